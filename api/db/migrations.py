@@ -0,0 +1,192 @@
+"""
+Versioned schema migrations recorded in public.schema_migrations.
+
+Each migration has a stable key and runs at most once per database; its key
+lands in the ledger in the same transaction as its DDL. Repeatable migrations
+carry a checksum and run again whenever the checksum the code computes no
+longer matches the ledger. Checking whether a database is already at head is
+one SELECT, so scripts and API startup only pay for DDL when something is
+actually pending.
+
+Apply explicitly (e.g. on deploy) with ``python -m api.db.migrations migrate``;
+``python -m api.db.migrations status`` lists pending migrations and exits 1
+when there are any.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Sequence
+
+import psycopg2
+import psycopg2.errors
+
+MIGRATIONS_TABLE = "public.schema_migrations"
+# Arbitrary application-wide advisory lock key serialising migrators.
+MIGRATION_LOCK_KEY = 7340215
+SCHEMA_MIGRATION_LOCK_TIMEOUT_ENV = "SCHEMA_MIGRATION_LOCK_TIMEOUT"
+DEFAULT_MIGRATION_LOCK_TIMEOUT = "30s"
+
+
+@dataclass(frozen=True)
+class Migration:
+    key: str
+    description: str
+    apply: Callable[[Any], None]
+    # Set for repeatable migrations; they rerun when the checksum changes.
+    checksum: Callable[[], str] | None = None
+
+    @property
+    def repeatable(self) -> bool:
+        return self.checksum is not None
+
+
+class SchemaMigrationError(RuntimeError):
+    pass
+
+
+def _row_value(row: Any, index: int, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else row[index]
+
+
+def read_ledger(conn) -> dict[str, str | None] | None:
+    """Return applied migration keys and checksums, or None before the ledger exists."""
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT key, checksum FROM {MIGRATIONS_TABLE}")
+            rows = cur.fetchall() or []
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return None
+    conn.commit()
+    return {_row_value(row, 0, "key"): _row_value(row, 1, "checksum") for row in rows}
+
+
+def pending_migrations(ledger: dict[str, str | None] | None, migrations: Iterable[Migration]) -> list[Migration]:
+    applied = ledger or {}
+    pending = []
+    for migration in migrations:
+        if migration.key not in applied:
+            pending.append(migration)
+        elif migration.repeatable and applied[migration.key] != migration.checksum():
+            pending.append(migration)
+    return pending
+
+
+def _ensure_ledger(cur) -> None:
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            key text PRIMARY KEY,
+            description text NOT NULL,
+            checksum text,
+            execution_ms integer,
+            applied_at timestamp with time zone NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def _lock_timeout() -> str:
+    return (os.getenv(SCHEMA_MIGRATION_LOCK_TIMEOUT_ENV) or "").strip() or DEFAULT_MIGRATION_LOCK_TIMEOUT
+
+
+def migrate(conn, migrations: Sequence[Migration], *, lock_timeout: str | None = None) -> list[str]:
+    """
+    Apply every pending migration in order and return the keys applied.
+
+    Migrators are serialised with an advisory lock and the pending list is
+    re-read under it, so concurrent starts apply each migration once. DDL runs
+    with a lock_timeout so a migration that would queue behind a long-running
+    table lock fails loudly instead of stalling every query behind it.
+    """
+    timeout = lock_timeout or _lock_timeout()
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        _ensure_ledger(cur)
+    conn.commit()
+
+    applied: list[str] = []
+    try:
+        for migration in pending_migrations(read_ledger(conn), migrations):
+            started = time.perf_counter()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT set_config('lock_timeout', %s, true)", (timeout,))
+                migration.apply(conn)
+                checksum = migration.checksum() if migration.checksum else None
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"""
+                        INSERT INTO {MIGRATIONS_TABLE} (key, description, checksum, execution_ms)
+                        VALUES (%s, %s, %s, %s)
+                        ON CONFLICT (key) DO UPDATE SET
+                            description = EXCLUDED.description,
+                            checksum = EXCLUDED.checksum,
+                            execution_ms = EXCLUDED.execution_ms,
+                            applied_at = now()
+                        """,
+                        (
+                            migration.key,
+                            migration.description,
+                            checksum,
+                            int((time.perf_counter() - started) * 1000),
+                        ),
+                    )
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                raise SchemaMigrationError(f"Schema migration {migration.key} failed: {exc}") from exc
+            applied.append(migration.key)
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+    return applied
+
+
+def migrate_to_head(conn, migrations: Sequence[Migration]) -> list[str]:
+    """Fast path: one SELECT when nothing is pending, otherwise migrate."""
+    if not pending_migrations(read_ledger(conn), migrations):
+        return []
+    return migrate(conn, migrations)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from api.db.connection import connect_db
+    from api.db.schema import SCHEMA_MIGRATIONS
+
+    parser = argparse.ArgumentParser(description="Inspect or apply app schema migrations.")
+    parser.add_argument("command", nargs="?", choices=("status", "migrate"), default="status")
+    args = parser.parse_args(argv)
+
+    conn = connect_db()
+    try:
+        if args.command == "migrate":
+            applied = migrate(conn, SCHEMA_MIGRATIONS)
+            for key in applied:
+                print(f"✅ Applied {key}")
+            print("✅ Schema is at head." if not applied else f"✅ Applied {len(applied)} migration(s).")
+            return 0
+
+        ledger = read_ledger(conn)
+        pending = {migration.key for migration in pending_migrations(ledger, SCHEMA_MIGRATIONS)}
+        for migration in SCHEMA_MIGRATIONS:
+            if migration.key not in pending:
+                state = "applied"
+            elif migration.key in (ledger or {}):
+                state = "changed"
+            else:
+                state = "pending"
+            print(f"{migration.key:<24} {state:<8} {migration.description}")
+        return 1 if pending else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,14 @@ import os
 import psycopg2
 
 from api.db.connection import connect_db, get_database_url
-from api.services.app_settings import bootstrap_settings_from_env, ensure_settings_schema, sync_setting_descriptions
+from api.db.migrations import Migration, migrate, migrate_to_head
+from api.services.app_settings import (
+    bootstrap_settings_from_env,
+    ensure_settings_schema,
+    settings_catalog_checksum,
+    sync_setting_descriptions,
+)
+from api.services.library_search import detect_trigram_search, refresh_library_search
 
 CANONICAL_FEEDBACK_VALUES = (
     "interested",
@@ -12,11 +19,14 @@ CANONICAL_FEEDBACK_VALUES = (
     "watched_dislike",
 )
 
+# Database URLs whose schema updates already ran in this process (and, for the
+# warm pipeline worker, in every stage forked from it).
+_APPLIED_SCHEMA_URLS: set[str] = set()
+
 
-def apply_schema_updates(conn) -> None:
+def _apply_baseline_schema(conn) -> None:
     with conn.cursor() as cur:
         ensure_settings_schema(conn)
-        sync_setting_descriptions(conn)
         cur.execute(
             """
             ALTER TABLE IF EXISTS public.users
@@ -596,17 +606,281 @@ def apply_schema_updates(conn) -> None:
             ON public.pipeline_run_stages (run_id)
             """
         )
-    conn.commit()
+
+
+def _add_pipeline_stage_fingerprints(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            ALTER TABLE IF EXISTS public.pipeline_run_stages
+            ADD COLUMN IF NOT EXISTS input_fingerprint text
+            """
+        )
+        cur.execute(
+            """
+            ALTER TABLE IF EXISTS public.pipeline_run_stages
+            ADD COLUMN IF NOT EXISTS input_fingerprint_detail jsonb
+            """
+        )
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_pipeline_run_stages_stage_key
+            ON public.pipeline_run_stages (stage_key, stage_id DESC)
+            """
+        )
+
+
+def _add_pipeline_stage_metrics(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.pipeline_stage_metrics (
+                stage_id integer PRIMARY KEY REFERENCES public.pipeline_run_stages(stage_id) ON DELETE CASCADE,
+                run_id integer NOT NULL REFERENCES public.pipeline_runs(run_id) ON DELETE CASCADE,
+                stage_key text NOT NULL,
+                status text NOT NULL,
+                wall_seconds double precision NOT NULL,
+                cpu_user_seconds double precision,
+                cpu_system_seconds double precision,
+                peak_rss_kb bigint,
+                rows_read bigint,
+                rows_written bigint,
+                phases jsonb NOT NULL DEFAULT '{}'::jsonb,
+                recorded_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_pipeline_stage_metrics_stage_key
+            ON public.pipeline_stage_metrics (stage_key, stage_id DESC)
+            """
+        )
+        cur.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_pipeline_stage_metrics_run_id
+            ON public.pipeline_stage_metrics (run_id)
+            """
+        )
+
+
+def _add_scoring_delta_state(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.scoring_media_state (
+                rating_key integer PRIMARY KEY,
+                embedding_hash text NOT NULL,
+                scored_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.scoring_user_state (
+                username text PRIMARY KEY,
+                embedding_hash text NOT NULL,
+                model_version text NOT NULL,
+                scored_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+
+
+def _add_recommendation_keyset_indexes(conn) -> None:
+    # Keyset pages seek on (sort columns..., rating_key). Scores live on
+    # recommendations; the other sortable columns come from library through
+    # expanded_recs_w_label_v. score_band is a per-request percentile and
+    # cannot be indexed.
+    statements = (
+        """
+        CREATE INDEX IF NOT EXISTS recommendations_username_score_key_idx
+        ON public.recommendations (username, predicted_probability DESC NULLS LAST, rating_key)
+        """,
+        "CREATE INDEX IF NOT EXISTS library_title_key_idx ON public.library (title, rating_key)",
+        """
+        CREATE INDEX IF NOT EXISTS library_show_episode_order_idx
+        ON public.library (show_title, season_number, episode_number, rating_key)
+        """,
+        "CREATE INDEX IF NOT EXISTS library_year_key_idx ON public.library (year, rating_key)",
+        "CREATE INDEX IF NOT EXISTS library_media_type_key_idx ON public.library (media_type, rating_key)",
+    )
+    with conn.cursor() as cur:
+        for statement in statements:
+            cur.execute(statement)
+
+
+def _add_response_cache_versions(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.response_cache_versions (
+                scope text PRIMARY KEY,
+                version bigint NOT NULL DEFAULT 0,
+                updated_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+
+
+def _ensure_pg_trgm(cur) -> bool:
+    """
+    Install pg_trgm when it is missing. Creating an extension needs rights the
+    app role may not have, so a failure leaves search on tsvector only.
+    """
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if cur.fetchone() is not None:
+        return True
+    cur.execute("SAVEPOINT create_pg_trgm")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except psycopg2.Error as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT create_pg_trgm")
+        print(f"⚠️ Could not create the pg_trgm extension; library search will skip fuzzy title matching: {exc}")
+        return False
+    cur.execute("RELEASE SAVEPOINT create_pg_trgm")
+    return True
+
+
+def _add_library_search(conn) -> None:
+    with conn.cursor() as cur:
+        trigram = _ensure_pg_trgm(cur)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.library_search (
+                rating_key integer PRIMARY KEY,
+                title text,
+                show_title text,
+                document tsvector NOT NULL,
+                updated_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS library_search_document_idx "
+            "ON public.library_search USING gin (document)"
+        )
+        if trigram:
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS library_search_title_trgm_idx "
+                "ON public.library_search USING gin (title gin_trgm_ops)"
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS library_search_show_title_trgm_idx "
+                "ON public.library_search USING gin (show_title gin_trgm_ops)"
+            )
+        refresh_library_search(cur)
+
+
+def _add_poster_asset_cache(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.poster_asset_cache (
+                rating_key integer NOT NULL,
+                variant text NOT NULL,
+                poster_path text NOT NULL,
+                content bytea NOT NULL,
+                content_type text NOT NULL,
+                updated_at timestamp with time zone NOT NULL DEFAULT now(),
+                PRIMARY KEY (rating_key, variant)
+            )
+            """
+        )
+
+
+def _add_tautulli_metadata_cache(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.tautulli_metadata_cache (
+                endpoint text NOT NULL,
+                rating_key integer NOT NULL,
+                updated_at bigint,
+                parent_rating_key integer,
+                grandparent_rating_key integer,
+                payload jsonb NOT NULL,
+                fetched_at timestamp with time zone NOT NULL DEFAULT now(),
+                PRIMARY KEY (endpoint, rating_key)
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS tautulli_metadata_cache_fetched_at_idx "
+            "ON public.tautulli_metadata_cache (fetched_at)"
+        )
+
+
+def _add_library_change_fingerprints(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.library_section_fingerprints (
+                section_id integer PRIMARY KEY,
+                item_count integer,
+                parent_count integer,
+                child_count integer,
+                checked_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS public.library_show_fingerprints (
+                show_rating_key integer PRIMARY KEY,
+                season_count integer NOT NULL,
+                episode_count integer NOT NULL,
+                updated_at bigint,
+                checked_at timestamp with time zone NOT NULL DEFAULT now()
+            )
+            """
+        )
+
+
+def _sync_settings_catalog(conn) -> None:
+    sync_setting_descriptions(conn)
     bootstrap_settings_from_env(conn)
 
 
+# Append new schema changes as new numbered entries; never edit an applied one.
+SCHEMA_MIGRATIONS = (
+    Migration("0001_baseline", "Baseline app schema", _apply_baseline_schema),
+    Migration("0002_pipeline_stage_fingerprints", "Pipeline stage input fingerprints", _add_pipeline_stage_fingerprints),
+    Migration("0003_pipeline_stage_metrics", "Pipeline stage resource metrics", _add_pipeline_stage_metrics),
+    Migration("0004_scoring_delta_state", "Scored embedding ledgers for delta scoring", _add_scoring_delta_state),
+    Migration("0005_recommendation_keyset_indexes", "Indexes for keyset-paged recommendation lists", _add_recommendation_keyset_indexes),
+    Migration("0006_response_cache_versions", "Invalidation versions for cached recommendation pages", _add_response_cache_versions),
+    Migration("0007_library_search", "Weighted full-text and trigram library search", _add_library_search),
+    Migration("0008_poster_asset_cache", "Persistent optimized poster bytes for digests", _add_poster_asset_cache),
+    Migration("0009_tautulli_metadata_cache", "Persistent Tautulli metadata responses", _add_tautulli_metadata_cache),
+    Migration("0010_library_change_fingerprints", "Section and show fingerprints for incremental sync", _add_library_change_fingerprints),
+    Migration(
+        "settings_catalog",
+        "Setting descriptions and env bootstrap",
+        _sync_settings_catalog,
+        checksum=settings_catalog_checksum,
+    ),
+)
+
+
+def apply_schema_updates(conn) -> list[str]:
+    """Apply every pending migration; returns the keys that ran."""
+    return migrate(conn, SCHEMA_MIGRATIONS)
+
+
 def ensure_app_schema(db_url: str | None = None) -> None:
     resolved_db_url = db_url or get_database_url()
     if not resolved_db_url:
         return
+    if resolved_db_url in _APPLIED_SCHEMA_URLS:
+        return
 
     conn = psycopg2.connect(resolved_db_url) if db_url else connect_db()
     try:
-        apply_schema_updates(conn)
+        migrate_to_head(conn, SCHEMA_MIGRATIONS)
+        with conn.cursor() as cur:
+            detect_trigram_search(cur)
+        conn.commit()
     finally:
         conn.close()
+    _APPLIED_SCHEMA_URLS.add(resolved_db_url)
@@ -21,6 +21,7 @@ from api.routes import admin_routes
 from api.routes import agent_tools
 from api.routes import feedback_routes  # <- wherever your route is
 from api.routes import library_catalog
+from api.routes import model_admin_routes
 from api.routes import plex_oauth_routes
 from api.routes import poster_routes
 from api.routes import rag_routes
@@ -135,6 +136,7 @@ app.include_router(poster_routes.router, prefix="/api")
 app.include_router(library_catalog.router, prefix="/api/library", tags=["library"])
 app.include_router(digest_routes.router, prefix="/api", tags=["digests"])
 app.include_router(pipeline_admin_routes.router, prefix="/api", tags=["pipeline"])
+app.include_router(model_admin_routes.router, prefix="/api", tags=["models"])
 app.include_router(agent_tools.router, prefix="/api/agent", tags=["agent-tools"])
 app.include_router(video_router.router, prefix="/api/agent", tags=["sora-video"])
 app.mount("/mcp", mcp_mount_app, name="mcp")
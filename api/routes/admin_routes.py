@@ -17,12 +17,14 @@ from api.services.app_settings import (
     test_tautulli_settings,
 )
 from api.services.plex_service import get_plex_user_info
+from api.services.response_cache import response_cache_stats
 from api.routes.recommendation_routes import (
     DEFAULT_PAGE_LIMIT,
     MAX_PAGE_LIMIT,
     _append_paging,
     _build_recommendations_query,
     _decorate_recommendation_rows,
+    _next_page_cursor,
     _page_rows,
     get_default_display_threshold,
 )
@@ -207,6 +209,7 @@ def admin_get_recommendations(
     search: Optional[str] = Query(None),
     limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page; overrides offset."),
     sort: Optional[list[str]] = Query(None),
     min_probability: Optional[float] = Query(None, ge=0.0, le=1.0),
     admin_user=Depends(require_admin),
@@ -226,10 +229,14 @@ def admin_get_recommendations(
                 display_threshold=display_threshold,
             )
 
-            sql = _append_paging(sql, params, limit=limit, offset=offset)
+            cursor = cursor if isinstance(cursor, str) and cursor else None
+            sql = _append_paging(sql, params, limit=limit, offset=offset, cursor=cursor, sort=sort)
             cur.execute(sql, tuple(params))
             fetched_rows = cur.fetchall()
             rec_rows, has_more, next_offset = _page_rows(fetched_rows, limit=limit, offset=offset)
+            next_cursor = _next_page_cursor(rec_rows, has_more, sort)
+            if cursor:
+                next_offset = None
             _decorate_recommendation_rows(rec_rows)
 
             cur.execute(
@@ -258,12 +265,18 @@ def admin_get_recommendations(
         "display_threshold": display_threshold,
         "has_more": has_more,
         "next_offset": next_offset,
+        "next_cursor": next_cursor,
         "limit": limit,
         "offset": offset,
         "threshold_note": "Raw predicted_probability values are stored unchanged; this threshold only filters display results.",
     }
 
 
+@router.get("/admin/response-cache")
+def admin_response_cache_stats(admin_user=Depends(require_admin)):
+    return {"requested_by": admin_user["username"], **response_cache_stats()}
+
+
 @router.get("/admin/feedback")
 def admin_feedback_history(
     target_username: str = Query(...),
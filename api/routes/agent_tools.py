@@ -12,6 +12,7 @@ from api.services.agent_tool_service import (
     RecentLibraryAdditionsResponse,
     WatchHistoryResponse,
     get_agent_library_item,
+    get_agent_library_items,
     get_agent_recommendations,
     get_recent_library_additions,
     get_agent_watch_history,
@@ -19,6 +20,7 @@ from api.services.agent_tool_service import (
     search_agent_library,
 )
 from api.services.feedback_service import normalize_feedback_action, record_feedback
+from api.services.rescoring_service import schedule_user_rescore
 from api.services.poster_markup_service import (
     build_poster_gallery_payload,
     coerce_gallery_entries,
@@ -105,9 +107,9 @@ def agent_search_library(
         None, description="Optional filter: movie, episode, show, etc."
     ),
     sort_by: str = Query(
-        "title",
-        description="Sort field: 'title' or 'year'",
-        pattern="^(title|year)$",
+        "relevance",
+        description="Sort field: 'relevance', 'title' or 'year'",
+        pattern="^(relevance|title|year)$",
     ),
     sort_dir: str = Query(
         "asc",
@@ -137,18 +139,20 @@ def agent_poster_gallery(payload: PosterGalleryPayload):
         items=[item.model_dump() for item in payload.items],
     )
 
-    for entry in entries:
-        title = entry.get("title")
-        media_type = entry.get("media_type")
-        if title and media_type:
-            continue
+    lookup_keys = [
+        entry["rating_key"] for entry in entries if not entry.get("title") or not entry.get("media_type")
+    ]
+    library_items = {}
+    if lookup_keys:
         try:
-            item = get_agent_library_item(rating_key=entry["rating_key"])
-            entry["title"] = title or item.title
-            entry["media_type"] = media_type or item.media_type
+            library_items = {item.rating_key: item for item in get_agent_library_items(rating_keys=lookup_keys)}
         except Exception:
-            entry["title"] = title
-            entry["media_type"] = media_type
+            library_items = {}
+
+    for entry in entries:
+        item = library_items.get(entry["rating_key"])
+        entry["title"] = entry.get("title") or (item.title if item else None)
+        entry["media_type"] = entry.get("media_type") or (item.media_type if item else None)
 
     return build_poster_gallery_payload(
         entries,
@@ -193,6 +197,7 @@ def agent_submit_feedback(payload: FeedbackPayload):
                 plex_token=None,
             )
         conn.commit()
+    schedule_user_rescore(payload.user)
 
     return FeedbackResponse(
         status="ok",
@@ -7,6 +7,7 @@ from api.routes.admin_routes import get_current_user, require_admin
 from api.services.digest_service import (
     DigestConfigError,
     generate_digest_preview,
+    get_digest_candidates,
     get_digest_content,
     get_digest_history,
     get_unsubscribe_target,
@@ -96,6 +97,19 @@ def admin_test_send_digest(req: DigestTestSendRequest, admin_user=Depends(requir
     }
 
 
+@router.get("/admin/digest/candidates")
+def admin_digest_candidates(admin_user=Depends(require_admin)):
+    try:
+        candidates = get_digest_candidates()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed loading digest candidates: {exc}") from exc
+
+    return {
+        "requested_by": admin_user["username"],
+        **candidates,
+    }
+
+
 @router.get("/admin/digest/history")
 def admin_digest_history(admin_user=Depends(require_admin)):
     history = get_digest_history()
@@ -12,6 +12,7 @@ from api.services.feedback_service import (
     record_feedback,
 )
 from api.services.plex_service import get_plex_user_info
+from api.services.rescoring_service import schedule_user_rescore
 
 
 router = APIRouter()
@@ -76,6 +77,7 @@ def submit_feedback(request: Request, feedback: FeedbackIn):
         return {
             "status": "ok",
             "feedback": feedback_row,
+            "rescore": schedule_user_rescore(username),
         }
 
     except HTTPException:
@@ -108,6 +110,7 @@ def submit_bulk_feedback(request: Request, feedback: FeedbackIn):
         return {
             "status": "ok",
             **result,
+            "rescore": schedule_user_rescore(username),
         }
 
     except HTTPException:
@@ -139,6 +142,7 @@ def remove_feedback(request: Request, rating_key: int, username: str | None = No
         return {
             "status": "ok",
             **result,
+            "rescore": schedule_user_rescore(resolved_username),
         }
 
     except HTTPException:
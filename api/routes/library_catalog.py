@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, Query
 from psycopg2.extras import RealDictCursor
 
 from api.db.connection import connect_db
+from api.services.library_search import search_keys_subquery, search_params, search_rank_sql, search_terms
 
 router = APIRouter()
 
@@ -52,8 +53,9 @@ def search(
 ):
     clauses: list[str] = []
     params: list = []
-    if title:
-        clauses += ["LOWER(title) LIKE LOWER(%s)"]; params += [f"%{title}%"]
+    ranked = bool(search_terms(title))
+    if ranked:
+        clauses += [f"rating_key IN ({search_keys_subquery()})"]; params += search_params(title)
     if media_type:
         clauses += ["media_type = %s"]; params += [media_type]
     if genre:
@@ -68,6 +70,16 @@ def search(
         clauses += ["duration IS NOT NULL AND duration <= %s"]; params += [duration_lte]
 
     where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-    sql = BASE + where + " ORDER BY changed_at DESC NULLS LAST LIMIT %s"
+    if ranked:
+        # Rank by the same score the agent search uses; library_catalog_v has no search columns.
+        order = (
+            f" ORDER BY (SELECT {search_rank_sql('ls')} FROM library_search ls"
+            " WHERE ls.rating_key = library_catalog_v.rating_key) DESC NULLS LAST,"
+            " changed_at DESC NULLS LAST LIMIT %s"
+        )
+        params += search_params(title)
+    else:
+        order = " ORDER BY changed_at DESC NULLS LAST LIMIT %s"
+    sql = BASE + where + order
     rows = q(sql, (*params, limit))
     return {"items": rows}
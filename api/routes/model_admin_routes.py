@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.routes.admin_routes import require_admin
+from api.services.model_registry import (
+    ModelRegistryError,
+    describe_version,
+    list_versions,
+    read_pointer,
+    rollback,
+    set_current,
+)
+
+router = APIRouter()
+
+
+def _registry_state() -> dict:
+    try:
+        pointer = read_pointer() or {}
+    except ModelRegistryError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    current = pointer.get("version")
+    return {
+        "current": current,
+        "previous": pointer.get("previous"),
+        "updated_at": pointer.get("updated_at"),
+        "models": [describe_version(model_version, current) for model_version in reversed(list_versions())],
+    }
+
+
+@router.get("/admin/models")
+def admin_list_models(admin_user=Depends(require_admin)):
+    return {"requested_by": admin_user["username"], **_registry_state()}
+
+
+@router.post("/admin/models/{version}/activate")
+def admin_activate_model(version: str, admin_user=Depends(require_admin)):
+    try:
+        set_current(version, reason=f"activated by {admin_user['username']}")
+    except ModelRegistryError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return {"requested_by": admin_user["username"], **_registry_state()}
+
+
+@router.post("/admin/models/rollback")
+def admin_rollback_model(admin_user=Depends(require_admin)):
+    try:
+        rollback()
+    except ModelRegistryError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"requested_by": admin_user["username"], **_registry_state()}
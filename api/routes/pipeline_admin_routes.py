@@ -6,6 +6,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from api.routes.admin_routes import require_admin
+from api.services.pipeline_metrics_service import DEFAULT_COMPARE_RUNS, MAX_COMPARE_RUNS, get_pipeline_run_metrics
 from api.services.pipeline_service import (
     get_pipeline_run,
     get_pipeline_runs,
@@ -55,6 +56,18 @@ def admin_get_pipeline_run(run_id: int, admin_user=Depends(require_admin)):
     return {"requested_by": admin_user["username"], "run": _serialize_run(row)}
 
 
+@router.get("/admin/pipeline/runs/{run_id}/metrics")
+def admin_get_pipeline_run_metrics(
+    run_id: int,
+    compare: int = Query(DEFAULT_COMPARE_RUNS, ge=1, le=MAX_COMPARE_RUNS),
+    admin_user=Depends(require_admin),
+):
+    payload = get_pipeline_run_metrics(run_id, compare_runs=compare)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {"requested_by": admin_user["username"], **payload}
+
+
 @router.post("/admin/pipeline/runs/{run_id}/cancel", status_code=202)
 def admin_cancel_pipeline_run(run_id: int, admin_user=Depends(require_admin)):
     result = request_pipeline_cancel(
@@ -77,7 +90,7 @@ def admin_cancel_pipeline_run(run_id: int, admin_user=Depends(require_admin)):
 
 
 @router.post("/admin/pipeline/trigger")
-def admin_trigger_pipeline(admin_user=Depends(require_admin)):
+def admin_trigger_pipeline(force: bool = False, admin_user=Depends(require_admin)):
     username = admin_user["username"]
 
     def worker() -> None:
@@ -86,14 +99,19 @@ def admin_trigger_pipeline(admin_user=Depends(require_admin)):
                 delivery_type="manual",
                 triggered_by=username,
                 schedule_key=None,
+                force=force,
             )
         except Exception as exc:
             print(f"Manual pipeline error: {exc}")
 
     thread = threading.Thread(target=worker, daemon=True)
     thread.start()
+    detail = "Pipeline started in the background. Refresh runs to see progress."
+    if force:
+        detail = "Pipeline started in the background with every stage forced to run. Refresh runs to see progress."
     return {
         "status": "accepted",
         "requested_by": username,
-        "detail": "Pipeline started in the background. Refresh runs to see progress.",
+        "force": force,
+        "detail": detail,
     }
@@ -5,6 +5,17 @@ from psycopg2.extras import RealDictCursor
 
 from api.db.connection import connect_db
 from api.services.app_settings import get_setting_value
+from api.services.recommendation_query_service import (
+    _keyset_predicate,
+    decode_page_cursor,
+    encode_page_cursor,
+)
+from api.services.response_cache import (
+    fetch_cache_versions,
+    get_response_cache,
+    response_cache_enabled,
+    response_cache_key,
+)
 from api.services.recommendation_filter_service import (
     latest_feedback_cte,
     leaf_feedback_join,
@@ -13,6 +24,12 @@ from api.services.recommendation_filter_service import (
 
 router = APIRouter()
 
+PUBLIC_SORT_KEYS = [("predicted_probability", "desc"), ("rating_key", "asc")]
+PUBLIC_SORT_COLUMNS = {
+    "predicted_probability": "recs.predicted_probability",
+    "rating_key": "recs.rating_key",
+}
+
 # ✅ Validate API Key format + value
 def validate_api_key(apikey: Optional[str]):
     expected_api_key = get_setting_value("public_api.api_key")
@@ -22,8 +39,38 @@ def validate_api_key(apikey: Optional[str]):
     except Exception:
         raise HTTPException(status_code=403, detail="Invalid or missing API key")
 
+def _count_results(cur, username, count_query, params):
+    """Total matching rows, computed once per filter and recommendation/feedback version."""
+    cache_key = None
+    if response_cache_enabled():
+        cache_key = response_cache_key(
+            "public_recs_total",
+            username,
+            {"sql": count_query, "params": params},
+            fetch_cache_versions(cur, username),
+        )
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            return cached["total"]
+
+    cur.execute(count_query, tuple(params))
+    total = cur.fetchone()["count"]
+    if cache_key is not None:
+        get_response_cache().set(cache_key, {"total": total})
+    return total
+
+
 # 📦 Shared logic for both routes
-def fetch_recommendations(username, genre, media_type, score_threshold, page, page_size):
+def fetch_recommendations(
+    username,
+    genre,
+    media_type,
+    score_threshold,
+    page,
+    page_size,
+    cursor=None,
+    include_total=True,
+):
     base_query = """
         FROM expanded_recs_w_label_v recs
     """ + leaf_feedback_join("recs") + """
@@ -41,36 +88,57 @@ def fetch_recommendations(username, genre, media_type, score_threshold, page, pa
         base_query += " AND recs.predicted_probability >= %s"
         params.append(score_threshold)
 
-    offset = (page - 1) * page_size
+    count_query = latest_feedback_cte() + f"SELECT COUNT(*) {base_query}"
+
+    # A cursor seeks past the previous page on (score, rating_key); page
+    # numbers still work for older clients but get slower the deeper they go.
+    cursor = cursor if isinstance(cursor, str) and cursor else None
+    page_query = base_query
+    page_params = list(params)
+    if cursor:
+        page_predicate, predicate_params = _keyset_predicate(
+            PUBLIC_SORT_KEYS,
+            decode_page_cursor(cursor, PUBLIC_SORT_KEYS),
+            PUBLIC_SORT_COLUMNS,
+        )
+        page_query += f" AND {page_predicate}"
+        page_params += predicate_params
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
 
     data_query = latest_feedback_cte() + f"""
         SELECT recs.rating_key, recs.title, recs.predicted_probability, recs.semantic_themes,
                recs.year, recs.genres, recs.show_title, recs.media_type
-        {base_query}
-        ORDER BY recs.predicted_probability DESC
+        {page_query}
+        ORDER BY recs.predicted_probability DESC NULLS LAST, recs.rating_key ASC
         LIMIT %s OFFSET %s
     """
-    count_query = latest_feedback_cte() + f"SELECT COUNT(*) {base_query}"
-    params_with_pagination = params + [page_size, offset]
+    params_with_pagination = page_params + [page_size + 1, offset]
 
     try:
         conn = connect_db(cursor_factory=RealDictCursor)
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        cur.execute(count_query, tuple(params))
-        total = cur.fetchone()["count"]
+        total = _count_results(cur, username, count_query, params) if include_total else None
 
         cur.execute(data_query, tuple(params_with_pagination))
-        rows = cur.fetchall()
+        fetched_rows = cur.fetchall()
+        rows = fetched_rows[:page_size]
+        has_more = len(fetched_rows) > page_size
 
         return {
             "page": page,
             "page_size": page_size,
             "total_results": total,
-            "total_pages": (total + page_size - 1) // page_size,
-            "results": rows
+            "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+            "results": rows,
+            "next_cursor": encode_page_cursor(rows[-1], PUBLIC_SORT_KEYS) if has_more and rows else None,
         }
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -86,10 +154,14 @@ def get_public_recs(
     score_threshold: Optional[float] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True, description="Set false to skip total_results/total_pages."),
     apikey: Optional[str] = Query(None, alias="apikey")
 ):
     validate_api_key(apikey)
-    return fetch_recommendations(username, genre, media_type, score_threshold, page, page_size)
+    return fetch_recommendations(
+        username, genre, media_type, score_threshold, page, page_size, cursor, include_total
+    )
 
 # 🧭 Tautulli-style command router
 @router.get("/api")
@@ -101,13 +173,17 @@ def tautulli_style_router(
     media_type: Optional[str] = Query(None),
     score_threshold: Optional[float] = Query(None),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
 ):
     validate_api_key(apikey)
 
     if cmd == "get_public_recs":
         if not username:
             raise HTTPException(status_code=400, detail="Missing required parameter: username")
-        return fetch_recommendations(username, genre, media_type, score_threshold, page, page_size)
+        return fetch_recommendations(
+            username, genre, media_type, score_threshold, page, page_size, cursor, include_total
+        )
     else:
         raise HTTPException(status_code=400, detail=f"Unknown command: {cmd}")
@@ -13,6 +13,13 @@ from api.services.poster_service import (
 )
 from api.services.app_settings import get_setting_value
 from api.services.pipeline_service import fetch_score_model_refresh_status, is_score_model_refreshing
+from api.services.rescoring_service import schedule_user_rescore, user_rescore_status
+from api.services.response_cache import (
+    fetch_cache_versions,
+    get_response_cache,
+    response_cache_enabled,
+    response_cache_key,
+)
 from api.services.recommendation_query_service import (
     DEFAULT_PAGE_LIMIT,
     MAX_PAGE_LIMIT,
@@ -21,6 +28,7 @@ from api.services.recommendation_query_service import (
     _build_order_clause,
     _build_recommendations_query,
     _feedback_rollup_cte,
+    _next_page_cursor,
     _page_rows,
 )
 
@@ -99,6 +107,7 @@ def get_recommendations(
     search: Optional[str] = Query(None),
     limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page; overrides offset."),
     sort: Optional[list[str]] = Query(None),
     min_probability: Optional[float] = Query(
         None,
@@ -152,10 +161,30 @@ def get_recommendations(
             score_max=score_max,
         )
 
-        sql = _append_paging(sql, params, limit=limit, offset=offset)
+        cursor = cursor if isinstance(cursor, str) and cursor else None
+        sql = _append_paging(sql, params, limit=limit, offset=offset, cursor=cursor, sort=sort)
+
+        # The built SQL and params are the normalized query. is_refreshing is
+        # never cached; it is read fresh for every response.
+        cache_key = None
+        if response_cache_enabled():
+            cache_key = response_cache_key(
+                "recommendations",
+                plex_username,
+                {"sql": sql, "params": params, "limit": limit, "offset": offset},
+                fetch_cache_versions(cur, plex_username),
+            )
+            cached = get_response_cache().get(cache_key)
+            if cached is not None:
+                cached["is_refreshing"] = fetch_score_model_refresh_status(cur)
+                return cached
+
         cur.execute(sql, tuple(params))
         fetched_rows = cur.fetchall()
         rec_rows, has_more, next_offset = _page_rows(fetched_rows, limit=limit, offset=offset)
+        next_cursor = _next_page_cursor(rec_rows, has_more, sort)
+        if cursor:
+            next_offset = None
         _decorate_recommendation_rows(rec_rows)
 
         print(f"Found {len(rec_rows)} recs for {plex_username}")
@@ -175,21 +204,23 @@ def get_recommendations(
             (plex_username,),
         )
         feedback_keys = [row["rating_key"] for row in cur.fetchall()]
-        is_refreshing = fetch_score_model_refresh_status(cur)
 
-        return {
+        payload = {
             "username": plex_username,
             "recommendations": rec_rows,
             "last_updated": rec_rows[0]["scored_at"] if rec_rows else None,
-            "is_refreshing": is_refreshing,
             "feedback_keys": feedback_keys,
             "display_threshold": display_threshold,
             "has_more": has_more,
             "next_offset": next_offset,
+            "next_cursor": next_cursor,
             "limit": limit,
             "offset": offset,
             "threshold_note": "Raw predicted_probability values are stored unchanged; this threshold only filters display results.",
         }
+        if cache_key is not None:
+            get_response_cache().set(cache_key, payload)
+        return {**payload, "is_refreshing": fetch_score_model_refresh_status(cur)}
 
     except HTTPException:
         raise
@@ -213,4 +244,18 @@ def get_recommendations_refresh_status(request: Request):
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    return {"is_refreshing": is_score_model_refreshing()}
+    payload = {"is_refreshing": is_score_model_refreshing()}
+    username = request.session.get("username")
+    if username:
+        payload["user_rescore"] = user_rescore_status(username)
+    return payload
+
+
+@router.post("/recommendations/rescore", status_code=202)
+def request_recommendations_rescore(request: Request):
+    token = request.session.get("plex_token")
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    username = request.session.get("username") or get_plex_username(token)
+    return {"username": username, **schedule_user_rescore(username, reason="manual", force=True)}
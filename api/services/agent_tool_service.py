@@ -9,6 +9,8 @@ from pydantic import BaseModel
 from psycopg2.extras import RealDictCursor
 
 from api.db.connection import connect_db
+from api.services.library_search import search_match_sql, search_params, search_rank_sql, search_terms
+from api.services.poster_service import resolve_poster_path_from_row
 from api.services.recommendation_query_service import (
     _build_recommendations_query,
     is_media_type_view_alias,
@@ -66,6 +68,7 @@ class LibraryItem(BaseModel):
     genres: Optional[str] = None
     actors: Optional[str] = None
     directors: Optional[str] = None
+    has_poster: Optional[bool] = None
 
 
 class LibrarySearchResponse(BaseModel):
@@ -226,46 +229,46 @@ def search_agent_library(
     *,
     q: str,
     media_type: Optional[str] = None,
-    sort_by: str = "title",
+    sort_by: str = "relevance",
     sort_dir: str = "asc",
     limit: int = 20,
 ) -> LibrarySearchResponse:
-    pattern = f"%{q}%"
-    sql = """
+    if not search_terms(q):
+        return LibrarySearchResponse(query=q, count=0, items=[])
+
+    sql = f"""
         SELECT
-            rating_key,
-            media_type,
-            show_title,
-            title,
-            summary,
-            season_number,
-            episode_number,
-            rating,
-            year,
-            duration,
-            genres,
-            actors,
-            directors
-        FROM media_enriched_v
-        WHERE (
-            title ILIKE %s
-            OR show_title ILIKE %s
-            OR summary ILIKE %s
-            OR genres ILIKE %s
-            OR actors ILIKE %s
-            OR directors ILIKE %s
-        )
+            m.rating_key,
+            m.media_type,
+            m.show_title,
+            m.title,
+            m.summary,
+            m.season_number,
+            m.episode_number,
+            m.rating,
+            m.year,
+            m.duration,
+            m.genres,
+            m.actors,
+            m.directors,
+            {search_rank_sql("ls")} AS relevance
+        FROM public.library_search ls
+        JOIN media_enriched_v m ON m.rating_key = ls.rating_key
+        WHERE {search_match_sql("ls")}
     """
 
-    params: List[object] = [pattern, pattern, pattern, pattern, pattern, pattern]
+    params: List[object] = [*search_params(q), *search_params(q)]
 
     if media_type:
-        sql += " AND media_type = %s"
+        sql += " AND m.media_type = %s"
         params.append(media_type)
 
-    order_col = "year" if sort_by == "year" else "title"
     order_dir = "ASC" if sort_dir == "asc" else "DESC"
-    sql += f" ORDER BY {order_col} {order_dir}, title ASC LIMIT %s"
+    if sort_by == "relevance":
+        sql += " ORDER BY relevance DESC, m.title ASC LIMIT %s"
+    else:
+        order_col = "m.year" if sort_by == "year" else "m.title"
+        sql += f" ORDER BY {order_col} {order_dir}, m.title ASC LIMIT %s"
     params.append(limit)
 
     with _get_conn() as conn:
@@ -295,34 +298,7 @@ def search_agent_library(
     return LibrarySearchResponse(query=q, count=len(items), items=items)
 
 
-def get_agent_library_item(*, rating_key: int) -> LibraryItem:
-    sql = """
-        SELECT
-            rating_key,
-            media_type,
-            show_title,
-            title,
-            summary,
-            season_number,
-            episode_number,
-            rating,
-            year,
-            duration,
-            genres,
-            actors,
-            directors
-        FROM media_enriched_v
-        WHERE rating_key = %s
-    """
-
-    with _get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (rating_key,))
-            row = cur.fetchone()
-
-    if not row:
-        raise HTTPException(status_code=404, detail="Item not found")
-
+def _library_item_from_row(row) -> LibraryItem:
     return LibraryItem(
         rating_key=row["rating_key"],
         title=row["title"],
@@ -337,9 +313,60 @@ def get_agent_library_item(*, rating_key: int) -> LibraryItem:
         genres=row.get("genres"),
         actors=row.get("actors"),
         directors=row.get("directors"),
+        has_poster=resolve_poster_path_from_row(row) is not None,
     )
 
 
+def get_agent_library_items(*, rating_keys: List[int]) -> List[LibraryItem]:
+    """
+    Look up many library items in one query, in the order they were asked for.
+
+    Unknown keys are skipped. ``has_poster`` comes from the stored Plex thumb
+    paths, so callers can tell whether a poster exists without downloading it.
+    """
+    keys = list(dict.fromkeys(int(key) for key in rating_keys))
+    if not keys:
+        return []
+
+    sql = """
+        SELECT
+            m.rating_key,
+            m.media_type,
+            m.show_title,
+            m.title,
+            m.summary,
+            m.season_number,
+            m.episode_number,
+            m.rating,
+            m.year,
+            m.duration,
+            m.genres,
+            m.actors,
+            m.directors,
+            l.thumb_path,
+            l.parent_thumb_path,
+            l.grandparent_thumb_path
+        FROM media_enriched_v m
+        LEFT JOIN public.library l ON l.rating_key = m.rating_key
+        WHERE m.rating_key = ANY(%s)
+    """
+
+    with _get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, (keys,))
+            rows = cur.fetchall()
+
+    items_by_key = {int(row["rating_key"]): _library_item_from_row(row) for row in rows}
+    return [items_by_key[key] for key in keys if key in items_by_key]
+
+
+def get_agent_library_item(*, rating_key: int) -> LibraryItem:
+    items = get_agent_library_items(rating_keys=[rating_key])
+    if not items:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return items[0]
+
+
 def get_recent_library_additions(
     *,
     media_type: Optional[str] = None,
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import re
 from dataclasses import dataclass
@@ -542,6 +544,110 @@ SETTING_DEFINITIONS: tuple[SettingDefinition, ...] = (
         description="Number of days to wait before treating a meaningful partial episode watch as inferred abandonment.",
         minimum=0,
     ),
+    _setting(
+        "training.fast_mode",
+        "training_scoring",
+        "Fast Training Mode",
+        "boolean",
+        default=False,
+        env_aliases=("TRAINING_FAST_MODE",),
+        description=(
+            "Train with XGBoost's hist method on cached QuantileDMatrix data and let early stopping on the "
+            "validation split choose the number of boosting rounds. Plots are written to files instead of shown. "
+            "Usually much faster on large training sets; leave off to keep the fixed 100-round model."
+        ),
+    ),
+    _setting(
+        "training.n_jobs",
+        "training_scoring",
+        "Training Threads",
+        "integer",
+        default=0,
+        env_aliases=("TRAINING_N_JOBS",),
+        description=(
+            "Threads XGBoost may use while training in fast mode. 0 uses every available core; lower it to leave "
+            "CPU for the API or other pipeline work on the same host."
+        ),
+        minimum=0,
+    ),
+    _setting(
+        "training.max_boost_rounds",
+        "training_scoring",
+        "Maximum Boosting Rounds",
+        "integer",
+        default=400,
+        description="Upper bound on boosting rounds in fast training mode; early stopping usually stops well before.",
+        minimum=1,
+    ),
+    _setting(
+        "training.early_stopping_rounds",
+        "training_scoring",
+        "Early Stopping Rounds",
+        "integer",
+        default=25,
+        description=(
+            "In fast training mode, stop adding rounds once validation aucpr has not improved for this many rounds. "
+            "The final model is refit on all rows with the best round count."
+        ),
+        minimum=1,
+    ),
+    _setting(
+        "training.incremental_enabled",
+        "training_scoring",
+        "Incremental Model Refresh",
+        "boolean",
+        default=False,
+        env_aliases=("TRAINING_INCREMENTAL",),
+        description=(
+            "Continue boosting the saved model on only the training rows that are new or changed since the last "
+            "run, instead of retraining from zero. Falls back to a full retrain on the full-retrain schedule or when "
+            "the feature schema, changed-row share or label balance drifts."
+        ),
+    ),
+    _setting(
+        "training.incremental_rounds",
+        "training_scoring",
+        "Incremental Boosting Rounds",
+        "integer",
+        default=10,
+        description="Boosting rounds added per incremental refresh. Keep this small; each refresh grows the model.",
+        minimum=1,
+    ),
+    _setting(
+        "training.full_retrain_days",
+        "training_scoring",
+        "Full Retrain Interval Days",
+        "integer",
+        default=7,
+        description="With incremental refresh enabled, retrain from zero at least this often.",
+        minimum=1,
+    ),
+    _setting(
+        "training.incremental_max_changed_fraction",
+        "training_scoring",
+        "Incremental Max Changed Rows",
+        "float",
+        default=0.2,
+        description=(
+            "Retrain fully instead of incrementally when more than this share of training rows was added, "
+            "changed or removed since the last run."
+        ),
+        minimum=0.0,
+        maximum=1.0,
+    ),
+    _setting(
+        "training.incremental_max_label_drift",
+        "training_scoring",
+        "Incremental Max Label Drift",
+        "float",
+        default=0.05,
+        description=(
+            "Retrain fully when the share of positive training labels moves more than this far from the last full "
+            "retrain."
+        ),
+        minimum=0.0,
+        maximum=1.0,
+    ),
     _setting(
         "user_embeddings.engagement_threshold",
         "training_scoring",
@@ -583,6 +689,83 @@ SETTING_DEFINITIONS: tuple[SettingDefinition, ...] = (
         minimum=0.0,
         maximum=1.0,
     ),
+    _setting(
+        "recommendations.rescore_on_feedback",
+        "training_scoring",
+        "Rescore After Feedback",
+        "boolean",
+        default=True,
+        env_aliases=("RESCORE_ON_FEEDBACK",),
+        description=(
+            "Rescore a user's recommendations inside the API process shortly after they submit feedback, so hidden "
+            "titles drop out and ranks update in the same session instead of waiting for the nightly scoring run. "
+            "Turn off on very memory-constrained hosts; the API then never loads the model."
+        ),
+    ),
+    _setting(
+        "recommendations.rescore_debounce_seconds",
+        "training_scoring",
+        "Rescore Debounce Seconds",
+        "float",
+        default=5.0,
+        env_aliases=("RESCORE_DEBOUNCE_SECONDS",),
+        description=(
+            "Quiet period after the last feedback before a user's rescore runs. Rating a batch of titles within this "
+            "window triggers one rescore instead of one per click."
+        ),
+        minimum=0.0,
+        maximum=300.0,
+    ),
+    _setting(
+        "recommendations.response_cache_enabled",
+        "training_scoring",
+        "Cache Recommendation Pages",
+        "boolean",
+        default=True,
+        env_aliases=("RESPONSE_CACHE_ENABLED",),
+        description=(
+            "Serve repeated recommendation page requests from a cache keyed by the query and the user's "
+            "recommendation and feedback versions. Scoring runs and feedback writes bump those versions, so cached "
+            "pages never outlive the data they were built from."
+        ),
+    ),
+    _setting(
+        "recommendations.response_cache_max_mb",
+        "training_scoring",
+        "Recommendation Cache Size (MB)",
+        "float",
+        default=64.0,
+        env_aliases=("RESPONSE_CACHE_MAX_MB",),
+        description="Memory budget for the in-process page cache; least recently used pages are evicted past it.",
+        minimum=1.0,
+        maximum=4096.0,
+    ),
+    _setting(
+        "recommendations.response_cache_ttl_seconds",
+        "training_scoring",
+        "Recommendation Cache TTL Seconds",
+        "integer",
+        default=300,
+        env_aliases=("RESPONSE_CACHE_TTL_SECONDS",),
+        description=(
+            "Upper bound on a cached page's age. Covers inputs that are not versioned, such as library metadata, "
+            "SHAP labels and Plex URL settings. 0 keeps pages until they are evicted."
+        ),
+        minimum=0,
+        maximum=86400,
+    ),
+    _setting(
+        "recommendations.response_cache_url",
+        "training_scoring",
+        "Shared Recommendation Cache URL",
+        "string",
+        default="",
+        env_aliases=("RESPONSE_CACHE_REDIS_URL",),
+        description=(
+            "Optional redis:// URL to share cached pages between API workers. Requires the redis package; leave "
+            "blank to use the in-process cache."
+        ),
+    ),
     _setting(
         "scoring.shap_prune_days",
         "training_scoring",
@@ -860,6 +1043,51 @@ SETTING_DEFINITIONS: tuple[SettingDefinition, ...] = (
             "context. Raise it if prompts need more user-specific evidence and token size is still manageable."
         ),
     ),
+    _setting(
+        "labeling.openai_concurrency",
+        "advanced_labeling",
+        "OpenAI Labeling Concurrency",
+        "integer",
+        default=4,
+        minimum=1,
+        description=(
+            "How many dimension labels are requested from OpenAI at once. Raise it to shorten large labeling runs; "
+            "lower it if you hit rate limits."
+        ),
+    ),
+    _setting(
+        "labeling.ollama_concurrency",
+        "advanced_labeling",
+        "Ollama Labeling Concurrency",
+        "integer",
+        default=1,
+        minimum=1,
+        description=(
+            "How many dimension labels are requested from Ollama at once. Keep 1 unless the Ollama server is "
+            "configured to run parallel requests (OLLAMA_NUM_PARALLEL)."
+        ),
+    ),
+    _setting(
+        "labeling.openai_tokens_per_minute",
+        "advanced_labeling",
+        "OpenAI Labeling Tokens Per Minute",
+        "integer",
+        default=30000,
+        minimum=0,
+        description=(
+            "Estimated prompt plus completion tokens PlexIntel may send to OpenAI per minute while labeling. Match "
+            "it to your account's limit for the label model. 0 disables the limit."
+        ),
+    ),
+    _setting(
+        "labeling.ollama_tokens_per_minute",
+        "advanced_labeling",
+        "Ollama Labeling Tokens Per Minute",
+        "integer",
+        default=0,
+        minimum=0,
+        description="Estimated tokens per minute sent to Ollama while labeling. 0 disables the limit.",
+    ),
     _setting(
         "smtp.server",
         "email_digests",
@@ -1014,6 +1242,48 @@ SETTING_DEFINITIONS: tuple[SettingDefinition, ...] = (
         env_aliases=("DIGEST_BASE_URL",),
         description="Public PlexIntel URL used for links in digest emails.",
     ),
+    _setting(
+        "digest.render_workers",
+        "email_digests",
+        "Digest Render Workers",
+        "integer",
+        default=4,
+        env_aliases=("DIGEST_RENDER_WORKERS",),
+        description=(
+            "How many recipients' digests are rendered at once during a send. Each worker holds its own database "
+            "connection while it runs."
+        ),
+        minimum=1,
+        maximum=16,
+    ),
+    _setting(
+        "smtp.pool_size",
+        "email_digests",
+        "SMTP Sessions",
+        "integer",
+        default=2,
+        env_aliases=("SMTP_POOL_SIZE",),
+        description=(
+            "How many authenticated SMTP connections a digest send keeps open and reuses. Lower this if your "
+            "provider limits concurrent connections."
+        ),
+        minimum=1,
+        maximum=8,
+    ),
+    _setting(
+        "smtp.send_retries",
+        "email_digests",
+        "SMTP Send Retries",
+        "integer",
+        default=2,
+        env_aliases=("SMTP_SEND_RETRIES",),
+        description=(
+            "Extra attempts per message after a dropped connection or temporary (4xx) SMTP error. Permanent "
+            "rejections are not retried."
+        ),
+        minimum=0,
+        maximum=5,
+    ),
     _setting(
         "pipeline.enabled",
         "pipeline",
@@ -1151,6 +1421,60 @@ SETTING_DEFINITIONS: tuple[SettingDefinition, ...] = (
             "when the goal is to backfill labels onto more recommendations."
         ),
     ),
+    _setting(
+        "pipeline.skip_unchanged_stages",
+        "pipeline",
+        "Skip Unchanged Stages",
+        "boolean",
+        default=True,
+        env_aliases=("PIPELINE_SKIP_UNCHANGED_STAGES",),
+        description=(
+            "When enabled, each pipeline stage fingerprints its inputs (source table row counts, max ids and "
+            "timestamps, the model file, stage scripts, and relevant settings) and is skipped when nothing changed "
+            "since its last successful run. The Tautulli sync always runs. Use Run pipeline now with force to rerun "
+            "every stage regardless."
+        ),
+    ),
+    _setting(
+        "pipeline.warm_worker_enabled",
+        "pipeline",
+        "Warm Stage Worker",
+        "boolean",
+        default=True,
+        env_aliases=("PIPELINE_WARM_WORKER_ENABLED",),
+        description=(
+            "When enabled, pipeline stages are forked from a long-lived worker that already imported pandas, "
+            "numpy, xgboost, shap, scikit-learn and matplotlib and applied the app schema, instead of starting a "
+            "fresh Python interpreter per stage. Falls back to subprocesses when the worker cannot start."
+        ),
+    ),
+    _setting(
+        "pipeline.tautulli_metadata_cache_hours",
+        "pipeline",
+        "Tautulli Metadata Cache Hours",
+        "integer",
+        default=168,
+        env_aliases=("TAUTULLI_METADATA_CACHE_HOURS",),
+        description=(
+            "How long library sync reuses stored Tautulli metadata and season/episode listings instead of asking "
+            "Tautulli again. Items are still refetched early when Plex reports a newer updated_at or Tautulli lists "
+            "them as recently added. Set to 0 to always fetch live."
+        ),
+        minimum=0,
+    ),
+    _setting(
+        "pipeline.library_change_detection",
+        "pipeline",
+        "Targeted Library Change Detection",
+        "boolean",
+        default=True,
+        env_aliases=("PIPELINE_LIBRARY_CHANGE_DETECTION",),
+        description=(
+            "Incremental sync finds new media from Tautulli's recently-added feed and library section counts, and "
+            "only walks seasons and episodes of shows that changed. It falls back to walking every show when stored "
+            "per-show counts stop matching the TV library. Disable to walk the whole library every run."
+        ),
+    ),
 )
 
 SETTINGS_BY_KEY = {definition.key: definition for definition in SETTING_DEFINITIONS}
@@ -1450,6 +1774,26 @@ def bootstrap_settings_from_env(conn) -> None:
     conn.commit()
 
 
+def settings_catalog_checksum() -> str:
+    """
+    Fingerprint what sync_setting_descriptions and bootstrap_settings_from_env
+    would write: every definition's description plus the env values currently
+    set for it. Env values are hashed rather than stored so secrets never land
+    in the migration ledger.
+    """
+    digest = hashlib.sha256()
+    for definition in SETTING_DEFINITIONS:
+        env_value, env_name = _read_env_value(definition)
+        raw_env = format_raw_value(definition, env_value) if env_value is not None else None
+        digest.update(
+            json.dumps(
+                [definition.key, definition.description or "", env_name, raw_env],
+                default=str,
+            ).encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
 def ensure_settings_bootstrap() -> None:
     try:
         conn = connect_db()
@@ -3,7 +3,8 @@ from __future__ import annotations
 import secrets
 import smtplib
 import ssl
-from datetime import datetime, time as time_of_day, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as time_of_day, timedelta, timezone
 from email.message import EmailMessage
 from html import escape
 from html.parser import HTMLParser
@@ -13,15 +14,22 @@ from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 from psycopg2 import IntegrityError
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from PIL import Image
 
 from api.db.connection import connect_db
 from api.services.app_settings import get_setting_value
+from api.services.poster_asset_cache import fetch_optimized_posters
 from api.services.poster_service import build_poster_url
+from api.services.smtp_pool import DEFAULT_POOL_SIZE, DEFAULT_RETRIES, SMTPSessionPool
 from api.services.user_sync_service import sync_users_from_tautulli
 
 
+DEFAULT_RENDER_WORKERS = 4
+DELIVERY_BATCH_SIZE = 25
+# Cache variant for the 220x330 q58 JPEGs produced by _optimize_poster_image.
+DIGEST_POSTER_VARIANT = "digest-220x330-q58"
+
 WEEKDAY_INDEX = {
     "monday": 0,
     "tuesday": 1,
@@ -380,6 +388,7 @@ def _get_digest_settings() -> dict[str, Any]:
         "top_shows": int(get_setting_value("digest.top_shows", default=10) or 0),
         "base_url": get_setting_value("digest.base_url"),
         "display_threshold": float(get_setting_value("recommendations.display_threshold", default=0.70)),
+        "render_workers": int(get_setting_value("digest.render_workers", default=DEFAULT_RENDER_WORKERS) or 1),
     }
 
 
@@ -413,6 +422,8 @@ def _get_smtp_settings() -> dict[str, Any]:
         "from_email": from_email,
         "from_name": from_name or "PlexIntel",
         "reply_to": reply_to,
+        "pool_size": int(get_setting_value("smtp.pool_size", default=DEFAULT_POOL_SIZE) or 1),
+        "send_retries": int(get_setting_value("smtp.send_retries", default=DEFAULT_RETRIES) or 0),
     }
 
 
@@ -573,7 +584,6 @@ def fetch_top_show_recommendations(
         JOIN visible_recommendation_rollup vr
           ON vr.username = sr.username
          AND vr.group_rating_key = sr.show_rating_key
-        LEFT JOIN descendant_feedback df ON df.group_rating_key = sr.show_rating_key
         WHERE sr.username = %s
         ORDER BY vr.visible_rollup_score DESC
         LIMIT %s
@@ -583,6 +593,140 @@ def fetch_top_show_recommendations(
         return cur.fetchall()
 
 
+# Same selection as fetch_top_movie_recommendations / fetch_top_show_recommendations,
+# for many users in one statement. Show scores use the same rollup as the
+# per-user query: the mean of each show's top 20% (at least one) visible episodes.
+BATCH_DIGEST_ITEMS_SQL = """
+    WITH latest_feedback AS (
+        SELECT DISTINCT ON (username, rating_key)
+            username,
+            rating_key,
+            feedback,
+            suppress
+        FROM public.user_feedback
+        WHERE username = ANY(%(usernames)s)
+        ORDER BY username, rating_key, COALESCE(modified_at, created_at, now()) DESC, id DESC
+    ),
+    visible_recs AS (
+        SELECT
+            recs.username,
+            recs.rating_key,
+            recs.media_type,
+            recs.show_rating_key,
+            recs.title,
+            recs.year,
+            recs.genres,
+            recs.semantic_themes,
+            recs.predicted_probability
+        FROM public.expanded_recs_w_label_v recs
+        LEFT JOIN latest_feedback lf
+          ON lf.username = recs.username
+         AND lf.rating_key = recs.rating_key
+        WHERE recs.username = ANY(%(usernames)s)
+          AND recs.media_type IN ('movie', 'episode')
+          AND recs.predicted_probability >= %(min_probability)s
+          AND CASE
+                WHEN lf.feedback = 'interested' THEN FALSE
+                ELSE COALESCE(lf.suppress, FALSE)
+              END = FALSE
+    ),
+    ranked_movies AS (
+        SELECT
+            'movie'::text AS kind,
+            username,
+            rating_key,
+            title,
+            year,
+            genres,
+            semantic_themes,
+            predicted_probability,
+            ROW_NUMBER() OVER (PARTITION BY username ORDER BY predicted_probability DESC) AS item_rank
+        FROM visible_recs
+        WHERE media_type = 'movie'
+    ),
+    ranked_episodes AS (
+        SELECT
+            username,
+            show_rating_key,
+            predicted_probability,
+            ROW_NUMBER() OVER (
+                PARTITION BY username, show_rating_key
+                ORDER BY predicted_probability DESC
+            ) AS visible_rank,
+            COUNT(*) OVER (PARTITION BY username, show_rating_key)::int AS visible_episode_count
+        FROM visible_recs
+        WHERE media_type = 'episode'
+          AND show_rating_key IS NOT NULL
+    ),
+    show_scores AS (
+        SELECT
+            username,
+            show_rating_key,
+            AVG(predicted_probability) FILTER (
+                WHERE visible_rank <= GREATEST(1, CEIL(visible_episode_count::double precision * 0.2)::int)
+            ) AS rollup_score
+        FROM ranked_episodes
+        GROUP BY username, show_rating_key
+    ),
+    ranked_shows AS (
+        SELECT
+            'show'::text AS kind,
+            sr.username,
+            sr.show_rating_key AS rating_key,
+            sr.show_title AS title,
+            sr.year,
+            sr.genres,
+            NULL::text AS semantic_themes,
+            ss.rollup_score AS predicted_probability,
+            ROW_NUMBER() OVER (PARTITION BY sr.username ORDER BY ss.rollup_score DESC) AS item_rank
+        FROM public.show_rollups_v sr
+        JOIN show_scores ss
+          ON ss.username = sr.username
+         AND ss.show_rating_key = sr.show_rating_key
+        WHERE sr.username = ANY(%(usernames)s)
+    )
+    SELECT * FROM ranked_movies WHERE item_rank <= %(top_movies)s
+    UNION ALL
+    SELECT * FROM ranked_shows WHERE item_rank <= %(top_shows)s
+    ORDER BY username, kind, item_rank
+"""
+
+_MOVIE_ITEM_FIELDS = ("rating_key", "title", "year", "genres", "semantic_themes", "predicted_probability")
+_SHOW_ITEM_FIELDS = ("rating_key", "title", "year", "genres", "predicted_probability")
+
+
+def fetch_digest_items_for_users(
+    conn,
+    usernames: list[str],
+    *,
+    top_movies: int,
+    top_shows: int,
+    min_probability: float | None = None,
+) -> dict[str, tuple[list[dict[str, Any]], list[dict[str, Any]]]]:
+    """Top movies and top show rollups for every user in one round trip, as ``{username: (movies, shows)}``."""
+    items: dict[str, tuple[list[dict[str, Any]], list[dict[str, Any]]]] = {username: ([], []) for username in usernames}
+    if not usernames or (top_movies <= 0 and top_shows <= 0):
+        return items
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            BATCH_DIGEST_ITEMS_SQL,
+            {
+                "usernames": list(usernames),
+                "min_probability": 0.70 if min_probability is None else min_probability,
+                "top_movies": max(int(top_movies), 0),
+                "top_shows": max(int(top_shows), 0),
+            },
+        )
+        rows = cur.fetchall()
+    for row in rows:
+        movies, shows = items.setdefault(row["username"], ([], []))
+        if row["kind"] == "movie":
+            movies.append({field: row[field] for field in _MOVIE_ITEM_FIELDS})
+        else:
+            shows.append({field: row[field] for field in _SHOW_ITEM_FIELDS})
+    return items
+
+
 def _build_item_subtitle(item: dict[str, Any]) -> str:
     subtitle_parts = [
         str(item["year"]) if item.get("year") is not None else None,
@@ -618,24 +762,39 @@ def _optimize_poster_image(content: bytes, content_type: str | None) -> dict[str
     }
 
 
-def _decorate_items_with_inline_posters(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def _fetch_inline_poster(rating_key: Any) -> dict[str, Any] | None:
+    try:
+        from api.services.poster_service import fetch_poster_image_for_rating_key
+
+        payload = fetch_poster_image_for_rating_key(rating_key, allow_unconfigured=True)
+    except Exception:
+        payload = None
+    if not payload:
+        return None
+    return _optimize_poster_image(payload["content"], payload.get("content_type"))
+
+
+def _decorate_items_with_inline_posters(
+    items: list[dict[str, Any]],
+    poster_cache: dict[Any, dict[str, Any] | None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Attach CID posters to ``items``. ``poster_cache`` is shared across a send run
+    so a title in many recipients' digests is fetched and resized once; two
+    render workers racing on the same key may both fetch it, which is harmless.
+    """
     inline_images: list[dict[str, Any]] = []
     for item in items:
         rating_key = item.get("rating_key")
         if rating_key is None:
             item["poster_src"] = None
             continue
-        try:
-            from api.services.poster_service import fetch_poster_image_for_rating_key
-
-            payload = fetch_poster_image_for_rating_key(rating_key, allow_unconfigured=True)
-        except Exception:
-            payload = None
-        if not payload:
-            item["poster_src"] = None
-            continue
-
-        optimized_payload = _optimize_poster_image(payload["content"], payload.get("content_type"))
+        if poster_cache is not None and rating_key in poster_cache:
+            optimized_payload = poster_cache[rating_key]
+        else:
+            optimized_payload = _fetch_inline_poster(rating_key)
+            if poster_cache is not None:
+                poster_cache[rating_key] = optimized_payload
         if not optimized_payload:
             item["poster_src"] = None
             continue
@@ -830,24 +989,16 @@ def _render_digest_text(
     return "\n".join(lines).strip()
 
 
-def _build_preview_payload(
+def _fetch_digest_items(
     conn,
-    *,
-    rendered_for_user: dict[str, Any],
-    recipient_user: dict[str, Any],
-    message_html: str | None,
-    is_test: bool,
-    poster_mode: str = "proxy",
-) -> dict[str, Any]:
-    preference_row = _ensure_preference_row(conn, recipient_user["user_id"])
-    digest_settings = _get_digest_settings()
-    subject = _build_subject(frequency=digest_settings["frequency"], is_test=is_test)
-    sanitized_message_html = sanitize_rich_html(message_html) if message_html is not None else get_digest_content()["message_html"]
+    username: str,
+    digest_settings: dict[str, Any],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     movies = [
         dict(item)
         for item in fetch_top_movie_recommendations(
             conn,
-            rendered_for_user["username"],
+            username,
             digest_settings["top_movies"],
             digest_settings["display_threshold"],
         )
@@ -856,16 +1007,58 @@ def _build_preview_payload(
         dict(item)
         for item in fetch_top_show_recommendations(
             conn,
-            rendered_for_user["username"],
+            username,
             digest_settings["top_shows"],
             digest_settings["display_threshold"],
         )
     ]
+    return movies, shows
+
+
+def _build_render_context(
+    *,
+    message_html: str | None,
+    is_test: bool,
+    digest_settings: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Everything a digest render needs that is the same for every recipient of a run."""
+    digest_settings = digest_settings or _get_digest_settings()
+    return {
+        "digest_settings": digest_settings,
+        "subject": _build_subject(frequency=digest_settings["frequency"], is_test=is_test),
+        "message_html": sanitize_rich_html(message_html) if message_html is not None else get_digest_content()["message_html"],
+        "poster_cache": {},
+    }
+
+
+def _build_preview_payload(
+    conn,
+    *,
+    rendered_for_user: dict[str, Any],
+    recipient_user: dict[str, Any],
+    message_html: str | None,
+    is_test: bool,
+    poster_mode: str = "proxy",
+    preference_row: dict[str, Any] | None = None,
+    render_context: dict[str, Any] | None = None,
+    items: tuple[list[dict[str, Any]], list[dict[str, Any]]] | None = None,
+) -> dict[str, Any]:
+    if preference_row is None:
+        preference_row = _ensure_preference_row(conn, recipient_user["user_id"])
+    if render_context is None:
+        render_context = _build_render_context(message_html=message_html, is_test=is_test)
+    digest_settings = render_context["digest_settings"]
+    subject = render_context["subject"]
+    sanitized_message_html = render_context["message_html"]
+    if items is None:
+        items = _fetch_digest_items(conn, rendered_for_user["username"], digest_settings)
+    movies, shows = items
     inline_images: list[dict[str, Any]] = []
 
     if poster_mode == "cid":
-        inline_images.extend(_decorate_items_with_inline_posters(movies))
-        inline_images.extend(_decorate_items_with_inline_posters(shows))
+        poster_cache = render_context.get("poster_cache")
+        inline_images.extend(_decorate_items_with_inline_posters(movies, poster_cache))
+        inline_images.extend(_decorate_items_with_inline_posters(shows, poster_cache))
     else:
         _decorate_items_with_preview_posters(movies, unsubscribe_token=preference_row["unsubscribe_token"])
         _decorate_items_with_preview_posters(shows, unsubscribe_token=preference_row["unsubscribe_token"])
@@ -962,7 +1155,7 @@ def _describe_smtp_data_error(exc: smtplib.SMTPDataError) -> str:
     return smtp_error or "SMTP rejected the message body."
 
 
-def _send_email(
+def _build_email_message(
     smtp_settings: dict[str, Any],
     *,
     recipient_email: str,
@@ -970,7 +1163,7 @@ def _send_email(
     html_body: str,
     text_body: str,
     inline_images: list[dict[str, Any]] | None = None,
-) -> None:
+) -> EmailMessage:
     message = EmailMessage()
     message["Subject"] = subject
     message["From"] = f"{smtp_settings['from_name']} <{smtp_settings['from_email']}>"
@@ -991,34 +1184,66 @@ def _send_email(
             cid=f"<{inline_image['cid']}>",
             filename=inline_image.get("filename"),
         )
+    return message
 
-    encryption = smtp_settings["encryption"]
-    timeout = 30
-    if encryption == "ssl_tls":
-        with smtplib.SMTP_SSL(smtp_settings["server"], smtp_settings["port"], context=ssl.create_default_context(), timeout=timeout) as server:
-            if smtp_settings.get("username"):
-                try:
-                    server.login(smtp_settings["username"], smtp_settings.get("password") or "")
-                except smtplib.SMTPAuthenticationError as exc:
-                    raise DigestConfigError(_describe_smtp_auth_error(exc)) from exc
-            try:
-                server.send_message(message)
-            except smtplib.SMTPDataError as exc:
-                raise DigestConfigError(_describe_smtp_data_error(exc)) from exc
-        return
 
-    with smtplib.SMTP(smtp_settings["server"], smtp_settings["port"], timeout=timeout) as server:
-        if encryption == "starttls":
+def _open_smtp_session(smtp_settings: dict[str, Any]) -> smtplib.SMTP:
+    timeout = 30
+    if smtp_settings["encryption"] == "ssl_tls":
+        server = smtplib.SMTP_SSL(
+            smtp_settings["server"], smtp_settings["port"], context=ssl.create_default_context(), timeout=timeout
+        )
+    else:
+        server = smtplib.SMTP(smtp_settings["server"], smtp_settings["port"], timeout=timeout)
+    try:
+        if smtp_settings["encryption"] == "starttls":
             server.starttls(context=ssl.create_default_context())
         if smtp_settings.get("username"):
             try:
                 server.login(smtp_settings["username"], smtp_settings.get("password") or "")
             except smtplib.SMTPAuthenticationError as exc:
                 raise DigestConfigError(_describe_smtp_auth_error(exc)) from exc
-        try:
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _open_smtp_pool(smtp_settings: dict[str, Any]) -> SMTPSessionPool:
+    """Shared sessions for one send run; callers close it (or use it as a context manager)."""
+    return SMTPSessionPool(
+        lambda: _open_smtp_session(smtp_settings),
+        size=smtp_settings.get("pool_size", DEFAULT_POOL_SIZE),
+        retries=smtp_settings.get("send_retries", DEFAULT_RETRIES),
+    )
+
+
+def _send_email(
+    smtp_settings: dict[str, Any],
+    *,
+    recipient_email: str,
+    subject: str,
+    html_body: str,
+    text_body: str,
+    inline_images: list[dict[str, Any]] | None = None,
+    smtp_pool: SMTPSessionPool | None = None,
+) -> None:
+    message = _build_email_message(
+        smtp_settings,
+        recipient_email=recipient_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        inline_images=inline_images,
+    )
+    try:
+        if smtp_pool is not None:
+            smtp_pool.send(message)
+            return
+        with _open_smtp_session(smtp_settings) as server:
             server.send_message(message)
-        except smtplib.SMTPDataError as exc:
-            raise DigestConfigError(_describe_smtp_data_error(exc)) from exc
+    except smtplib.SMTPDataError as exc:
+        raise DigestConfigError(_describe_smtp_data_error(exc)) from exc
 
 
 def _record_run_start(
@@ -1089,6 +1314,43 @@ def _record_delivery(
     conn.commit()
 
 
+def _record_deliveries(conn, *, run_id: int, delivery_type: str, rows: list[dict[str, Any]]) -> None:
+    """Insert a batch of delivery rows in one statement and one commit."""
+    if not rows:
+        return
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO public.email_digest_deliveries (
+                run_id,
+                delivery_type,
+                recipient_username,
+                recipient_email,
+                rendered_for_username,
+                status,
+                error_message,
+                sent_at
+            )
+            VALUES %s
+            """,
+            [
+                (
+                    run_id,
+                    delivery_type,
+                    row["recipient_username"],
+                    row["recipient_email"],
+                    row["rendered_for_username"],
+                    row["status"],
+                    row.get("error_message"),
+                    row.get("sent_at"),
+                )
+                for row in rows
+            ],
+        )
+    conn.commit()
+
+
 def _finalize_run(
     conn,
     *,
@@ -1209,47 +1471,51 @@ def send_test_digest(
         recipient_count = len(with_email)
         success_count = 0
         failure_count = 0
-        for admin_user in with_email:
-            rendered_for_user = sample_user if target == "self" else admin_user
-            preview = _build_preview_payload(
-                conn,
-                rendered_for_user=rendered_for_user,
-                recipient_user=admin_user,
-                message_html=message_html,
-                is_test=True,
-                poster_mode="cid",
-            )
-            try:
-                _send_email(
-                    smtp_settings,
-                    recipient_email=admin_user["plex_email"],
-                    subject=preview["subject"],
-                    html_body=preview["html"],
-                    text_body=preview["text"],
-                    inline_images=preview.get("inline_images"),
-                )
-                _record_delivery(
-                    conn,
-                    run_id=run_id,
-                    delivery_type="test",
-                    recipient_username=admin_user["username"],
-                    recipient_email=admin_user["plex_email"],
-                    rendered_for_username=rendered_for_user["username"],
-                    status="sent",
-                )
-                success_count += 1
-            except Exception as exc:
-                _record_delivery(
+        render_context = _build_render_context(message_html=message_html, is_test=True)
+        with _open_smtp_pool(smtp_settings) as smtp_pool:
+            for admin_user in with_email:
+                rendered_for_user = sample_user if target == "self" else admin_user
+                preview = _build_preview_payload(
                     conn,
-                    run_id=run_id,
-                    delivery_type="test",
-                    recipient_username=admin_user["username"],
-                    recipient_email=admin_user["plex_email"],
-                    rendered_for_username=rendered_for_user["username"],
-                    status="failed",
-                    error_message=str(exc),
+                    rendered_for_user=rendered_for_user,
+                    recipient_user=admin_user,
+                    message_html=message_html,
+                    is_test=True,
+                    poster_mode="cid",
+                    render_context=render_context,
                 )
-                failure_count += 1
+                try:
+                    _send_email(
+                        smtp_settings,
+                        recipient_email=admin_user["plex_email"],
+                        subject=preview["subject"],
+                        html_body=preview["html"],
+                        text_body=preview["text"],
+                        inline_images=preview.get("inline_images"),
+                        smtp_pool=smtp_pool,
+                    )
+                    _record_delivery(
+                        conn,
+                        run_id=run_id,
+                        delivery_type="test",
+                        recipient_username=admin_user["username"],
+                        recipient_email=admin_user["plex_email"],
+                        rendered_for_username=rendered_for_user["username"],
+                        status="sent",
+                    )
+                    success_count += 1
+                except Exception as exc:
+                    _record_delivery(
+                        conn,
+                        run_id=run_id,
+                        delivery_type="test",
+                        recipient_username=admin_user["username"],
+                        recipient_email=admin_user["plex_email"],
+                        rendered_for_username=rendered_for_user["username"],
+                        status="failed",
+                        error_message=str(exc),
+                    )
+                    failure_count += 1
         status = "completed" if failure_count == 0 else "completed_with_failures"
         notes = None
         if skipped_admins:
@@ -1306,6 +1572,168 @@ def _get_schedule_slot(now_utc: datetime | None = None) -> dict[str, Any]:
     return {"slot_dt": slot_dt, "schedule_key": schedule_key, "due": True}
 
 
+def _new_delivery(recipient: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "recipient_username": recipient["username"],
+        "recipient_email": recipient["plex_email"],
+        "rendered_for_username": recipient["username"],
+        "status": "failed",
+        "error_message": None,
+        "sent_at": None,
+    }
+
+
+def _prepare_recipients(
+    conn,
+    recipients: list[dict[str, Any]],
+    digest_settings: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Load every recipient's digest items with one batch query."""
+    query_options = {
+        "top_movies": digest_settings["top_movies"],
+        "top_shows": digest_settings["top_shows"],
+        "min_probability": digest_settings["display_threshold"],
+    }
+    try:
+        items_by_user = fetch_digest_items_for_users(
+            conn, [recipient["username"] for recipient in recipients], **query_options
+        )
+    except Exception as exc:
+        conn.rollback()
+        return [{"recipient": recipient, "items": None, "error": str(exc)} for recipient in recipients]
+    return [
+        {"recipient": recipient, "items": items_by_user.get(recipient["username"], ([], [])), "error": None}
+        for recipient in recipients
+    ]
+
+
+def _prefetch_digest_posters(
+    prepared: list[dict[str, Any]],
+    *,
+    render_context: dict[str, Any],
+    workers: int,
+) -> dict[str, int]:
+    """
+    Fetch every poster the run will attach exactly once, before any message is rendered.
+
+    ``references`` counts poster slots across all digests; ``fetched`` is how
+    many were actually downloaded after de-duplication and the persistent cache.
+    """
+    rating_keys = [
+        item["rating_key"]
+        for entry in prepared
+        if entry["items"]
+        for group in entry["items"]
+        for item in group
+        if item.get("rating_key") is not None
+    ]
+    payloads, stats = fetch_optimized_posters(
+        rating_keys,
+        variant=DIGEST_POSTER_VARIANT,
+        optimize=_optimize_poster_image,
+        workers=workers,
+    )
+    render_context["poster_cache"].update(payloads)
+    return {"references": len(rating_keys), **stats}
+
+
+def _render_and_send(
+    entry: dict[str, Any],
+    *,
+    render_context: dict[str, Any],
+    smtp_settings: dict[str, Any],
+    smtp_pool: SMTPSessionPool,
+) -> dict[str, Any]:
+    recipient = entry["recipient"]
+    delivery = _new_delivery(recipient)
+    try:
+        if entry["error"]:
+            delivery["error_message"] = entry["error"]
+            return delivery
+        preview = _build_preview_payload(
+            None,
+            rendered_for_user=recipient,
+            recipient_user=recipient,
+            message_html=render_context["message_html"],
+            is_test=False,
+            poster_mode="cid",
+            preference_row=recipient.get("preference"),
+            render_context=render_context,
+            items=entry["items"],
+        )
+        if preview["counts"]["movies"] == 0 and preview["counts"]["shows"] == 0 and not preview["message_html"]:
+            delivery.update(status="skipped", error_message="No digest content to send.")
+            return delivery
+        _send_email(
+            smtp_settings,
+            recipient_email=recipient["plex_email"],
+            subject=preview["subject"],
+            html_body=preview["html"],
+            text_body=preview["text"],
+            inline_images=preview.get("inline_images"),
+            smtp_pool=smtp_pool,
+        )
+        delivery["status"] = "sent"
+    except Exception as exc:
+        delivery["error_message"] = str(exc)
+    finally:
+        delivery["sent_at"] = datetime.now(timezone.utc)
+    return delivery
+
+
+def _deliver_scheduled_digests(
+    conn,
+    *,
+    run_id: int,
+    recipients: list[dict[str, Any]],
+    render_context: dict[str, Any],
+    smtp_settings: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Deliver a scheduled run in three passes.
+
+    1. One batch query loads every recipient's top movies and shows.
+    2. The posters for all recipients are fetched together, so each poster is
+       fetched once (see ``_prefetch_digest_posters``). If that fails the run
+       continues with an empty poster cache and renders fetch posters as needed.
+    3. A bounded worker pool renders and sends. Rendering needs no database.
+       Workers block on the SMTP pool when every session is busy, so at most
+       ``smtp.pool_size`` messages are in flight.
+
+    Delivery rows are written from this thread in batches.
+    """
+    workers = max(1, min(int(render_context["digest_settings"].get("render_workers", DEFAULT_RENDER_WORKERS)), len(recipients) or 1))
+    counts = {"sent": 0, "failed": 0, "skipped": 0}
+    pending: list[dict[str, Any]] = []
+    try:
+        prepared = _prepare_recipients(conn, recipients, render_context["digest_settings"])
+        try:
+            poster_stats = _prefetch_digest_posters(prepared, render_context=render_context, workers=workers)
+        except Exception as exc:
+            print(f"⚠️ Digest poster prefetch failed; rendering without it: {exc}")
+            poster_stats = {"references": 0, "unique": 0, "cache_hits": 0, "fetched": 0, "error": str(exc)}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="digest-render") as executor:
+            with _open_smtp_pool(smtp_settings) as smtp_pool:
+                deliveries = executor.map(
+                    lambda entry: _render_and_send(
+                        entry,
+                        render_context=render_context,
+                        smtp_settings=smtp_settings,
+                        smtp_pool=smtp_pool,
+                    ),
+                    prepared,
+                )
+                for delivery in deliveries:
+                    counts[delivery["status"]] += 1
+                    pending.append(delivery)
+                    if len(pending) >= DELIVERY_BATCH_SIZE:
+                        _record_deliveries(conn, run_id=run_id, delivery_type="scheduled", rows=pending)
+                        pending = []
+    finally:
+        _record_deliveries(conn, run_id=run_id, delivery_type="scheduled", rows=pending)
+    return {"deliveries": counts, "posters": poster_stats}
+
+
 def run_scheduled_digest(*, force: bool = False, triggered_by: str | None = None) -> dict[str, Any]:
     digest_settings = _get_digest_settings()
     if not digest_settings["enabled"] and not force:
@@ -1336,62 +1764,28 @@ def run_scheduled_digest(*, force: bool = False, triggered_by: str | None = None
 
         recipients = _list_digest_recipients(conn)
         recipient_count = len(recipients)
-        success_count = 0
-        failure_count = 0
-
-        saved_message_html = get_digest_content()["message_html"]
-        for recipient in recipients:
-            preview = _build_preview_payload(
-                conn,
-                rendered_for_user=recipient,
-                recipient_user=recipient,
-                message_html=saved_message_html,
-                is_test=False,
-                poster_mode="cid",
-            )
-            if preview["counts"]["movies"] == 0 and preview["counts"]["shows"] == 0 and not preview["message_html"]:
-                _record_delivery(
-                    conn,
-                    run_id=run_id,
-                    delivery_type="scheduled",
-                    recipient_username=recipient["username"],
-                    recipient_email=recipient["plex_email"],
-                    rendered_for_username=recipient["username"],
-                    status="skipped",
-                    error_message="No digest content to send.",
-                )
-                continue
-            try:
-                _send_email(
-                    smtp_settings,
-                    recipient_email=recipient["plex_email"],
-                    subject=preview["subject"],
-                    html_body=preview["html"],
-                    text_body=preview["text"],
-                    inline_images=preview.get("inline_images"),
-                )
-                _record_delivery(
-                    conn,
-                    run_id=run_id,
-                    delivery_type="scheduled",
-                    recipient_username=recipient["username"],
-                    recipient_email=recipient["plex_email"],
-                    rendered_for_username=recipient["username"],
-                    status="sent",
-                )
-                success_count += 1
-            except Exception as exc:
-                _record_delivery(
-                    conn,
-                    run_id=run_id,
-                    delivery_type="scheduled",
-                    recipient_username=recipient["username"],
-                    recipient_email=recipient["plex_email"],
-                    rendered_for_username=recipient["username"],
-                    status="failed",
-                    error_message=str(exc),
-                )
-                failure_count += 1
+        render_context = _build_render_context(
+            message_html=get_digest_content()["message_html"],
+            is_test=False,
+            digest_settings=digest_settings,
+        )
+        counts = _deliver_scheduled_digests(
+            conn,
+            run_id=run_id,
+            recipients=recipients,
+            render_context=render_context,
+            smtp_settings=smtp_settings,
+        )
+        success_count = counts["deliveries"]["sent"]
+        failure_count = counts["deliveries"]["failed"]
+        poster_stats = counts["posters"]
+        poster_note = (
+            f"Posters: fetched {poster_stats['fetched']} for {poster_stats['references']} references "
+            f"({poster_stats['unique']} unique, {poster_stats['cache_hits']} cached)"
+        )
+        if poster_stats.get("error"):
+            poster_note = f"Poster prefetch failed: {poster_stats['error']}"
+        print(f"🖼️ {poster_note}")
 
         status = "completed" if failure_count == 0 else "completed_with_failures"
         _finalize_run(
@@ -1401,7 +1795,7 @@ def run_scheduled_digest(*, force: bool = False, triggered_by: str | None = None
             recipient_count=recipient_count,
             success_count=success_count,
             failure_count=failure_count,
-            notes=sync_note,
+            notes=f"{poster_note}. {sync_note}" if sync_note else poster_note,
         )
         return {
             "status": status,
@@ -1411,11 +1805,43 @@ def run_scheduled_digest(*, force: bool = False, triggered_by: str | None = None
             "success_count": success_count,
             "failure_count": failure_count,
             "subject": subject,
+            "posters": poster_stats,
         }
     finally:
         conn.close()
 
 
+def get_digest_candidates() -> dict[str, Any]:
+    """What the next scheduled digest would contain for every enabled recipient, without rendering."""
+    digest_settings = _get_digest_settings()
+    conn = connect_db(cursor_factory=RealDictCursor)
+    try:
+        recipients = _list_digest_recipients(conn)
+        items_by_user = fetch_digest_items_for_users(
+            conn,
+            [recipient["username"] for recipient in recipients],
+            top_movies=digest_settings["top_movies"],
+            top_shows=digest_settings["top_shows"],
+            min_probability=digest_settings["display_threshold"],
+        )
+    finally:
+        conn.close()
+
+    candidates = []
+    for recipient in recipients:
+        movies, shows = items_by_user.get(recipient["username"], ([], []))
+        candidates.append(
+            {
+                "username": recipient["username"],
+                "display_name": _build_display_name(recipient.get("username"), recipient.get("friendly_name")),
+                "email": recipient.get("plex_email"),
+                "counts": {"movies": len(movies), "shows": len(shows)},
+                "movies": movies,
+                "shows": shows,
+            }
+        )
+    return {"recipient_count": len(candidates), "recipients": candidates}
+
 def get_digest_history(*, limit_runs: int = 20, limit_deliveries: int = 100) -> dict[str, Any]:
     conn = connect_db(cursor_factory=RealDictCursor)
     try:
@@ -0,0 +1,339 @@
+"""
+Shared feature building for training and scoring.
+
+A model's columns are described by a frozen ``FeatureSchema`` saved next to
+the model as ``<model>.features.json``: the combined user+media embedding,
+then genre, actor and director indicator columns, decade flags and
+``watch_sim``. Training builds the schema from its tag vocabulary; scoring
+loads it and assembles float32 matrices in exactly that column order.
+
+The media-side part of a scoring row (media embedding plus tag and decade
+indicators) is identical for every user, so it is built once per library
+version and cached on disk as a ``MediaFeatureBlock``.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+FEATURE_SCHEMA_SUFFIX = ".features.json"
+FEATURE_SCHEMA_VERSION = 1
+FEATURE_CACHE_DIR_ENV = "FEATURE_CACHE_DIR"
+DEFAULT_FEATURE_CACHE_DIR = REPO_ROOT / "feature_cache"
+MEDIA_BLOCK_PREFIX = "media_features"
+FEATURE_DTYPE = np.float32
+
+
+def normalize_tag_list(value) -> list[str]:
+    if isinstance(value, (list, tuple, set)):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    if value is None or pd.isna(value):
+        return []
+    return [tag.strip() for tag in str(value).split(",") if tag.strip()]
+
+
+def parse_embedding(value) -> np.ndarray:
+    """Parse a pgvector value (text like "[0.1,0.2]" or a sequence) to float32."""
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("[") and text.endswith("]"):
+            body = text[1:-1].strip()
+            if not body:
+                return np.empty(0, dtype=FEATURE_DTYPE)
+            try:
+                return np.array(body.split(","), dtype=FEATURE_DTYPE)
+            except ValueError:
+                pass
+        return np.array(ast.literal_eval(text), dtype=FEATURE_DTYPE)
+    if value is None:
+        return np.empty(0, dtype=FEATURE_DTYPE)
+    return np.asarray(value, dtype=FEATURE_DTYPE)
+
+
+def decade_feature(year) -> str | None:
+    if year is None or pd.isna(year):
+        return None
+    try:
+        return f"is_{int(year) // 10 * 10}s"
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    embedding_dim: int
+    genres: tuple[str, ...] = ()
+    actors: tuple[str, ...] = ()
+    directors: tuple[str, ...] = ()
+    decades: tuple[str, ...] = ()
+    feature_names: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        names = [f"emb_{i}" for i in range(self.embedding_dim)]
+        names += [f"genre_{tag}" for tag in self.genres]
+        names += [f"actor_{tag}" for tag in self.actors]
+        names += [f"director_{tag}" for tag in self.directors]
+        names += list(self.decades)
+        names.append("watch_sim")
+        object.__setattr__(self, "feature_names", tuple(names))
+
+    @property
+    def side_width(self) -> int:
+        """Width of the media-side indicator block (tags + decades)."""
+        return len(self.genres) + len(self.actors) + len(self.directors) + len(self.decades)
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256("\n".join(self.feature_names).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_feature_names(cls, names: Iterable[str]) -> "FeatureSchema":
+        """Rebuild a schema from a trained booster's feature names."""
+        names = [str(name) for name in names]
+        schema = cls(
+            embedding_dim=sum(1 for name in names if name.startswith("emb_")),
+            genres=tuple(name.split("_", 1)[1] for name in names if name.startswith("genre_")),
+            actors=tuple(name.split("_", 1)[1] for name in names if name.startswith("actor_")),
+            directors=tuple(name.split("_", 1)[1] for name in names if name.startswith("director_")),
+            decades=tuple(name for name in names if name.startswith("is_") and name.endswith("s")),
+        )
+        if list(schema.feature_names) != names:
+            raise ValueError(
+                "Model feature names are not in feature-store column order; retrain with train_model.py."
+            )
+        return schema
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": FEATURE_SCHEMA_VERSION,
+            "embedding_dim": self.embedding_dim,
+            "genres": list(self.genres),
+            "actors": list(self.actors),
+            "directors": list(self.directors),
+            "decades": list(self.decades),
+            "fingerprint": self.fingerprint,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "FeatureSchema":
+        return cls(
+            embedding_dim=int(payload["embedding_dim"]),
+            genres=tuple(payload.get("genres") or ()),
+            actors=tuple(payload.get("actors") or ()),
+            directors=tuple(payload.get("directors") or ()),
+            decades=tuple(payload.get("decades") or ()),
+        )
+
+    def save(self, path: str | os.PathLike) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "FeatureSchema":
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def feature_schema_path(model_path: str | os.PathLike) -> Path:
+    path = Path(model_path)
+    return path.with_name(path.stem + FEATURE_SCHEMA_SUFFIX)
+
+
+def load_feature_schema(model_path: str | os.PathLike, model_feature_names: Sequence[str]) -> FeatureSchema:
+    """
+    Load the schema saved next to a model, falling back to the model's own
+    feature names for models trained before schemas were saved.
+    """
+    names = [str(name) for name in model_feature_names]
+    path = feature_schema_path(model_path)
+    if path.is_file():
+        schema = FeatureSchema.load(path)
+        if list(schema.feature_names) != names:
+            raise ValueError(f"{path} does not match the model's feature names; retrain with train_model.py.")
+        return schema
+    return FeatureSchema.from_feature_names(names)
+
+
+def indicator_matrix(tag_lists: Iterable[Sequence[str]], vocabulary: Sequence[str]) -> np.ndarray:
+    """One-hot rows for tag lists; tags outside the vocabulary are ignored."""
+    tag_lists = list(tag_lists)
+    out = np.zeros((len(tag_lists), len(vocabulary)), dtype=FEATURE_DTYPE)
+    if not vocabulary:
+        return out
+    column = {tag: i for i, tag in enumerate(vocabulary)}
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            index = column.get(tag)
+            if index is not None:
+                out[row, index] = 1.0
+    return out
+
+
+def side_features(
+    schema: FeatureSchema,
+    *,
+    genres: Iterable[Sequence[str]],
+    actors: Iterable[Sequence[str]],
+    directors: Iterable[Sequence[str]],
+    years: Iterable[Any],
+) -> np.ndarray:
+    decades = [[label] if (label := decade_feature(year)) else [] for year in years]
+    return np.hstack(
+        [
+            indicator_matrix(genres, schema.genres),
+            indicator_matrix(actors, schema.actors),
+            indicator_matrix(directors, schema.directors),
+            indicator_matrix(decades, schema.decades),
+        ]
+    ).astype(FEATURE_DTYPE, copy=False)
+
+
+def assemble_features(
+    schema: FeatureSchema,
+    embeddings: Sequence[np.ndarray] | np.ndarray,
+    side: np.ndarray,
+    watch_sim: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Fill one float32 matrix in schema order. ``embeddings`` is either a full
+    (n, embedding_dim) array or a sequence of blocks laid side by side, such
+    as (media embeddings, user embedding broadcast). ``out`` may be a
+    preallocated (e.g. memory-mapped) matrix of the right shape.
+    """
+    blocks = [embeddings] if isinstance(embeddings, np.ndarray) else list(embeddings)
+    rows = side.shape[0]
+    shape = (rows, len(schema.feature_names))
+    if out is not None and (out.shape != shape or out.dtype != FEATURE_DTYPE):
+        raise ValueError(f"Output matrix must be {FEATURE_DTYPE} with shape {shape}.")
+    X = np.empty(shape, dtype=FEATURE_DTYPE) if out is None else out
+    offset = 0
+    for block in blocks:
+        block = np.asarray(block, dtype=FEATURE_DTYPE)
+        width = block.shape[-1]
+        X[:, offset : offset + width] = block
+        offset += width
+    if offset != schema.embedding_dim:
+        raise ValueError(f"Embedding width {offset} does not match the feature schema ({schema.embedding_dim}).")
+    X[:, offset : offset + schema.side_width] = side
+    X[:, -1] = 0.0 if watch_sim is None else np.asarray(watch_sim, dtype=FEATURE_DTYPE)
+    return X
+
+
+def watch_similarity(media_embeddings: np.ndarray, user_watch_vec) -> np.ndarray:
+    sims = np.zeros(media_embeddings.shape[0], dtype=FEATURE_DTYPE)
+    if user_watch_vec is None:
+        return sims
+    user_watch_vec = np.asarray(user_watch_vec, dtype=FEATURE_DTYPE)
+    norm_user = np.linalg.norm(user_watch_vec)
+    if norm_user <= 0:
+        return sims
+    denom = np.linalg.norm(media_embeddings, axis=1) * norm_user
+    valid = denom > 0
+    sims[valid] = (media_embeddings[valid] @ user_watch_vec) / denom[valid]
+    return sims
+
+
+@dataclass
+class MediaFeatureBlock:
+    """Per-item media features shared by every user's scoring matrix."""
+
+    rating_keys: np.ndarray
+    embeddings: np.ndarray
+    side: np.ndarray
+    schema_fingerprint: str
+    library_version: str
+
+    def __post_init__(self) -> None:
+        self._positions = {int(key): i for i, key in enumerate(self.rating_keys.tolist())}
+
+    def __len__(self) -> int:
+        return int(self.rating_keys.shape[0])
+
+    def positions(self, rating_keys: Iterable[Any]) -> np.ndarray:
+        """Row positions for rating keys; -1 where the block has no row."""
+        return np.array([self._positions.get(int(key), -1) for key in rating_keys], dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, schema: FeatureSchema, *, library_version: str) -> "MediaFeatureBlock":
+        """Build from rows with rating_key, embedding, year and *_tags columns."""
+        embeddings = [parse_embedding(value) for value in df["embedding"]]
+        width = embeddings[0].size if embeddings else 0
+        return cls(
+            rating_keys=df["rating_key"].to_numpy(dtype=np.int64),
+            embeddings=np.vstack(embeddings).astype(FEATURE_DTYPE, copy=False)
+            if embeddings
+            else np.empty((0, width), dtype=FEATURE_DTYPE),
+            side=side_features(
+                schema,
+                genres=df["genre_tags"].map(normalize_tag_list),
+                actors=df["actor_tags"].map(normalize_tag_list),
+                directors=df["director_tags"].map(normalize_tag_list),
+                years=df["year"],
+            ),
+            schema_fingerprint=schema.fingerprint,
+            library_version=library_version,
+        )
+
+
+def feature_cache_dir() -> Path:
+    return Path(os.getenv(FEATURE_CACHE_DIR_ENV) or DEFAULT_FEATURE_CACHE_DIR)
+
+
+def media_block_path(schema: FeatureSchema, library_version: str, cache_dir: Path | None = None) -> Path:
+    directory = cache_dir or feature_cache_dir()
+    return directory / f"{MEDIA_BLOCK_PREFIX}-{library_version[:16]}-{schema.fingerprint}.npz"
+
+
+def load_media_block(schema: FeatureSchema, library_version: str, cache_dir: Path | None = None) -> MediaFeatureBlock | None:
+    path = media_block_path(schema, library_version, cache_dir)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            block = MediaFeatureBlock(
+                rating_keys=data["rating_keys"],
+                embeddings=data["embeddings"],
+                side=data["side"],
+                schema_fingerprint=str(data["schema_fingerprint"]),
+                library_version=str(data["library_version"]),
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+    if block.library_version != library_version or block.schema_fingerprint != schema.fingerprint:
+        return None
+    return block
+
+
+def save_media_block(block: MediaFeatureBlock, schema: FeatureSchema, cache_dir: Path | None = None) -> Path:
+    """Write the block atomically and drop blocks for older library versions."""
+    path = media_block_path(schema, block.library_version, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        np.savez(
+            handle,
+            rating_keys=block.rating_keys,
+            embeddings=block.embeddings,
+            side=block.side,
+            schema_fingerprint=np.array(block.schema_fingerprint),
+            library_version=np.array(block.library_version),
+        )
+    os.replace(tmp_path, path)
+    for stale in path.parent.glob(f"{MEDIA_BLOCK_PREFIX}-*.npz"):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    return path
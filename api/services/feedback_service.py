@@ -6,6 +6,7 @@ from fastapi import HTTPException
 
 from api.services.library_service import ensure_library_guid, load_library_item
 from api.services.plex_service import add_to_plex_watchlist, remove_from_plex_watchlist
+from api.services.response_cache import bump_cache_versions, user_feedback_scope
 
 
 SHOW_MEDIA_TYPES = {"show", "series", "tv_show"}
@@ -259,6 +260,7 @@ def record_feedback(
         plex_watchlist_status=watchlist_status,
         plex_watchlist_synced_at=watchlist_synced_at,
     )
+    bump_cache_versions(cur, [user_feedback_scope(username)])
     return _build_feedback_response(
         row["username"],
         row["rating_key"],
@@ -324,6 +326,8 @@ def record_bulk_feedback(
         )
         updated_count += 1
 
+    if updated_count:
+        bump_cache_versions(cur, [user_feedback_scope(username)])
     return {
         "target_rating_key": target["target_rating_key"],
         "target_media_type": target["target_media_type"],
@@ -390,6 +394,7 @@ def delete_feedback_row(
         """,
         (username, rating_key),
     )
+    bump_cache_versions(cur, [user_feedback_scope(username)])
 
     return {
         "deleted": True,
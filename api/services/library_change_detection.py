@@ -0,0 +1,206 @@
+"""
+Change detection for the incremental library sync.
+
+Walking every show and season through ``get_children_metadata`` costs one
+Tautulli call per season even when nothing changed. Instead, the sync reads
+the per-section item counts from ``get_libraries`` and the recently-added
+feed, and descends only into shows the feed names or whose listing row
+changed.
+
+Two fingerprint tables confirm that nothing was missed:
+
+* ``library_section_fingerprints`` keeps each section's item, parent and child
+  counts from the last run. While they are unchanged, the movie and show
+  listings are not paged through at all.
+* ``library_show_fingerprints`` keeps each show's season and episode counts as
+  last walked, plus the listing's ``updated_at``. If their totals disagree with
+  the TV section's counts, the sync walks every show again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from psycopg2.extras import execute_values
+
+SECTION_TABLE = "library_section_fingerprints"
+SHOW_TABLE = "library_show_fingerprints"
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if value in (None, "", " ", "None"):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class SectionFingerprint:
+    count: Optional[int]
+    parent_count: Optional[int]
+    child_count: Optional[int]
+
+
+@dataclass(frozen=True)
+class ShowFingerprint:
+    season_count: int
+    episode_count: int
+    updated_at: Optional[int] = None
+
+
+@dataclass
+class ChangePlan:
+    list_movies: bool
+    list_shows: bool
+    recent_movie_keys: list[int] = field(default_factory=list)
+    changed_show_keys: set[int] = field(default_factory=set)
+
+
+def section_fingerprint(section: dict[str, Any]) -> SectionFingerprint:
+    return SectionFingerprint(
+        count=_as_int(section.get("count")),
+        parent_count=_as_int(section.get("parent_count")),
+        child_count=_as_int(section.get("child_count")),
+    )
+
+
+def listing_updated_at(row: dict[str, Any]) -> Optional[int]:
+    """Best change marker a library listing row offers for a show."""
+    return _as_int(row.get("updated_at")) or _as_int(row.get("added_at"))
+
+
+def recent_show_key(item: dict[str, Any]) -> Optional[int]:
+    media_type = item.get("media_type")
+    if media_type == "episode":
+        return _as_int(item.get("grandparent_rating_key"))
+    if media_type == "season":
+        return _as_int(item.get("parent_rating_key"))
+    if media_type in ("show", "series"):
+        return _as_int(item.get("rating_key"))
+    return None
+
+
+def plan_library_changes(
+    *,
+    movie_section: Optional[dict[str, Any]],
+    show_section: Optional[dict[str, Any]],
+    stored_sections: dict[int, SectionFingerprint],
+    movie_section_id: int,
+    show_section_id: int,
+    recent_items: Iterable[dict[str, Any]],
+) -> ChangePlan:
+    """
+    Decide which listings to page through. A section is listed when its counts
+    moved since the last run, or when there is no reading to compare against.
+    """
+
+    def section_changed(section, section_id):
+        if not section:
+            return True
+        return stored_sections.get(section_id) != section_fingerprint(section)
+
+    plan = ChangePlan(
+        list_movies=section_changed(movie_section, movie_section_id),
+        list_shows=section_changed(show_section, show_section_id),
+    )
+    for item in recent_items:
+        if item.get("media_type") == "movie":
+            rating_key = _as_int(item.get("rating_key"))
+            if rating_key is not None and rating_key not in plan.recent_movie_keys:
+                plan.recent_movie_keys.append(rating_key)
+            continue
+        show_key = recent_show_key(item)
+        if show_key is not None:
+            plan.changed_show_keys.add(show_key)
+    return plan
+
+
+def fingerprints_match_section(
+    show_section: Optional[dict[str, Any]],
+    fingerprints: dict[int, ShowFingerprint],
+) -> bool:
+    """True when per-show totals agree with every count the TV section reports."""
+    if not show_section:
+        return False
+    expected = section_fingerprint(show_section)
+    actual = (
+        len(fingerprints),
+        sum(fingerprint.season_count for fingerprint in fingerprints.values()),
+        sum(fingerprint.episode_count for fingerprint in fingerprints.values()),
+    )
+    reported = (expected.count, expected.parent_count, expected.child_count)
+    if all(value is None for value in reported):
+        return False
+    return all(want is None or want == have for want, have in zip(reported, actual))
+
+
+def load_section_fingerprints(cur) -> dict[int, SectionFingerprint]:
+    cur.execute(f"SELECT section_id, item_count, parent_count, child_count FROM public.{SECTION_TABLE}")
+    return {
+        int(section_id): SectionFingerprint(count, parent_count, child_count)
+        for section_id, count, parent_count, child_count in cur.fetchall()
+    }
+
+
+def save_section_fingerprints(cur, sections: dict[int, dict[str, Any]]) -> None:
+    rows = []
+    for section_id, section in sections.items():
+        fingerprint = section_fingerprint(section)
+        rows.append((section_id, fingerprint.count, fingerprint.parent_count, fingerprint.child_count))
+    if not rows:
+        return
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO public.{SECTION_TABLE} (section_id, item_count, parent_count, child_count, checked_at)
+        VALUES %s
+        ON CONFLICT (section_id) DO UPDATE SET
+            item_count = EXCLUDED.item_count,
+            parent_count = EXCLUDED.parent_count,
+            child_count = EXCLUDED.child_count,
+            checked_at = EXCLUDED.checked_at
+        """,
+        rows,
+        template="(%s, %s, %s, %s, now())",
+    )
+
+
+def load_show_fingerprints(cur) -> dict[int, ShowFingerprint]:
+    cur.execute(f"SELECT show_rating_key, season_count, episode_count, updated_at FROM public.{SHOW_TABLE}")
+    return {
+        int(show_key): ShowFingerprint(int(season_count), int(episode_count), _as_int(updated_at))
+        for show_key, season_count, episode_count, updated_at in cur.fetchall()
+    }
+
+
+def save_show_fingerprints(
+    cur,
+    fingerprints: dict[int, ShowFingerprint],
+    *,
+    removed: Iterable[int] = (),
+) -> None:
+    removed_keys = sorted({int(key) for key in removed})
+    if removed_keys:
+        cur.execute(f"DELETE FROM public.{SHOW_TABLE} WHERE show_rating_key = ANY(%s)", (removed_keys,))
+    if not fingerprints:
+        return
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO public.{SHOW_TABLE} (show_rating_key, season_count, episode_count, updated_at, checked_at)
+        VALUES %s
+        ON CONFLICT (show_rating_key) DO UPDATE SET
+            season_count = EXCLUDED.season_count,
+            episode_count = EXCLUDED.episode_count,
+            updated_at = EXCLUDED.updated_at,
+            checked_at = EXCLUDED.checked_at
+        """,
+        [
+            (show_key, fingerprint.season_count, fingerprint.episode_count, fingerprint.updated_at)
+            for show_key, fingerprint in sorted(fingerprints.items())
+        ],
+        template="(%s, %s, %s, %s, now())",
+    )
@@ -0,0 +1,163 @@
+"""
+Indexed library search shared by the REST, agent, MCP and OpenWebUI paths.
+
+``library_search`` holds one weighted ``tsvector`` per library row, refreshed
+by ingestion right after it writes library metadata:
+
+* A: title
+* B: show title
+* C: actors, directors and genres
+* D: summary and episode summary
+
+Postgres only has four weight classes, so people and genres share C. Query
+text is split into words and each word becomes a prefix term (``blad:*``), so
+partial words match while typing. Misspelled titles fall back to ``pg_trgm``
+similarity against the title and show title. Matches rank by ``ts_rank_cd``
+plus the best trigram similarity. Every predicate here is served by the GIN
+indexes created in migration 0007.
+
+When ``pg_trgm`` is not installed, migration 0007 skips the trigram indexes
+and ``detect_trigram_search`` switches these helpers to full-text matching
+only.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+SEARCH_TABLE = "library_search"
+TS_CONFIG = "simple"
+
+# Set from pg_extension when the app schema is applied; see detect_trigram_search.
+_TRIGRAM_SEARCH = True
+
+_DOCUMENT_SQL = f"""
+    setweight(to_tsvector('{TS_CONFIG}', COALESCE(m.title, '')), 'A')
+    || setweight(to_tsvector('{TS_CONFIG}', COALESCE(m.show_title, '')), 'B')
+    || setweight(to_tsvector('{TS_CONFIG}', COALESCE(people.names, '')), 'C')
+    || setweight(to_tsvector('{TS_CONFIG}', COALESCE(genre_names.names, '')), 'C')
+    || setweight(to_tsvector('{TS_CONFIG}', COALESCE(m.summary, '') || ' ' || COALESCE(m.episode_summary, '')), 'D')
+"""
+
+REFRESH_LIBRARY_SEARCH_SQL = f"""
+    INSERT INTO public.{SEARCH_TABLE} AS s (rating_key, title, show_title, document, updated_at)
+    SELECT
+        m.rating_key,
+        m.title,
+        m.show_title,
+        {_DOCUMENT_SQL},
+        now()
+    FROM public.library m
+    LEFT JOIN LATERAL (
+        SELECT string_agg(name, ' ') AS names
+        FROM (
+            SELECT a.name FROM public.media_actors ma JOIN public.actors a ON a.id = ma.actor_id
+            WHERE ma.media_id = m.rating_key
+            UNION ALL
+            SELECT d.name FROM public.media_directors md JOIN public.directors d ON d.id = md.director_id
+            WHERE md.media_id = m.rating_key
+        ) names
+    ) people ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT string_agg(g.name, ' ') AS names
+        FROM public.media_genres mg JOIN public.genres g ON g.id = mg.genre_id
+        WHERE mg.media_id = m.rating_key
+    ) genre_names ON TRUE
+    {{where}}
+    ON CONFLICT (rating_key) DO UPDATE SET
+        title = EXCLUDED.title,
+        show_title = EXCLUDED.show_title,
+        document = EXCLUDED.document,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def refresh_library_search(cur, rating_keys: Optional[Iterable[int]] = None, *, missing_only: bool = False) -> int:
+    """
+    Rebuild search documents inside the caller's transaction.
+
+    ``rating_keys`` limits the refresh to those rows; ``missing_only`` picks up
+    library rows that have no document yet (header rows written outside the
+    normal ingest path). With neither, every row is rebuilt.
+    """
+    params: tuple = ()
+    if rating_keys is not None:
+        keys = sorted({int(key) for key in rating_keys})
+        if not keys:
+            return 0
+        where = "WHERE m.rating_key = ANY(%s)"
+        params = (keys,)
+    elif missing_only:
+        where = f"WHERE NOT EXISTS (SELECT 1 FROM public.{SEARCH_TABLE} s2 WHERE s2.rating_key = m.rating_key)"
+    else:
+        where = ""
+    cur.execute(REFRESH_LIBRARY_SEARCH_SQL.format(where=where), params)
+    return cur.rowcount
+
+
+def safe_refresh_library_search(
+    cur, rating_keys: Optional[Iterable[int]] = None, *, missing_only: bool = False
+) -> int:
+    """Refresh under a savepoint so a search failure never discards the ingest it follows."""
+    cur.execute("SAVEPOINT library_search_refresh")
+    try:
+        refreshed = refresh_library_search(cur, rating_keys, missing_only=missing_only)
+    except Exception as exc:
+        cur.execute("ROLLBACK TO SAVEPOINT library_search_refresh")
+        print(f"⚠️ Could not refresh library search documents: {exc}")
+        return 0
+    cur.execute("RELEASE SAVEPOINT library_search_refresh")
+    return refreshed
+
+
+def detect_trigram_search(cur) -> bool:
+    """Check whether pg_trgm is installed and build search SQL to match."""
+    global _TRIGRAM_SEARCH
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    _TRIGRAM_SEARCH = cur.fetchone() is not None
+    if not _TRIGRAM_SEARCH:
+        print("⚠️ pg_trgm is not installed; library search uses full-text matching only")
+    return _TRIGRAM_SEARCH
+
+
+def search_terms(q: Optional[str]) -> list[str]:
+    if not isinstance(q, str):
+        return []
+    return re.findall(r"\w+", q.lower())
+
+
+def prefix_tsquery(q: Optional[str]) -> str:
+    """``"blade run"`` -> ``"blade:* & run:*"``; words only, so user text never reaches tsquery syntax."""
+    return " & ".join(f"{term}:*" for term in search_terms(q))
+
+
+def search_match_sql(alias: str = "ls") -> str:
+    if not _TRIGRAM_SEARCH:
+        return f"({alias}.document @@ to_tsquery('{TS_CONFIG}', %s))"
+    return (
+        f"({alias}.document @@ to_tsquery('{TS_CONFIG}', %s)"
+        f" OR {alias}.title %% %s OR {alias}.show_title %% %s)"
+    )
+
+
+def search_rank_sql(alias: str = "ls") -> str:
+    if not _TRIGRAM_SEARCH:
+        return f"ts_rank_cd({alias}.document, to_tsquery('{TS_CONFIG}', %s))"
+    return (
+        f"(ts_rank_cd({alias}.document, to_tsquery('{TS_CONFIG}', %s))"
+        f" + GREATEST(similarity({alias}.title, %s), similarity({alias}.show_title, %s), 0))"
+    )
+
+
+def search_params(q: str) -> list:
+    """Parameters for either ``search_match_sql`` or ``search_rank_sql``."""
+    if not _TRIGRAM_SEARCH:
+        return [prefix_tsquery(q)]
+    normalized = " ".join(search_terms(q))
+    return [prefix_tsquery(q), normalized, normalized]
+
+
+def search_keys_subquery() -> str:
+    """``rating_key IN (...)`` body for filtering other views by a search; takes ``search_params``."""
+    return f"SELECT ls.rating_key FROM public.{SEARCH_TABLE} ls WHERE {search_match_sql('ls')}"
@@ -23,6 +23,7 @@ from api.services.agent_tool_service import (
     RecentLibraryAdditionsResponse,
     WatchHistoryResponse,
     get_agent_library_item,
+    get_agent_library_items,
     get_agent_recommendations,
     get_recent_library_additions,
     get_agent_watch_history,
@@ -30,7 +31,7 @@ from api.services.agent_tool_service import (
     search_agent_library,
 )
 from api.services.app_settings import get_setting_value
-from api.services.poster_service import build_public_poster_url, fetch_poster_image_for_rating_key
+from api.services.poster_service import build_public_poster_url, poster_proxy_configured
 from api.services.poster_markup_service import (
     build_poster_gallery_payload,
     build_poster_markup_payload as _build_poster_markup_payload,
@@ -92,16 +93,16 @@ def build_poster_markup_payload(
 
 
 def build_poster_image_result(rating_key: int) -> CallToolResult:
-    title = None
-    media_type = None
+    item = None
 
     try:
-        item = get_agent_library_item(rating_key=rating_key)
-        title = item.title
-        media_type = item.media_type
+        items = get_agent_library_items(rating_keys=[rating_key])
+        item = items[0] if items else None
     except Exception:
         logger.info("MCP poster metadata lookup failed for rating_key=%s", rating_key, exc_info=True)
 
+    title = item.title if item else None
+    media_type = item.media_type if item else None
     metadata = {
         "rating_key": rating_key,
         "title": title,
@@ -110,21 +111,22 @@ def build_poster_image_result(rating_key: int) -> CallToolResult:
     }
     display_title = title or f"rating_key {rating_key}"
 
-    try:
-        payload = fetch_poster_image_for_rating_key(rating_key)
-    except Exception as exc:
+    # The client loads the image from the public poster URL itself, so the
+    # tool only checks that a poster exists instead of downloading it here.
+    if not poster_proxy_configured():
+        error = "Poster proxy is not configured."
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=f"Unable to fetch poster for {display_title}: {exc}",
+                    text=f"Unable to fetch poster for {display_title}: {error}",
                 )
             ],
-            structuredContent={**metadata, "error": str(exc)},
+            structuredContent={**metadata, "error": error},
             isError=True,
         )
 
-    if not payload:
+    if item is None or item.has_poster is False:
         return CallToolResult(
             content=[
                 TextContent(
@@ -165,22 +167,22 @@ def build_poster_gallery_result(
 ) -> CallToolResult:
     entries = _coerce_gallery_entries(rating_keys=rating_keys, items=items)
 
+    lookup_keys = [
+        entry["rating_key"] for entry in entries if not entry.get("title") or not entry.get("media_type")
+    ]
+    library_items = {}
+    if lookup_keys:
+        try:
+            library_items = {
+                item.rating_key: item for item in get_agent_library_items(rating_keys=lookup_keys)
+            }
+        except Exception:
+            logger.info("MCP gallery metadata lookup failed for rating_keys=%s", lookup_keys, exc_info=True)
+
     for entry in entries:
-        title = entry.get("title")
-        media_type = entry.get("media_type")
-        if not title or not media_type:
-            try:
-                item = get_agent_library_item(rating_key=entry["rating_key"])
-                title = title or item.title
-                media_type = media_type or item.media_type
-            except Exception:
-                logger.info(
-                    "MCP gallery metadata lookup failed for rating_key=%s",
-                    entry["rating_key"],
-                    exc_info=True,
-                )
-        entry["title"] = title
-        entry["media_type"] = media_type
+        item = library_items.get(entry["rating_key"])
+        entry["title"] = entry.get("title") or (item.title if item else None)
+        entry["media_type"] = entry.get("media_type") or (item.media_type if item else None)
 
     gallery_payload = build_poster_gallery_payload(
         entries,
@@ -399,7 +401,7 @@ def _build_mcp_server() -> FastMCP:
     def mcp_search_library(
         q: str,
         media_type: Optional[str] = None,
-        sort_by: str = "title",
+        sort_by: str = "relevance",
         sort_dir: str = "asc",
         limit: int = 20,
     ) -> LibrarySearchResponse:
@@ -0,0 +1,419 @@
+"""
+Versioned model registry and the process-level model server.
+
+Each published model is copied into ``<registry>/versions/<version>/`` with
+its feature schema and a ``metadata.json`` (training summary, validation
+metrics, checksum). ``<registry>/current.json`` names the live version and
+the one before it; it is replaced atomically, so publishing or rolling back
+is a single rename that scorers pick up on their next request.
+
+``get_model_server().get()`` loads the current booster once per process and
+reloads only when the pointer changes. Installs that have never published
+fall back to the legacy ``xgb_model.pkl`` in the repo root.
+``use_model_file`` pins a process to one model file instead (benchmarks,
+experiments) without touching the registry.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from api.services.feature_store import FeatureSchema, feature_schema_path, load_feature_schema
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MODEL_REGISTRY_DIR_ENV = "MODEL_REGISTRY_DIR"
+DEFAULT_MODEL_REGISTRY_DIR = REPO_ROOT / "model_registry"
+LEGACY_MODEL_PATH = REPO_ROOT / "xgb_model.pkl"
+CURRENT_POINTER_FILENAME = "current.json"
+VERSIONS_DIRNAME = "versions"
+MODEL_FILENAME = "model.pkl"
+METADATA_FILENAME = "metadata.json"
+MODEL_NAME = "xgb_model"
+LEGACY_VERSION = "legacy"
+DEFAULT_KEEP_VERSIONS = 10
+
+
+class ModelRegistryError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    version: str
+    path: Path
+    metadata: dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @property
+    def model_path(self) -> Path:
+        return self.path / MODEL_FILENAME
+
+    @property
+    def schema_path(self) -> Path:
+        return feature_schema_path(self.model_path)
+
+
+def registry_dir() -> Path:
+    return Path(os.getenv(MODEL_REGISTRY_DIR_ENV) or DEFAULT_MODEL_REGISTRY_DIR)
+
+
+def current_pointer_path(root: Path | None = None) -> Path:
+    return (root or registry_dir()) / CURRENT_POINTER_FILENAME
+
+
+def _write_json_atomic(path: Path, payload: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2, default=str)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_version(path: Path) -> ModelVersion:
+    try:
+        with open(path / METADATA_FILENAME, encoding="utf-8") as handle:
+            metadata = json.load(handle)
+    except (OSError, ValueError):
+        metadata = {}
+    return ModelVersion(version=path.name, path=path, metadata=metadata)
+
+
+def list_versions(root: Path | None = None) -> list[ModelVersion]:
+    """Published versions, oldest first (version ids start with a UTC timestamp)."""
+    versions_dir = (root or registry_dir()) / VERSIONS_DIRNAME
+    if not versions_dir.is_dir():
+        return []
+    return [
+        _load_version(path)
+        for path in sorted(versions_dir.iterdir())
+        if path.is_dir() and not path.name.startswith(".") and (path / MODEL_FILENAME).is_file()
+    ]
+
+
+def get_version(version: str, root: Path | None = None) -> ModelVersion:
+    if not version or Path(version).name != version or version.startswith("."):
+        raise ModelRegistryError(f"Model version {version!r} is not in the registry.")
+    path = (root or registry_dir()) / VERSIONS_DIRNAME / version
+    if not (path / MODEL_FILENAME).is_file():
+        raise ModelRegistryError(f"Model version {version!r} is not in the registry.")
+    return _load_version(path)
+
+
+def read_pointer(root: Path | None = None) -> dict[str, Any] | None:
+    try:
+        with open(current_pointer_path(root), encoding="utf-8") as handle:
+            pointer = json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        raise ModelRegistryError(f"Unreadable model registry pointer: {exc}") from exc
+    return pointer if isinstance(pointer, dict) and pointer.get("version") else None
+
+
+def current_version(root: Path | None = None) -> ModelVersion | None:
+    pointer = read_pointer(root)
+    return get_version(pointer["version"], root) if pointer else None
+
+
+def set_current(
+    version: str,
+    *,
+    root: Path | None = None,
+    reason: str | None = None,
+    now: datetime | None = None,
+) -> ModelVersion:
+    """Point ``current`` at an existing version; the old target is kept for rollback."""
+    target = get_version(version, root)
+    pointer = read_pointer(root)
+    previous = pointer.get("version") if pointer else None
+    if previous == version:
+        previous = pointer.get("previous")
+    _write_json_atomic(
+        current_pointer_path(root),
+        {
+            "version": version,
+            "previous": previous,
+            "updated_at": (now or datetime.now(timezone.utc)).isoformat(),
+            "reason": reason,
+        },
+    )
+    return target
+
+
+def rollback(version: str | None = None, *, root: Path | None = None) -> ModelVersion:
+    """Re-point ``current`` at ``version`` or, by default, the version it replaced."""
+    pointer = read_pointer(root)
+    if version is None:
+        version = pointer.get("previous") if pointer else None
+        if not version:
+            raise ModelRegistryError("No previous model version to roll back to.")
+    return set_current(version, root=root, reason="rollback")
+
+
+def prune_versions(keep: int = DEFAULT_KEEP_VERSIONS, *, root: Path | None = None) -> list[str]:
+    """Delete all but the newest ``keep`` versions, never the current or previous one."""
+    pointer = read_pointer(root) or {}
+    protected = {pointer.get("version"), pointer.get("previous")}
+    versions = list_versions(root)
+    removed = []
+    for model_version in versions[: max(len(versions) - keep, 0)]:
+        if model_version.version in protected:
+            continue
+        shutil.rmtree(model_version.path, ignore_errors=True)
+        removed.append(model_version.version)
+    return removed
+
+
+def publish_model(
+    model_path: str | os.PathLike,
+    *,
+    metadata: dict[str, Any] | None = None,
+    make_current: bool = True,
+    keep: int | None = DEFAULT_KEEP_VERSIONS,
+    root: Path | None = None,
+    now: datetime | None = None,
+) -> ModelVersion:
+    """Copy a trained model and its feature schema into a new registry version."""
+    model_path = Path(model_path)
+    schema_path = feature_schema_path(model_path)
+    if not model_path.is_file():
+        raise ModelRegistryError(f"Model file {model_path} does not exist.")
+    if not schema_path.is_file():
+        raise ModelRegistryError(f"Feature schema {schema_path} does not exist; retrain to write it.")
+
+    now = now or datetime.now(timezone.utc)
+    checksum = _file_sha256(model_path)
+    version = f"{now.strftime('%Y%m%dT%H%M%SZ')}-{checksum[:8]}"
+    versions_dir = (root or registry_dir()) / VERSIONS_DIRNAME
+    final_dir = versions_dir / version
+    if final_dir.exists():
+        raise ModelRegistryError(f"Model version {version} already exists.")
+
+    staging_dir = versions_dir / f".{version}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+    try:
+        staged = ModelVersion(version=version, path=staging_dir)
+        shutil.copy2(model_path, staged.model_path)
+        shutil.copy2(schema_path, staged.schema_path)
+        schema = FeatureSchema.load(schema_path)
+        _write_json_atomic(
+            staging_dir / METADATA_FILENAME,
+            {
+                **(metadata or {}),
+                "version": version,
+                "created_at": now.isoformat(),
+                "source_path": str(model_path),
+                "sha256": checksum,
+                "feature_count": len(schema.feature_names),
+                "feature_schema_fingerprint": schema.fingerprint,
+            },
+        )
+        os.replace(staging_dir, final_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    published = _load_version(final_dir)
+    if make_current:
+        set_current(version, root=root, reason="publish", now=now)
+    if keep is not None:
+        prune_versions(keep, root=root)
+    return published
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    model: Any
+    feature_names: list[str]
+    schema: FeatureSchema
+    metadata: dict[str, Any]
+    model_path: Path
+
+    @property
+    def booster(self):
+        return self.model.get_booster()
+
+    @property
+    def model_name(self) -> str:
+        return MODEL_NAME if self.version == LEGACY_VERSION else f"{MODEL_NAME}@{self.version}"
+
+
+class ModelServer:
+    """Keeps the current model in memory and reloads it only when the registry pointer moves."""
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        legacy_model_path: Path | None = LEGACY_MODEL_PATH,
+        *,
+        use_registry: bool = True,
+    ):
+        self.root = root
+        self.legacy_model_path = legacy_model_path
+        self.use_registry = use_registry
+        self._lock = threading.Lock()
+        self._pointer_key: tuple | None = None
+        self._source_key: tuple | None = None
+        self._source: tuple[str, Path, dict[str, Any]] | None = None
+        self._loaded: LoadedModel | None = None
+        self._loaded_key: tuple | None = None
+
+    def _resolve_source(self) -> tuple[tuple, str, Path, dict[str, Any]]:
+        pointer_path = current_pointer_path(self.root)
+        try:
+            stat = pointer_path.stat() if self.use_registry else None
+            pointer_key = ("registry", stat.st_ino, stat.st_mtime_ns, stat.st_size) if stat else None
+        except FileNotFoundError:
+            pointer_key = None
+        if pointer_key is not None and pointer_key == self._pointer_key and self._source is not None:
+            return (self._source_key, *self._source)
+
+        model_version = current_version(self.root) if pointer_key is not None else None
+        if model_version is not None:
+            self._pointer_key = pointer_key
+            self._source_key = ("registry", model_version.version)
+            self._source = (model_version.version, model_version.model_path, model_version.metadata)
+            return (self._source_key, *self._source)
+
+        self._pointer_key = None
+        if self.legacy_model_path is None or not self.legacy_model_path.is_file():
+            raise ModelRegistryError(
+                "No current model: publish one with train_model.py or python -m api.services.model_registry publish."
+            )
+        stat = self.legacy_model_path.stat()
+        self._source_key = ("legacy", stat.st_mtime_ns, stat.st_size)
+        self._source = (LEGACY_VERSION, self.legacy_model_path, {})
+        return (self._source_key, *self._source)
+
+    def get(self) -> LoadedModel:
+        with self._lock:
+            source_key, version, model_path, metadata = self._resolve_source()
+            if self._loaded is not None and self._loaded_key == source_key:
+                return self._loaded
+
+            import joblib
+
+            model = joblib.load(model_path)
+            feature_names = list(model.get_booster().feature_names)
+            self._loaded = LoadedModel(
+                version=version,
+                model=model,
+                feature_names=feature_names,
+                schema=load_feature_schema(model_path, feature_names),
+                metadata=metadata,
+                model_path=Path(model_path),
+            )
+            self._loaded_key = source_key
+            print(f"🧠 Loaded model {self._loaded.model_name} from {model_path}")
+            return self._loaded
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pointer_key = self._source_key = self._source = None
+            self._loaded = self._loaded_key = None
+
+
+_MODEL_SERVER: ModelServer | None = None
+_MODEL_SERVER_LOCK = threading.Lock()
+
+
+def get_model_server() -> ModelServer:
+    global _MODEL_SERVER
+    with _MODEL_SERVER_LOCK:
+        if _MODEL_SERVER is None:
+            _MODEL_SERVER = ModelServer()
+        return _MODEL_SERVER
+
+
+def use_model_file(model_path: str | os.PathLike) -> ModelServer:
+    """Make ``get_model_server()`` serve this model file, ignoring the registry pointer."""
+    global _MODEL_SERVER
+    path = Path(model_path).resolve()
+    if not path.is_file():
+        raise ModelRegistryError(f"Model file {path} does not exist.")
+    with _MODEL_SERVER_LOCK:
+        _MODEL_SERVER = ModelServer(legacy_model_path=path, use_registry=False)
+        return _MODEL_SERVER
+
+
+def describe_version(model_version: ModelVersion, current: str | None = None) -> dict[str, Any]:
+    metadata = model_version.metadata
+    training = metadata.get("training") or {}
+    return {
+        "version": model_version.version,
+        "current": model_version.version == current,
+        "created_at": metadata.get("created_at"),
+        "feature_count": metadata.get("feature_count"),
+        "training_mode": training.get("training_mode"),
+        "experiment_label": training.get("experiment_label"),
+        "validation": training.get("validation"),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, publish or roll back registered models.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("list", help="List published versions (default).")
+    publish_parser = subparsers.add_parser("publish", help="Publish a trained model file and make it current.")
+    publish_parser.add_argument("model_path", nargs="?", default=str(LEGACY_MODEL_PATH))
+    publish_parser.add_argument("--no-activate", action="store_true", help="Publish without switching current.")
+    activate_parser = subparsers.add_parser("activate", help="Make an existing version current.")
+    activate_parser.add_argument("version")
+    rollback_parser = subparsers.add_parser("rollback", help="Switch back to the previous current version.")
+    rollback_parser.add_argument("version", nargs="?", default=None)
+    prune_parser = subparsers.add_parser("prune", help="Delete old versions.")
+    prune_parser.add_argument("--keep", type=int, default=DEFAULT_KEEP_VERSIONS)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "publish":
+            published = publish_model(args.model_path, make_current=not args.no_activate)
+            print(f"✅ Published {published.version}" + ("" if args.no_activate else " and made it current"))
+        elif args.command == "activate":
+            print(f"✅ Current model is now {set_current(args.version, reason='activate').version}")
+        elif args.command == "rollback":
+            print(f"↩️ Rolled back to {rollback(args.version).version}")
+        elif args.command == "prune":
+            removed = prune_versions(args.keep)
+            print(f"🧹 Removed {len(removed)} version(s)")
+        else:
+            pointer = read_pointer() or {}
+            versions = list_versions()
+            if not versions:
+                print(f"No published models in {registry_dir()}")
+            for model_version in versions:
+                row = describe_version(model_version, pointer.get("version"))
+                marker = "*" if row["current"] else " "
+                print(
+                    f"{marker} {row['version']:<26} {row['training_mode'] or '-':<12} "
+                    f"{row['feature_count'] or '-':>5} features  {row['experiment_label'] or ''}"
+                )
+    except ModelRegistryError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from psycopg2.extras import RealDictCursor
+
+from api.services.app_settings import SETTING_DEFINITIONS, resolve_settings
+from api.services.model_registry import current_pointer_path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MODEL_PATH = REPO_ROOT / "xgb_model.pkl"
+FEATURE_SCHEMA_PATH = REPO_ROOT / "xgb_model.features.json"
+MODEL_REGISTRY_POINTER_PATH = current_pointer_path()
+FINGERPRINT_VERSION = 1
+REUSABLE_STAGE_STATUSES = ("success", "skipped")
+
+
+@dataclass(frozen=True)
+class TableSource:
+    """One source table summarized as row count plus optional max id / max modified columns."""
+
+    table: str
+    id_column: str | None = None
+    modified_column: str | None = None
+    where: str | None = None
+    where_setting: str | None = None
+    where_default: Any = None
+    label: str | None = None
+
+    @property
+    def key(self) -> str:
+        return self.label or self.table
+
+
+@dataclass(frozen=True)
+class StageInputs:
+    tables: tuple[TableSource, ...] = ()
+    scripts: tuple[str, ...] = ()
+    files: tuple[Path, ...] = ()
+    required_outputs: tuple[Path, ...] = ()
+    setting_prefixes: tuple[str, ...] = ()
+    setting_keys: tuple[str, ...] = ()
+
+
+_LIBRARY = TableSource("library", id_column="rating_key", modified_column="added_at")
+_MEDIA_EMBEDDINGS = TableSource("media_embeddings", id_column="rating_key")
+_WATCH_HISTORY = TableSource("watch_history", id_column="watch_id", modified_column="watched_at")
+_WATCH_EMBEDDINGS = TableSource("watch_embeddings", id_column="watch_id")
+_USER_EMBEDDINGS = TableSource("user_embeddings")
+_USER_FEEDBACK = TableSource("user_feedback", id_column="id", modified_column="modified_at")
+_MEDIA_TAG_TABLES = (
+    TableSource("media_genres", id_column="media_id"),
+    TableSource("media_actors", id_column="media_id"),
+    TableSource("media_directors", id_column="media_id"),
+)
+
+# Stages without an entry here (the Tautulli sync) read external systems and
+# always run. Every other stage is skipped when its inputs match the last
+# successful or skipped execution of the same stage.
+STAGE_INPUTS: dict[str, StageInputs] = {
+    "library_embeddings": StageInputs(
+        tables=(_LIBRARY, _MEDIA_EMBEDDINGS),
+        scripts=("fetch_tautulli_data.py", "ollama_embeddings.py"),
+        setting_prefixes=("embeddings.",),
+        setting_keys=("ollama.embedding_model",),
+    ),
+    "watch_embeddings": StageInputs(
+        tables=(_WATCH_HISTORY, _WATCH_EMBEDDINGS),
+        scripts=("fetch_tautulli_data.py", "ollama_embeddings.py"),
+        setting_prefixes=("embeddings.",),
+        setting_keys=("ollama.embedding_model",),
+    ),
+    "user_embeddings": StageInputs(
+        tables=(_WATCH_HISTORY, _LIBRARY, _MEDIA_EMBEDDINGS),
+        scripts=("build_user_embeddings.py",),
+        setting_prefixes=("user_embeddings.",),
+    ),
+    "training_data": StageInputs(
+        tables=(
+            _WATCH_HISTORY,
+            _LIBRARY,
+            _MEDIA_EMBEDDINGS,
+            _USER_EMBEDDINGS,
+            _WATCH_EMBEDDINGS,
+            _USER_FEEDBACK,
+            *_MEDIA_TAG_TABLES,
+            # Partial watches become trainable once they age past the revisit
+            # window, so the number of aged rows is an input in its own right.
+            TableSource(
+                "watch_history",
+                where="watched_at <= now() - (%s * interval '1 day')",
+                where_setting="training.tv_revisit_pending_days",
+                where_default=14,
+                label="watch_history_past_tv_revisit_window",
+            ),
+            TableSource(
+                "watch_history",
+                where="watched_at <= now() - (%s * interval '1 day')",
+                where_setting="training.movie_revisit_pending_days",
+                where_default=21,
+                label="watch_history_past_movie_revisit_window",
+            ),
+        ),
+        scripts=("build_training_data.py",),
+        setting_prefixes=("training.",),
+    ),
+    "train_model": StageInputs(
+        tables=(TableSource("training_data", id_column="id"),),
+        scripts=("train_model.py", "api/services/feature_store.py"),
+        required_outputs=(MODEL_PATH,),
+        setting_keys=(
+            "training.fast_mode",
+            "training.n_jobs",
+            "training.max_boost_rounds",
+            "training.early_stopping_rounds",
+            "training.incremental_enabled",
+            "training.incremental_rounds",
+            "training.full_retrain_days",
+            "training.incremental_max_changed_fraction",
+            "training.incremental_max_label_drift",
+        ),
+    ),
+    "score_model": StageInputs(
+        tables=(
+            _LIBRARY,
+            _MEDIA_EMBEDDINGS,
+            _USER_EMBEDDINGS,
+            _WATCH_HISTORY,
+            _WATCH_EMBEDDINGS,
+            _USER_FEEDBACK,
+            *_MEDIA_TAG_TABLES,
+        ),
+        scripts=("score_model.py", "api/services/feature_store.py", "api/services/model_registry.py"),
+        # A publish or rollback moves the registry pointer, which re-runs scoring.
+        files=(MODEL_PATH, FEATURE_SCHEMA_PATH, MODEL_REGISTRY_POINTER_PATH),
+        setting_prefixes=("scoring.",),
+        setting_keys=("training.watch_embed_min_engagement",),
+    ),
+    "batch_label": StageInputs(
+        tables=(
+            TableSource("shap_impact", modified_column="modified_at"),
+            TableSource("embedding_labels", id_column="dimension", modified_column="updated_at"),
+            TableSource(
+                "embedding_labels",
+                where="next_review_at IS NOT NULL AND next_review_at <= now()",
+                label="embedding_labels_review_due",
+            ),
+        ),
+        scripts=("batch_label_embeddings.py", "gpt_utils.py"),
+        setting_prefixes=("labeling.", "pipeline.label", "pipeline.refresh_existing_labels"),
+    ),
+}
+
+
+def get_stage_inputs(stage_key: str) -> StageInputs | None:
+    return STAGE_INPUTS.get(stage_key)
+
+
+def _file_sha256(path: Path) -> str | None:
+    try:
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _stage_setting_keys(inputs: StageInputs) -> list[str]:
+    keys = list(inputs.setting_keys)
+    for definition in SETTING_DEFINITIONS:
+        if definition.secret or definition.key in keys:
+            continue
+        if any(definition.key.startswith(prefix) for prefix in inputs.setting_prefixes):
+            keys.append(definition.key)
+    for source in inputs.tables:
+        if source.where_setting and source.where_setting not in keys:
+            keys.append(source.where_setting)
+    return sorted(keys)
+
+
+def _json_safe(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _summarize_table(cur, source: TableSource, settings: dict[str, Any]) -> dict[str, Any]:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL AS present", (f"public.{source.table}",))
+    row = cur.fetchone()
+    if not (row and row["present"]):
+        return {"present": False}
+
+    columns = ["COUNT(*) AS row_count"]
+    if source.id_column:
+        columns.append(f"MAX({source.id_column}) AS max_id")
+    if source.modified_column:
+        columns.append(f"MAX({source.modified_column}) AS max_modified")
+    params: tuple[Any, ...] = ()
+    where_sql = ""
+    if source.where:
+        where_sql = f"WHERE {source.where}"
+        if source.where_setting:
+            setting_value = settings.get(source.where_setting)
+            params = (source.where_default if setting_value is None else setting_value,)
+
+    cur.execute(
+        f"SELECT {', '.join(columns)} FROM public.{source.table} {where_sql}",
+        params or None,
+    )
+    summary = cur.fetchone() or {}
+    return {key: _json_safe(value) for key, value in dict(summary).items()}
+
+
+def compute_stage_fingerprint(
+    conn,
+    stage_key: str,
+    *,
+    settings: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Summarize everything a stage reads into a stable digest.
+
+    Returns None for stages that always run or whose required outputs are
+    missing, so callers never skip work that has not produced an artifact.
+    """
+    inputs = get_stage_inputs(stage_key)
+    if inputs is None:
+        return None
+    if any(not path.is_file() for path in inputs.required_outputs):
+        return None
+
+    setting_keys = _stage_setting_keys(inputs)
+    if settings is None:
+        resolved = resolve_settings(keys=setting_keys) if setting_keys else {}
+        settings = {key: effective.value for key, effective in resolved.items()}
+    stage_settings = {key: _json_safe(settings.get(key)) for key in setting_keys}
+
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        tables = {source.key: _summarize_table(cur, source, stage_settings) for source in inputs.tables}
+    conn.commit()
+
+    detail = {
+        "version": FINGERPRINT_VERSION,
+        "stage_key": stage_key,
+        "tables": tables,
+        "scripts": {name: _file_sha256(REPO_ROOT / name) for name in inputs.scripts},
+        "files": {path.name: _file_sha256(path) for path in inputs.files},
+        "settings": stage_settings,
+    }
+    encoded = json.dumps(detail, sort_keys=True, separators=(",", ":"), default=str)
+    return {
+        "digest": hashlib.sha256(encoded.encode("utf-8")).hexdigest(),
+        "detail": detail,
+    }
+
+
+def find_reusable_stage_run(conn, *, stage_key: str, digest: str) -> dict[str, Any] | None:
+    """Return the latest completed run of a stage when it was fed identical inputs."""
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT stage_id, run_id, status, input_fingerprint, completed_at
+            FROM public.pipeline_run_stages
+            WHERE stage_key = %s
+              AND status IN %s
+              AND input_fingerprint IS NOT NULL
+            ORDER BY stage_id DESC
+            LIMIT 1
+            """,
+            (stage_key, REUSABLE_STAGE_STATUSES),
+        )
+        row = cur.fetchone()
+    conn.commit()
+    if not row or row["input_fingerprint"] != digest:
+        return None
+    return dict(row)
+
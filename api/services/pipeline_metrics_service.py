@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import Any
+
+from psycopg2.extras import Json, RealDictCursor
+
+from api.db.connection import connect_db
+
+DEFAULT_COMPARE_RUNS = 5
+MAX_COMPARE_RUNS = 50
+METRIC_FIELDS = (
+    "wall_seconds",
+    "cpu_user_seconds",
+    "cpu_system_seconds",
+    "peak_rss_kb",
+    "rows_read",
+    "rows_written",
+)
+
+
+def _number(value: Any) -> float | None:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_stage_metrics(
+    conn,
+    *,
+    run_id: int,
+    stage_id: int,
+    stage_key: str,
+    status: str,
+    wall_seconds: float,
+    metrics: dict[str, Any] | None,
+) -> None:
+    """
+    Store one stage's profile. Wall time comes from the runner; CPU, peak RSS,
+    row counts and phases come from the stage's own profile when it wrote one.
+    """
+    reported = metrics or {}
+    phases = reported.get("phases") if isinstance(reported.get("phases"), dict) else {}
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO public.pipeline_stage_metrics (
+                stage_id, run_id, stage_key, status, wall_seconds,
+                cpu_user_seconds, cpu_system_seconds, peak_rss_kb,
+                rows_read, rows_written, phases
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (stage_id) DO UPDATE SET
+                status = EXCLUDED.status,
+                wall_seconds = EXCLUDED.wall_seconds,
+                cpu_user_seconds = EXCLUDED.cpu_user_seconds,
+                cpu_system_seconds = EXCLUDED.cpu_system_seconds,
+                peak_rss_kb = EXCLUDED.peak_rss_kb,
+                rows_read = EXCLUDED.rows_read,
+                rows_written = EXCLUDED.rows_written,
+                phases = EXCLUDED.phases,
+                recorded_at = now()
+            """,
+            (
+                stage_id,
+                run_id,
+                stage_key,
+                status,
+                float(wall_seconds),
+                _number(reported.get("cpu_user_seconds")),
+                _number(reported.get("cpu_system_seconds")),
+                reported.get("peak_rss_kb"),
+                reported.get("rows_read"),
+                reported.get("rows_written"),
+                Json(phases),
+            ),
+        )
+    conn.commit()
+
+
+def _mean(values: list[float]) -> float | None:
+    return sum(values) / len(values) if values else None
+
+
+def _delta(current: float | None, baseline: float | None) -> dict[str, Any]:
+    if current is None or baseline is None:
+        return {"current": current, "baseline": baseline, "delta": None, "delta_pct": None}
+    delta = current - baseline
+    return {
+        "current": current,
+        "baseline": baseline,
+        "delta": delta,
+        "delta_pct": (delta / baseline * 100.0) if baseline else None,
+    }
+
+
+def compare_stage_metrics(current: dict[str, Any], history: list[dict[str, Any]]) -> dict[str, Any]:
+    """Compare one stage's metrics against the mean of earlier successful runs."""
+    metrics = {
+        field: _delta(
+            _number(current.get(field)),
+            _mean([v for v in (_number(row.get(field)) for row in history) if v is not None]),
+        )
+        for field in METRIC_FIELDS
+    }
+
+    current_phases = current.get("phases") or {}
+    phase_names = list(current_phases)
+    for row in history:
+        for name in row.get("phases") or {}:
+            if name not in phase_names:
+                phase_names.append(name)
+    phases = {}
+    for name in phase_names:
+        baseline_values = [
+            v
+            for v in (_number(((row.get("phases") or {}).get(name) or {}).get("seconds")) for row in history)
+            if v is not None
+        ]
+        phases[name] = _delta(
+            _number((current_phases.get(name) or {}).get("seconds")),
+            _mean(baseline_values),
+        )
+
+    return {
+        "baseline_run_ids": [row["run_id"] for row in history],
+        "metrics": metrics,
+        "phases": phases,
+    }
+
+
+def get_pipeline_run_metrics(run_id: int, *, compare_runs: int = DEFAULT_COMPARE_RUNS) -> dict[str, Any] | None:
+    compare_runs = max(1, min(int(compare_runs), MAX_COMPARE_RUNS))
+    conn = connect_db(cursor_factory=RealDictCursor)
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT run_id, status, started_at, completed_at FROM public.pipeline_runs WHERE run_id = %s",
+                (run_id,),
+            )
+            run = cur.fetchone()
+            if not run:
+                return None
+            cur.execute(
+                """
+                SELECT stage_id, run_id, stage_key, status, wall_seconds, cpu_user_seconds,
+                       cpu_system_seconds, peak_rss_kb, rows_read, rows_written, phases, recorded_at
+                FROM public.pipeline_stage_metrics
+                WHERE run_id = %s
+                ORDER BY stage_id ASC
+                """,
+                (run_id,),
+            )
+            stages = [dict(row) for row in cur.fetchall() or []]
+            history_rows: list[dict[str, Any]] = []
+            if stages:
+                cur.execute(
+                    """
+                    SELECT stage_id, run_id, stage_key, wall_seconds, cpu_user_seconds,
+                           cpu_system_seconds, peak_rss_kb, rows_read, rows_written, phases
+                    FROM (
+                        SELECT m.*,
+                               row_number() OVER (PARTITION BY m.stage_key ORDER BY m.stage_id DESC) AS recent_rank
+                        FROM public.pipeline_stage_metrics m
+                        WHERE m.stage_key = ANY(%s)
+                          AND m.run_id < %s
+                          AND m.status = 'success'
+                    ) ranked
+                    WHERE recent_rank <= %s
+                    ORDER BY stage_key, stage_id DESC
+                    """,
+                    ([stage["stage_key"] for stage in stages], run_id, compare_runs),
+                )
+                history_rows = [dict(row) for row in cur.fetchall() or []]
+        conn.commit()
+    finally:
+        conn.close()
+
+    history_by_stage: dict[str, list[dict[str, Any]]] = {}
+    for row in history_rows:
+        history_by_stage.setdefault(row["stage_key"], []).append(row)
+
+    out_stages = []
+    for stage in stages:
+        recorded_at = stage.get("recorded_at")
+        out_stages.append(
+            {
+                **stage,
+                "recorded_at": recorded_at.isoformat() if hasattr(recorded_at, "isoformat") else recorded_at,
+                "comparison": compare_stage_metrics(stage, history_by_stage.get(stage["stage_key"], [])),
+            }
+        )
+    return {
+        "run_id": run["run_id"],
+        "status": run["status"],
+        "compare_runs": compare_runs,
+        "stages": out_stages,
+    }
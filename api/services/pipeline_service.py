@@ -13,10 +13,18 @@ from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json, RealDictCursor
 
 from api.db.connection import connect_db
 from api.services.app_settings import get_setting_value
+from api.services.pipeline_fingerprint_service import (
+    compute_stage_fingerprint,
+    find_reusable_stage_run,
+    get_stage_inputs,
+)
+from api.services.pipeline_metrics_service import record_stage_metrics
+from api.services.pipeline_worker import WORKER_MODULE, WarmStageWorker, WarmStageWorkerError, get_warm_stage_worker
+from api.services.stage_metrics import STAGE_METRICS_PATH_ENV, read_stage_metrics
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 VENV_PYTHON = REPO_ROOT / "plexenv" / "bin" / "python"
@@ -41,6 +49,7 @@ PIPELINE_PROCESS_MARKERS = (
     "train_model.py",
     "score_model.py",
     "batch_label_embeddings.py",
+    WORKER_MODULE,
 )
 
 WEEKDAY_INDEX = {
@@ -60,6 +69,8 @@ class StageProcessResult:
     stdout: str
     stderr: str
     cancelled: bool = False
+    startup_saved_seconds: float | None = None
+    metrics: dict[str, Any] | None = None
 
 
 def _python_executable() -> str:
@@ -458,6 +469,14 @@ def _signal_process_group(proc: subprocess.Popen, sig: signal.Signals) -> None:
         proc.kill()
 
 
+def _acquire_warm_worker() -> WarmStageWorker | None:
+    try:
+        return get_warm_stage_worker(_python_executable())
+    except (WarmStageWorkerError, OSError) as exc:
+        print(f"Warm pipeline worker unavailable, using subprocesses: {exc}", file=sys.stderr)
+        return None
+
+
 def _run_stage_process(
     *,
     conn,
@@ -467,6 +486,7 @@ def _run_stage_process(
     env: dict[str, str],
     poll_seconds: float | None = None,
     grace_seconds: float | None = None,
+    use_warm_worker: bool = False,
 ) -> StageProcessResult:
     poll_interval = (
         poll_seconds
@@ -479,8 +499,28 @@ def _run_stage_process(
         else _env_float(PIPELINE_CANCEL_GRACE_SECONDS_ENV, DEFAULT_CANCEL_GRACE_SECONDS)
     )
 
-    with tempfile.TemporaryFile(mode="w+b") as stdout_file:
-        with tempfile.TemporaryFile(mode="w+b") as stderr_file:
+    worker = _acquire_warm_worker() if use_warm_worker else None
+
+    # Named files so a stage forked by the warm worker can open the same capture files.
+    with (
+        tempfile.NamedTemporaryFile(mode="w+b", prefix="pipeline-stdout-") as stdout_file,
+        tempfile.NamedTemporaryFile(mode="w+b", prefix="pipeline-stderr-") as stderr_file,
+        tempfile.NamedTemporaryFile(mode="w+b", prefix="pipeline-metrics-", suffix=".json") as metrics_file,
+    ):
+        env = {**env, STAGE_METRICS_PATH_ENV: metrics_file.name}
+        proc = None
+        if worker is not None:
+            try:
+                proc = worker.launch(
+                    argv,
+                    env=env,
+                    stdout_path=stdout_file.name,
+                    stderr_path=stderr_file.name,
+                    cwd=str(REPO_ROOT),
+                )
+            except (WarmStageWorkerError, OSError) as exc:
+                print(f"Warm pipeline worker failed to launch {stage_key}: {exc}", file=sys.stderr)
+        if proc is None:
             proc = subprocess.Popen(
                 argv,
                 cwd=str(REPO_ROOT),
@@ -489,36 +529,98 @@ def _run_stage_process(
                 env=env,
                 start_new_session=True,
             )
-            cancelled = False
-            _update_run_heartbeat(conn, run_id=run_id, stage_key=stage_key, pid=proc.pid)
+        cancelled = False
+        _update_run_heartbeat(conn, run_id=run_id, stage_key=stage_key, pid=proc.pid)
 
-            while proc.poll() is None:
-                if _is_pipeline_cancel_requested(conn, run_id):
-                    cancelled = True
-                    _signal_process_group(proc, signal.SIGTERM)
-                    deadline = time.monotonic() + cancel_grace
-                    while proc.poll() is None and time.monotonic() < deadline:
-                        time.sleep(min(0.2, max(deadline - time.monotonic(), 0)))
-                    if proc.poll() is None:
-                        _signal_process_group(proc, signal.SIGKILL)
-                    proc.wait()
-                    break
-
-                if poll_interval > 0:
-                    time.sleep(poll_interval)
-                _update_run_heartbeat(conn, run_id=run_id, stage_key=stage_key, pid=proc.pid)
-
-            if proc.poll() is None:
+        while proc.poll() is None:
+            if _is_pipeline_cancel_requested(conn, run_id):
+                cancelled = True
+                _signal_process_group(proc, signal.SIGTERM)
+                deadline = time.monotonic() + cancel_grace
+                while proc.poll() is None and time.monotonic() < deadline:
+                    time.sleep(min(0.2, max(deadline - time.monotonic(), 0)))
+                if proc.poll() is None:
+                    _signal_process_group(proc, signal.SIGKILL)
                 proc.wait()
+                break
+
+            if poll_interval > 0:
+                time.sleep(poll_interval)
+            _update_run_heartbeat(conn, run_id=run_id, stage_key=stage_key, pid=proc.pid)
 
-            stdout = _read_spooled_output(stdout_file)
-            stderr = _read_spooled_output(stderr_file)
-            return StageProcessResult(
-                returncode=proc.returncode,
-                stdout=stdout,
-                stderr=stderr,
-                cancelled=cancelled,
+        if proc.poll() is None:
+            proc.wait()
+
+        stdout = _read_spooled_output(stdout_file)
+        stderr = _read_spooled_output(stderr_file)
+        return StageProcessResult(
+            returncode=proc.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            cancelled=cancelled,
+            startup_saved_seconds=getattr(proc, "startup_saved_seconds", None),
+            metrics=read_stage_metrics(metrics_file.name),
+        )
+
+
+def _resolve_stage_fingerprint(
+    conn,
+    *,
+    stage_key: str,
+    skip_unchanged: bool,
+) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Return (fingerprint, reusable prior stage row) for a stage; failures never block the run."""
+    try:
+        fingerprint = compute_stage_fingerprint(conn, stage_key)
+    except Exception as exc:
+        conn.rollback()
+        print(f"Failed to fingerprint pipeline stage {stage_key}: {exc}", file=sys.stderr)
+        return None, None
+    if fingerprint is None or not skip_unchanged:
+        return fingerprint, None
+    try:
+        reusable = find_reusable_stage_run(conn, stage_key=stage_key, digest=fingerprint["digest"])
+    except Exception as exc:
+        conn.rollback()
+        print(f"Failed to look up prior fingerprint for {stage_key}: {exc}", file=sys.stderr)
+        reusable = None
+    return fingerprint, reusable
+
+
+def _record_skipped_stage(
+    conn,
+    *,
+    run_id: int,
+    stage_key: str,
+    fingerprint: dict[str, Any],
+    reusable: dict[str, Any],
+) -> None:
+    note = (
+        f"Skipped: inputs unchanged since run {reusable.get('run_id')} "
+        f"(fingerprint {fingerprint['digest'][:12]})"
+    )
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO public.pipeline_run_stages (
+                run_id, stage_key, status, stdout_tail, started_at, completed_at,
+                input_fingerprint, input_fingerprint_detail
             )
+            VALUES (%s, %s, 'skipped', %s, now(), now(), %s, %s)
+            """,
+            (run_id, stage_key, note, fingerprint["digest"], Json(fingerprint["detail"])),
+        )
+    conn.commit()
+    _log_run_event(run_id, f"Stage {stage_key} {note[0].lower()}{note[1:]}")
+
+
+def _record_stage_metrics(conn, **kwargs: Any) -> None:
+    """Persist a stage profile; metrics are diagnostic, so failures never fail the run."""
+    try:
+        record_stage_metrics(conn, **kwargs)
+    except Exception as exc:
+        conn.rollback()
+        print(f"Failed to record metrics for stage {kwargs.get('stage_key')}: {exc}", file=sys.stderr)
 
 
 def build_pipeline_stages() -> list[tuple[str, list[str]]]:
@@ -660,6 +762,7 @@ def run_pipeline(
     delivery_type: str,
     triggered_by: str | None,
     schedule_key: str | None,
+    force: bool = False,
 ) -> dict[str, Any]:
     conn = connect_db(cursor_factory=RealDictCursor)
     lock_acquired = False
@@ -707,7 +810,7 @@ def run_pipeline(
         conn.commit()
         _log_run_event(
             run_id,
-            f"Pipeline run started delivery_type={delivery_type} schedule_key={schedule_key or '-'} triggered_by={triggered_by or '-'}",
+            f"Pipeline run started delivery_type={delivery_type} schedule_key={schedule_key or '-'} triggered_by={triggered_by or '-'} force={force}",
         )
 
         env = {**os.environ}
@@ -715,6 +818,8 @@ def run_pipeline(
         env.setdefault("PGPORT", env.get("PGPORT", "5432"))
 
         stages = build_pipeline_stages()
+        skip_unchanged: bool | None = None
+        use_warm_worker: bool | None = None
         for stage_key, argv in stages:
             if _is_pipeline_cancel_requested(conn, run_id):
                 note = f"Pipeline run cancelled before stage {stage_key}"
@@ -722,21 +827,51 @@ def run_pipeline(
                 _log_run_event(run_id, note)
                 break
 
+            fingerprint: dict[str, Any] | None = None
+            if get_stage_inputs(stage_key) is not None:
+                if skip_unchanged is None:
+                    skip_unchanged = not force and bool(
+                        get_setting_value("pipeline.skip_unchanged_stages", default=True)
+                    )
+                fingerprint, reusable = _resolve_stage_fingerprint(
+                    conn,
+                    stage_key=stage_key,
+                    skip_unchanged=skip_unchanged,
+                )
+                if fingerprint is not None and reusable is not None:
+                    _record_skipped_stage(
+                        conn,
+                        run_id=run_id,
+                        stage_key=stage_key,
+                        fingerprint=fingerprint,
+                        reusable=reusable,
+                    )
+                    continue
+
             with conn.cursor() as cur:
                 cur.execute(
                     """
                     INSERT INTO public.pipeline_run_stages (
-                        run_id, stage_key, status, started_at
+                        run_id, stage_key, status, started_at,
+                        input_fingerprint, input_fingerprint_detail
                     )
-                    VALUES (%s, %s, 'started', now())
+                    VALUES (%s, %s, 'started', now(), %s, %s)
                     RETURNING stage_id
                     """,
-                    (run_id, stage_key),
+                    (
+                        run_id,
+                        stage_key,
+                        fingerprint["digest"] if fingerprint else None,
+                        Json(fingerprint["detail"]) if fingerprint else None,
+                    ),
                 )
                 sid_row = cur.fetchone()
                 stage_id = sid_row["stage_id"] if isinstance(sid_row, dict) else sid_row[0]
             conn.commit()
 
+            if use_warm_worker is None:
+                use_warm_worker = bool(get_setting_value("pipeline.warm_worker_enabled", default=True))
+            stage_started = time.monotonic()
             try:
                 proc_result = _run_stage_process(
                     conn=conn,
@@ -744,6 +879,7 @@ def run_pipeline(
                     stage_key=stage_key,
                     argv=argv,
                     env=env,
+                    use_warm_worker=use_warm_worker,
                 )
             except Exception as exc:
                 err_msg = str(exc)
@@ -798,6 +934,11 @@ def run_pipeline(
                 stderr=proc_result.stderr,
                 exit_code=proc_result.returncode,
             )
+            if proc_result.startup_saved_seconds is not None:
+                _log_run_event(
+                    run_id,
+                    f"Stage {stage_key} ran in warm worker; saved ~{proc_result.startup_saved_seconds:.2f}s of startup",
+                )
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -810,6 +951,15 @@ def run_pipeline(
                     (stage_status, proc_result.returncode, out_t, err_t, stage_id),
                 )
             conn.commit()
+            _record_stage_metrics(
+                conn,
+                run_id=run_id,
+                stage_id=stage_id,
+                stage_key=stage_key,
+                status=stage_status,
+                wall_seconds=time.monotonic() - stage_started,
+                metrics=proc_result.metrics,
+            )
             _clear_run_current_stage(conn, run_id)
 
             if proc_result.cancelled:
@@ -927,6 +1077,7 @@ def get_pipeline_runs(*, limit: int = 50) -> dict[str, Any]:
                     exit_code,
                     stdout_tail,
                     stderr_tail,
+                    input_fingerprint,
                     started_at,
                     completed_at
                 FROM public.pipeline_run_stages
@@ -993,6 +1144,7 @@ def get_pipeline_run(run_id: int) -> dict[str, Any] | None:
                     exit_code,
                     stdout_tail,
                     stderr_tail,
+                    input_fingerprint,
                     started_at,
                     completed_at
                 FROM public.pipeline_run_stages
@@ -0,0 +1,372 @@
+"""
+Long-lived warm worker for pipeline stages.
+
+The worker imports the heavy data stack and applies the app schema once, then
+forks a fresh child per stage script. Each child keeps its own pid, process
+group, stdout/stderr files and exit status, so the pipeline runner can
+heartbeat and cancel it exactly like a cold subprocess while skipping the
+interpreter start, imports and schema DDL.
+
+Run directly with ``python -m api.services.pipeline_worker``; the parent talks
+to it over stdin/stdout using one JSON object per line.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import runpy
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+WORKER_MODULE = "api.services.pipeline_worker"
+PIPELINE_WORKER_READY_TIMEOUT_SECONDS_ENV = "PIPELINE_WORKER_READY_TIMEOUT_SECONDS"
+DEFAULT_WORKER_READY_TIMEOUT_SECONDS = 300.0
+WORKER_READ_CHUNK = 65536
+
+# Imported once in the worker and inherited by every forked stage. Repo scripts
+# are deliberately not preloaded so edits to them take effect on the next run.
+PRELOAD_MODULES = (
+    "dotenv",
+    "numpy",
+    "pandas",
+    "requests",
+    "psycopg2",
+    "psycopg2.extras",
+    "pgvector.psycopg2",
+    "sqlalchemy",
+    "joblib",
+    "sklearn.preprocessing",
+    "sklearn.metrics",
+    "sklearn.model_selection",
+    "xgboost",
+    "shap",
+    "matplotlib.pyplot",
+    "openai",
+    "api.db.connection",
+    "api.db.schema",
+    "api.services.app_settings",
+    "api.services.model_registry",
+)
+
+
+def warm_up() -> dict[str, Any]:
+    """Import PRELOAD_MODULES and apply the schema; return what was loaded."""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    loaded: list[str] = []
+    missing: list[str] = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            missing.append(name)
+        else:
+            loaded.append(name)
+
+    schema_error = None
+    try:
+        from api.db.schema import ensure_app_schema
+
+        ensure_app_schema()
+    except Exception as exc:
+        schema_error = str(exc)
+
+    # Forked scoring stages inherit the loaded booster; the model server
+    # reloads in the child only if training moved the registry pointer since.
+    model_version = None
+    try:
+        from api.services.model_registry import get_model_server
+
+        model_version = get_model_server().get().version
+    except Exception:
+        pass
+    return {"loaded": loaded, "missing": missing, "schema_error": schema_error, "model_version": model_version}
+
+
+def _run_stage_child(request: dict[str, Any], protocol_fd: int, session_fd: int) -> None:
+    """Body of a forked stage child; never returns."""
+    exit_code = 1
+    try:
+        os.setsid()
+        # Tell the worker the process group exists before it reports our pid.
+        os.write(session_fd, b"1")
+        os.close(session_fd)
+        os.close(protocol_fd)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        stdin_fd = os.open(os.devnull, os.O_RDONLY)
+        stdout_fd = os.open(request["stdout_path"], os.O_WRONLY | os.O_TRUNC)
+        stderr_fd = os.open(request["stderr_path"], os.O_WRONLY | os.O_TRUNC)
+        os.dup2(stdin_fd, 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        for fd in (stdin_fd, stdout_fd, stderr_fd):
+            os.close(fd)
+
+        os.environ.clear()
+        os.environ.update(request.get("env") or {})
+        os.chdir(request.get("cwd") or str(REPO_ROOT))
+
+        argv = list(request["argv"][1:])
+        script = argv[0]
+        script_dir = str(Path(script).resolve().parent)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        sys.argv = argv
+        try:
+            runpy.run_path(script, run_name="__main__")
+            exit_code = 0
+        except SystemExit as exc:
+            code = exc.code
+            if code is None:
+                exit_code = 0
+            elif isinstance(code, int):
+                exit_code = code
+            else:
+                print(code, file=sys.stderr)
+                exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(exit_code)
+
+
+def serve() -> int:
+    """Worker main loop: warm up, then fork one child per stage request."""
+    # Keep the protocol on a private fd so stray prints cannot corrupt it.
+    protocol_fd = os.dup(1)
+    os.dup2(2, 1)
+    protocol = os.fdopen(protocol_fd, "w", buffering=1, encoding="utf-8")
+
+    def emit(event: dict[str, Any]) -> None:
+        protocol.write(json.dumps(event) + "\n")
+        protocol.flush()
+
+    os.chdir(str(REPO_ROOT))
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    started = time.monotonic()
+    details = warm_up()
+    emit({"event": "ready", "pid": os.getpid(), "warmup_seconds": time.monotonic() - started, **details})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            emit({"event": "error", "error": "invalid request"})
+            continue
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        launched = time.monotonic()
+        session_read_fd, session_write_fd = os.pipe()
+        child_pid = os.fork()
+        if child_pid == 0:
+            os.close(session_read_fd)
+            _run_stage_child(request, protocol_fd, session_write_fd)
+        os.close(session_write_fd)
+        os.read(session_read_fd, 1)
+        os.close(session_read_fd)
+        emit({"event": "started", "pid": child_pid, "launch_seconds": time.monotonic() - launched})
+        _pid, status = os.waitpid(child_pid, 0)
+        emit({"event": "exited", "pid": child_pid, "returncode": os.waitstatus_to_exitcode(status)})
+    return 0
+
+
+class WarmStageWorkerError(RuntimeError):
+    pass
+
+
+class WarmStageProcess:
+    """Popen-like handle for a stage forked by the warm worker."""
+
+    def __init__(self, worker: "WarmStageWorker", pid: int, launch_seconds: float):
+        self._worker = worker
+        self.pid = pid
+        self.launch_seconds = launch_seconds
+        self.returncode: int | None = None
+
+    @property
+    def startup_saved_seconds(self) -> float:
+        return max(self._worker.cold_start_seconds - self.launch_seconds, 0.0)
+
+    def _collect(self, timeout: float | None) -> int | None:
+        if self.returncode is not None:
+            return self.returncode
+        try:
+            event = self._worker.read_event(timeout)
+        except WarmStageWorkerError as exc:
+            # The worker died under a running stage; report it as a failure.
+            print(f"Warm pipeline worker lost stage pid {self.pid}: {exc}", file=sys.stderr)
+            self.returncode = 1
+            return self.returncode
+        if event is not None and event.get("event") == "exited" and event.get("pid") == self.pid:
+            self.returncode = int(event["returncode"])
+        return self.returncode
+
+    def poll(self) -> int | None:
+        return self._collect(0)
+
+    def wait(self) -> int:
+        while self._collect(None) is None:
+            pass
+        return self.returncode
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+    def send_signal(self, sig: signal.Signals) -> None:
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+
+class WarmStageWorker:
+    """Parent-side handle that starts the worker process and launches stages."""
+
+    def __init__(self, python_executable: str, *, env: dict[str, str] | None = None):
+        self.python_executable = python_executable
+        self.env = env
+        self.proc: subprocess.Popen | None = None
+        self.cold_start_seconds = 0.0
+        self.ready_event: dict[str, Any] = {}
+        self._buffer = b""
+
+    def start(self, *, timeout: float | None = None) -> None:
+        ready_timeout = timeout
+        if ready_timeout is None:
+            try:
+                ready_timeout = float(
+                    os.getenv(PIPELINE_WORKER_READY_TIMEOUT_SECONDS_ENV, DEFAULT_WORKER_READY_TIMEOUT_SECONDS)
+                )
+            except ValueError:
+                ready_timeout = DEFAULT_WORKER_READY_TIMEOUT_SECONDS
+        started = time.monotonic()
+        self.proc = subprocess.Popen(
+            [self.python_executable, "-m", WORKER_MODULE],
+            cwd=str(REPO_ROOT),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=self.env,
+            bufsize=0,
+            start_new_session=True,
+        )
+        event = self.read_event(ready_timeout)
+        if event is None or event.get("event") != "ready":
+            self.close()
+            raise WarmStageWorkerError("warm pipeline worker did not become ready")
+        self.cold_start_seconds = time.monotonic() - started
+        self.ready_event = event
+
+    def is_alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def read_event(self, timeout: float | None) -> dict[str, Any] | None:
+        """Read one protocol event, waiting up to timeout seconds (None blocks)."""
+        if self.proc is None or self.proc.stdout is None:
+            raise WarmStageWorkerError("warm pipeline worker is not running")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fd = self.proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            readable, _w, _x = select.select([fd], [], [], remaining)
+            if not readable:
+                return None
+            chunk = os.read(fd, WORKER_READ_CHUNK)
+            if not chunk:
+                raise WarmStageWorkerError("warm pipeline worker exited")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line.decode("utf-8"))
+
+    def launch(
+        self,
+        argv: list[str],
+        *,
+        env: dict[str, str],
+        stdout_path: str,
+        stderr_path: str,
+        cwd: str | None = None,
+    ) -> WarmStageProcess:
+        if not self.is_alive() or self.proc.stdin is None:
+            raise WarmStageWorkerError("warm pipeline worker is not running")
+        request = {
+            "argv": list(argv),
+            "env": dict(env),
+            "cwd": cwd or str(REPO_ROOT),
+            "stdout_path": stdout_path,
+            "stderr_path": stderr_path,
+        }
+        self.proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        self.proc.stdin.flush()
+        event = self.read_event(None)
+        if not event or event.get("event") != "started":
+            raise WarmStageWorkerError(f"warm pipeline worker rejected stage: {event}")
+        return WarmStageProcess(self, int(event["pid"]), float(event.get("launch_seconds") or 0.0))
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+
+_WORKER: WarmStageWorker | None = None
+_WORKER_LOCK = threading.Lock()
+
+
+def get_warm_stage_worker(python_executable: str) -> WarmStageWorker:
+    """Return the shared warm worker, starting it on first use or after it exits."""
+    global _WORKER
+    if not hasattr(os, "fork"):
+        raise WarmStageWorkerError("warm pipeline worker requires os.fork")
+    with _WORKER_LOCK:
+        if _WORKER is not None and _WORKER.is_alive() and _WORKER.python_executable == python_executable:
+            return _WORKER
+        if _WORKER is not None:
+            _WORKER.close()
+        worker = WarmStageWorker(python_executable)
+        worker.start()
+        _WORKER = worker
+        return worker
+
+
+def shutdown_warm_stage_worker() -> None:
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is not None:
+            _WORKER.close()
+            _WORKER = None
+
+
+if __name__ == "__main__":
+    raise SystemExit(serve())
@@ -0,0 +1,156 @@
+"""
+Persistent cache of optimized poster bytes for bulk consumers such as digests.
+
+Entries are keyed by ``(rating_key, variant)``, where the variant names the
+size and quality a caller renders at. Each entry also stores the Plex poster
+path it was built from. Plex puts an artwork timestamp in that path, so new
+artwork changes the path and the old entry is simply refetched and
+overwritten. Failed fetches are not cached; they are retried on the next run.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+from psycopg2.extras import RealDictCursor, execute_values
+
+from api.db.connection import connect_db
+from api.services.poster_service import fetch_tautulli_image, poster_proxy_configured, resolve_poster_path_from_row
+
+CACHE_TABLE = "poster_asset_cache"
+DEFAULT_FETCH_WORKERS = 6
+
+
+def resolve_poster_paths(cur, rating_keys: list[int]) -> dict[int, str]:
+    cur.execute(
+        """
+        SELECT rating_key, media_type, thumb_path, parent_thumb_path, grandparent_thumb_path
+        FROM public.library
+        WHERE rating_key = ANY(%s)
+        """,
+        (rating_keys,),
+    )
+    paths = {}
+    for row in cur.fetchall():
+        poster_path = resolve_poster_path_from_row(row)
+        if poster_path:
+            paths[int(row["rating_key"])] = poster_path
+    return paths
+
+
+def load_cached_posters(cur, variant: str, paths: dict[int, str]) -> dict[int, dict[str, Any]]:
+    if not paths:
+        return {}
+    cur.execute(
+        f"""
+        SELECT rating_key, poster_path, content, content_type
+        FROM public.{CACHE_TABLE}
+        WHERE variant = %s AND rating_key = ANY(%s)
+        """,
+        (variant, list(paths)),
+    )
+    cached = {}
+    for row in cur.fetchall():
+        rating_key = int(row["rating_key"])
+        if paths.get(rating_key) == row["poster_path"]:
+            cached[rating_key] = {"content": bytes(row["content"]), "content_type": row["content_type"]}
+    return cached
+
+
+def store_cached_posters(cur, variant: str, entries: list[tuple[int, str, dict[str, Any]]]) -> None:
+    if not entries:
+        return
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO public.{CACHE_TABLE} (rating_key, variant, poster_path, content, content_type, updated_at)
+        VALUES %s
+        ON CONFLICT (rating_key, variant) DO UPDATE SET
+            poster_path = EXCLUDED.poster_path,
+            content = EXCLUDED.content,
+            content_type = EXCLUDED.content_type,
+            updated_at = EXCLUDED.updated_at
+        """,
+        [
+            (rating_key, variant, poster_path, payload["content"], payload["content_type"])
+            for rating_key, poster_path, payload in entries
+        ],
+        template="(%s, %s, %s, %s, %s, now())",
+    )
+
+
+def _fetch_and_optimize(
+    poster_path: str,
+    optimize: Callable[[bytes, Optional[str]], Optional[dict[str, Any]]],
+) -> Optional[dict[str, Any]]:
+    try:
+        response = fetch_tautulli_image(poster_path)
+    except Exception as exc:
+        print(f"⚠️ Poster fetch failed for {poster_path}: {exc}")
+        return None
+    return optimize(response.content, response.headers.get("Content-Type", "image/jpeg"))
+
+
+def fetch_optimized_posters(
+    rating_keys: Iterable[int],
+    *,
+    variant: str,
+    optimize: Callable[[bytes, Optional[str]], Optional[dict[str, Any]]],
+    workers: int = DEFAULT_FETCH_WORKERS,
+) -> tuple[dict[int, Optional[dict[str, Any]]], dict[str, int]]:
+    """
+    Return ``{rating_key: payload or None}`` for every key, plus fetch counters.
+
+    Keys are resolved to poster paths in one query, cache hits are read in one
+    query, and each distinct missing path is downloaded and optimized once on
+    a thread pool. Episodes of one season share a path, so they share a fetch.
+    """
+    keys = sorted({int(key) for key in rating_keys})
+    payloads: dict[int, Optional[dict[str, Any]]] = {key: None for key in keys}
+    stats = {"unique": len(keys), "cache_hits": 0, "fetched": 0, "unavailable": 0}
+    if not keys:
+        return payloads, stats
+
+    conn = connect_db(cursor_factory=RealDictCursor)
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            paths = resolve_poster_paths(cur, keys)
+            cached = load_cached_posters(cur, variant, paths)
+        conn.commit()
+        payloads.update(cached)
+        stats["cache_hits"] = len(cached)
+
+        missing_by_path: dict[str, list[int]] = {}
+        for rating_key, poster_path in paths.items():
+            if rating_key not in cached:
+                missing_by_path.setdefault(poster_path, []).append(rating_key)
+
+        fetched: dict[str, Optional[dict[str, Any]]] = {}
+        if missing_by_path and poster_proxy_configured():
+            poster_paths = list(missing_by_path)
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(int(workers), len(poster_paths))), thread_name_prefix="poster-fetch"
+            ) as executor:
+                fetched = dict(zip(poster_paths, executor.map(lambda path: _fetch_and_optimize(path, optimize), poster_paths)))
+            stats["fetched"] = len(poster_paths)
+
+        new_entries = []
+        for poster_path, payload in fetched.items():
+            for rating_key in missing_by_path[poster_path]:
+                payloads[rating_key] = payload
+                if payload:
+                    new_entries.append((rating_key, poster_path, payload))
+        if new_entries:
+            try:
+                with conn.cursor() as cur:
+                    store_cached_posters(cur, variant, new_entries)
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                print(f"⚠️ Could not store {len(new_entries)} posters in {CACHE_TABLE}: {exc}")
+    finally:
+        conn.close()
+
+    stats["unavailable"] = sum(1 for payload in payloads.values() if not payload)
+    return payloads, stats
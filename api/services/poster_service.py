@@ -367,16 +367,19 @@ def fetch_tautulli_image(poster_path: str) -> requests.Response:
     raise RuntimeError("Unable to fetch poster from Tautulli.")
 
 
+def poster_proxy_configured() -> bool:
+    tautulli_url = get_setting_value("tautulli.base_url")
+    tautulli_api_url = get_setting_value("tautulli.api_url")
+    tautulli_api_key = get_setting_value("tautulli.api_key")
+    return bool(tautulli_api_key and (tautulli_url or tautulli_api_url))
+
+
 def fetch_poster_image_for_rating_key(
     rating_key: Any,
     *,
     allow_unconfigured: bool = False,
 ) -> Optional[dict[str, Any]]:
-    tautulli_url = get_setting_value("tautulli.base_url")
-    tautulli_api_url = get_setting_value("tautulli.api_url")
-    tautulli_api_key = get_setting_value("tautulli.api_key")
-
-    if not tautulli_api_key or (not tautulli_url and not tautulli_api_url):
+    if not poster_proxy_configured():
         if allow_unconfigured:
             return None
         raise RuntimeError("Poster proxy is not configured.")
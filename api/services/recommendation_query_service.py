@@ -1,7 +1,11 @@
+import base64
+import json
 from typing import Optional
 
 from fastapi import HTTPException
 
+from api.services.library_search import search_keys_subquery, search_params, search_terms
+
 DEFAULT_PAGE_LIMIT = 100
 MAX_PAGE_LIMIT = 250
 RECOMMENDATION_VIEWS = {"all", "movies", "shows", "seasons", "episodes"}
@@ -92,18 +96,87 @@ def _normalize_sort(sort: Optional[list[str]]) -> list[tuple[str, str]]:
     return normalized[:3]
 
 
+def _sort_keys(sort: Optional[list[str]], default_column: str = "predicted_probability") -> list[tuple[str, str]]:
+    """Full ordering: allowlisted sort, the default score column, then rating_key as the unique tie-breaker."""
+    keys = _normalize_sort(sort)
+    if default_column not in [column for column, _direction in keys]:
+        keys.append((default_column, "desc"))
+    keys.append(("rating_key", "asc"))
+    return keys
+
+
 def _build_order_clause(sort: Optional[list[str]], default_column: str = "predicted_probability") -> str:
-    normalized_sort = _normalize_sort(sort)
+    keys = _sort_keys(sort, default_column)
     sort_parts = [
         f"{column} {direction.upper()} NULLS LAST"
-        for column, direction in normalized_sort
+        for column, direction in keys[:-1]
     ]
-    if default_column not in [column for column, _direction in normalized_sort]:
-        sort_parts.append(f"{default_column} DESC NULLS LAST")
     sort_parts.append("rating_key ASC")
     return " ORDER BY " + ", ".join(sort_parts)
 
 
+def _cursor_signature(keys: list[tuple[str, str]]) -> list[str]:
+    return [f"{column}:{direction}" for column, direction in keys]
+
+
+def encode_page_cursor(row: dict, keys: list[tuple[str, str]]) -> str:
+    """Opaque cursor holding ``row``'s sort-key values, for the page that follows it."""
+    payload = {"k": _cursor_signature(keys), "v": [row.get(column) for column, _direction in keys]}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: str, keys: list[tuple[str, str]]) -> list:
+    try:
+        raw = base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode("ascii"))
+        payload = json.loads(raw)
+        signature, values = payload["k"], payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        signature != _cursor_signature(keys)
+        or not isinstance(values, list)
+        or len(values) != len(keys)
+        or not all(value is None or isinstance(value, (str, int, float)) for value in values)
+    ):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    return values
+
+
+def _keyset_predicate(
+    keys: list[tuple[str, str]],
+    values: list,
+    column_sql: Optional[dict[str, str]] = None,
+) -> tuple[str, list]:
+    """Rows strictly after ``values`` in ``keys`` order, with NULLs sorting last.
+
+    ``column_sql`` maps key names to qualified SQL expressions where the bare
+    output name would be ambiguous.
+    """
+    column_sql = column_sql or {}
+    clauses: list[str] = []
+    params: list = []
+    for index, (key, direction) in enumerate(keys):
+        column = column_sql.get(key, key)
+        value = values[index]
+        if value is None:
+            # Nothing sorts after NULL on this key; only ties on later keys follow.
+            continue
+        parts = []
+        for (prior_key, _direction), prior_value in zip(keys[:index], values[:index]):
+            prior_column = column_sql.get(prior_key, prior_key)
+            if prior_value is None:
+                parts.append(f"{prior_column} IS NULL")
+            else:
+                parts.append(f"{prior_column} = %s")
+                params.append(prior_value)
+        operator = "<" if direction == "desc" else ">"
+        parts.append(f"({column} {operator} %s OR {column} IS NULL)")
+        params.append(value)
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return ("(" + " OR ".join(clauses) + ")" if clauses else "FALSE"), params
+
+
 def _escape_like(value: str) -> str:
     return (
         value
@@ -130,9 +203,54 @@ def _append_search_filter(
     return sql
 
 
-def _append_paging(sql: str, params: list, *, limit: int, offset: int) -> str:
-    params.extend([limit + 1, offset])
-    return sql + " LIMIT %s OFFSET %s"
+def _append_library_search_filter(
+    sql: str,
+    params: list,
+    search: Optional[str],
+    key_columns: list[str],
+    like_columns: tuple[str, ...] = (),
+) -> str:
+    """Match ``search`` through the indexed library search on ``key_columns``; ``like_columns`` stay ILIKE."""
+    if not isinstance(search, str) or not search_terms(search):
+        return _append_search_filter(sql, params, search, list(like_columns)) if like_columns else sql
+    predicates = []
+    for column in key_columns:
+        predicates.append(f"{column} IN ({search_keys_subquery()})")
+        params.extend(search_params(search))
+    pattern = f"%{_escape_like(search.strip())}%"
+    for column in like_columns:
+        predicates.append(f"{column} ILIKE %s ESCAPE E'\\\\'")
+        params.append(pattern)
+    return sql + " AND (" + " OR ".join(predicates) + ")"
+
+
+def _append_paging(
+    sql: str,
+    params: list,
+    *,
+    limit: int,
+    offset: int,
+    cursor: Optional[str] = None,
+    sort: Optional[list[str]] = None,
+) -> str:
+    """Page an ordered query by offset, or by keyset when a ``cursor`` is given.
+
+    Keyset pages wrap the query so the predicate can use the output column
+    names, letting Postgres seek past the cursor instead of sorting and
+    discarding every earlier row.
+    """
+    if not cursor:
+        params.extend([limit + 1, offset])
+        return sql + " LIMIT %s OFFSET %s"
+
+    keys = _sort_keys(sort)
+    predicate, predicate_params = _keyset_predicate(keys, decode_page_cursor(cursor, keys))
+    order_clause = _build_order_clause(sort)
+    if sql.endswith(order_clause):
+        sql = sql[: -len(order_clause)]
+    params.extend(predicate_params)
+    params.append(limit + 1)
+    return f"SELECT * FROM ({sql}) AS keyset_page WHERE {predicate}{order_clause} LIMIT %s"
 
 
 def _page_rows(rows: list[dict], *, limit: int, offset: int) -> tuple[list[dict], bool, Optional[int]]:
@@ -142,6 +260,12 @@ def _page_rows(rows: list[dict], *, limit: int, offset: int) -> tuple[list[dict]
     return page_rows, has_more, next_offset
 
 
+def _next_page_cursor(page_rows: list[dict], has_more: bool, sort: Optional[list[str]]) -> Optional[str]:
+    if not has_more or not page_rows:
+        return None
+    return encode_page_cursor(page_rows[-1], _sort_keys(sort))
+
+
 def normalize_recommendation_view(view: Optional[str]) -> str:
     view_key = (view or "all").strip().lower()
     if view_key not in RECOMMENDATION_VIEWS:
@@ -362,7 +486,7 @@ def _build_recommendations_query(
         """
         params = [username, username, display_threshold, username]
         sql = _append_score_filters(sql, params, "vr.visible_rollup_score", score_min, score_max)
-        sql = _append_search_filter(sql, params, search, ["sr.show_title", "sr.genres"])
+        sql = _append_library_search_filter(sql, params, search, ["sr.show_rating_key"])
         sql += _build_order_clause(sort)
         return sql, params
 
@@ -425,7 +549,7 @@ def _build_recommendations_query(
             sql += " AND sr.show_rating_key = %s"
             params.append(show_rating_key)
         sql = _append_score_filters(sql, params, "vr.visible_rollup_score", score_min, score_max)
-        sql = _append_search_filter(sql, params, search, ["sr.season_title", "sr.show_title", "sr.genres"])
+        sql = _append_library_search_filter(sql, params, search, ["sr.season_rating_key", "sr.show_rating_key"])
         sql += _build_order_clause(sort)
         return sql, params
 
@@ -514,11 +638,12 @@ def _build_recommendations_query(
         params.append(season_rating_key)
 
     sql = _append_score_filters(sql, params, "recs.predicted_probability", score_min, score_max)
-    sql = _append_search_filter(
+    sql = _append_library_search_filter(
         sql,
         params,
         search,
-        ["recs.title", "recs.show_title", "recs.genres", "recs.semantic_themes"],
+        ["recs.rating_key"],
+        like_columns=("recs.semantic_themes",),
     )
     sql += _build_order_clause(sort)
     return sql, params
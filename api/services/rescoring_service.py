@@ -0,0 +1,159 @@
+"""
+Debounced, in-process rescoring of one user's recommendations after feedback.
+
+Feedback routes call ``schedule_user_rescore``; repeated calls for the same
+user within the debounce window collapse into one run. Runs execute one at a
+time on a background thread inside the API process, reusing the model
+server's loaded booster and the cached media feature block, and replace only
+that user's rows in ``recommendations`` (the show/season rollups are views
+over it). SHAP rows are left alone: the model, user embedding and item
+features are unchanged, so existing explanations still hold.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from api.services.app_settings import get_setting_value
+
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+# How stale the API process's media feature block may get before the
+# library version is re-checked.
+MEDIA_BLOCK_MAX_AGE_SECONDS = 300.0
+
+
+def _score_user(username: str) -> None:
+    # Imported lazily: score_model pulls in the XGBoost/pandas stack.
+    import score_model
+
+    score_model.score_and_store(
+        username,
+        skip_shap=True,
+        media_max_age_seconds=MEDIA_BLOCK_MAX_AGE_SECONDS,
+    )
+
+
+class RescoreDebouncer:
+    """Runs ``run(username)`` once per user after ``delay`` seconds without new requests."""
+
+    def __init__(
+        self,
+        run: Callable[[str], Any],
+        delay: Callable[[], float] | float = DEFAULT_DEBOUNCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._run = run
+        self._delay = delay if callable(delay) else (lambda: float(delay))
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._due: dict[str, float] = {}
+        self._reasons: dict[str, list[str]] = {}
+        self._running: str | None = None
+        self._last: dict[str, dict[str, Any]] = {}
+        self._thread: threading.Thread | None = None
+
+    def request(self, username: str, reason: str | None = None) -> dict[str, Any]:
+        delay = max(float(self._delay()), 0.0)
+        with self._cond:
+            self._due[username] = self._clock() + delay
+            reasons = self._reasons.setdefault(username, [])
+            if reason and reason not in reasons:
+                reasons.append(reason)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="user-rescore", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return {"status": "scheduled", "run_after_seconds": delay}
+
+    def status(self, username: str) -> dict[str, Any]:
+        with self._cond:
+            if self._running == username:
+                state = "running"
+            elif username in self._due:
+                state = "scheduled"
+            else:
+                state = "idle"
+            return {"state": state, "last_run": self._last.get(username)}
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until nothing is scheduled or running (used by tests and shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._due or self._running is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is None else min(remaining, 0.05))
+        return True
+
+    def _next_due(self) -> tuple[str, float] | None:
+        if not self._due:
+            return None
+        username = min(self._due, key=self._due.get)
+        return username, self._due[username]
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                next_due = self._next_due()
+                if next_due is None:
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+                username, due = next_due
+                wait = due - self._clock()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                del self._due[username]
+                reasons = self._reasons.pop(username, [])
+                self._running = username
+
+            started = time.perf_counter()
+            result: dict[str, Any] = {"reasons": reasons}
+            try:
+                self._run(username)
+                result["status"] = "success"
+            except Exception as exc:
+                traceback.print_exc()
+                result.update(status="failed", error=str(exc))
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            result["finished_at"] = datetime.now(timezone.utc).isoformat()
+            print(f"🔁 Rescored {username} in-process: {result['status']} in {result['seconds']:.2f}s")
+
+            with self._cond:
+                self._last[username] = result
+                self._running = None
+                self._cond.notify_all()
+
+
+def _debounce_seconds() -> float:
+    return float(get_setting_value("recommendations.rescore_debounce_seconds", default=DEFAULT_DEBOUNCE_SECONDS))
+
+
+_DEBOUNCER = RescoreDebouncer(_score_user, delay=_debounce_seconds)
+
+
+def rescore_on_feedback_enabled() -> bool:
+    return bool(get_setting_value("recommendations.rescore_on_feedback", default=True))
+
+
+def schedule_user_rescore(username: str, reason: str = "feedback", *, force: bool = False) -> dict[str, Any]:
+    """Queue a debounced rescore for ``username``; never raises into the caller's request."""
+    if not username:
+        return {"status": "skipped", "reason": "no username"}
+    try:
+        if not force and not rescore_on_feedback_enabled():
+            return {"status": "disabled"}
+        return _DEBOUNCER.request(username, reason)
+    except Exception as exc:
+        print(f"⚠️ Could not schedule rescoring for {username}: {exc}")
+        return {"status": "error", "detail": str(exc)}
+
+
+def user_rescore_status(username: str) -> dict[str, Any]:
+    return _DEBOUNCER.status(username)
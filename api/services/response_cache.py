@@ -0,0 +1,255 @@
+"""
+Versioned response cache for recommendation pages.
+
+Entries are keyed by username, the normalized query and the data versions the
+page was built from: the global recommendations version (bumped when a full
+scoring run swaps its staging table in), the user's own recommendations
+version (bumped by per-user rescoring and delta merges) and the user's
+feedback version (bumped by every feedback write). Versions live in
+``response_cache_versions`` so writes from pipeline subprocesses invalidate
+the API's cache; nothing is ever deleted, stale keys simply stop being asked
+for and age out of the LRU.
+
+The default backend is an in-process LRU bounded by payload bytes. Setting
+``recommendations.response_cache_url`` to a ``redis://`` URL shares entries
+between API workers when the optional ``redis`` package is installed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from api.services.app_settings import get_setting_value
+
+VERSIONS_TABLE = "response_cache_versions"
+RECOMMENDATIONS_SCOPE = "recommendations"
+DEFAULT_MAX_MB = 64.0
+DEFAULT_TTL_SECONDS = 300
+
+_BUMP_VERSIONS_SQL = f"""
+    INSERT INTO public.{VERSIONS_TABLE} AS v (scope, version, updated_at)
+    SELECT scope, 1, now() FROM unnest({{scopes}}) AS scope
+    ON CONFLICT (scope) DO UPDATE
+    SET version = v.version + 1, updated_at = now()
+"""
+# Bound as a SQLAlchemy text() parameter by the scoring scripts.
+BUMP_VERSIONS_SQLALCHEMY = _BUMP_VERSIONS_SQL.format(scopes="CAST(:scopes AS text[])")
+
+
+def user_recommendations_scope(username: str) -> str:
+    return f"recommendations:{username}"
+
+
+def user_feedback_scope(username: str) -> str:
+    return f"feedback:{username}"
+
+
+def bump_cache_versions(cur, scopes: Iterable[str]) -> None:
+    """Invalidate cached pages for ``scopes`` inside the caller's transaction."""
+    cur.execute(_BUMP_VERSIONS_SQL.format(scopes="%s::text[]"), (list(scopes),))
+
+
+def fetch_cache_versions(cur, username: str) -> dict[str, int]:
+    scopes = {
+        "recommendations": RECOMMENDATIONS_SCOPE,
+        "user_recommendations": user_recommendations_scope(username),
+        "feedback": user_feedback_scope(username),
+    }
+    cur.execute(
+        f"SELECT scope, version FROM public.{VERSIONS_TABLE} WHERE scope = ANY(%s)",
+        (list(scopes.values()),),
+    )
+    found = {}
+    for row in cur.fetchall():
+        scope, version = (row["scope"], row["version"]) if isinstance(row, dict) else row
+        found[scope] = int(version)
+    return {name: found.get(scope, 0) for name, scope in scopes.items()}
+
+
+def response_cache_key(namespace: str, username: str, params: dict[str, Any], versions: dict[str, int]) -> str:
+    raw = json.dumps(
+        {"user": username, "params": params, "versions": versions},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def _encode(payload: Any) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+
+
+class _CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+class LRUResponseCache:
+    """In-process cache of encoded payloads, evicting least recently used entries past ``max_bytes``."""
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and self._clock() - entry[1] > self.ttl_seconds:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            payload = entry[0]
+        return json.loads(payload)
+
+    def set(self, key: str, payload: Any) -> None:
+        encoded = _encode(payload)
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (encoded, self._clock())
+            self._bytes += len(encoded)
+            self._stats.stores += 1
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        payload, _stored_at = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                **self._stats.as_dict(),
+            }
+
+
+class RedisResponseCache:
+    """Shared backend; Redis enforces the memory bound with its own maxmemory/LRU policy."""
+
+    backend = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, prefix: str = "plexintel:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = float(ttl_seconds)
+        self.prefix = prefix
+        self._stats = _CacheStats()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self._stats, name, getattr(self._stats, name) + 1)
+
+    def get(self, key: str) -> Any | None:
+        try:
+            payload = self._client.get(self.prefix + key)
+        except Exception:
+            self._count("errors")
+            payload = None
+        self._count("hits" if payload is not None else "misses")
+        return json.loads(payload) if payload is not None else None
+
+    def set(self, key: str, payload: Any) -> None:
+        try:
+            ttl = int(self.ttl_seconds) if self.ttl_seconds > 0 else None
+            self._client.set(self.prefix + key, _encode(payload), ex=ttl)
+            self._count("stores")
+        except Exception:
+            self._count("errors")
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"backend": self.backend, "ttl_seconds": self.ttl_seconds, **self._stats.as_dict()}
+
+
+_CACHE = None
+_CACHE_CONFIG = None
+_CACHE_LOCK = threading.Lock()
+
+
+def response_cache_enabled() -> bool:
+    return bool(get_setting_value("recommendations.response_cache_enabled", default=True))
+
+
+def get_response_cache():
+    """Process-wide cache, rebuilt when its settings change."""
+    global _CACHE, _CACHE_CONFIG
+    config = (
+        str(get_setting_value("recommendations.response_cache_url", default="") or "").strip(),
+        float(get_setting_value("recommendations.response_cache_max_mb", default=DEFAULT_MAX_MB)),
+        float(get_setting_value("recommendations.response_cache_ttl_seconds", default=DEFAULT_TTL_SECONDS)),
+    )
+    with _CACHE_LOCK:
+        if _CACHE is None or config != _CACHE_CONFIG:
+            url, max_mb, ttl_seconds = config
+            cache = None
+            if url:
+                try:
+                    cache = RedisResponseCache(url, ttl_seconds=ttl_seconds)
+                except ImportError:
+                    print("⚠️ recommendations.response_cache_url is set but redis is not installed; using memory cache.")
+            _CACHE = cache or LRUResponseCache(int(max_mb * 1024 * 1024), ttl_seconds=ttl_seconds)
+            _CACHE_CONFIG = config
+        return _CACHE
+
+
+def response_cache_stats() -> dict[str, Any]:
+    return {"enabled": response_cache_enabled(), **get_response_cache().stats()}
@@ -0,0 +1,125 @@
+"""
+Small pool of reusable, authenticated SMTP sessions.
+
+Opening a TLS connection and logging in costs more than sending a digest, so
+a send run keeps up to ``size`` sessions open and hands them to sender
+threads one at a time. A message that hits a dropped connection or a
+temporary (4xx) reply is retried on a fresh session; permanent replies are
+raised at once. A failure while opening a session (bad credentials, wrong
+host) is remembered and re-raised for every later message instead of
+hammering the server once per recipient.
+"""
+
+from __future__ import annotations
+
+import queue
+import smtplib
+import threading
+import time
+from typing import Callable
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0
+
+
+def is_transient_smtp_error(exc: BaseException) -> bool:
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= int(exc.smtp_code or 0) < 500
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    return isinstance(exc, OSError)
+
+
+class SMTPSessionPool:
+    def __init__(
+        self,
+        open_session: Callable[[], smtplib.SMTP],
+        *,
+        size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._open_session = open_session
+        self.size = max(int(size), 1)
+        self.retries = max(int(retries), 0)
+        self._sleep = sleep
+        # Every slot starts empty and is opened on first use. LIFO hands out the
+        # most recently used (already open) session before opening another.
+        self._slots: queue.LifoQueue = queue.LifoQueue()
+        for _ in range(self.size):
+            self._slots.put(None)
+        self._lock = threading.Lock()
+        self._open_error: BaseException | None = None
+        self.sessions_opened = 0
+        self.retried = 0
+
+    def __enter__(self) -> "SMTPSessionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        session = self._slots.get()
+        if session is not None:
+            return session
+        with self._lock:
+            if self._open_error is not None:
+                self._slots.put(None)
+                raise self._open_error
+        try:
+            session = self._open_session()
+        except Exception as exc:
+            with self._lock:
+                if not is_transient_smtp_error(exc):
+                    self._open_error = exc
+            self._slots.put(None)
+            raise
+        with self._lock:
+            self.sessions_opened += 1
+        return session
+
+    @staticmethod
+    def _discard(session: smtplib.SMTP) -> None:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def send(self, message) -> None:
+        attempt = 0
+        while True:
+            session = None
+            try:
+                session = self._checkout()
+                session.send_message(message)
+            except Exception as exc:
+                if session is not None:
+                    # The session's state is unknown after any error; never hand it out again.
+                    self._discard(session)
+                    self._slots.put(None)
+                if attempt >= self.retries or not is_transient_smtp_error(exc):
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retried += 1
+                self._sleep(RETRY_BACKOFF_SECONDS * attempt)
+                continue
+            self._slots.put(session)
+            return
+
+    def close(self) -> None:
+        while True:
+            try:
+                session = self._slots.get_nowait()
+            except queue.Empty:
+                return
+            if session is None:
+                continue
+            try:
+                session.quit()
+            except Exception:
+                self._discard(session)
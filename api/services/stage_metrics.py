@@ -0,0 +1,105 @@
+"""
+In-process profiling for pipeline stage scripts.
+
+A stage script wraps its entry point in ``profile_stage()`` and marks named
+sub-phases with ``stage_phase("predict")``. When the pipeline runner sets
+PIPELINE_STAGE_METRICS_PATH the profile is written there as JSON on exit;
+outside the pipeline every helper is a cheap no-op.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterator
+
+STAGE_METRICS_PATH_ENV = "PIPELINE_STAGE_METRICS_PATH"
+
+
+class StageProfiler:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.start_usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.phases: dict[str, dict[str, float]] = {}
+        self.rows_read = 0
+        self.rows_written = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += time.perf_counter() - started
+            stats["calls"] += 1
+
+    def add_rows(self, *, read: int = 0, written: int = 0) -> None:
+        self.rows_read += int(read or 0)
+        self.rows_written += int(written or 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # ru_maxrss is kilobytes on Linux and bytes on macOS.
+        peak_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "cpu_user_seconds": usage.ru_utime - self.start_usage.ru_utime,
+            "cpu_system_seconds": usage.ru_stime - self.start_usage.ru_stime,
+            "peak_rss_kb": int(peak_rss_kb),
+            "rows_read": self.rows_read,
+            "rows_written": self.rows_written,
+            "phases": {
+                name: {"seconds": round(stats["seconds"], 6), "calls": int(stats["calls"])}
+                for name, stats in self.phases.items()
+            },
+        }
+
+
+_ACTIVE_PROFILER: StageProfiler | None = None
+
+
+@contextmanager
+def profile_stage() -> Iterator[StageProfiler]:
+    """Profile the enclosed stage and write the result for the pipeline runner."""
+    global _ACTIVE_PROFILER
+    profiler = StageProfiler()
+    previous = _ACTIVE_PROFILER
+    _ACTIVE_PROFILER = profiler
+    try:
+        yield profiler
+    finally:
+        _ACTIVE_PROFILER = previous
+        path = os.getenv(STAGE_METRICS_PATH_ENV)
+        if path:
+            try:
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(profiler.snapshot(), handle)
+            except OSError as exc:
+                print(f"⚠️ Could not write stage metrics to {path}: {exc}", file=sys.stderr)
+
+
+def stage_phase(name: str):
+    """Time a named sub-phase of the active stage; no-op outside profile_stage()."""
+    if _ACTIVE_PROFILER is None:
+        return nullcontext()
+    return _ACTIVE_PROFILER.phase(name)
+
+
+def record_rows(*, read: int = 0, written: int = 0) -> None:
+    if _ACTIVE_PROFILER is not None:
+        _ACTIVE_PROFILER.add_rows(read=read, written=written)
+
+
+def read_stage_metrics(path: str) -> dict[str, Any] | None:
+    """Load metrics written by a stage, or None when it wrote nothing usable."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
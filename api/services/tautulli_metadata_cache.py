@@ -0,0 +1,229 @@
+"""
+Persistent cache of raw Tautulli ``get_metadata`` and ``get_children_metadata``
+responses for the library sync.
+
+Entries are keyed by ``(endpoint, rating_key)`` and remember the item's Plex
+``updated_at``. An entry is served while it is younger than the TTL and, when
+the caller knows the item's current ``updated_at`` (children listings carry
+it), only while that value still matches. Callers that cannot tell whether a
+listing is current pass ``require_updated_at`` so it is never served on age
+alone. A write-through cache refreshes entries but serves none of them, which
+is how full syncs keep it warm without trusting it. Invalidating a key also drops the
+cached child listings of its parent and grandparent, so a new episode shows
+up in its season and show on the next walk.
+
+Fresh entries are read in one query on first use and new responses are
+written in batches, so a sync run costs a few round trips rather than one per
+item. When the table cannot be read the cache turns itself off and every
+lookup goes to Tautulli as before.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional
+
+from psycopg2.extras import Json, RealDictCursor, execute_values
+
+from api.db.connection import connect_db
+
+CACHE_TABLE = "tautulli_metadata_cache"
+METADATA_ENDPOINT = "get_metadata"
+CHILDREN_ENDPOINT = "get_children_metadata"
+DEFAULT_FLUSH_SIZE = 200
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if value in (None, "", " ", "None"):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TautulliMetadataCache:
+    def __init__(self, *, ttl_seconds: int, flush_size: int = DEFAULT_FLUSH_SIZE):
+        self.ttl_seconds = max(int(ttl_seconds or 0), 0)
+        self.enabled = self.ttl_seconds > 0
+        self.write_through = False
+        self.flush_size = max(int(flush_size), 1)
+        # (endpoint, rating_key) -> (updated_at, parent_rating_key, grandparent_rating_key, payload)
+        self._entries: dict[tuple[str, int], tuple[Optional[int], Optional[int], Optional[int], Any]] = {}
+        self._pending: dict[tuple[str, int], tuple] = {}
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded or not self.enabled:
+            return
+        self._loaded = True
+        try:
+            conn = connect_db(cursor_factory=RealDictCursor)
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        f"""
+                        SELECT endpoint, rating_key, updated_at, parent_rating_key, grandparent_rating_key, payload
+                        FROM public.{CACHE_TABLE}
+                        WHERE fetched_at > now() - make_interval(secs => %s)
+                        """,
+                        (self.ttl_seconds,),
+                    )
+                    rows = cur.fetchall()
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as exc:
+            print(f"⚠️ Tautulli metadata cache unavailable; fetching live: {exc}")
+            self.enabled = False
+            return
+
+        for row in rows:
+            self._entries[(row["endpoint"], int(row["rating_key"]))] = (
+                _as_int(row["updated_at"]),
+                _as_int(row["parent_rating_key"]),
+                _as_int(row["grandparent_rating_key"]),
+                row["payload"],
+            )
+        print(f"🗃️ Loaded {len(rows)} cached Tautulli responses")
+
+    def get(
+        self,
+        endpoint: str,
+        rating_key: Any,
+        *,
+        updated_at: Any = None,
+        require_updated_at: bool = False,
+    ) -> Any:
+        """
+        Return the cached payload, or ``None`` when it is missing or stale.
+        With ``require_updated_at`` an entry is only served when ``updated_at``
+        is given and matches it.
+        """
+        key = _as_int(rating_key)
+        self._ensure_loaded()
+        if not self.enabled or self.write_through or key is None:
+            return None
+        entry = self._entries.get((endpoint, key))
+        expected = _as_int(updated_at)
+        if expected is None and require_updated_at:
+            entry = None
+        if entry is None or (expected is not None and entry[0] != expected):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[3]
+
+    def put(
+        self,
+        endpoint: str,
+        rating_key: Any,
+        payload: Any,
+        *,
+        updated_at: Any = None,
+        parent_rating_key: Any = None,
+        grandparent_rating_key: Any = None,
+    ) -> None:
+        key = _as_int(rating_key)
+        if not self.enabled or key is None or not payload:
+            return
+        entry = (
+            _as_int(updated_at),
+            _as_int(parent_rating_key),
+            _as_int(grandparent_rating_key),
+            payload,
+        )
+        self._entries[(endpoint, key)] = entry
+        self._pending[(endpoint, key)] = entry
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def put_metadata(self, rating_key: Any, metadata: dict[str, Any]) -> None:
+        self.put(
+            METADATA_ENDPOINT,
+            rating_key,
+            metadata,
+            updated_at=metadata.get("updated_at"),
+            parent_rating_key=metadata.get("parent_rating_key"),
+            grandparent_rating_key=metadata.get("grandparent_rating_key"),
+        )
+
+    def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            conn = connect_db()
+            try:
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        f"""
+                        INSERT INTO public.{CACHE_TABLE}
+                            (endpoint, rating_key, updated_at, parent_rating_key, grandparent_rating_key, payload, fetched_at)
+                        VALUES %s
+                        ON CONFLICT (endpoint, rating_key) DO UPDATE SET
+                            updated_at = EXCLUDED.updated_at,
+                            parent_rating_key = EXCLUDED.parent_rating_key,
+                            grandparent_rating_key = EXCLUDED.grandparent_rating_key,
+                            payload = EXCLUDED.payload,
+                            fetched_at = EXCLUDED.fetched_at
+                        """,
+                        [
+                            (endpoint, rating_key, updated, parent, grandparent, Json(payload))
+                            for (endpoint, rating_key), (updated, parent, grandparent, payload) in pending.items()
+                        ],
+                        template="(%s, %s, %s, %s, %s, %s, now())",
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as exc:
+            print(f"⚠️ Could not store {len(pending)} Tautulli responses in {CACHE_TABLE}: {exc}")
+            return 0
+        return len(pending)
+
+    def invalidate(self, rating_keys: Iterable[Any], *, parent_keys: Iterable[Any] = ()) -> int:
+        """
+        Drop every cached response for ``rating_keys`` and the child listings of
+        their parents. ``parent_keys`` lose only their child listings.
+        """
+        keys = {key for key in (_as_int(value) for value in rating_keys) if key is not None}
+        parents = {key for key in (_as_int(value) for value in parent_keys) if key is not None}
+        self._ensure_loaded()
+        if not self.enabled or not (keys or parents):
+            return 0
+
+        for key in keys:
+            entry = self._entries.get((METADATA_ENDPOINT, key))
+            if entry is not None:
+                parents.update(value for value in entry[1:3] if value is not None)
+
+        dropped = [
+            cache_key
+            for cache_key in self._entries
+            if cache_key[1] in keys or (cache_key[0] == CHILDREN_ENDPOINT and cache_key[1] in parents)
+        ]
+        for cache_key in dropped:
+            self._entries.pop(cache_key, None)
+            self._pending.pop(cache_key, None)
+
+        try:
+            conn = connect_db()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"""
+                        DELETE FROM public.{CACHE_TABLE}
+                        WHERE rating_key = ANY(%s)
+                           OR (endpoint = %s AND rating_key = ANY(%s))
+                        """,
+                        (sorted(keys), CHILDREN_ENDPOINT, sorted(parents)),
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as exc:
+            print(f"⚠️ Could not invalidate cached Tautulli responses: {exc}")
+        return len(dropped)
@@ -6,12 +6,14 @@ import argparse
 import csv
 import math
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
 from pgvector.psycopg2 import register_vector
 
 from api.db.connection import connect_db as connect_bootstrap_db
 from api.db.schema import ensure_app_schema
+from api.services.stage_metrics import profile_stage
 from gpt_utils import (
     COMBINED_EMBEDDING_DIMENSIONS,
     DEFAULT_FETCH_ITEMS,
@@ -20,6 +22,8 @@ from gpt_utils import (
     build_dimension_prompt,
     call_llm_for_label_result,
     get_dimension_mode,
+    get_label_concurrency,
+    get_label_rate_limiter,
     get_bottom_media_for_dimension,
     get_bottom_users_for_dimension,
     get_media_metadata,
@@ -1643,6 +1647,98 @@ def _fetch_dimension_samples(dimension: int):
     )
 
 
+def _prepare_dimension_prompt(index: int, dim_stats: dict, dry_run: bool = False) -> dict:
+    dimension = dim_stats["dimension"]
+    review_mode = dim_stats.get("selection_mode") == "review"
+    mode, positive_df, negative_df = _fetch_dimension_samples(dimension)
+    prompt_bundle = build_dimension_prompt(
+        dimension,
+        positive_df,
+        negative_df,
+        dimension_mode=mode,
+        existing_label=dim_stats.get("existing_label") if review_mode else None,
+        existing_display_label=dim_stats.get("existing_display_label") if review_mode else None,
+        existing_label_type=dim_stats.get("existing_label_type") if review_mode else None,
+    )
+
+    print(f"📄 Prepared contrast prompt for {mode} dim {dimension}", flush=True)
+    if dry_run:
+        print(prompt_bundle["prompt_text"], flush=True)
+    if prompt_bundle["skipped_reason"]:
+        print(f"⚠️ Skipping LLM for dim {dimension}: {prompt_bundle['skipped_reason']}", flush=True)
+    return {
+        "index": index,
+        "dimension": dimension,
+        "dim_stats": dim_stats,
+        "mode": mode,
+        "prompt_bundle": prompt_bundle,
+    }
+
+
+def _request_dimension_label(prepared: dict, provider, model, rate_limiter=None) -> tuple[dict, str]:
+    dimension = prepared["dimension"]
+    mode = prepared["mode"]
+    try:
+        label_result = call_llm_for_label_result(
+            prepared["prompt_bundle"]["prompt_text"],
+            provider=provider,
+            model=model,
+            dimension_mode=mode,
+            rate_limiter=rate_limiter,
+        )
+    except Exception as exc:
+        skipped_reason = f"LLM error: {str(exc).strip()}"
+        print(f"⚠️ Skipping dim {dimension} due to LLM error: {exc}", flush=True)
+        return _default_label_result(skipped_reason), skipped_reason
+
+    validation_message = _format_result_validation(label_result)
+    print(
+        f"🧠 {mode.title()} dim {dimension} labeled via {provider}:{model} as: {label_result['label']}"
+        + (f"\n   validation={validation_message}" if validation_message else ""),
+        flush=True,
+    )
+    return label_result, ""
+
+
+def iter_dimension_label_results(
+    prepared_dimensions: list[dict],
+    *,
+    call_model: bool,
+    provider=None,
+    model=None,
+    concurrency: int = 1,
+    rate_limiter=None,
+):
+    """
+    Yield ``(prepared, label_result, skipped_reason)`` for every prepared dimension.
+
+    Dimensions that need no LLM call come first, in selection order. The rest
+    are labeled on a thread pool and yielded as each call finishes, so the
+    caller can save them right away; ``prepared["index"]`` keeps selection
+    order for output.
+    """
+    pending = []
+    for prepared in prepared_dimensions:
+        skipped_reason = prepared["prompt_bundle"]["skipped_reason"]
+        if skipped_reason or not call_model:
+            yield prepared, _default_label_result(skipped_reason), skipped_reason
+        else:
+            pending.append(prepared)
+    if not pending:
+        return
+
+    workers = max(1, min(int(concurrency), len(pending)))
+    print(f"🧵 Labeling {len(pending)} dimensions via {provider}:{model} with {workers} concurrent requests", flush=True)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="label-llm") as executor:
+        futures = {
+            executor.submit(_request_dimension_label, prepared, provider, model, rate_limiter): prepared
+            for prepared in pending
+        }
+        for future in as_completed(futures):
+            label_result, skipped_reason = future.result()
+            yield futures[future], label_result, skipped_reason
+
+
 def _default_label_result(skipped_reason: str = "") -> dict:
     if skipped_reason:
         return {
@@ -2036,14 +2132,21 @@ def main():
         action="store_true",
         help="Process top SHAP dimensions even when they already have saved labels",
     )
+    parser.add_argument(
+        "--label_concurrency",
+        type=int,
+        default=None,
+        help="Concurrent LLM label requests (default: labeling.<provider>_concurrency setting)",
+    )
     args = parser.parse_args()
 
     if not 0.0 <= args.coverage_share <= 1.0:
         parser.error("--coverage_share must be between 0.0 and 1.0")
     if args.repair_cooldown_days < 0:
         parser.error("--repair_cooldown_days must be zero or greater")
+    if args.label_concurrency is not None and args.label_concurrency < 1:
+        parser.error("--label_concurrency must be 1 or greater")
 
-    csv_rows = []
     provider_name = None
     model_name = None
     should_call_model = args.label and not args.dry_run
@@ -2119,52 +2222,27 @@ def main():
             scope = "all dimensions" if args.refresh_existing else "unlabeled dimensions"
         print(f"ℹ️ No {scope} selected for labeling.", flush=True)
 
+    prepared_dimensions = [
+        _prepare_dimension_prompt(index, dim_stats, dry_run=args.dry_run)
+        for index, dim_stats in enumerate(top_dims)
+    ]
+    concurrency = args.label_concurrency or (get_label_concurrency(provider_name) if provider_name else 1)
+    label_results = iter_dimension_label_results(
+        prepared_dimensions,
+        call_model=should_call_model,
+        provider=provider_name,
+        model=model_name,
+        concurrency=concurrency,
+        rate_limiter=get_label_rate_limiter(provider_name) if should_call_model else None,
+    )
+
+    csv_rows_by_index = {}
     review_cooldown_events = []
-    for dim_stats in top_dims:
-        dimension = dim_stats["dimension"]
-        mode, positive_df, negative_df = _fetch_dimension_samples(dimension)
-        prompt_bundle = build_dimension_prompt(
-            dimension,
-            positive_df,
-            negative_df,
-            dimension_mode=mode,
-            existing_label=dim_stats.get("existing_label") if dim_stats.get("selection_mode") == "review" else None,
-            existing_display_label=(
-                dim_stats.get("existing_display_label") if dim_stats.get("selection_mode") == "review" else None
-            ),
-            existing_label_type=(
-                dim_stats.get("existing_label_type") if dim_stats.get("selection_mode") == "review" else None
-            ),
-        )
-        skipped_reason = prompt_bundle["skipped_reason"]
-        label_result = _default_label_result(skipped_reason)
-
-        print(f"📄 Prepared contrast prompt for {mode} dim {dimension}", flush=True)
-        if args.dry_run:
-            print(prompt_bundle["prompt_text"], flush=True)
-
-        if skipped_reason:
-            print(f"⚠️ Skipping LLM for dim {dimension}: {skipped_reason}", flush=True)
-        elif should_call_model:
-            try:
-                label_result = call_llm_for_label_result(
-                    prompt_bundle["prompt_text"],
-                    provider=provider_name,
-                    model=model_name,
-                    dimension_mode=mode,
-                )
-                print(
-                    f"🧠 {mode.title()} dim {dimension} labeled via "
-                    f"{provider_name}:{model_name} as: {label_result['label']}",
-                    flush=True,
-                )
-                validation_message = _format_result_validation(label_result)
-                if validation_message:
-                    print(f"   validation={validation_message}", flush=True)
-            except Exception as exc:
-                skipped_reason = f"LLM error: {str(exc).strip()}"
-                label_result = _default_label_result(skipped_reason)
-                print(f"⚠️ Skipping dim {dimension} due to LLM error: {exc}", flush=True)
+    for prepared, label_result, skipped_reason in label_results:
+        dim_stats = prepared["dim_stats"]
+        dimension = prepared["dimension"]
+        mode = prepared["mode"]
+        prompt_bundle = prepared["prompt_bundle"]
 
         label_result = validate_label_perspective(label_result, dimension_mode=mode)
         generated_label = label_result["label"]
@@ -2202,6 +2280,7 @@ def main():
                 review_cooldown_until = _format_review_cooldown_until(args.repair_cooldown_days)
                 review_cooldown_events.append(
                     {
+                        "index": prepared["index"],
                         "dimension": dimension,
                         "status": save_status,
                         "cooldown_until": review_cooldown_until,
@@ -2214,86 +2293,85 @@ def main():
                 )
 
         if args.export_csv:
-            csv_rows.append(
-                {
-                    "dimension": dimension,
-                    "dim_type": mode,
-                    "selection_mode": dim_stats.get("selection_mode", args.selection_mode),
-                    "label_repair_status": dim_stats.get("label_repair_status", ""),
-                    "selection_reason": dim_stats.get("selection_reason", ""),
-                    "existing_label": dim_stats.get("existing_label", ""),
-                    "existing_display_label": dim_stats.get("existing_display_label", ""),
-                    "existing_label_type": dim_stats.get("existing_label_type", ""),
-                    "existing_explainable": dim_stats.get("existing_explainable", ""),
-                    "existing_needs_review": dim_stats.get("existing_needs_review", dim_stats.get("needs_review", "")),
-                    "last_reviewed_at": dim_stats.get("last_reviewed_at", ""),
-                    "review_attempt_count": dim_stats.get("review_attempt_count", ""),
-                    "next_review_at": dim_stats.get("next_review_at", ""),
-                    "unlock_count_total": dim_stats.get("unlock_count_total", ""),
-                    "marginal_unlock_count": dim_stats.get("marginal_unlock_count", ""),
-                    "marginal_weighted_unlock_score": dim_stats.get("marginal_weighted_unlock_score", ""),
-                    "cumulative_unlocked_recommendations": dim_stats.get(
-                        "cumulative_unlocked_recommendations",
-                        "",
-                    ),
-                    "positive_shap_sum_on_unlabeled": dim_stats.get(
-                        "positive_shap_sum_on_unlabeled",
-                        "",
-                    ),
-                    "positive_shap_avg_on_unlabeled": dim_stats.get(
-                        "positive_shap_avg_on_unlabeled",
-                        "",
-                    ),
-                    "mode": mode,
-                    "summary": prompt_bundle["summary"],
-                    "prompt_text": prompt_bundle["prompt_text"],
-                    "label_provider": provider_name or "",
-                    "label_model": model_name or "",
-                    "proposed_label": generated_label,
-                    "proposed_label_confidence": label_result.get("label_confidence", ""),
-                    "proposed_label_type": label_result.get(
-                        "proposed_label_type",
-                        label_result.get("label_type", ""),
-                    ),
-                    "gpt_label": generated_label,
-                    "final_saved_label": final_saved_label,
-                    "final_label_type": final_governance["label_type"],
-                    "final_explainable": final_governance["explainable"],
-                    "final_needs_review": final_governance["needs_review"],
-                    "final_display_label": final_governance["display_label"],
-                    "review_cooldown_until": review_cooldown_until,
-                    "label": generated_label,
-                    "label_confidence": label_result.get("label_confidence", ""),
-                    "label_type": final_governance["label_type"],
-                    "explainable": final_governance["explainable"],
-                    "needs_review": final_governance["needs_review"],
-                    "display_label": final_governance["display_label"],
-                    "coverage_high_count": label_result.get("coverage_high_count"),
-                    "coverage_high_total": label_result.get("coverage_high_total"),
-                    "coverage_high_percent": label_result.get("coverage_high_percent"),
-                    "coverage_low_overlap_count": label_result.get("coverage_low_overlap_count"),
-                    "coverage_low_total": label_result.get("coverage_low_total"),
-                    "coverage_low_overlap_percent": label_result.get("coverage_low_overlap_percent"),
-                    "validation_status": label_result.get("validation_status", ""),
-                    "validation_notes": _format_validation_notes(label_result.get("validation_notes", [])),
-                    "label_explanation": label_result.get("explanation", ""),
-                    "label_evidence_1": evidence[0] if len(evidence) > 0 else "",
-                    "label_evidence_2": evidence[1] if len(evidence) > 1 else "",
-                    "label_evidence_3": evidence[2] if len(evidence) > 2 else "",
-                    "valid_positive_count": prompt_bundle["valid_positive_count"],
-                    "valid_negative_count": prompt_bundle["valid_negative_count"],
-                    "flagged_item_count": prompt_bundle["flagged_item_count"],
-                    "skipped_reason": skipped_reason,
-                    "usage_count": dim_stats["usage_count"],
-                    "sum_abs_shap": dim_stats.get("sum_abs_shap", 0.0),
-                    "avg_abs_shap": dim_stats.get("avg_abs_shap", 0.0),
-                    "combined_score": dim_stats.get("combined_score", 0.0),
-                    "user_count": dim_stats.get("user_count", 0),
-                    "stats_source": dim_stats.get("stats_source", "unknown"),
-                }
-            )
+            csv_rows_by_index[prepared["index"]] = {
+                "dimension": dimension,
+                "dim_type": mode,
+                "selection_mode": dim_stats.get("selection_mode", args.selection_mode),
+                "label_repair_status": dim_stats.get("label_repair_status", ""),
+                "selection_reason": dim_stats.get("selection_reason", ""),
+                "existing_label": dim_stats.get("existing_label", ""),
+                "existing_display_label": dim_stats.get("existing_display_label", ""),
+                "existing_label_type": dim_stats.get("existing_label_type", ""),
+                "existing_explainable": dim_stats.get("existing_explainable", ""),
+                "existing_needs_review": dim_stats.get("existing_needs_review", dim_stats.get("needs_review", "")),
+                "last_reviewed_at": dim_stats.get("last_reviewed_at", ""),
+                "review_attempt_count": dim_stats.get("review_attempt_count", ""),
+                "next_review_at": dim_stats.get("next_review_at", ""),
+                "unlock_count_total": dim_stats.get("unlock_count_total", ""),
+                "marginal_unlock_count": dim_stats.get("marginal_unlock_count", ""),
+                "marginal_weighted_unlock_score": dim_stats.get("marginal_weighted_unlock_score", ""),
+                "cumulative_unlocked_recommendations": dim_stats.get(
+                    "cumulative_unlocked_recommendations",
+                    "",
+                ),
+                "positive_shap_sum_on_unlabeled": dim_stats.get(
+                    "positive_shap_sum_on_unlabeled",
+                    "",
+                ),
+                "positive_shap_avg_on_unlabeled": dim_stats.get(
+                    "positive_shap_avg_on_unlabeled",
+                    "",
+                ),
+                "mode": mode,
+                "summary": prompt_bundle["summary"],
+                "prompt_text": prompt_bundle["prompt_text"],
+                "label_provider": provider_name or "",
+                "label_model": model_name or "",
+                "proposed_label": generated_label,
+                "proposed_label_confidence": label_result.get("label_confidence", ""),
+                "proposed_label_type": label_result.get(
+                    "proposed_label_type",
+                    label_result.get("label_type", ""),
+                ),
+                "gpt_label": generated_label,
+                "final_saved_label": final_saved_label,
+                "final_label_type": final_governance["label_type"],
+                "final_explainable": final_governance["explainable"],
+                "final_needs_review": final_governance["needs_review"],
+                "final_display_label": final_governance["display_label"],
+                "review_cooldown_until": review_cooldown_until,
+                "label": generated_label,
+                "label_confidence": label_result.get("label_confidence", ""),
+                "label_type": final_governance["label_type"],
+                "explainable": final_governance["explainable"],
+                "needs_review": final_governance["needs_review"],
+                "display_label": final_governance["display_label"],
+                "coverage_high_count": label_result.get("coverage_high_count"),
+                "coverage_high_total": label_result.get("coverage_high_total"),
+                "coverage_high_percent": label_result.get("coverage_high_percent"),
+                "coverage_low_overlap_count": label_result.get("coverage_low_overlap_count"),
+                "coverage_low_total": label_result.get("coverage_low_total"),
+                "coverage_low_overlap_percent": label_result.get("coverage_low_overlap_percent"),
+                "validation_status": label_result.get("validation_status", ""),
+                "validation_notes": _format_validation_notes(label_result.get("validation_notes", [])),
+                "label_explanation": label_result.get("explanation", ""),
+                "label_evidence_1": evidence[0] if len(evidence) > 0 else "",
+                "label_evidence_2": evidence[1] if len(evidence) > 1 else "",
+                "label_evidence_3": evidence[2] if len(evidence) > 2 else "",
+                "valid_positive_count": prompt_bundle["valid_positive_count"],
+                "valid_negative_count": prompt_bundle["valid_negative_count"],
+                "flagged_item_count": prompt_bundle["flagged_item_count"],
+                "skipped_reason": skipped_reason,
+                "usage_count": dim_stats["usage_count"],
+                "sum_abs_shap": dim_stats.get("sum_abs_shap", 0.0),
+                "avg_abs_shap": dim_stats.get("avg_abs_shap", 0.0),
+                "combined_score": dim_stats.get("combined_score", 0.0),
+                "user_count": dim_stats.get("user_count", 0),
+                "stats_source": dim_stats.get("stats_source", "unknown"),
+            }
         conn.commit()
 
+    review_cooldown_events.sort(key=lambda event: event["index"])
     if review_cooldown_events:
         print(
             "Review unresolved dimensions placed on cooldown: "
@@ -2314,7 +2392,7 @@ def main():
                 fieldnames=CSV_FIELDNAMES,
             )
             writer.writeheader()
-            writer.writerows(csv_rows)
+            writer.writerows(csv_rows_by_index[index] for index in sorted(csv_rows_by_index))
         print(f"✅ CSV export completed: {args.export_csv}", flush=True)
 
     cur.close()
@@ -2322,4 +2400,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with profile_stage():
+        main()
@@ -18,6 +18,12 @@ psql "$DATABASE_URL" -tAc "SELECT 1 FROM media_embeddings LIMIT 1;" || {
   }
 }
 
+echo "🧱 Applying app schema migrations..."
+python -m api.db.migrations migrate || {
+  echo "❌ Failed to apply schema migrations."
+  exit 2
+}
+
 echo "✅ Schema check and setup complete!"
 echo "🚀 Starting FastAPI..."
 exec uvicorn api.main:app --host 0.0.0.0 --port 8489
@@ -10,6 +10,7 @@ import ast
 from api.db.connection import connect_db
 from api.db.schema import ensure_app_schema
 from api.services.app_settings import get_setting_value
+from api.services.stage_metrics import profile_stage, record_rows, stage_phase
 
 # ✅ Load environment variables
 load_dotenv()
@@ -492,9 +493,11 @@ LEFT JOIN LATERAL (
         )
 
     print(f"✅ Retrieved {len(watched_rows)} aggregated watched + {len(feedback_only_rows)} feedback-only rows")
+    record_rows(read=len(watched_rows) + len(feedback_only_rows))
 
     print("🧮 Building per-user watch-embedding profiles...")
-    user_watch_vectors = build_user_watch_vectors(conn)
+    with stage_phase("build watch vectors"):
+        user_watch_vectors = build_user_watch_vectors(conn)
 
     inserts = []
     watched_insert_count = 0
@@ -557,13 +560,14 @@ LEFT JOIN LATERAL (
 
     print(f"🧠 Inserting {len(inserts)} training records...")
 
-    with conn.cursor() as insert_cur:
+    with stage_phase("write"), conn.cursor() as insert_cur:
         print("🚧 Replacing existing training data...")
         insert_cur.execute("DELETE FROM training_data;")
         for row in inserts:
             insert_cur.execute(insert_sql, [row.get(col) for col in insert_columns])
 
     conn.commit()
+    record_rows(written=len(inserts))
 
     cur.execute("""
         SELECT COUNT(*) AS duplicate_pairs
@@ -583,5 +587,5 @@ LEFT JOIN LATERAL (
 
 
 if __name__ == "__main__":
-    ensure_app_schema()
-    build_training_data()
+    with profile_stage():
+        build_training_data()
@@ -7,6 +7,7 @@ from pgvector import Vector
 from api.db.connection import connect_db
 from api.db.schema import ensure_app_schema
 from api.services.app_settings import get_setting_value
+from api.services.stage_metrics import profile_stage, record_rows, stage_phase
 
 # ✅ Load environment variables
 load_dotenv()
@@ -74,20 +75,25 @@ def build_user_embeddings(watch_history, conn):
             """, (username, Vector(avg_vector.tolist())))
 
     conn.commit()
+    record_rows(written=sum(1 for vectors in user_vectors.values() if vectors))
 
 
 def main():
     conn = connect()
 
     print("🔍 Fetching engaged watch history...")
-    watch_history = fetch_user_watch_history(conn)
+    with stage_phase("fetch watch history"):
+        watch_history = fetch_user_watch_history(conn)
+    record_rows(read=len(watch_history))
     print(f"🎬 Found {len(watch_history)} engaged watch events")
 
-    build_user_embeddings(watch_history, conn)
+    with stage_phase("build embeddings"):
+        build_user_embeddings(watch_history, conn)
 
     conn.close()
 
 
 if __name__ == "__main__":
     ensure_app_schema()
-    main()
+    with profile_stage():
+        main()
@@ -13,6 +13,23 @@ from ollama_embeddings import embed_texts
 from api.db.connection import connect_db
 from api.db.schema import ensure_app_schema
 from api.services.app_settings import get_setting_value
+from api.services.library_change_detection import (
+    ShowFingerprint,
+    fingerprints_match_section,
+    listing_updated_at,
+    load_section_fingerprints,
+    load_show_fingerprints,
+    plan_library_changes,
+    save_section_fingerprints,
+    save_show_fingerprints,
+)
+from api.services.library_search import safe_refresh_library_search
+from api.services.stage_metrics import profile_stage
+from api.services.tautulli_metadata_cache import (
+    CHILDREN_ENDPOINT,
+    METADATA_ENDPOINT,
+    TautulliMetadataCache,
+)
 from api.services.tautulli_api import (
     TautulliApiError,
     delete_tautulli_cache,
@@ -50,19 +67,89 @@ def get_tautulli_api_key() -> str | None:
 def get_tautulli_base_url() -> str | None:
     return get_setting_value("tautulli.base_url")
 
+# Set once Tautulli's cache has been flushed in this process; later metadata
+# misses retry without flushing it again.
+_TAUTULLI_CACHE_CLEARED = False
+
+RECENTLY_ADDED_INVALIDATION_COUNT = 200
+MOVIE_SECTION_ID = 1
+TV_SECTION_ID = 2
+
+# Number of Tautulli API calls made by this process, for sync summaries.
+_TAUTULLI_REQUESTS = 0
+
+
 def clear_tautulli_cache():
     """
     Clear Tautulli's metadata cache so new/changed items show up.
     Uses the same TAUTULLI_URL and TAUTULLI_API_KEY as the rest of the script.
     """
+    global _TAUTULLI_CACHE_CLEARED
     try:
         delete_tautulli_cache(timeout=30)
+        _TAUTULLI_CACHE_CLEARED = True
         print("✅ Cleared Tautulli cache via delete_cache")
     except Exception as e:
         print(f"❌ ERROR clearing Tautulli cache: {e}")
 
+
+_METADATA_STORE = None
+
+
+def get_metadata_store() -> TautulliMetadataCache:
+    global _METADATA_STORE
+    if _METADATA_STORE is None:
+        hours = get_setting_value("pipeline.tautulli_metadata_cache_hours", default=168)
+        _METADATA_STORE = TautulliMetadataCache(ttl_seconds=int(hours or 0) * 3600)
+    return _METADATA_STORE
+
+
+def flush_metadata_store():
+    store = get_metadata_store()
+    store.flush()
+    if store.enabled:
+        print(f"🗃️ Tautulli metadata cache: {store.hits} hit(s), {store.misses} miss(es)")
+
+
+def fetch_recently_added(count=RECENTLY_ADDED_INVALIDATION_COUNT):
+    data = fetch_tautulli_data("get_recently_added", {"count": count})
+    items = data.get("recently_added") if isinstance(data, dict) else None
+    return [item for item in items or [] if isinstance(item, dict)]
+
+
+def fetch_library_sections():
+    data = fetch_tautulli_data("get_libraries")
+    sections = {}
+    for section in data if isinstance(data, list) else []:
+        section_id = safe_int(section.get("section_id")) if isinstance(section, dict) else None
+        if section_id is not None:
+            sections[section_id] = section
+    return sections
+
+
+def invalidate_recently_added_metadata(items=None):
+    """
+    Drop cached responses for everything Tautulli lists as recently added, and
+    the child listings of their seasons and shows, so new episodes are seen.
+    """
+    if items is None:
+        items = fetch_recently_added()
+    if not items:
+        return 0
+    rating_keys = [item.get("rating_key") for item in items]
+    parent_keys = [
+        item.get(field)
+        for item in items
+        for field in ("parent_rating_key", "grandparent_rating_key")
+    ]
+    dropped = get_metadata_store().invalidate(rating_keys, parent_keys=parent_keys)
+    print(f"♻️ Invalidated {dropped} cached Tautulli response(s) for {len(items)} recently added item(s)")
+    return dropped
+
 # ✅ Fetch data from Tautulli API
 def fetch_tautulli_data(endpoint, params=None):
+    global _TAUTULLI_REQUESTS
+    _TAUTULLI_REQUESTS += 1
     try:
         return tautulli_request(
             endpoint,
@@ -195,7 +282,15 @@ def get_library_media_info(section_id, limit=None):
     print(f"✅ DEBUG: Fetched total {len(all_results)} items for section_id={section_id}")
     return all_results
 
-def get_children_metadata(parent_rating_key):
+def get_children_metadata(parent_rating_key, updated_at=None, use_cache=True):
+    # A cached listing can miss children added since it was fetched, so it is
+    # only trusted when the parent's updated_at says nothing has changed.
+    store = get_metadata_store()
+    if use_cache:
+        cached = store.get(CHILDREN_ENDPOINT, parent_rating_key, updated_at=updated_at, require_updated_at=True)
+        if cached is not None:
+            return list(cached)
+
     all_children = []
     start = 0
     page_size = 50  
@@ -229,6 +324,7 @@ def get_children_metadata(parent_rating_key):
         start += page_size  
 
     print(f"✅ Retrieved {len(all_children)} children for parent_rating_key={parent_rating_key}")
+    store.put(CHILDREN_ENDPOINT, parent_rating_key, all_children, updated_at=updated_at)
     return all_children
 
 
@@ -266,24 +362,41 @@ def get_children_metadata(parent_rating_key):
 
 _METADATA_CACHE = {}
 
-def get_metadata(rating_key):
-    cache_key = safe_int(rating_key)
-    if cache_key is not None and cache_key in _METADATA_CACHE:
-        return _METADATA_CACHE[cache_key]
+def _fetch_raw_metadata(rating_key, updated_at=None):
+    store = get_metadata_store()
+    metadata = store.get(METADATA_ENDPOINT, rating_key, updated_at=updated_at)
+    if metadata:
+        return metadata
 
     print(f"🔄 Fetching detailed metadata for rating_key={rating_key}...")
     params = {"rating_key": rating_key}
     metadata = fetch_tautulli_data("get_metadata", params)
 
     if not metadata:
-        print(f"⚠️ WARNING: No metadata found for rating_key={rating_key}. Trying cache clear...")
-        clear_tautulli_cache()
-        time.sleep(1)
+        # Flushing Tautulli's cache is global and slow, so do it at most once per
+        # run; after that a miss is retried once against the live cache.
+        if not _TAUTULLI_CACHE_CLEARED:
+            print(f"⚠️ WARNING: No metadata found for rating_key={rating_key}. Trying cache clear...")
+            clear_tautulli_cache()
+            time.sleep(1)
         metadata = fetch_tautulli_data("get_metadata", params)
         if not metadata:
-            print(f"❌ ERROR: Still no metadata found for rating_key={rating_key} after cache clear.")
+            print(f"❌ ERROR: Still no metadata found for rating_key={rating_key}.")
             return None
 
+    store.put_metadata(rating_key, metadata)
+    return metadata
+
+
+def get_metadata(rating_key, updated_at=None):
+    cache_key = safe_int(rating_key)
+    if cache_key is not None and cache_key in _METADATA_CACHE:
+        return _METADATA_CACHE[cache_key]
+
+    metadata = _fetch_raw_metadata(rating_key, updated_at=updated_at)
+    if not metadata:
+        return None
+
     # -------------------------------------------------------------------------
     # 🧬 3-Tier Metadata Cascade (Episode -> Season -> Show)
     # -------------------------------------------------------------------------
@@ -375,6 +488,17 @@ def get_metadata(rating_key):
 
 # ✅ Fetch library metadata
 def get_library_data(movies_limit=None, tv_limit=None):
+    # A full crawl re-reads everything from Tautulli and only refreshes the
+    # metadata store, so it also repairs entries an incremental run missed.
+    store = get_metadata_store()
+    store.write_through = True
+    try:
+        return _crawl_library(movies_limit=movies_limit, tv_limit=tv_limit)
+    finally:
+        store.write_through = False
+
+
+def _crawl_library(movies_limit=None, tv_limit=None):
     library_data = []
 
     # Fetch Movies (simple)
@@ -400,23 +524,23 @@ def get_library_data(movies_limit=None, tv_limit=None):
             print(f"⚠️ Show metadata missing: rating_key={show['rating_key']}")
 
         print(f"🔍 Fetching seasons for show: {show['title']} ({show['rating_key']})")
-        seasons = get_children_metadata(show["rating_key"])  # ✅ Get Seasons
+        seasons = get_children_metadata(show["rating_key"], show.get("updated_at"))  # ✅ Get Seasons
         seasons = [s for s in seasons if s.get("media_type") == "season"]  # ✅ Ensure only seasons
         print(f"🚨 DEBUG Seasons fetched for show {show['rating_key']}: {len(seasons)}")
 
         for season in seasons:
             # ✅ STORE SEASON METADATA (New for 3-Tier Model)
-            season_metadata = get_metadata(season["rating_key"])
+            season_metadata = get_metadata(season["rating_key"], season.get("updated_at"))
             if season_metadata:
                 library_data.append(season_metadata)
             
             print(f"🔍 Fetching episodes for season: {season['title']} ({season['rating_key']})")
-            episodes = get_children_metadata(season["rating_key"])  # ✅ Get Episodes
+            episodes = get_children_metadata(season["rating_key"], season.get("updated_at"))  # ✅ Get Episodes
             episodes = [e for e in episodes if e.get("media_type") == "episode"]  # ✅ Ensure only episodes
             print(f"🚨 DEBUG Episodes fetched for season {season['rating_key']}: {len(episodes)}")
 
             for episode in episodes:
-                episode_metadata = get_metadata(episode["rating_key"])
+                episode_metadata = get_metadata(episode["rating_key"], episode.get("updated_at"))
                 if episode_metadata:
                     library_data.append(episode_metadata)  # ✅ Store Episodes
                 else:
@@ -430,11 +554,12 @@ def get_watch_history():
 
 # ✅ Store library metadata in PostgreSQL
 def store_library_data(conn, cursor, library_data):
+    """Upsert library rows and return the rating_keys confirmed in the table afterwards."""
     print("📌 Full library_data before inserting:", library_data)
 
     if not library_data:
         print("⚠️ No library data found. Skipping library insert.")
-        return
+        return []
 
     insert_library = """
         INSERT INTO library (
@@ -466,6 +591,7 @@ def store_library_data(conn, cursor, library_data):
     """
 
     successful_inserts = 0
+    stored_keys = []
 
     for item in library_data:
         # ✅ Ensure `rating_key` is assigned at the very beginning of the loop
@@ -555,13 +681,28 @@ def store_library_data(conn, cursor, library_data):
 
             print(f"✅ Successfully inserted: {rating_key}")
             successful_inserts += 1
+            stored_keys.append(rating_key)
         except Exception as e:
             print(f"⚠️ EXCEPTION inserting rating_key={rating_key}: {e}")
             conn.rollback()
             
+    safe_refresh_library_search(cursor, stored_keys)
+
     print("🔎 Checking database commit…")
     conn.commit()
-    print(f"✅ Stored {successful_inserts}/{len(library_data)} library items into database.")
+
+    # A failed item rolls back every uncommitted row before it, so confirm
+    # which rows actually reached the table.
+    committed_keys = []
+    if stored_keys:
+        cursor.execute(
+            "SELECT rating_key FROM library WHERE rating_key = ANY(%s)",
+            ([safe_int(key) for key in stored_keys],),
+        )
+        committed = {row[0] for row in cursor.fetchall()}
+        committed_keys = [key for key in stored_keys if safe_int(key) in committed]
+    print(f"✅ Stored {len(committed_keys)}/{len(library_data)} library items into database.")
+    return committed_keys
 
 
 
@@ -733,7 +874,119 @@ def store_watch_history(conn, cursor, watch_history, *, raise_on_error=False):
 #    print(f"✅ Found {len(to_process)} new or updated media items.")
 #    return to_process
 
-def run_incremental_load():
+def _walk_show(show_key, updated_at, visit, use_cache=True):
+    """Visit every season and episode of one show; returns its fingerprint."""
+    seasons = get_children_metadata(show_key, updated_at, use_cache=use_cache)
+    seasons = [s for s in seasons if s.get("media_type") == "season"]
+    episode_count = 0
+    for season in seasons:
+        visit(season, show_key)
+        episodes = get_children_metadata(season["rating_key"], season.get("updated_at"), use_cache=use_cache)
+        episodes = [e for e in episodes if e.get("media_type") == "episode"]
+        episode_count += len(episodes)
+        for episode in episodes:
+            visit(episode, show_key)
+    return ShowFingerprint(len(seasons), episode_count, safe_int(updated_at))
+
+
+def discover_library_changes(cursor, recent_items, visit, *, full_walk=False):
+    """
+    Visit every library item that may be new since the last run.
+
+    Movies and shows are only listed when their section counts moved, and only
+    shows named by the recently-added feed or with a changed listing row are
+    walked. If the per-show fingerprints then disagree with the TV section's
+    counts, every show is walked again from live Tautulli listings, since a
+    cached listing is exactly what could hide the missing items. Returns the
+    fingerprints to save once the new items are stored.
+    """
+    requests_before = _TAUTULLI_REQUESTS
+    sections = fetch_library_sections()
+    movie_section = sections.get(MOVIE_SECTION_ID)
+    show_section = sections.get(TV_SECTION_ID)
+    fingerprints = load_show_fingerprints(cursor)
+    stored_show_keys = set(fingerprints)
+    plan = plan_library_changes(
+        movie_section=movie_section,
+        show_section=show_section,
+        stored_sections=load_section_fingerprints(cursor),
+        movie_section_id=MOVIE_SECTION_ID,
+        show_section_id=TV_SECTION_ID,
+        recent_items=recent_items,
+    )
+
+    if full_walk or plan.list_movies:
+        print("🎞️ Fetching movies...")
+        for movie in get_library_media_info(section_id=MOVIE_SECTION_ID):
+            visit(movie)
+    else:
+        for rating_key in plan.recent_movie_keys:
+            visit({"rating_key": rating_key, "media_type": "movie"})
+
+    targets = {show_key: None for show_key in plan.changed_show_keys}
+    markers = {}
+    listed_keys = None
+
+    def list_shows():
+        for show in get_library_media_info(section_id=TV_SECTION_ID):
+            show_key = safe_int(show.get("rating_key"))
+            if show_key is None:
+                continue
+            visit(show, show_key)
+            marker = markers[show_key] = listing_updated_at(show)
+            stored = fingerprints.get(show_key)
+            if full_walk or stored is None or (marker is not None and stored.updated_at != marker):
+                targets[show_key] = marker
+            elif show_key in targets:
+                targets[show_key] = marker
+        return set(markers)
+
+    if full_walk or plan.list_shows or not fingerprints:
+        print("📺 Fetching shows...")
+        listed_keys = list_shows()
+    else:
+        for show_key in plan.changed_show_keys:
+            visit({"rating_key": show_key, "media_type": "show"}, show_key)
+
+    print(f"📺 Walking seasons and episodes of {len(targets)} show(s)...")
+    walked = {show_key: _walk_show(show_key, marker, visit) for show_key, marker in targets.items()}
+    fingerprints.update(walked)
+    if listed_keys is not None:
+        fingerprints = {key: value for key, value in fingerprints.items() if key in listed_keys}
+
+    if not full_walk and show_section and not fingerprints_match_section(show_section, fingerprints):
+        print("⚠️ Stored show counts no longer match the TV library; walking every show...")
+        if listed_keys is None:
+            listed_keys = list_shows()
+        for show_key in listed_keys:
+            walked[show_key] = _walk_show(show_key, markers.get(show_key), visit, use_cache=False)
+
+    print(f"🔎 Library change detection used {_TAUTULLI_REQUESTS - requests_before} Tautulli call(s)")
+    return {
+        "sections": {
+            section_id: section
+            for section_id, section in sections.items()
+            if section_id in (MOVIE_SECTION_ID, TV_SECTION_ID)
+        },
+        "shows": walked,
+        "removed_shows": set() if listed_keys is None else stored_show_keys - listed_keys,
+    }
+
+
+def save_library_fingerprints(cursor, result, *, failed_show_keys=()):
+    """
+    Store fingerprints after the new items are in the library. Shows whose new
+    items could not be fetched or stored keep their old fingerprint, and section
+    counts are not advanced, so the next run looks at them again.
+    """
+    failed = set(failed_show_keys)
+    shows = {key: value for key, value in result["shows"].items() if key not in failed}
+    save_show_fingerprints(cursor, shows, removed=result["removed_shows"])
+    if not failed:
+        save_section_fingerprints(cursor, result["sections"])
+
+
+def run_incremental_load(full_walk=False):
     print("🔁 Running incremental update...")
 
     conn, cursor = connect_to_db()
@@ -744,6 +997,8 @@ def run_incremental_load():
     # Clear before listing libraries so Admin/manual pipeline runs see newly-added
     # media that Tautulli may still be serving from its cached metadata views.
     clear_tautulli_cache()
+    recent_items = fetch_recently_added()
+    invalidate_recently_added_metadata(recent_items)
     
     # 0. Sync Plex/Tautulli users into the `users` table
     try:
@@ -758,8 +1013,9 @@ def run_incremental_load():
     existing_keys = {str(row[0]) for row in cursor.fetchall()}
     queued_keys = set()
     new_items = []
+    show_of_item = {}
 
-    def append_new_item(item):
+    def append_new_item(item, show_key=None):
         rating_key = safe_int(item.get("rating_key")) if isinstance(item, dict) else None
         if rating_key is None:
             return
@@ -768,49 +1024,54 @@ def run_incremental_load():
             return
         new_items.append(item)
         queued_keys.add(rating_key_str)
-
-    # 2. Get movies
-    print("🎞️ Fetching movies...")
-    movies = get_library_media_info(section_id=1)
-    for movie in movies:
-        append_new_item(movie)
-
-    # 3. Get shows, seasons, and episodes via show → season → episode
-    print("📺 Fetching shows, seasons, and episodes...")
-    shows = get_library_media_info(section_id=2)
-    for show in shows:
-        append_new_item(show)
-        show_key = show["rating_key"]
-        seasons = get_children_metadata(show_key)
-        for season in seasons:
-            if season.get("media_type") != "season":
-                continue
-            append_new_item(season)
-            season_key = season["rating_key"]
-            episodes = get_children_metadata(season_key)
-            for ep in episodes:
-                if ep.get("media_type") == "episode":
-                    append_new_item(ep)
+        if show_key is not None:
+            show_of_item[rating_key_str] = show_key
+
+    # 2-3. Find new movies, shows, seasons and episodes. Change detection walks
+    # only shows that changed; the full walk descends into every show.
+    change_detection = get_setting_value("pipeline.library_change_detection", default=True)
+    fingerprints = discover_library_changes(
+        cursor,
+        recent_items,
+        append_new_item,
+        full_walk=full_walk or not change_detection,
+    )
 
     print(f"📌 New media items to insert: {len(new_items)}")
 
     # 4. Fetch detailed metadata for each new item
     enriched = []
+    failed_keys = []
     for item in new_items:
-        metadata = get_metadata(item["rating_key"])
+        metadata = get_metadata(item["rating_key"], item.get("updated_at"))
         if metadata:
             enriched.append(metadata)
         else:
+            failed_keys.append(str(safe_int(item["rating_key"])))
             print(f"⚠️ Could not fetch metadata for rating_key={item['rating_key']}")
 
+    flush_metadata_store()
+
     if enriched:
         print(f"📥 Inserting {len(enriched)} new media entries...")
-        store_library_data(conn, cursor, enriched)
+        committed_keys = {str(safe_int(key)) for key in store_library_data(conn, cursor, enriched)}
+        for metadata in enriched:
+            rating_key = str(safe_int(metadata.get("rating_key")))
+            if rating_key not in committed_keys:
+                failed_keys.append(rating_key)
+                print(f"⚠️ rating_key={rating_key} was not stored; its show will be checked again next run")
     else:
         print("✅ No new content to add.")
 
+    save_library_fingerprints(
+        cursor,
+        fingerprints,
+        failed_show_keys={show_of_item.get(key) for key in failed_keys} if failed_keys else (),
+    )
+
     # 5. Repair missing parent header rows implied by already-ingested descendants.
     backfill_missing_header_records(conn, cursor)
+    safe_refresh_library_search(cursor, missing_only=True)
 
     # 6. One-time backfill path for existing rows added before plex_guid existed.
     backfill_missing_plex_guids(conn, cursor)
@@ -830,6 +1091,94 @@ def run_incremental_load():
     print("✅ Incremental update complete.")
 
 
+def parse_rating_keys(values):
+    """Accept rating keys as separate arguments or comma/space separated text."""
+    keys = []
+    for value in values or []:
+        for part in str(value).replace(",", " ").split():
+            key = safe_int(part)
+            if key is not None and key not in keys:
+                keys.append(key)
+    return keys
+
+
+def collect_targeted_items(rating_keys, existing_keys):
+    """
+    Fetch metadata for notified items and their season and show.
+
+    Named items and their parents are always refetched so they are upserted
+    with fresh metadata. Tautulli groups several new episodes into one show or
+    season notification, so a named show or season is expanded to its
+    children; only children not yet in the library are fetched.
+    """
+    get_metadata_store().invalidate(rating_keys)
+    items = {}
+
+    def add(rating_key):
+        key = safe_int(rating_key)
+        if key is None or key in items:
+            return None
+        metadata = get_metadata(key)
+        if metadata:
+            items[key] = metadata
+        else:
+            print(f"⚠️ Could not fetch metadata for rating_key={key}")
+        return metadata
+
+    def add_new_child(child, _show_key=None):
+        key = safe_int(child.get("rating_key"))
+        if key is not None and str(key) not in existing_keys:
+            add(key)
+
+    for rating_key in rating_keys:
+        metadata = add(rating_key)
+        if not metadata:
+            continue
+        add(metadata.get("parent_rating_key"))
+        add(metadata.get("show_rating_key"))
+        media_type = metadata.get("media_type")
+        if media_type in ("show", "series"):
+            _walk_show(rating_key, None, add_new_child)
+        elif media_type == "season":
+            for episode in get_children_metadata(rating_key):
+                if episode.get("media_type") == "episode":
+                    add_new_child(episode)
+
+    return list(items.values())
+
+
+def run_targeted_ingest(rating_keys, *, embed=True):
+    """
+    Upsert just the notified items (and their parents), then embed them.
+
+    Used by the recently-added webhook so new media is recommendable minutes
+    after Plex sees it; the nightly incremental run still crawls the library.
+    """
+    rating_keys = parse_rating_keys(rating_keys)
+    print(f"🎯 Targeted ingest for rating_key(s): {rating_keys}")
+    if not rating_keys:
+        return []
+
+    conn, cursor = connect_to_db()
+    if not conn:
+        print("❌ ERROR: Could not connect to database.")
+        return []
+
+    try:
+        cursor.execute("SELECT rating_key FROM library")
+        existing_keys = {str(row[0]) for row in cursor.fetchall()}
+        items = collect_targeted_items(rating_keys, existing_keys)
+        flush_metadata_store()
+        stored_keys = [safe_int(key) for key in store_library_data(conn, cursor, items)]
+    finally:
+        conn.close()
+
+    if embed and stored_keys and get_setting_value("embeddings.enable_media", default=True):
+        generate_media_embeddings(rating_keys=stored_keys)
+    print(f"✅ Targeted ingest stored {len(stored_keys)} item(s).")
+    return stored_keys
+
+
 def backfill_missing_header_records(conn, cursor):
     print("🧱 Checking for missing show and season header records...")
     cursor.execute(
@@ -990,12 +1339,12 @@ def recover_missing_media(dry_run=False):
     shows = get_library_media_info(section_id=2)
     for show in shows:
         show_key = show["rating_key"]
-        seasons = get_children_metadata(show_key)
+        seasons = get_children_metadata(show_key, show.get("updated_at"))
         for season in seasons:
             if season.get("media_type") != "season":
                 continue
             season_key = season["rating_key"]
-            episodes = get_children_metadata(season_key)
+            episodes = get_children_metadata(season_key, season.get("updated_at"))
             for ep in episodes:
                 if ep.get("media_type") == "episode":
                     all_rating_keys.add(str(ep["rating_key"]))
@@ -1020,6 +1369,7 @@ def recover_missing_media(dry_run=False):
             recovered_items.append(metadata)
         else:
             print(f"⚠️ Could not fetch metadata for rating_key={rk}")
+    flush_metadata_store()
 
     # 6. Insert or preview
     if recovered_items:
@@ -1321,9 +1671,10 @@ def sync_new_watch_history(conn, cursor):
     )
     return True
 
-def generate_media_embeddings(batch_size: int | None = None):
+def generate_media_embeddings(batch_size: int | None = None, rating_keys=None):
     """
     Generate embeddings for media items in `library` that are missing in `media_embeddings`.
+    `rating_keys` limits the pass to those items (targeted ingest).
 
     Assumes:
       - media_embeddings.embedding is pgvector `vector(768)`
@@ -1339,14 +1690,17 @@ def generate_media_embeddings(batch_size: int | None = None):
     print("✅ Connected to PostgreSQL database")
 
     # Find library entries without embeddings
+    key_filter = "AND l.rating_key = ANY(%s)" if rating_keys is not None else ""
     cur.execute(
-        """
+        f"""
         SELECT l.rating_key, l.title, COALESCE(l.summary, '')
         FROM library l
         LEFT JOIN media_embeddings me ON me.rating_key = l.rating_key
         WHERE me.rating_key IS NULL
+        {key_filter}
         ORDER BY l.rating_key
-        """
+        """,
+        (list(rating_keys),) if rating_keys is not None else None,
     )
     rows = cur.fetchall()
     if not rows:
@@ -1595,7 +1949,9 @@ def main():
             print(f"⚠️ Failed to sync users from Tautulli in full mode: {e}")
 
         # Fetch and store library data
+        invalidate_recently_added_metadata()
         library_data = get_library_data(movies_limit=None, tv_limit=None)
+        flush_metadata_store()
         print(f"🚨 DEBUG: Retrieved library data count: {len(library_data)}")
         if len(library_data) == 0:
             print("🚨 DEBUG: Library data is EMPTY after get_library_data()!")
@@ -1622,9 +1978,20 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Plex/Tautulli Media Metadata Importer")
     parser.add_argument(
         "--mode",
-        choices=["full", "incremental", "recover", "embeddings", "watch_embeddings", "backfill_cast_order"],
+        choices=["full", "incremental", "targeted", "recover", "embeddings", "watch_embeddings", "backfill_cast_order"],
         default="full",
-        help="Select run mode: full (default), incremental, recover missing items, generate embeddings, generate watch history embeddings, or backfill actor cast order",
+        help="Select run mode: full (default), incremental, targeted (only --rating-keys), recover missing items, generate embeddings, generate watch history embeddings, or backfill actor cast order",
+    )
+    parser.add_argument(
+        "--rating-keys",
+        nargs="+",
+        default=[],
+        help="Rating keys for --mode targeted, as separate or comma-separated values",
+    )
+    parser.add_argument(
+        "--full-walk",
+        action="store_true",
+        help="In incremental mode, walk every show's seasons and episodes instead of only the changed ones",
     )
     parser.add_argument(
         "--dry-run",
@@ -1635,17 +2002,20 @@ if __name__ == "__main__":
 
     print(f"🚀 Starting script in '{args.mode}' mode...")
 
-    if args.mode == "full":
-        main()
-    elif args.mode == "incremental":
-        run_incremental_load()
-    elif args.mode == "recover":
-        recover_missing_media(dry_run=args.dry_run)
-    elif args.mode == "embeddings":
-        # Media embeddings via Ollama + VectorChord
-        generate_media_embeddings()
-    elif args.mode == "watch_embeddings":
-        # Watch embeddings via Ollama + VectorChord
-        generate_watch_embeddings()
-    elif args.mode == "backfill_cast_order":
-        backfill_actor_cast_order()
+    with profile_stage():
+        if args.mode == "full":
+            main()
+        elif args.mode == "incremental":
+            run_incremental_load(full_walk=args.full_walk)
+        elif args.mode == "targeted":
+            run_targeted_ingest(args.rating_keys)
+        elif args.mode == "recover":
+            recover_missing_media(dry_run=args.dry_run)
+        elif args.mode == "embeddings":
+            # Media embeddings via Ollama + VectorChord
+            generate_media_embeddings()
+        elif args.mode == "watch_embeddings":
+            # Watch embeddings via Ollama + VectorChord
+            generate_watch_embeddings()
+        elif args.mode == "backfill_cast_order":
+            backfill_actor_cast_order()
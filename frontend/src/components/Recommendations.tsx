@@ -71,6 +71,7 @@ interface RecommendationsResponse {
   is_refreshing?: boolean;
   has_more?: boolean;
   next_offset?: number | null;
+  next_cursor?: string | null;
   limit?: number;
   offset?: number;
 }
@@ -379,6 +380,7 @@ async function loadRecommendationsData({
   maxScore,
   sortOrder,
   offset,
+  cursor,
   signal,
 }: {
   viewMode: ViewMode;
@@ -389,6 +391,7 @@ async function loadRecommendationsData({
   maxScore: number;
   sortOrder: SortState[];
   offset: number;
+  cursor?: string | null;
   signal?: AbortSignal;
 }) {
   const baseUrl = window.location.origin;
@@ -401,6 +404,9 @@ async function loadRecommendationsData({
   if (maxScore < 100) {
     params.set('max_probability', (maxScore / 100).toFixed(4));
   }
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
   const normalizedSearch = search.trim();
   if (normalizedSearch) {
     params.set('search', normalizedSearch);
@@ -445,6 +451,7 @@ function normalizeRecommendationsResponse(data: RecommendationsResponse) {
     isRefreshing: Boolean(data.is_refreshing),
     hasMore: Boolean(data.has_more),
     nextOffset: typeof data.next_offset === 'number' ? data.next_offset : null,
+    nextCursor: typeof data.next_cursor === 'string' ? data.next_cursor : null,
   };
 }
 
@@ -1108,6 +1115,7 @@ export default function Recommendations() {
   const [isRefreshing, setIsRefreshing] = useState(false);
   const [hasMore, setHasMore] = useState(false);
   const [nextOffset, setNextOffset] = useState<number | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoadingRecommendations, setIsLoadingRecommendations] = useState(false);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [pendingKeys, setPendingKeys] = useState<number[]>([]);
@@ -1145,9 +1153,15 @@ export default function Recommendations() {
     setIsRefreshing(normalized.isRefreshing);
     setHasMore(normalized.hasMore);
     setNextOffset(normalized.nextOffset);
+    setNextCursor(normalized.nextCursor);
   };
 
-  const refreshRecommendations = async (signal?: AbortSignal, append = false, offset = 0) => {
+  const refreshRecommendations = async (
+    signal?: AbortSignal,
+    append = false,
+    offset = 0,
+    cursor: string | null = null,
+  ) => {
     const data = await loadRecommendationsData({
       viewMode,
       selectedShow,
@@ -1157,6 +1171,7 @@ export default function Recommendations() {
       maxScore,
       sortOrder,
       offset,
+      cursor,
       signal,
     });
     applyRecommendationsData(data, append);
@@ -1449,14 +1464,14 @@ export default function Recommendations() {
   };
 
   const loadMoreRecommendations = async () => {
-    if (!hasMore || nextOffset == null || isLoadingMore) {
+    if (!hasMore || (nextCursor == null && nextOffset == null) || isLoadingMore) {
       return;
     }
 
     setIsLoadingMore(true);
     setPageError(null);
     try {
-      await refreshRecommendations(undefined, true, nextOffset);
+      await refreshRecommendations(undefined, true, nextOffset ?? 0, nextCursor);
     } catch (error) {
       console.error(error);
       setPageError(error instanceof Error ? error.message : 'Failed to load more recommendations.');
@@ -19,6 +19,7 @@ interface PipelineStage {
   exit_code: number | null;
   stdout_tail: string | null;
   stderr_tail: string | null;
+  input_fingerprint: string | null;
   started_at: string | null;
   completed_at: string | null;
 }
@@ -64,6 +65,7 @@ function statusChip(status: string) {
     case "failed":
       return "recs-status-red";
     case "cancelled":
+    case "skipped":
       return "recs-status-slate-muted";
     case "cancel_requested":
       return "recs-status-orange";
@@ -157,12 +159,12 @@ export default function AdminPipeline() {
     return () => window.clearInterval(timer);
   }, [hasActiveRun, loadRuns]);
 
-  async function triggerRun() {
+  async function triggerRun(force = false) {
     setTriggering(true);
     setStatus(null);
     setError(null);
     try {
-      const response = await fetch("/api/admin/pipeline/trigger", {
+      const response = await fetch(`/api/admin/pipeline/trigger${force ? "?force=true" : ""}`, {
         method: "POST",
         credentials: "include",
       });
@@ -222,6 +224,15 @@ export default function AdminPipeline() {
           >
             {triggering ? "Starting…" : "Run pipeline now"}
           </button>
+          <button
+            type="button"
+            onClick={() => void triggerRun(true)}
+            disabled={triggering || loading}
+            title="Run every stage even when its inputs are unchanged since the last successful run."
+            className="recs-btn-secondary px-4 py-2 text-sm"
+          >
+            Force full run
+          </button>
           <button
             type="button"
             onClick={() => void loadRuns()}
@@ -347,6 +358,14 @@ export default function AdminPipeline() {
                                       <span className="text-xs text-slate-500">
                                         {durationMs(st.started_at, st.completed_at)}
                                       </span>
+                                      {st.input_fingerprint && (
+                                        <span
+                                          className="font-mono text-xs text-slate-400"
+                                          title={`Input fingerprint ${st.input_fingerprint}`}
+                                        >
+                                          {st.input_fingerprint.slice(0, 12)}
+                                        </span>
+                                      )}
                                     </div>
                                     {(st.stderr_tail || st.stdout_tail) && (
                                       <pre className="mt-2 max-h-48 overflow-auto whitespace-pre-wrap rounded bg-slate-900/90 p-3 text-xs text-slate-100">
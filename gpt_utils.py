@@ -1,5 +1,6 @@
 import json
 import re
+import threading
 import time
 from datetime import datetime
 
@@ -30,6 +31,7 @@ OPENAI_LABEL_MODEL = get_setting_value("labeling.openai_model", default="gpt-4")
 OLLAMA_HOST = str(get_setting_value("ollama.host", default="http://localhost:11434")).rstrip("/")
 OLLAMA_LABEL_MODEL = get_setting_value("labeling.ollama_model", default="gemma3")
 OLLAMA_TIMEOUT_S = get_setting_value("ollama.timeout_s", default=300)
+LABEL_MAX_COMPLETION_TOKENS = 420
 
 SYSTEM_PROMPT = """
 You label one embedding dimension for film and TV data.
@@ -1100,7 +1102,7 @@ def _call_openai_for_label_result(prompt_text: str, model: str, dimension_mode:
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt_text},
         ],
-        max_tokens=420,
+        max_tokens=LABEL_MAX_COMPLETION_TOKENS,
         temperature=0.1,
     )
     content = response.choices[0].message.content or ""
@@ -1175,6 +1177,59 @@ def _call_ollama_for_label_result(prompt_text: str, model: str, dimension_mode:
     return _extract_label_result_from_response(data.get("response", ""), dimension_mode=dimension_mode)
 
 
+class TokenRateLimiter:
+    """Token bucket shared by labeling threads; `acquire` blocks until the estimate fits the per-minute budget."""
+
+    def __init__(self, tokens_per_minute: int | float, *, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = max(float(tokens_per_minute or 0), 0.0)
+        self._available = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int | float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        tokens = min(max(float(tokens), 0.0), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                refill = (now - self._updated) * self.capacity / 60.0
+                self._available = min(self.capacity, self._available + refill)
+                self._updated = now
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return waited
+                delay = (tokens - self._available) * 60.0 / self.capacity
+            self._sleep(delay)
+            waited += delay
+
+
+_LABEL_RATE_LIMITERS: dict[str, TokenRateLimiter] = {}
+_LABEL_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_label_rate_limiter(provider: str) -> TokenRateLimiter:
+    with _LABEL_RATE_LIMITERS_LOCK:
+        limiter = _LABEL_RATE_LIMITERS.get(provider)
+        if limiter is None:
+            tokens_per_minute = get_setting_value(f"labeling.{provider}_tokens_per_minute", default=0)
+            limiter = _LABEL_RATE_LIMITERS[provider] = TokenRateLimiter(tokens_per_minute)
+        return limiter
+
+
+def get_label_concurrency(provider: str) -> int:
+    default = 4 if provider == "openai" else 1
+    return max(int(get_setting_value(f"labeling.{provider}_concurrency", default=default) or 1), 1)
+
+
+def estimate_label_request_tokens(prompt_text: str) -> int:
+    """Rough prompt size (about four characters per token) plus the completion budget."""
+    return (len(SYSTEM_PROMPT) + len(prompt_text or "")) // 4 + LABEL_MAX_COMPLETION_TOKENS
+
+
 def call_llm_for_label_result(
     prompt_text: str,
     provider: str | None = None,
@@ -1182,12 +1237,16 @@ def call_llm_for_label_result(
     dimension_mode: str = "media",
     max_retries: int = 3,
     retry_delay_s: float = 1.0,
+    rate_limiter: TokenRateLimiter | None = None,
 ) -> dict:
     resolved_provider, resolved_model = resolve_label_backend(provider, model)
     last_error = None
+    request_tokens = estimate_label_request_tokens(prompt_text) if rate_limiter else 0
 
     for attempt in range(1, max_retries + 1):
         try:
+            if rate_limiter is not None:
+                rate_limiter.acquire(request_tokens)
             if resolved_provider == "openai":
                 return _call_openai_for_label_result(prompt_text, resolved_model, dimension_mode=dimension_mode)
             return _call_ollama_for_label_result(prompt_text, resolved_model, dimension_mode=dimension_mode)
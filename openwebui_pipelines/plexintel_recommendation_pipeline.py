@@ -1,20 +1,35 @@
 """
 title: PlexIntel Recommendation Pipeline
 author: jmnovak
-version: 0.1.7
+version: 0.1.8
 requirements: requests
 description: Deterministic PlexIntel workflows with optional Ollama Gemma narration.
 """
 
 from __future__ import annotations
 
+import contextvars
 import json
+import logging
 import os
 import re
-from typing import Any, Generator, Iterator, Optional, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, Iterator, Optional, Union
 
 from pydantic import BaseModel, Field
 import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Step durations for the chat turn being handled. Worker threads run inside a
+# copy of the caller's context, so they record into the same dict.
+_STEP_TIMINGS: contextvars.ContextVar[Optional[dict[str, float]]] = contextvars.ContextVar(
+    "plexintel_step_timings",
+    default=None,
+)
 
 
 def _env_bool(name: str, default: bool) -> bool:
@@ -106,12 +121,26 @@ class Pipeline:
         MAX_LIMIT: int = Field(default=20, ge=1)
         POSTER_WIDTH: int = Field(default=180, ge=1, le=1200)
         REQUEST_TIMEOUT_S: int = Field(default=30, ge=1)
+        HTTP_POOL_SIZE: int = Field(
+            default=8,
+            ge=1,
+            description="Keep-alive connections kept open per host for PlexIntel and Ollama calls.",
+        )
+        USERS_CACHE_TTL_S: int = Field(
+            default=60,
+            ge=0,
+            description="Seconds to reuse the PlexIntel user list between chat turns. 0 disables the cache.",
+        )
+        SHOW_TIMINGS: bool = Field(
+            default=False,
+            description="Append per-step timings to each reply. Timings are always logged.",
+        )
 
     def __init__(self):
         self.id = "plexintel_recommendations"
         self.name = "PlexIntel Recommendations"
         self.description = "Deterministic PlexIntel recommendation, search, poster, and watch-history workflows."
-        self.version = "0.1.7"
+        self.version = "0.1.8"
         self.valves = self.Valves(
             PLEXINTEL_BASE_URL=os.getenv("PLEXINTEL_BASE_URL", "http://192.168.1.9:8489"),
             POSTER_BASE_URL=os.getenv("POSTER_BASE_URL", ""),
@@ -124,13 +153,24 @@ class Pipeline:
             MAX_LIMIT=_env_int("MAX_LIMIT", 20),
             POSTER_WIDTH=_env_int("POSTER_WIDTH", 180),
             REQUEST_TIMEOUT_S=_env_int("REQUEST_TIMEOUT_S", 30),
+            HTTP_POOL_SIZE=_env_int("HTTP_POOL_SIZE", 8),
+            USERS_CACHE_TTL_S=_env_int("USERS_CACHE_TTL_S", 60),
+            SHOW_TIMINGS=_env_bool("SHOW_TIMINGS", False),
         )
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+        self._users_cache: tuple[str, float, list[dict[str, Any]]] | None = None
+        self._users_lock = threading.Lock()
+        self._aliases_cache: tuple[str, dict[str, str]] | None = None
 
     async def on_startup(self):
         pass
 
     async def on_shutdown(self):
-        pass
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
 
     def pipe(
         self,
@@ -147,24 +187,52 @@ class Pipeline:
         if body.get("title"):
             return self._short_title(prompt)
 
+        timings: dict[str, float] = {}
+        token = _STEP_TIMINGS.set(timings)
+        started = time.perf_counter()
+        workflow = "unknown"
         try:
             workflow = self._select_workflow(prompt)
-            if workflow == "list_users":
-                return self._handle_list_users()
-            if workflow == "search":
-                return self._handle_search(prompt)
-            if workflow == "item_poster":
-                return self._handle_item_poster(prompt)
-            if workflow == "watch_history":
-                return self._handle_watch_history(prompt, body)
-            return self._handle_recommendations(prompt, body)
+            response = self._run_workflow(workflow, prompt, body)
         except PipelineHttpError as exc:
-            return self._render_http_error(exc)
+            response = self._render_http_error(exc)
         except Exception as exc:
-            return (
+            response = (
                 "## PlexIntel Pipeline Error\n\n"
                 f"The deterministic pipeline failed before it could complete the workflow: `{exc}`"
             )
+        finally:
+            timings["total"] = time.perf_counter() - started
+            _STEP_TIMINGS.reset(token)
+
+        summary = self._format_timings(timings)
+        logger.info("PlexIntel pipeline workflow=%s %s", workflow, summary)
+        if self.valves.SHOW_TIMINGS:
+            response = f"{response}\n\n_Timings: {summary}_"
+        return response
+
+    def _run_workflow(self, workflow: str, prompt: str, body: dict[str, Any]) -> str:
+        if workflow == "list_users":
+            return self._handle_list_users()
+        if workflow == "search":
+            return self._handle_search(prompt)
+        if workflow == "item_poster":
+            return self._handle_item_poster(prompt)
+        if workflow == "watch_history":
+            return self._handle_watch_history(prompt, body)
+        return self._handle_recommendations(prompt, body)
+
+    def _timed(self, step: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings = _STEP_TIMINGS.get()
+            if timings is not None:
+                timings[step] = timings.get(step, 0.0) + time.perf_counter() - started
+
+    def _format_timings(self, timings: dict[str, float]) -> str:
+        return " ".join(f"{step}={seconds * 1000:.0f}ms" for step, seconds in timings.items())
 
     def _last_user_message(self, messages: list[dict[str, Any]]) -> str:
         for message in reversed(messages):
@@ -219,6 +287,17 @@ class Pipeline:
     def _plexintel_url(self, path: str) -> str:
         return f"{self.valves.PLEXINTEL_BASE_URL.rstrip('/')}{path}"
 
+    def _http_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                pool_size = int(self.valves.HTTP_POOL_SIZE)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
     def _http_json(
         self,
         method: str,
@@ -229,7 +308,7 @@ class Pipeline:
         headers: Optional[dict[str, str]] = None,
     ) -> dict[str, Any]:
         try:
-            response = requests.request(
+            response = self._http_session().request(
                 method,
                 url,
                 params=params,
@@ -277,15 +356,31 @@ class Pipeline:
         if view:
             params["view"] = view
 
-        recommendations = self._plex_get("/api/agent/recommendations", params=params)
+        recommendations = self._timed("recommendations", self._plex_get, "/api/agent/recommendations", params=params)
         items = list(recommendations.get("items") or [])[:limit]
-        gallery = self._poster_gallery_for_items(items)
-        narration = self._call_gemma_narration(
-            prompt=prompt,
-            username=resolution.username or "",
-            view=view,
-            items=items,
-        )
+
+        # The gallery and the narration only depend on the recommendations, so
+        # they run side by side; the reply waits for the slower of the two.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="plexintel-pipeline") as executor:
+            gallery_future = executor.submit(
+                contextvars.copy_context().run,
+                self._timed,
+                "gallery",
+                self._poster_gallery_for_items,
+                items,
+            )
+            narration_future = executor.submit(
+                contextvars.copy_context().run,
+                self._timed,
+                "narration",
+                self._call_gemma_narration,
+                prompt=prompt,
+                username=resolution.username or "",
+                view=view,
+                items=items,
+            )
+            gallery = gallery_future.result()
+            narration = narration_future.result()
         return self._render_recommendations(
             username=resolution.username or "",
             friendly_name=resolution.friendly_name,
@@ -305,9 +400,13 @@ class Pipeline:
         media_type = self._view_to_media_type(view)
         if media_type:
             params["media_type"] = media_type
-        results = self._plex_get("/api/agent/search", params=params)
+        results = self._timed("search", self._plex_get, "/api/agent/search", params=params)
         items = list(results.get("items") or [])[:limit]
-        gallery = self._poster_gallery_for_items(items) if "poster" in prompt.lower() and items else None
+        gallery = (
+            self._timed("gallery", self._poster_gallery_for_items, items)
+            if "poster" in prompt.lower() and items
+            else None
+        )
         return self._render_search(query=query, items=items, gallery=gallery)
 
     def _handle_item_poster(self, prompt: str) -> str:
@@ -316,15 +415,15 @@ class Pipeline:
             query = self._extract_search_query(prompt)
             if not query:
                 return "## PlexIntel Poster\n\nTell me the `rating_key` or title to show."
-            search = self._plex_get("/api/agent/search", params={"q": query, "limit": 1})
+            search = self._timed("search", self._plex_get, "/api/agent/search", params={"q": query, "limit": 1})
             items = list(search.get("items") or [])
             if not items:
                 return f"## PlexIntel Poster\n\nNo library item matched `{query}`."
             item = items[0]
         else:
-            item = self._plex_get(f"/api/agent/items/{rating_key}")
+            item = self._timed("item", self._plex_get, f"/api/agent/items/{rating_key}")
 
-        gallery = self._poster_gallery_for_items([item])
+        gallery = self._timed("gallery", self._poster_gallery_for_items, [item])
         lines = [
             "## PlexIntel Poster",
             "",
@@ -353,7 +452,7 @@ class Pipeline:
         if re.search(r"\b(engaged|completed|finished)\b", prompt, flags=re.I):
             params["engaged_only"] = True
 
-        history = self._plex_get("/api/agent/watch-history", params=params)
+        history = self._timed("watch_history", self._plex_get, "/api/agent/watch-history", params=params)
         return self._render_watch_history(
             username=named_resolution.username,
             items=list(history.get("results") or [])[:limit],
@@ -361,8 +460,19 @@ class Pipeline:
         )
 
     def _fetch_users(self) -> list[dict[str, Any]]:
-        payload = self._plex_get("/api/agent/users", params={"limit": 1000})
-        return list(payload.get("items") or [])
+        ttl = int(self.valves.USERS_CACHE_TTL_S)
+        base_url = self.valves.PLEXINTEL_BASE_URL
+        with self._users_lock:
+            cached = self._users_cache
+        if ttl > 0 and cached and cached[0] == base_url and time.monotonic() < cached[1]:
+            return list(cached[2])
+
+        payload = self._timed("users", self._plex_get, "/api/agent/users", params={"limit": 1000})
+        users = list(payload.get("items") or [])
+        if ttl > 0:
+            with self._users_lock:
+                self._users_cache = (base_url, time.monotonic() + ttl, users)
+        return list(users)
 
     def _resolve_user(
         self,
@@ -414,13 +524,19 @@ class Pipeline:
         return bool(re.search(r"\b(me|my|mine|myself)\b", prompt, flags=re.I))
 
     def _load_aliases(self) -> dict[str, str]:
+        source = self.valves.USER_ALIASES_JSON or "{}"
+        cached = self._aliases_cache
+        if cached and cached[0] == source:
+            return cached[1]
         try:
-            raw = json.loads(self.valves.USER_ALIASES_JSON or "{}")
+            raw = json.loads(source)
         except json.JSONDecodeError:
-            return {}
+            raw = {}
         if not isinstance(raw, dict):
-            return {}
-        return {str(key).strip().casefold(): str(value).strip() for key, value in raw.items()}
+            raw = {}
+        aliases = {str(key).strip().casefold(): str(value).strip() for key, value in raw.items()}
+        self._aliases_cache = (source, aliases)
+        return aliases
 
     def _resolve_alias_user(
         self,
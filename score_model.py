@@ -3,17 +3,34 @@ load_dotenv()
 
 import pandas as pd
 import numpy as np
-import joblib
+import hashlib
+import io
+import time
 import psycopg2
+from pathlib import Path
+from psycopg2.extras import execute_values
 from sqlalchemy import create_engine, text
-import ast
 from datetime import datetime
 import xgboost as xgb
-from sklearn.preprocessing import MultiLabelBinarizer
 import warnings
 from api.db.connection import connect_db, get_database_url
 from api.db.schema import ensure_app_schema
 from api.services.app_settings import get_setting_value
+from api.services.feature_store import (
+    MediaFeatureBlock,
+    assemble_features,
+    load_media_block,
+    parse_embedding,
+    save_media_block,
+    watch_similarity,
+)
+from api.services.model_registry import LEGACY_VERSION, get_model_server, use_model_file
+from api.services.response_cache import (
+    BUMP_VERSIONS_SQLALCHEMY,
+    RECOMMENDATIONS_SCOPE,
+    user_recommendations_scope,
+)
+from api.services.stage_metrics import profile_stage, record_rows, stage_phase
 
 warnings.filterwarnings("ignore", category=UserWarning, module='sklearn')
 
@@ -86,6 +103,7 @@ def swap_recommendations_from_staging(engine):
             )
         )
         conn.execute(text(f"DROP TABLE public.{RECOMMENDATIONS_STAGING_TABLE}"))
+        conn.execute(text(BUMP_VERSIONS_SQLALCHEMY), {"scopes": [RECOMMENDATIONS_SCOPE]})
     print("🔁 Atomically swapped staged recommendations into public.recommendations")
 
 def ensure_shap_snapshot_schema(conn):
@@ -391,18 +409,6 @@ def _upsert_shap_dimension_stats_current(cur, user_dim_agg):
             (dim, usage_count, sum_abs, avg_abs, float(combined_score), 1)
         )
 
-def parse_vector(x):
-    if isinstance(x, str):
-        return np.array(ast.literal_eval(x), dtype=np.float32)
-    return np.array(x, dtype=np.float32)
-
-def normalize_tag_list(value):
-    if isinstance(value, (list, tuple, set)):
-        return [str(tag).strip() for tag in value if str(tag).strip()]
-    if value is None or pd.isna(value):
-        return []
-    return [tag.strip() for tag in str(value).split(",") if tag.strip()]
-
 def get_user_watch_vector(username):
     """
     Build a per-user average watch-embedding vector (from watch_history + watch_embeddings).
@@ -440,7 +446,7 @@ def get_user_watch_vector(username):
         ratio = played_duration / (media_duration / 1000.0) if media_duration else 0.0
         if ratio < WATCH_EMBED_MIN_ENGAGEMENT:
             continue
-        vec = parse_vector(watch_embedding)
+        vec = parse_embedding(watch_embedding)
         if vec_sum is None:
             vec_sum = vec.copy()
         else:
@@ -451,21 +457,17 @@ def get_user_watch_vector(username):
         return None
     return vec_sum / count
 
-def get_unwatched_media(username):
+def get_unwatched_media(username, rating_keys=None):
+    """Scoreable items ``username`` has not watched or hidden, optionally limited to ``rating_keys``."""
     engine = get_engine()
     query = """
-        SELECT 
+        SELECT
             m.rating_key,
             m.media_type,
             m.title,
             m.parent_rating_key,
             m.show_rating_key,
-            e.embedding,
-            m.year,
-            g.genre_tags,
-            a.actor_tags,
-            d.director_tags,
-            ue.embedding AS user_embedding
+            m.year
         FROM library m
         JOIN media_embeddings e ON m.rating_key = e.rating_key
         JOIN user_embeddings ue ON ue.username = %s
@@ -489,24 +491,6 @@ def get_unwatched_media(username):
                     AND (w.played_duration::float / (m.duration / 1000.0)) >= %s
                 )
             )
-        LEFT JOIN (
-            SELECT mg.media_id, STRING_AGG(g.name, ',') AS genre_tags
-            FROM media_genres mg
-            JOIN genres g ON mg.genre_id = g.id
-            GROUP BY mg.media_id
-        ) g ON g.media_id = m.rating_key
-        LEFT JOIN (
-            SELECT ma.media_id, STRING_AGG(a.name, ',' ORDER BY ma.cast_order NULLS LAST, a.name) AS actor_tags
-            FROM media_actors ma
-            JOIN actors a ON ma.actor_id = a.id
-            GROUP BY ma.media_id
-        ) a ON a.media_id = m.rating_key
-        LEFT JOIN (
-            SELECT md.media_id, STRING_AGG(d.name, ',') AS director_tags
-            FROM media_directors md
-            JOIN directors d ON md.director_id = d.id
-            GROUP BY md.media_id
-        ) d ON d.media_id = m.rating_key
         WHERE w.rating_key IS NULL
         AND m.media_type IN ('movie', 'episode')
         AND NOT EXISTS (
@@ -518,116 +502,140 @@ def get_unwatched_media(username):
               AND f.feedback <> 'interested'
         )
     """
-    df = pd.read_sql(
-        query,
-        engine,
-        params=(
-            username,
-            username,
-            WATCHED_ENGAGEMENT_THRESHOLD,
-            WATCHED_ENGAGEMENT_THRESHOLD,
-            username,
-        ),
-    )
+    params = [
+        username,
+        username,
+        WATCHED_ENGAGEMENT_THRESHOLD,
+        WATCHED_ENGAGEMENT_THRESHOLD,
+        username,
+    ]
+    if rating_keys is not None:
+        query += "    AND m.rating_key = ANY(%s)\n"
+        params.append([int(key) for key in rating_keys])
+    df = pd.read_sql(query, engine, params=tuple(params))
     print(f"🔍 {len(df)} media items remaining after suppression filter.")
     return df
 
-def preprocess_for_scoring(df, feature_names_template, user_watch_vec=None):
-    feature_names_template = [str(name) for name in feature_names_template]
+# Media-side feature inputs for every scoreable item. Tags and embeddings are
+# the same for every user, so they are read once per library version into a
+# cached MediaFeatureBlock instead of once per user.
+_MEDIA_FEATURES_FROM = """
+    FROM library m
+    JOIN media_embeddings e ON m.rating_key = e.rating_key
+    LEFT JOIN (
+        SELECT mg.media_id, STRING_AGG(g.name, ',') AS genre_tags
+        FROM media_genres mg
+        JOIN genres g ON mg.genre_id = g.id
+        GROUP BY mg.media_id
+    ) g ON g.media_id = m.rating_key
+    LEFT JOIN (
+        SELECT ma.media_id, STRING_AGG(a.name, ',' ORDER BY ma.cast_order NULLS LAST, a.name) AS actor_tags
+        FROM media_actors ma
+        JOIN actors a ON ma.actor_id = a.id
+        GROUP BY ma.media_id
+    ) a ON a.media_id = m.rating_key
+    LEFT JOIN (
+        SELECT md.media_id, STRING_AGG(d.name, ',') AS director_tags
+        FROM media_directors md
+        JOIN directors d ON md.director_id = d.id
+        GROUP BY md.media_id
+    ) d ON d.media_id = m.rating_key
+    WHERE m.media_type IN ('movie', 'episode')
+"""
+MEDIA_FEATURES_QUERY = (
+    "SELECT m.rating_key, m.year, e.embedding, g.genre_tags, a.actor_tags, d.director_tags"
+    + _MEDIA_FEATURES_FROM
+)
+# Order-independent content hash; changes whenever an item, its year,
+# embedding or tags change.
+MEDIA_FEATURES_VERSION_QUERY = (
+    """
+    SELECT
+        COUNT(*) AS item_count,
+        COALESCE(SUM(hashtext(concat_ws('|', m.rating_key, m.year, e.embedding::text,
+                                        g.genre_tags, a.actor_tags, d.director_tags))::bigint), 0) AS content_hash
+    """
+    + _MEDIA_FEATURES_FROM
+)
 
-    def safe_embedding_parse(x):
-        if isinstance(x, str):
-            return np.array(ast.literal_eval(x), dtype=np.float32)
-        return np.array(x, dtype=np.float32)
+_MEDIA_FEATURE_BLOCK = None
+_MEDIA_FEATURE_BLOCK_CHECKED_AT = 0.0
 
-    def get_decade_flags(year):
-        if year is None or pd.isna(year):
-            return {}
-        try:
-            decade = int(year) // 10 * 10
-            return {f"is_{decade}s": 1}
-        except:
-            return {}
-
-    df['genres'] = df['genre_tags'].apply(normalize_tag_list)
-    df['actors'] = df['actor_tags'].apply(normalize_tag_list)
-    df['directors'] = df['director_tags'].apply(normalize_tag_list)
-
-    # Parse embeddings before combination
-    df['media_embedding'] = df['embedding'].apply(safe_embedding_parse)
-    df['user_embedding'] = df['user_embedding'].apply(safe_embedding_parse)
-
-    # Watch-embedding similarity (media_emb vs user watch-profile)
-    media_embs = np.stack(df['media_embedding'])
-    watch_sim = np.zeros(len(df), dtype=np.float32)
-    if user_watch_vec is not None:
-        user_watch_vec = np.array(user_watch_vec, dtype=np.float32)
-        norm_user = np.linalg.norm(user_watch_vec)
-        if norm_user > 0:
-            norms_media = np.linalg.norm(media_embs, axis=1)
-            denom = norms_media * norm_user
-            valid = denom > 0
-            watch_sim[valid] = (media_embs[valid] @ user_watch_vec) / denom[valid]
-    df['watch_sim'] = watch_sim
-
-    # Combine user and media embeddings
-    df['embedding'] = df.apply(lambda row: np.concatenate([row['media_embedding'], row['user_embedding']]), axis=1)
-
-    genre_top = [f.split("_", 1)[1] for f in feature_names_template if f.startswith("genre_")]
-    actor_top = [f.split("_", 1)[1] for f in feature_names_template if f.startswith("actor_")]
-    director_top = [f.split("_", 1)[1] for f in feature_names_template if f.startswith("director_")]
-    decade_features = [f for f in feature_names_template if f.startswith("is_") and f.endswith("s")]
-
-    def filter_known(labels, allowed_set):
-        return [label for label in labels if label in allowed_set]
-
-    df['genres'] = df['genres'].apply(lambda x: filter_known(x, set(genre_top)))
-    df['actors'] = df['actors'].apply(lambda x: filter_known(x, set(actor_top)))
-    df['directors'] = df['directors'].apply(lambda x: filter_known(x, set(director_top)))
-
-    genre_bin = MultiLabelBinarizer(classes=genre_top)
-    actor_bin = MultiLabelBinarizer(classes=actor_top)
-    director_bin = MultiLabelBinarizer(classes=director_top)
-
-    embedding_features = [f"emb_{i}" for i in range(len(df['embedding'].iloc[0]))]
-    feature_df = pd.DataFrame(
-        np.vstack(df['embedding'].values),
-        columns=embedding_features,
-        index=df.index,
-    )
-    feature_df = pd.concat(
-        [
-            feature_df,
-            pd.DataFrame(
-                genre_bin.fit_transform(df['genres']),
-                columns=[f"genre_{genre}" for genre in genre_top],
-                index=df.index,
-            ),
-            pd.DataFrame(
-                actor_bin.fit_transform(df['actors']),
-                columns=[f"actor_{actor}" for actor in actor_top],
-                index=df.index,
-            ),
-            pd.DataFrame(
-                director_bin.fit_transform(df['directors']),
-                columns=[f"director_{director}" for director in director_top],
-                index=df.index,
-            ),
-        ],
-        axis=1,
+
+def get_media_feature_version(engine):
+    with engine.connect() as conn:
+        row = conn.execute(text(MEDIA_FEATURES_VERSION_QUERY)).mappings().one()
+    return hashlib.sha256(f"{row['item_count']}:{row['content_hash']}".encode("utf-8")).hexdigest()
+
+
+def get_media_feature_block(schema, max_age_seconds=None):
+    """
+    Media features for the current library, from memory, disk cache or the DB.
+    Batch runs keep the in-memory block for the whole process; long-lived
+    callers (API rescoring) pass ``max_age_seconds`` to re-check the library
+    version once the block is older than that.
+    """
+    global _MEDIA_FEATURE_BLOCK, _MEDIA_FEATURE_BLOCK_CHECKED_AT
+    block = _MEDIA_FEATURE_BLOCK
+    fresh = max_age_seconds is None or time.monotonic() - _MEDIA_FEATURE_BLOCK_CHECKED_AT < max_age_seconds
+    if block is not None and block.schema_fingerprint == schema.fingerprint and fresh:
+        return block
+
+    engine = get_engine()
+    version = get_media_feature_version(engine)
+    _MEDIA_FEATURE_BLOCK_CHECKED_AT = time.monotonic()
+    if block is not None and block.schema_fingerprint == schema.fingerprint and block.library_version == version:
+        return block
+    block = load_media_block(schema, version)
+    if block is not None:
+        print(f"📦 Loaded cached media features for {len(block)} items")
+    else:
+        df = pd.read_sql(MEDIA_FEATURES_QUERY, engine)
+        block = MediaFeatureBlock.from_frame(df, schema, library_version=version)
+        path = save_media_block(block, schema)
+        print(f"📦 Built media features for {len(block)} items (cached at {path})")
+    _MEDIA_FEATURE_BLOCK = block
+    return block
+
+
+def get_user_embedding(username):
+    conn = connect_db()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT embedding FROM user_embeddings WHERE username = %s", (username,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    return parse_embedding(row[0]) if row else None
+
+
+def preprocess_for_scoring(df, schema, media_block, user_embedding, user_watch_vec=None):
+    """
+    Assemble the float32 scoring matrix in the model's feature-schema order.
+    Adds a ``feature_row`` column mapping each df row to its X row.
+    """
+    positions = media_block.positions(df["rating_key"])
+    missing = positions < 0
+    if missing.any():
+        print(f"⚠️ Skipping {int(missing.sum())} items missing from the media feature cache.")
+        df = df.loc[~missing].reset_index(drop=True)
+        positions = positions[~missing]
+
+    media_embs = media_block.embeddings[positions]
+    user_embedding = np.asarray(user_embedding, dtype=np.float32)
+    X = assemble_features(
+        schema,
+        (media_embs, np.broadcast_to(user_embedding, (len(positions), user_embedding.size))),
+        media_block.side[positions],
+        watch_similarity(media_embs, user_watch_vec),
     )
+    df = df.copy()
+    df["feature_row"] = np.arange(len(df))
 
-    decade_df = pd.DataFrame(0, columns=decade_features, index=df.index, dtype=np.int8)
-    for idx, flags in df['year'].apply(get_decade_flags).items():
-        for feature in flags:
-            if feature in decade_df.columns:
-                decade_df.at[idx, feature] = 1
-    feature_df = pd.concat([feature_df, decade_df], axis=1)
-    feature_df["watch_sim"] = watch_sim
-
-    feature_df = feature_df.reindex(columns=feature_names_template, fill_value=0)
-    X = feature_df.values
-    active_decades = [col for col in decade_features if feature_df[col].any()]
+    decade_start = len(schema.feature_names) - 1 - len(schema.decades)
+    active_decades = [
+        name for offset, name in enumerate(schema.decades) if X[:, decade_start + offset].any()
+    ]
     print("📆 Decade columns active:", active_decades)
 
     return X, df
@@ -639,59 +647,95 @@ def cosine_similarity_batch(user_embeddings, media_embeddings):
     similarities = dot_products / (norms_user * norms_media)
     return similarities
 
+def write_recommendation_rows(conn, table, output):
+    """Bulk-load scored rows with COPY inside the caller's SQLAlchemy transaction."""
+    buffer = io.StringIO()
+    # \N marks NULL so empty explanations stay empty strings, as with to_sql.
+    output.to_csv(buffer, index=False, header=False, na_rep="\\N")
+    buffer.seek(0)
+    columns = ", ".join(output.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY public.{table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def recommendation_output(df, X, media_dim, username, model_name, user_embedding):
+    """Annotate scored rows in place and return the columns written to ``recommendations``."""
+    df['username'] = username
+    df['scored_at'] = datetime.now()
+    df['model_name'] = model_name
+    df['rank'] = df['predicted_probability'].rank(method='first', ascending=False).astype(int)
+
+    media_rows = X[df['feature_row'].to_numpy(), :media_dim]
+    df['cosine_similarity'] = cosine_similarity_batch(
+        np.broadcast_to(np.asarray(user_embedding, dtype=np.float32), media_rows.shape),
+        media_rows,
+    )
+
+    df['explanation'] = np.where(
+        df['cosine_similarity'] > 0.85,
+        "Very similar to your viewing preferences",
+        ""
+    )
+
+    return df[['username', 'rating_key', 'predicted_probability', 'model_name', 'scored_at', 'rank', 'cosine_similarity', 'explanation']]
+
+
 def score_and_store(
     username,
     skip_shap=False,
     recommendations_table=RECOMMENDATIONS_TABLE,
     replace_existing=True,
+    media_max_age_seconds=None,
 ):
     import shap
     print("📥 Loading model...")
-    model = joblib.load("xgb_model.pkl")
-    booster = model.get_booster()
+    with stage_phase("load model"):
+        loaded_model = get_model_server().get()
+    model = loaded_model.model
+    feature_names = loaded_model.feature_names
+    schema = loaded_model.schema
 
     print(f"📊 Fetching unwatched media for {username}...")
-    df = get_unwatched_media(username)
+    with stage_phase("fetch unwatched"):
+        df = get_unwatched_media(username)
+    record_rows(read=len(df))
     
     if df.empty:
         print("✅ No unwatched items to score.")
         return
 
     print("🧹 Preprocessing...")
-    feature_names = booster.feature_names
-    user_watch_vec = get_user_watch_vector(username)
+    with stage_phase("fetch watch vector"):
+        user_watch_vec = get_user_watch_vector(username)
     if user_watch_vec is None:
         print(f"⚠️ No watch-embedding profile for {username}; watch_sim will be 0.")
-    X, df = preprocess_for_scoring(df, feature_names, user_watch_vec=user_watch_vec)
-
-    # 🔍 Embedding Debug (NOW SAFE TO CALL)
-    media_embs = np.stack(df['media_embedding'])
-    print("✅ Unique media embeddings:", len(np.unique(media_embs, axis=0)))
-
-    combo_embs = np.stack(df['embedding'])
-    print("✅ Unique combined embeddings:", len(np.unique(combo_embs, axis=0)))
-    
-
-    combo_embs = np.stack(df['embedding'])
-    unique_combo_count = len(np.unique(combo_embs, axis=0))
-    print("🧠 Unique combined user-media embedding vectors:", unique_combo_count)
+    user_embedding = get_user_embedding(username)
+    if user_embedding is None:
+        print(f"✅ No user embedding for {username}; nothing to score.")
+        return
+    with stage_phase("media features"):
+        media_block = get_media_feature_block(schema, max_age_seconds=media_max_age_seconds)
+    with stage_phase("preprocess"):
+        X, df = preprocess_for_scoring(
+            df,
+            schema,
+            media_block,
+            user_embedding,
+            user_watch_vec=user_watch_vec,
+        )
+    media_dim = media_block.embeddings.shape[1]
+    print("✅ Unique media embeddings:", len(np.unique(X[:, :media_dim], axis=0)))
 
     print("🔮 Scoring predictions...")
-    expected_features = model.feature_names_in_
-
-    # ✅ Ensure X is a DataFrame, even if it was returned as a NumPy array
-    if X.shape[1] != len(expected_features):
-        print(f"⚠️ Feature mismatch: X has {X.shape[1]} columns, expected {len(expected_features)}")
-        if X.shape[1] < len(expected_features):
-            pad_width = len(expected_features) - X.shape[1]
-            print(f"🔧 Padding X with {pad_width} zeros")
-            X = np.hstack([X, np.zeros((X.shape[0], pad_width))])
-        else:
-            print(f"🔧 Trimming X from {X.shape[1]} to {len(expected_features)} columns")
-            X = X[:, :len(expected_features)]
-
-    X_df = pd.DataFrame(X, columns=expected_features)  # <-- always create this
-    probabilities = model.predict_proba(X_df)[:, 1]
+    X_df = pd.DataFrame(X, columns=feature_names)
+    with stage_phase("predict"):
+        probabilities = model.predict_proba(X_df)[:, 1]
 
     df['predicted_probability'] = probabilities
 
@@ -707,7 +751,7 @@ def score_and_store(
 
     # Keep TV recommendations at the episode level for rollups/drilldowns later.
     tv_df = episode_df.copy()
-    model_name = 'xgb_model'
+    model_name = loaded_model.model_name
 
     # Sort
     if not tv_df.empty:
@@ -738,32 +782,18 @@ def score_and_store(
         top_df['season_number'] = None
 
     df = top_df # replace original df with stored top_df
-    
-    df['username'] = username
-    df['scored_at'] = datetime.now()
-    df['model_name'] = model_name
-    df['rank'] = df['predicted_probability'].rank(method='first', ascending=False).astype(int)
-
-    df['cosine_similarity'] = cosine_similarity_batch(
-        np.stack(df['user_embedding']),
-        np.stack(df['media_embedding'])
-    )
-
-    df['explanation'] = np.where(
-        df['cosine_similarity'] > 0.85,
-        "Very similar to your viewing preferences",
-        ""
-    )
-
-    output = df[['username', 'rating_key', 'predicted_probability', 'model_name', 'scored_at', 'rank', 'cosine_similarity', 'explanation']]
+    output = recommendation_output(df, X, media_dim, username, model_name, user_embedding)
     engine = get_engine()
-    with engine.begin() as conn:
+    with stage_phase("write"), engine.begin() as conn:
         if replace_existing:
             conn.execute(
                 text(f"DELETE FROM public.{RECOMMENDATIONS_TABLE} WHERE username = :username"),
                 {"username": username},
             )
-        output.to_sql(recommendations_table, conn, if_exists="append", index=False, schema="public")
+        write_recommendation_rows(conn, recommendations_table, output)
+        if recommendations_table == RECOMMENDATIONS_TABLE:
+            conn.execute(text(BUMP_VERSIONS_SQLALCHEMY), {"scopes": [user_recommendations_scope(username)]})
+    record_rows(written=len(output))
     if recommendations_table == RECOMMENDATIONS_TABLE:
         print(f"✅ Replaced recommendations for {username} with {len(output)} scored items.")
     else:
@@ -794,7 +824,8 @@ def score_and_store(
     # Optional deeper print
     for i in range(min(5, len(X_top))):
         print(f"Row {i} summary hash: {hash(tuple(np.round(X_top.iloc[i].values, 4)))}")
-    shap_values = explainer.shap_values(X_top)
+    with stage_phase("shap"):
+        shap_values = explainer.shap_values(X_top)
 
     print("\n🔍 SHAP Feature Impact (Top Rows):")
     conn = connect_db()
@@ -809,35 +840,39 @@ def score_and_store(
 
     user_dim_agg = {}
 
-    for i, row in enumerate(df_shap.itertuples()):
-        shap_row = shap_values[i]
-        top_features = sorted(zip(feature_names, shap_row), key=lambda x: abs(x[1]), reverse=True)[:3]
-        formatted = ", ".join([f"{name} ({value:+.2f})" for name, value in top_features])
-        print(f"Rank {row.rank}: {row.rating_key} — {formatted}")
-
-        sorted_dims = _sorted_embedding_shap_dims(shap_row)
-        raw_dims = _select_raw_shap_dims(sorted_dims)
-        for dim, shap_val in raw_dims:
-            cur.execute(
-                """
-                INSERT INTO shap_impact (user_id, rating_key, dimension, shap_value, created_at, modified_at)
-                VALUES (%s, %s, %s, %s, NOW(), NOW())
-                ON CONFLICT (user_id, rating_key, dimension)
-                DO UPDATE SET 
-                    shap_value = EXCLUDED.shap_value,
-                    modified_at = NOW()
-                WHERE shap_impact.shap_value IS DISTINCT FROM EXCLUDED.shap_value;
-                """,
-                (username, row.rating_key, dim, float(shap_val))
-            )
+    shap_rows_written = 0
+    with stage_phase("shap write"):
+        for i, row in enumerate(df_shap.itertuples()):
+            shap_row = shap_values[i]
+            top_features = sorted(zip(feature_names, shap_row), key=lambda x: abs(x[1]), reverse=True)[:3]
+            formatted = ", ".join([f"{name} ({value:+.2f})" for name, value in top_features])
+            print(f"Rank {row.rank}: {row.rating_key} — {formatted}")
+
+            sorted_dims = _sorted_embedding_shap_dims(shap_row)
+            raw_dims = _select_raw_shap_dims(sorted_dims)
+            shap_rows_written += len(raw_dims)
+            for dim, shap_val in raw_dims:
+                cur.execute(
+                    """
+                    INSERT INTO shap_impact (user_id, rating_key, dimension, shap_value, created_at, modified_at)
+                    VALUES (%s, %s, %s, %s, NOW(), NOW())
+                    ON CONFLICT (user_id, rating_key, dimension)
+                    DO UPDATE SET 
+                        shap_value = EXCLUDED.shap_value,
+                        modified_at = NOW()
+                    WHERE shap_impact.shap_value IS DISTINCT FROM EXCLUDED.shap_value;
+                    """,
+                    (username, row.rating_key, dim, float(shap_val))
+                )
 
-        for dim, _shap_val, abs_val in _select_agg_shap_dims(sorted_dims):
-            stats = user_dim_agg.setdefault(dim, {"usage_count": 0, "sum_abs_shap": 0.0})
-            stats["usage_count"] += 1
-            stats["sum_abs_shap"] += float(abs_val)
+            for dim, _shap_val, abs_val in _select_agg_shap_dims(sorted_dims):
+                stats = user_dim_agg.setdefault(dim, {"usage_count": 0, "sum_abs_shap": 0.0})
+                stats["usage_count"] += 1
+                stats["sum_abs_shap"] += float(abs_val)
 
-    _upsert_shap_dimension_stats_current(cur, user_dim_agg)
-    conn.commit()
+        _upsert_shap_dimension_stats_current(cur, user_dim_agg)
+        conn.commit()
+    record_rows(written=shap_rows_written)
     print(f"📊 Upserted {len(user_dim_agg)} aggregate SHAP dimension rows for {username}")
     cur.close()
     conn.close()
@@ -849,6 +884,247 @@ def get_all_users():
     df = pd.read_sql(query, engine)
     return df['username'].tolist()
 
+# Delta scoring. scoring_media_state / scoring_user_state record the embedding
+# each item and user was last scored with, so a delta run only scores
+# (every user x new or re-embedded items) + (new or re-embedded users x every
+# item) and merges the rows into public.recommendations without a swap.
+SCORING_MEDIA_INPUTS_QUERY = """
+    SELECT e.rating_key, md5(e.embedding::text) AS embedding_hash
+    FROM media_embeddings e
+    JOIN library m ON m.rating_key = e.rating_key
+    LEFT JOIN scoring_media_state s ON s.rating_key = e.rating_key
+    WHERE m.media_type IN ('movie', 'episode')
+"""
+SCORING_MEDIA_CHANGED_FILTER = "    AND s.embedding_hash IS DISTINCT FROM md5(e.embedding::text)\n"
+SCORING_USER_INPUTS_QUERY = """
+    SELECT
+        ue.username,
+        md5(ue.embedding::text) AS embedding_hash,
+        s.embedding_hash AS scored_hash,
+        s.model_version AS scored_model
+    FROM user_embeddings ue
+    LEFT JOIN scoring_user_state s ON s.username = ue.username
+    WHERE EXISTS (SELECT 1 FROM watch_history w WHERE w.username = ue.username)
+"""
+
+
+def scoring_model_key(loaded_model):
+    """Identity of the scoring model; legacy pickles are keyed by their mtime."""
+    if loaded_model.version != LEGACY_VERSION:
+        return loaded_model.version
+    try:
+        return f"{LEGACY_VERSION}:{Path(loaded_model.model_path).stat().st_mtime_ns}"
+    except OSError:
+        return LEGACY_VERSION
+
+
+def fetch_scoring_inputs(engine, changed_only=False):
+    """Current media/user embedding hashes, plus what each user was last scored with."""
+    media_query = SCORING_MEDIA_INPUTS_QUERY + (SCORING_MEDIA_CHANGED_FILTER if changed_only else "")
+    with engine.connect() as conn:
+        media = {int(row.rating_key): row.embedding_hash for row in conn.execute(text(media_query))}
+        users = [dict(row) for row in conn.execute(text(SCORING_USER_INPUTS_QUERY)).mappings()]
+        ledger_size = conn.execute(text("SELECT COUNT(*) FROM scoring_media_state")).scalar()
+    return media, users, int(ledger_size or 0)
+
+
+def plan_delta_scoring(user_rows, new_media, media_ledger_size, model_key):
+    """
+    Decide what a delta run has to score. Users never scored, or whose
+    embedding changed, are rescored in full; everyone else only against
+    ``new_media``. Falls back to a full run when no ledger exists yet or the
+    model changed since the last recorded run.
+    """
+    scored_models = {row["scored_model"] for row in user_rows if row["scored_model"]}
+    if not media_ledger_size or not scored_models:
+        return {"mode": "full", "reason": "no scoring ledger yet"}
+    if scored_models != {model_key}:
+        return {"mode": "full", "reason": f"model changed to {model_key}"}
+
+    rescore_users = [row for row in user_rows if row["scored_hash"] != row["embedding_hash"]]
+    rescored = {row["username"] for row in rescore_users}
+    merge_users = [row for row in user_rows if row["username"] not in rescored] if new_media else []
+    return {
+        "mode": "delta" if rescore_users or merge_users else "unchanged",
+        "reason": f"{len(new_media)} new item(s), {len(rescore_users)} new or changed user(s)",
+        "new_media": dict(new_media),
+        "rescore_users": rescore_users,
+        "merge_users": merge_users,
+    }
+
+
+def rerank_user_recommendations(conn, username):
+    """Renumber one user's ranks after rows were merged in (rollups are views, so they follow)."""
+    conn.execute(
+        text(
+            f"""
+            UPDATE public.{RECOMMENDATIONS_TABLE} r
+            SET rank = ranked.new_rank
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY predicted_probability DESC, id) AS new_rank
+                FROM public.{RECOMMENDATIONS_TABLE}
+                WHERE username = :username
+            ) ranked
+            WHERE r.id = ranked.id
+              AND r.rank IS DISTINCT FROM ranked.new_rank
+            """
+        ),
+        {"username": username},
+    )
+
+
+def merge_user_items(username, rating_keys, loaded_model):
+    """
+    Score ``rating_keys`` for one user and merge them into their existing
+    recommendations. New items get no SHAP rows until the next full run.
+    """
+    df = get_unwatched_media(username, rating_keys=rating_keys)
+    user_embedding = get_user_embedding(username)
+    output = None
+    if not df.empty and user_embedding is not None:
+        media_block = get_media_feature_block(loaded_model.schema)
+        X, df = preprocess_for_scoring(
+            df,
+            loaded_model.schema,
+            media_block,
+            user_embedding,
+            user_watch_vec=get_user_watch_vector(username),
+        )
+        if not df.empty:
+            X_df = pd.DataFrame(X, columns=loaded_model.feature_names)
+            df['predicted_probability'] = loaded_model.model.predict_proba(X_df)[:, 1]
+            output = recommendation_output(
+                df,
+                X,
+                media_block.embeddings.shape[1],
+                username,
+                loaded_model.model_name,
+                user_embedding,
+            )
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                f"DELETE FROM public.{RECOMMENDATIONS_TABLE} "
+                "WHERE username = :username AND rating_key = ANY(:rating_keys)"
+            ),
+            {"username": username, "rating_keys": [int(key) for key in rating_keys]},
+        )
+        if output is not None:
+            write_recommendation_rows(conn, RECOMMENDATIONS_TABLE, output)
+        rerank_user_recommendations(conn, username)
+        conn.execute(text(BUMP_VERSIONS_SQLALCHEMY), {"scopes": [user_recommendations_scope(username)]})
+    written = 0 if output is None else len(output)
+    print(f"➕ Merged {written} new item(s) into recommendations for {username}")
+    return written
+
+
+def record_scoring_state(engine, model_key, media_hashes, user_hashes, replace=False):
+    """Upsert (or, after a full run, replace) the delta-scoring ledgers."""
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        try:
+            if replace:
+                cursor.execute("DELETE FROM public.scoring_media_state")
+                cursor.execute("DELETE FROM public.scoring_user_state")
+            execute_values(
+                cursor,
+                """
+                INSERT INTO public.scoring_media_state (rating_key, embedding_hash)
+                VALUES %s
+                ON CONFLICT (rating_key) DO UPDATE
+                SET embedding_hash = EXCLUDED.embedding_hash, scored_at = now()
+                """,
+                list(media_hashes.items()),
+                page_size=1000,
+            )
+            execute_values(
+                cursor,
+                """
+                INSERT INTO public.scoring_user_state (username, embedding_hash, model_version)
+                VALUES %s
+                ON CONFLICT (username) DO UPDATE
+                SET embedding_hash = EXCLUDED.embedding_hash,
+                    model_version = EXCLUDED.model_version,
+                    scored_at = now()
+                """,
+                [(username, embedding_hash, model_key) for username, embedding_hash in user_hashes.items()],
+                page_size=1000,
+            )
+        finally:
+            cursor.close()
+
+
+def score_all_users(skip_shap=False):
+    """Full run: score every user into a staging table and swap it in atomically."""
+    engine = get_engine()
+    model_key = scoring_model_key(get_model_server().get())
+    # Snapshot before scoring so embeddings added mid-run are picked up by the next delta run.
+    media_hashes, user_rows, _ledger_size = fetch_scoring_inputs(engine)
+    prepare_recommendations_staging_table(engine)
+    swapped_recommendations = False
+    try:
+        if not skip_shap:
+            reset_shap_snapshot_tables()
+        users = get_all_users()
+        print(f"🔁 Scoring for all users: {users}")
+        shap_target_summaries = []
+        for user in users:
+            summary = score_and_store(
+                user,
+                skip_shap=skip_shap,
+                recommendations_table=RECOMMENDATIONS_STAGING_TABLE,
+                replace_existing=False,
+            )
+            if summary:
+                shap_target_summaries.append(summary)
+        with stage_phase("swap"):
+            swap_recommendations_from_staging(engine)
+        swapped_recommendations = True
+        if shap_target_summaries:
+            print("\n📊 All-user SHAP targeting summary")
+            print(format_shap_targeting_summary(shap_target_summaries))
+    finally:
+        if not swapped_recommendations:
+            drop_recommendations_staging_table(engine)
+    record_scoring_state(
+        engine,
+        model_key,
+        media_hashes,
+        {row["username"]: row["embedding_hash"] for row in user_rows},
+        replace=True,
+    )
+
+
+def run_delta_scoring(skip_shap=False):
+    """Score only what changed since the last recorded run; falls back to ``score_all_users``."""
+    engine = get_engine()
+    loaded_model = get_model_server().get()
+    model_key = scoring_model_key(loaded_model)
+    with stage_phase("plan"):
+        new_media, user_rows, ledger_size = fetch_scoring_inputs(engine, changed_only=True)
+        plan = plan_delta_scoring(user_rows, new_media, ledger_size, model_key)
+    print(f"🧮 Delta scoring: {plan['mode']} ({plan['reason']})")
+    if plan["mode"] == "full":
+        score_all_users(skip_shap=skip_shap)
+        return plan
+    if plan["mode"] == "unchanged":
+        return plan
+
+    for row in plan["rescore_users"]:
+        score_and_store(row["username"], skip_shap=skip_shap)
+    rating_keys = sorted(plan["new_media"])
+    with stage_phase("merge"):
+        for row in plan["merge_users"]:
+            record_rows(written=merge_user_items(row["username"], rating_keys, loaded_model))
+    record_scoring_state(
+        engine,
+        model_key,
+        plan["new_media"],
+        {row["username"]: row["embedding_hash"] for row in plan["rescore_users"]},
+    )
+    return plan
+
 if __name__ == "__main__":
     import argparse
 
@@ -857,35 +1133,25 @@ if __name__ == "__main__":
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--user", type=str, help="Username to score recommendations for")
     group.add_argument("--all-users", action="store_true", help="Score recommendations for all users with watch history")
+    group.add_argument(
+        "--delta",
+        action="store_true",
+        help="Score only new or re-embedded items and users, merging into existing recommendations",
+    )
     parser.add_argument("--skip-shap", action="store_true", help="Skip SHAP impact generation")
+    parser.add_argument(
+        "--model",
+        default=None,
+        help="Score with this model file instead of the registry's current version (benchmarks, experiments)",
+    )
     args = parser.parse_args()
-
-    if args.all_users:
-        engine = get_engine()
-        prepare_recommendations_staging_table(engine)
-        swapped_recommendations = False
-        try:
-            if not args.skip_shap:
-                reset_shap_snapshot_tables()
-            users = get_all_users()
-            print(f"🔁 Scoring for all users: {users}")
-            shap_target_summaries = []
-            for user in users:
-                summary = score_and_store(
-                    user,
-                    skip_shap=args.skip_shap,
-                    recommendations_table=RECOMMENDATIONS_STAGING_TABLE,
-                    replace_existing=False,
-                )
-                if summary:
-                    shap_target_summaries.append(summary)
-            swap_recommendations_from_staging(engine)
-            swapped_recommendations = True
-            if shap_target_summaries:
-                print("\n📊 All-user SHAP targeting summary")
-                print(format_shap_targeting_summary(shap_target_summaries))
-        finally:
-            if not swapped_recommendations:
-                drop_recommendations_staging_table(engine)
-    else:
-        score_and_store(args.user, skip_shap=args.skip_shap)
+    if args.model:
+        use_model_file(args.model)
+
+    with profile_stage():
+        if args.all_users:
+            score_all_users(skip_shap=args.skip_shap)
+        elif args.delta:
+            run_delta_scoring(skip_shap=args.skip_shap)
+        else:
+            score_and_store(args.user, skip_shap=args.skip_shap)
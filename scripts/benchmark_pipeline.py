@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Synthetic-data benchmark for the recommendation pipeline and recommendation views.
+
+Generates a synthetic library (movies, shows, seasons, episodes with genre,
+actor and director tags), users, watch history, feedback and random 768-dim
+embeddings into a dedicated Postgres + pgvector database. It then times
+build_user_embeddings, build_training_data, train_model, score_model --all-users
+(with SHAP and without) and the /api/recommendations view queries, and writes
+a JSON report that can be diffed against an earlier one with --baseline.
+
+Never point this at the production database: the generator truncates tables.
+
+Examples:
+    python scripts/benchmark_pipeline.py --database-url postgresql://bench@localhost/plexintel_bench --items 1000
+    python scripts/benchmark_pipeline.py --database-url ... --items 50000 --users 40 --output bench-50k.json
+    python scripts/benchmark_pipeline.py --database-url ... --skip-generate --stages score_model --baseline bench-50k.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from api.db.connection import get_database_url
+from api.services.model_registry import MODEL_REGISTRY_DIR_ENV
+from api.services.stage_metrics import STAGE_METRICS_PATH_ENV, read_stage_metrics
+
+EMBEDDING_DIMENSIONS = 768
+EMBEDDING_CHUNK_ROWS = 2000
+MIN_ITEMS = 1_000
+MAX_ITEMS = 200_000
+BENCHMARK_STAGES = ("user_embeddings", "training_data", "train_model", "score_model_no_shap", "score_model")
+VIEW_NAMES = ("all", "movies", "shows", "seasons", "episodes")
+FEEDBACK_VALUES = ("interested", "never_watch", "watched_like", "watched_dislike")
+GENRES = (
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family",
+    "Fantasy", "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction", "Thriller",
+    "War", "Western",
+)
+SYNTHETIC_TABLES = (
+    "recommendations",
+    "recommendations_new",
+    "shap_impact",
+    "shap_dimension_stats_current",
+    "training_data",
+    "user_embeddings",
+    "watch_embeddings",
+    "user_feedback",
+    "watch_history",
+    "media_embeddings",
+    "media_genres",
+    "media_actors",
+    "media_directors",
+    "library",
+    "genres",
+    "actors",
+    "directors",
+    "users",
+)
+
+
+@dataclass(frozen=True)
+class BenchmarkConfig:
+    items: int = 5_000
+    users: int = 20
+    watches_per_user: int = 150
+    feedback_per_user: int = 20
+    movie_share: float = 0.35
+    actors: int = 2_000
+    directors: int = 400
+    seed: int = 42
+
+
+@dataclass
+class SyntheticLibrary:
+    library: list[tuple]
+    media_genres: list[tuple[int, int]]
+    media_actors: list[tuple[int, int, int]]
+    media_directors: list[tuple[int, int]]
+    media_genre_index: dict[int, int]
+    playable_keys: list[int]
+    durations_ms: dict[int, int]
+
+
+def build_library(config: BenchmarkConfig, rng: np.random.Generator) -> SyntheticLibrary:
+    """Movies plus show -> season -> episode trees totalling config.items library rows."""
+    library: list[tuple] = []
+    media_genres: list[tuple[int, int]] = []
+    media_actors: list[tuple[int, int, int]] = []
+    media_directors: list[tuple[int, int]] = []
+    media_genre_index: dict[int, int] = {}
+    playable_keys: list[int] = []
+    durations_ms: dict[int, int] = {}
+    added_base = datetime(2020, 1, 1)
+    next_key = 1
+
+    def tag(rating_key: int, primary_genre: int, cast: list[int], director: int) -> None:
+        media_genre_index[rating_key] = primary_genre
+        secondary = int(rng.integers(len(GENRES)))
+        for genre_id in {primary_genre, secondary}:
+            media_genres.append((rating_key, genre_id + 1))
+        for order, actor_id in enumerate(cast):
+            media_actors.append((rating_key, actor_id, order))
+        media_directors.append((rating_key, director))
+
+    def random_cast(size: int) -> list[int]:
+        return [int(a) + 1 for a in rng.choice(config.actors, size=size, replace=False)]
+
+    movie_target = int(config.items * config.movie_share)
+    for index in range(movie_target):
+        rating_key = next_key
+        next_key += 1
+        duration = int(rng.integers(80, 170)) * 60_000
+        year = int(rng.integers(1970, 2026))
+        library.append((
+            rating_key, f"Synthetic Movie {index + 1}", year, duration, "movie", "PG-13",
+            f"Synthetic movie summary {index + 1}", None, None, None, None, None, None, None,
+            added_base + timedelta(minutes=int(rng.integers(0, 60 * 24 * 365 * 6))),
+        ))
+        tag(rating_key, int(rng.integers(len(GENRES))), random_cast(5), int(rng.integers(config.directors)) + 1)
+        playable_keys.append(rating_key)
+        durations_ms[rating_key] = duration
+
+    show_index = 0
+    while next_key <= config.items:
+        show_index += 1
+        show_key = next_key
+        next_key += 1
+        show_title = f"Synthetic Show {show_index}"
+        genre = int(rng.integers(len(GENRES)))
+        cast = random_cast(6)
+        director = int(rng.integers(config.directors)) + 1
+        year = int(rng.integers(1990, 2026))
+        added_at = added_base + timedelta(minutes=int(rng.integers(0, 60 * 24 * 365 * 6)))
+        library.append((
+            show_key, show_title, year, None, "show", "TV-14", f"{show_title} summary",
+            None, None, None, None, show_title, None, None, added_at,
+        ))
+        tag(show_key, genre, cast, director)
+        for season_number in range(1, int(rng.integers(1, 5)) + 1):
+            if next_key > config.items:
+                break
+            season_key = next_key
+            next_key += 1
+            library.append((
+                season_key, f"Season {season_number}", year, None, "season", "TV-14", None,
+                season_number, None, show_key, show_key, show_title, None, None, added_at,
+            ))
+            tag(season_key, genre, cast, director)
+            for episode_number in range(1, int(rng.integers(6, 13)) + 1):
+                if next_key > config.items:
+                    break
+                episode_key = next_key
+                next_key += 1
+                duration = int(rng.integers(22, 60)) * 60_000
+                episode_title = f"Episode {episode_number}"
+                library.append((
+                    episode_key, episode_title, year, duration, "episode", "TV-14", None,
+                    season_number, episode_number, season_key, show_key, show_title, episode_title,
+                    f"{show_title} S{season_number}E{episode_number} summary", added_at,
+                ))
+                tag(episode_key, genre, cast[:4], director)
+                playable_keys.append(episode_key)
+                durations_ms[episode_key] = duration
+
+    return SyntheticLibrary(
+        library=library,
+        media_genres=media_genres,
+        media_actors=media_actors,
+        media_directors=media_directors,
+        media_genre_index=media_genre_index,
+        playable_keys=playable_keys,
+        durations_ms=durations_ms,
+    )
+
+
+def build_activity(
+    config: BenchmarkConfig,
+    synthetic: SyntheticLibrary,
+    rng: np.random.Generator,
+) -> tuple[list[tuple], list[tuple], list[tuple]]:
+    """Users with genre tastes, watch history that follows them, and explicit feedback."""
+    users: list[tuple] = []
+    watch_history: list[tuple] = []
+    feedback: list[tuple] = []
+    now = datetime.now()
+    watch_id = 1
+    playable = np.array(synthetic.playable_keys)
+    library_by_key = {row[0]: row for row in synthetic.library}
+
+    for user_index in range(config.users):
+        username = f"bench_user_{user_index + 1:03d}"
+        users.append((user_index + 1, username, f"{username}@example.invalid"))
+        liked_genres = set(int(g) for g in rng.choice(len(GENRES), size=3, replace=False))
+        watch_count = min(config.watches_per_user, len(playable))
+        for rating_key in rng.choice(playable, size=watch_count, replace=False):
+            rating_key = int(rating_key)
+            row = library_by_key[rating_key]
+            duration_s = synthetic.durations_ms[rating_key] // 1000
+            likes = synthetic.media_genre_index[rating_key] in liked_genres
+            completion = float(rng.uniform(0.7, 1.0) if likes else rng.uniform(0.02, 0.6))
+            is_episode = row[4] == "episode"
+            watch_history.append((
+                watch_id,
+                username,
+                row[11] if is_episode else row[1],
+                row[4],
+                now - timedelta(minutes=int(rng.integers(60 * 24 * 30, 60 * 24 * 365))),
+                int(duration_s * completion),
+                round(completion * 100, 1),
+                rating_key,
+                row[10],
+                row[12],
+                row[7],
+                row[8],
+                username,
+            ))
+            watch_id += 1
+        for rating_key in rng.choice(playable, size=min(config.feedback_per_user, len(playable)), replace=False):
+            value = FEEDBACK_VALUES[int(rng.integers(len(FEEDBACK_VALUES)))]
+            feedback.append((username, int(rating_key), value, value == "never_watch", "benchmark"))
+    return users, watch_history, feedback
+
+
+def embedding_batches(
+    keys: list[int],
+    rng: np.random.Generator,
+    *,
+    centroids: np.ndarray | None = None,
+    centroid_index: dict[int, int] | None = None,
+    chunk_rows: int = EMBEDDING_CHUNK_ROWS,
+) -> Iterator[str]:
+    """Yield COPY text chunks of "key<TAB>[v1,...,v768]" with unit-norm vectors."""
+    for start in range(0, len(keys), chunk_rows):
+        chunk_keys = keys[start:start + chunk_rows]
+        vectors = rng.standard_normal((len(chunk_keys), EMBEDDING_DIMENSIONS)).astype(np.float32)
+        if centroids is not None and centroid_index is not None:
+            # Pull vectors toward a per-genre centroid so the model has signal to learn.
+            vectors += 2.0 * centroids[[centroid_index.get(key, 0) for key in chunk_keys]]
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        buffer = io.StringIO()
+        for key, vector in zip(chunk_keys, vectors):
+            buffer.write(f"{key}\t[{','.join(f'{value:.5f}' for value in vector)}]\n")
+        yield buffer.getvalue()
+
+
+def _copy_rows(cur, table: str, columns: tuple[str, ...], rows: list[tuple]) -> int:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(r"\N" if value is None else str(value) for value in row) + "\n")
+    buffer.seek(0)
+    cur.copy_expert(f"COPY public.{table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return len(rows)
+
+
+def _copy_embeddings(cur, table: str, key_column: str, batches: Iterator[str]) -> int:
+    total = 0
+    for chunk in batches:
+        cur.copy_expert(f"COPY public.{table} ({key_column}, embedding) FROM STDIN", io.StringIO(chunk))
+        total += chunk.count("\n")
+    return total
+
+
+def bootstrap_schema(database_url: str) -> None:
+    """Apply create.sql (as bootstrap.sh does) and the app schema updates."""
+    subprocess.run(
+        ["psql", "-q", "-v", "ON_ERROR_STOP=0", database_url, "-f", str(REPO_ROOT / "create.sql")],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    from api.db.schema import ensure_app_schema
+
+    ensure_app_schema(database_url)
+
+
+def generate_dataset(conn, config: BenchmarkConfig) -> dict[str, int]:
+    rng = np.random.default_rng(config.seed)
+    synthetic = build_library(config, rng)
+    users, watch_history, feedback = build_activity(config, synthetic, rng)
+    centroids = rng.standard_normal((len(GENRES), EMBEDDING_DIMENSIONS)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT string_agg(format('public.%%I', c.relname), ', ') FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname = ANY(%s)",
+            (list(SYNTHETIC_TABLES),),
+        )
+        existing = cur.fetchone()[0]
+        if existing:
+            cur.execute(f"TRUNCATE {existing} RESTART IDENTITY CASCADE")
+
+        counts = {
+            "genres": _copy_rows(cur, "genres", ("id", "name"), [(i + 1, name) for i, name in enumerate(GENRES)]),
+            "actors": _copy_rows(cur, "actors", ("id", "name"), [(i + 1, f"Actor {i + 1}") for i in range(config.actors)]),
+            "directors": _copy_rows(
+                cur, "directors", ("id", "name"), [(i + 1, f"Director {i + 1}") for i in range(config.directors)]
+            ),
+            "library": _copy_rows(
+                cur,
+                "library",
+                (
+                    "rating_key", "title", "year", "duration", "media_type", "rating", "summary",
+                    "season_number", "episode_number", "parent_rating_key", "show_rating_key",
+                    "show_title", "episode_title", "episode_summary", "added_at",
+                ),
+                synthetic.library,
+            ),
+            "media_genres": _copy_rows(cur, "media_genres", ("media_id", "genre_id"), synthetic.media_genres),
+            "media_actors": _copy_rows(
+                cur, "media_actors", ("media_id", "actor_id", "cast_order"), synthetic.media_actors
+            ),
+            "media_directors": _copy_rows(
+                cur, "media_directors", ("media_id", "director_id"), synthetic.media_directors
+            ),
+            "users": _copy_rows(cur, "users", ("user_id", "username", "plex_email"), users),
+            "watch_history": _copy_rows(
+                cur,
+                "watch_history",
+                (
+                    "watch_id", "username", "title", "media_type", "watched_at", "played_duration",
+                    "percent_complete", "rating_key", "show_rating_key", "episode_title",
+                    "season_number", "episode_number", "friendly_name",
+                ),
+                watch_history,
+            ),
+            "user_feedback": _copy_rows(
+                cur, "user_feedback", ("username", "rating_key", "feedback", "suppress", "source"), feedback
+            ),
+        }
+        counts["media_embeddings"] = _copy_embeddings(
+            cur,
+            "media_embeddings",
+            "rating_key",
+            embedding_batches(
+                [row[0] for row in synthetic.library],
+                rng,
+                centroids=centroids,
+                centroid_index=synthetic.media_genre_index,
+            ),
+        )
+        watch_genres = {row[0]: synthetic.media_genre_index[row[7]] for row in watch_history}
+        counts["watch_embeddings"] = _copy_embeddings(
+            cur,
+            "watch_embeddings",
+            "watch_id",
+            embedding_batches([row[0] for row in watch_history], rng, centroids=centroids, centroid_index=watch_genres),
+        )
+        cur.execute("ANALYZE")
+    conn.commit()
+    return counts
+
+
+def run_stage(name: str, argv: list[str], *, database_url: str, workdir: Path) -> dict[str, Any]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "MPLBACKEND": "Agg",
+        # Keep any publish or registry lookup away from the production registry.
+        MODEL_REGISTRY_DIR_ENV: str(workdir / "registry"),
+    }
+    metrics_path = workdir / f"{name}.metrics.json"
+    env[STAGE_METRICS_PATH_ENV] = str(metrics_path)
+    log_path = workdir / f"{name}.log"
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        completed = subprocess.run(argv, cwd=str(workdir), env=env, stdout=log, stderr=subprocess.STDOUT)
+    wall_seconds = time.perf_counter() - started
+    print(f"⏱️ {name}: {wall_seconds:.2f}s (exit {completed.returncode})", file=sys.stderr, flush=True)
+    return {
+        "argv": argv[1:],
+        "returncode": completed.returncode,
+        "wall_seconds": wall_seconds,
+        "profile": read_stage_metrics(str(metrics_path)),
+        "log_path": str(log_path),
+    }
+
+
+def benchmark_stages(stage_names: list[str], *, database_url: str, workdir: Path) -> dict[str, Any]:
+    py = sys.executable
+    root = str(REPO_ROOT)
+    model_path = str(workdir / "xgb_model.pkl")
+    commands = {
+        "user_embeddings": [py, f"{root}/build_user_embeddings.py"],
+        "training_data": [py, f"{root}/build_training_data.py"],
+        # train_model chdirs to the repo root, so every artifact path must be absolute.
+        "train_model": [
+            py, f"{root}/train_model.py",
+            "--model-output", model_path,
+            "--importance-log", str(workdir / "feature_importance_log.txt"),
+            "--importance-plot", str(workdir / "feature_importance_plot.png"),
+        ],
+        # Score with the model trained above, not the registry's current version.
+        "score_model_no_shap": [py, f"{root}/score_model.py", "--all-users", "--skip-shap", "--model", model_path],
+        "score_model": [py, f"{root}/score_model.py", "--all-users", "--model", model_path],
+    }
+    results: dict[str, Any] = {}
+    for name in stage_names:
+        results[name] = run_stage(name, commands[name], database_url=database_url, workdir=workdir)
+        if results[name]["returncode"] != 0:
+            print(f"❌ {name} failed; see {results[name]['log_path']}", file=sys.stderr)
+            break
+    return results
+
+
+def summarize_shap(stages: dict[str, Any]) -> dict[str, Any] | None:
+    scored = stages.get("score_model")
+    if not scored or not scored.get("profile"):
+        return None
+    phases = scored["profile"].get("phases") or {}
+    shap_seconds = sum((phases.get(name) or {}).get("seconds", 0.0) for name in ("shap", "shap write"))
+    summary: dict[str, Any] = {
+        "shap_seconds": shap_seconds,
+        "shap_phase_seconds": (phases.get("shap") or {}).get("seconds"),
+        "shap_write_seconds": (phases.get("shap write") or {}).get("seconds"),
+    }
+    baseline = stages.get("score_model_no_shap")
+    if baseline and baseline.get("returncode") == 0:
+        summary["wall_overhead_seconds"] = scored["wall_seconds"] - baseline["wall_seconds"]
+    return summary
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def benchmark_views(
+    conn,
+    *,
+    usernames: list[str],
+    repeats: int,
+    limit: int,
+    deep_offset: int,
+) -> dict[str, Any]:
+    """Time the SQL behind GET /api/recommendations for each view, first page and a deep page."""
+    from api.services.recommendation_query_service import _append_paging, _build_recommendations_query
+
+    results: dict[str, Any] = {}
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        for view in VIEW_NAMES:
+            for page_name, offset in (("first_page", 0), ("deep_page", deep_offset)):
+                timings: list[float] = []
+                rows_returned: list[int] = []
+                for username in usernames:
+                    sql, params = _build_recommendations_query(
+                        username=username,
+                        view=view,
+                        show_rating_key=None,
+                        season_rating_key=None,
+                        search=None,
+                        sort=None,
+                        display_threshold=0.0,
+                    )
+                    sql = _append_paging(sql, params, limit=limit, offset=offset)
+                    for _ in range(repeats):
+                        started = time.perf_counter()
+                        cur.execute(sql, tuple(params))
+                        rows = cur.fetchall()
+                        timings.append((time.perf_counter() - started) * 1000.0)
+                    rows_returned.append(len(rows))
+                    conn.rollback()
+                results[f"{view}.{page_name}"] = {
+                    "offset": offset,
+                    "samples": len(timings),
+                    "mean_ms": statistics.fmean(timings),
+                    "p50_ms": _percentile(timings, 50),
+                    "p95_ms": _percentile(timings, 95),
+                    "max_ms": max(timings),
+                    "avg_rows": statistics.fmean(rows_returned),
+                }
+    return results
+
+
+def compare_reports(current: dict[str, Any], baseline: dict[str, Any]) -> dict[str, Any]:
+    """Per-stage wall time and per-view p50 deltas against an earlier report."""
+
+    def delta(now: float | None, before: float | None) -> dict[str, Any] | None:
+        if now is None or before is None:
+            return None
+        return {
+            "current": now,
+            "baseline": before,
+            "delta": now - before,
+            "delta_pct": ((now - before) / before * 100.0) if before else None,
+        }
+
+    stages = {
+        name: delta(stage.get("wall_seconds"), (baseline.get("stages", {}).get(name) or {}).get("wall_seconds"))
+        for name, stage in current.get("stages", {}).items()
+    }
+    views = {
+        name: delta(view.get("p50_ms"), (baseline.get("views", {}).get(name) or {}).get("p50_ms"))
+        for name, view in current.get("views", {}).items()
+    }
+    return {
+        "baseline_generated_at": baseline.get("generated_at"),
+        "same_config": baseline.get("config") == current.get("config"),
+        "stages": {k: v for k, v in stages.items() if v is not None},
+        "views": {k: v for k, v in views.items() if v is not None},
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=str(REPO_ROOT), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Dedicated benchmark database (pgvector enabled)")
+    parser.add_argument(
+        "--allow-app-database",
+        action="store_true",
+        help="Allow --database-url to match the app's configured DATABASE_URL (destructive).",
+    )
+    parser.add_argument("--items", type=int, default=BenchmarkConfig.items, help="Library rows (1k-200k)")
+    parser.add_argument("--users", type=int, default=BenchmarkConfig.users)
+    parser.add_argument("--watches-per-user", type=int, default=BenchmarkConfig.watches_per_user)
+    parser.add_argument("--feedback-per-user", type=int, default=BenchmarkConfig.feedback_per_user)
+    parser.add_argument("--seed", type=int, default=BenchmarkConfig.seed)
+    parser.add_argument("--skip-generate", action="store_true", help="Reuse data already in the benchmark database")
+    parser.add_argument(
+        "--stages",
+        nargs="*",
+        choices=BENCHMARK_STAGES,
+        default=list(BENCHMARK_STAGES),
+        help="Pipeline stages to time, in order",
+    )
+    parser.add_argument("--skip-views", action="store_true", help="Do not time recommendation view queries")
+    parser.add_argument("--view-users", type=int, default=5, help="Users sampled for view timings")
+    parser.add_argument("--view-repeats", type=int, default=5)
+    parser.add_argument("--view-limit", type=int, default=100)
+    parser.add_argument("--view-deep-offset", type=int, default=1000)
+    parser.add_argument("--workdir", default=None, help="Directory for logs, model and metrics (default: temp dir)")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+    if not MIN_ITEMS <= args.items <= MAX_ITEMS:
+        parser.error(f"--items must be between {MIN_ITEMS} and {MAX_ITEMS}")
+    if args.users < 1 or args.watches_per_user < 1:
+        parser.error("--users and --watches-per-user must be at least 1")
+    app_database_url = get_database_url()
+    if app_database_url and app_database_url == args.database_url and not args.allow_app_database:
+        parser.error("--database-url matches the app database; use a dedicated benchmark database")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    config = BenchmarkConfig(
+        items=args.items,
+        users=args.users,
+        watches_per_user=args.watches_per_user,
+        feedback_per_user=args.feedback_per_user,
+        seed=args.seed,
+    )
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="plexintel-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    # In-process helpers (settings, schema, view queries) must see the benchmark database too.
+    os.environ["DATABASE_URL"] = args.database_url
+
+    report: dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": asdict(config),
+        "workdir": str(workdir),
+    }
+
+    if not args.skip_generate:
+        print(f"🧪 Generating {config.items:,} library items for {config.users} users...", file=sys.stderr, flush=True)
+        started = time.perf_counter()
+        bootstrap_schema(args.database_url)
+        conn = psycopg2.connect(args.database_url)
+        try:
+            report["dataset"] = generate_dataset(conn, config)
+        finally:
+            conn.close()
+        report["generation_seconds"] = time.perf_counter() - started
+        print(f"✅ Generated dataset in {report['generation_seconds']:.1f}s: {report['dataset']}", file=sys.stderr, flush=True)
+
+    report["stages"] = benchmark_stages(args.stages, database_url=args.database_url, workdir=workdir)
+    report["shap"] = summarize_shap(report["stages"])
+
+    if not args.skip_views:
+        conn = psycopg2.connect(args.database_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT DISTINCT username FROM public.recommendations ORDER BY username LIMIT %s",
+                    (args.view_users,),
+                )
+                usernames = [row[0] for row in cur.fetchall()]
+            conn.rollback()
+            report["views"] = (
+                benchmark_views(
+                    conn,
+                    usernames=usernames,
+                    repeats=args.view_repeats,
+                    limit=args.view_limit,
+                    deep_offset=args.view_deep_offset,
+                )
+                if usernames
+                else {}
+            )
+        finally:
+            conn.close()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["comparison"] = compare_reports(report, json.load(handle))
+
+    payload = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+        print(f"📝 Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+    failed = [name for name, stage in report["stages"].items() if stage["returncode"] != 0]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
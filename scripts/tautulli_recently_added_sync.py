@@ -9,7 +9,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import TextIO
+from typing import Iterable, Mapping, TextIO
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -25,6 +25,7 @@ from api.services.tautulli_api import (  # noqa: E402
 
 DEFAULT_LOCK_PATH = Path("/tmp/plexintel-tautulli-sync.lock")
 DEFAULT_DEBOUNCE_SECONDS = 90
+DEFAULT_MAX_ATTEMPTS = 3
 DEFAULT_LOG_PATH = REPO_ROOT / "logs" / "tautulli_recently_added_sync.log"
 
 
@@ -72,6 +73,72 @@ def _open_lock(lock_path: Path) -> TextIO | None:
     return lock_file
 
 
+def _queue_path(lock_path: Path) -> Path:
+    return lock_path.with_suffix(".queue")
+
+
+def _quarantine_path(queue_path: Path) -> Path:
+    return queue_path.with_suffix(".failed")
+
+
+def _parse_rating_keys(values: list[str] | None) -> list[int]:
+    keys: list[int] = []
+    for value in values or []:
+        for part in str(value).replace(",", " ").split():
+            try:
+                key = int(part)
+            except ValueError:
+                _log(f"Ignoring invalid rating_key {part!r}.", error=True)
+                continue
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+def enqueue_rating_keys(
+    queue_path: Path,
+    rating_keys: Iterable[int],
+    *,
+    attempts: Mapping[int, int] | None = None,
+) -> None:
+    """
+    Append keys for whichever invocation holds the sync lock to pick up. Keys
+    that already failed are written as ``key:attempts``.
+    """
+    lines = "".join(
+        f"{key}:{attempts[key]}\n" if attempts and attempts.get(key) else f"{key}\n" for key in rating_keys
+    )
+    queue_path.parent.mkdir(parents=True, exist_ok=True)
+    with queue_path.open("a", encoding="utf-8") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        handle.write(lines)
+        handle.flush()
+
+
+def drain_rating_keys(queue_path: Path) -> dict[int, int]:
+    """Empty the queue; returns each queued key with its number of failed attempts."""
+    if not queue_path.exists():
+        return {}
+    with queue_path.open("r+", encoding="utf-8") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        lines = handle.read().split()
+        handle.seek(0)
+        handle.truncate()
+
+    queued: dict[int, int] = {}
+    for line in lines:
+        key_part, _, attempts_part = line.partition(":")
+        keys = _parse_rating_keys([key_part])
+        if not keys:
+            continue
+        try:
+            attempts = max(int(attempts_part or 0), 0)
+        except ValueError:
+            attempts = 0
+        queued[keys[0]] = max(queued.get(keys[0], 0), attempts)
+    return queued
+
+
 def _python_executable() -> str:
     configured = os.environ.get("PLEXINTEL_PYTHON")
     if configured:
@@ -102,6 +169,156 @@ def run_incremental_sync() -> int:
     return int(result.returncode)
 
 
+def run_targeted_sync(rating_keys: list[int]) -> int:
+    cmd = [
+        _python_executable(),
+        str(REPO_ROOT / "fetch_tautulli_data.py"),
+        "--mode",
+        "targeted",
+        "--rating-keys",
+        ",".join(str(key) for key in rating_keys),
+    ]
+    _log(f"Running targeted sync command: {' '.join(cmd)}")
+    result = subprocess.run(cmd, cwd=str(REPO_ROOT), check=False)
+    return int(result.returncode)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw in (None, ""):
+        return default
+    return raw.strip().lower() not in {"0", "false", "no", "off"}
+
+
+def run_delta_scoring(*, embed: bool = True) -> int:
+    """Embed the newly synced items, then merge their scores into existing recommendations."""
+    commands = [
+        [_python_executable(), str(REPO_ROOT / "score_model.py"), "--delta", "--skip-shap"],
+    ]
+    if embed:
+        commands.insert(0, [_python_executable(), str(REPO_ROOT / "fetch_tautulli_data.py"), "--mode", "embeddings"])
+    for cmd in commands:
+        _log(f"Running delta refresh command: {' '.join(cmd)}")
+        result = subprocess.run(cmd, cwd=str(REPO_ROOT), check=False)
+        if result.returncode != 0:
+            return int(result.returncode)
+    return 0
+
+
+def _queue_has_keys(queue_path: Path) -> bool:
+    try:
+        return queue_path.stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+
+def _requeue_failed_keys(queue_path: Path, attempts: dict[int, int]) -> None:
+    """Put failed keys back in the queue, or quarantine them once they run out of attempts."""
+    max_attempts = max(int(_env_float("PLEXINTEL_TARGETED_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)), 1)
+    retry = [key for key, count in attempts.items() if count < max_attempts]
+    dropped = [key for key, count in attempts.items() if count >= max_attempts]
+    if retry:
+        enqueue_rating_keys(queue_path, retry, attempts=attempts)
+        _log(f"Re-queued rating_key(s) {retry} for the next run.", error=True)
+    if dropped:
+        quarantine_path = _quarantine_path(queue_path)
+        enqueue_rating_keys(quarantine_path, dropped, attempts=attempts)
+        _log(
+            f"Dropped rating_key(s) {dropped} after {max_attempts} failed attempt(s); "
+            f"recorded in {quarantine_path}.",
+            error=True,
+        )
+
+
+def _run_targeted_queue(queue_path: Path, *, delta_score: bool) -> int:
+    """
+    Ingest queued keys batch by batch until events stop arriving. When a batch
+    fails its keys are retried one at a time, so one bad key cannot hold back
+    the rest; keys that still fail count an attempt towards quarantine.
+    """
+    while True:
+        queued = drain_rating_keys(queue_path)
+        if not queued:
+            return 0
+
+        rating_keys = list(queued)
+        _log(f"Running PlexIntel targeted sync for rating_key(s) {rating_keys}.")
+        return_code = run_targeted_sync(rating_keys)
+        failed_keys = rating_keys if return_code != 0 else []
+        if failed_keys and len(rating_keys) > 1:
+            _log(
+                f"PlexIntel targeted sync failed with exit code {return_code}; "
+                "retrying rating_key(s) one at a time.",
+                error=True,
+            )
+            failed_keys = [key for key in rating_keys if run_targeted_sync([key]) != 0]
+
+        if failed_keys:
+            _log(
+                f"PlexIntel targeted sync failed with exit code {return_code} "
+                f"for rating_key(s) {failed_keys}.",
+                error=True,
+            )
+            _requeue_failed_keys(queue_path, {key: queued[key] + 1 for key in failed_keys})
+            if len(failed_keys) == len(rating_keys):
+                return return_code
+
+        _log("PlexIntel targeted sync complete.")
+        if delta_score:
+            delta_code = run_delta_scoring(embed=False)
+            if delta_code != 0:
+                _log(
+                    f"PlexIntel delta scoring failed with exit code {delta_code}.",
+                    error=True,
+                )
+                return delta_code
+            _log("PlexIntel delta scoring complete.")
+        if failed_keys:
+            return return_code
+
+
+def _run_incremental_refresh(queue_path: Path, *, delta_score: bool) -> int:
+    # The incremental sync picks up anything queued so far; keys are put back if it fails.
+    queued_keys = drain_rating_keys(queue_path)
+    return_code = _run_incremental_steps(delta_score=delta_score)
+    if return_code != 0 and queued_keys:
+        enqueue_rating_keys(queue_path, queued_keys, attempts=queued_keys)
+    return return_code
+
+
+def _run_incremental_steps(*, delta_score: bool) -> int:
+    try:
+        config = _resolve_event_config()
+        _log(f"Resolved Tautulli API URL: {config.api_url}")
+        delete_tautulli_cache(config=config, timeout=30)
+    except TautulliApiError as exc:
+        _log(f"Failed to clear Tautulli cache: {exc}", error=True)
+        return 1
+
+    _log("Tautulli cache cleared. Running PlexIntel incremental sync.")
+    return_code = run_incremental_sync()
+    if return_code != 0:
+        _log(
+            f"PlexIntel incremental sync failed with exit code {return_code}.",
+            error=True,
+        )
+        return return_code
+
+    _log("PlexIntel incremental sync complete.")
+    if not delta_score:
+        return 0
+
+    return_code = run_delta_scoring()
+    if return_code != 0:
+        _log(
+            f"PlexIntel delta scoring failed with exit code {return_code}.",
+            error=True,
+        )
+        return return_code
+    _log("PlexIntel delta scoring complete.")
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(
         description="Clear Tautulli cache and run PlexIntel incremental sync after Recently Added."
@@ -118,43 +335,62 @@ def main(argv: list[str] | None = None) -> int:
         default=Path(os.environ.get("PLEXINTEL_TAUTULLI_SYNC_LOCK", DEFAULT_LOCK_PATH)),
         help="File lock path used to prevent overlapping runs.",
     )
+    parser.add_argument(
+        "--delta-score",
+        action=argparse.BooleanOptionalAction,
+        default=_env_flag("PLEXINTEL_DELTA_SCORE", True),
+        help="Embed new items and delta-score them after the sync (default on).",
+    )
+    parser.add_argument(
+        "--rating-key",
+        action="append",
+        default=[],
+        help=(
+            "Rating key from the notification ({rating_key} in Tautulli); repeatable or comma-separated. "
+            "When given, only these items are ingested instead of running the incremental sync."
+        ),
+    )
     args = parser.parse_args(argv)
+    rating_keys = _parse_rating_keys(args.rating_key)
+    queue_path = _queue_path(args.lock_path)
+    if rating_keys:
+        enqueue_rating_keys(queue_path, rating_keys)
 
     _log(
         "Recently Added sync invoked "
         f"pid={os.getpid()} debounce={args.debounce_seconds:g}s lock={args.lock_path}"
     )
 
-    lock_file = _open_lock(args.lock_path)
-    if lock_file is None:
-        _log("PlexIntel Tautulli sync already running; skipping this event.")
-        return 0
+    targeted = bool(rating_keys)
+    first_round = True
+    while True:
+        lock_file = _open_lock(args.lock_path)
+        if lock_file is None:
+            if not first_round:
+                _log("Another PlexIntel Tautulli sync took the lock; it will ingest the queued rating_keys.")
+            elif rating_keys:
+                _log(f"PlexIntel Tautulli sync already running; queued rating_key(s) {rating_keys} for it.")
+            else:
+                _log("PlexIntel Tautulli sync already running; skipping this event.")
+            return 0
 
-    with lock_file:
-        if args.debounce_seconds > 0:
-            _log(f"Waiting {args.debounce_seconds:g}s for recently-added batch to settle.")
-            time.sleep(args.debounce_seconds)
+        with lock_file:
+            if first_round and args.debounce_seconds > 0:
+                _log(f"Waiting {args.debounce_seconds:g}s for recently-added batch to settle.")
+                time.sleep(args.debounce_seconds)
 
-        try:
-            config = _resolve_event_config()
-            _log(f"Resolved Tautulli API URL: {config.api_url}")
-            delete_tautulli_cache(config=config, timeout=30)
-        except TautulliApiError as exc:
-            _log(f"Failed to clear Tautulli cache: {exc}", error=True)
-            return 1
-
-        _log("Tautulli cache cleared. Running PlexIntel incremental sync.")
-        return_code = run_incremental_sync()
-        if return_code != 0:
-            _log(
-                f"PlexIntel incremental sync failed with exit code {return_code}.",
-                error=True,
-            )
-            return return_code
-
-        _log("PlexIntel incremental sync complete.")
-        return 0
+            if targeted:
+                return_code = _run_targeted_queue(queue_path, delta_score=args.delta_score)
+            else:
+                return_code = _run_incremental_refresh(queue_path, delta_score=args.delta_score)
 
+        # An event that arrived after the last drain but before the lock was
+        # released could not take the lock and exited; pick its keys up here.
+        if return_code != 0 or not _queue_has_keys(queue_path):
+            return return_code
+        _log("More rating_key(s) were queued while this sync finished; ingesting them.")
+        targeted = True
+        first_round = False
 
 if __name__ == "__main__":
     raise SystemExit(main())
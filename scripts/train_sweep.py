@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Train a grid of XGBoost parameter / feature-set variants from one load of training_data.
+
+training_data is loaded, embeddings are parsed and the union of every
+variant's feature columns is assembled exactly once into a memory-mapped
+float32 matrix. A process pool then fits each variant's evaluation model on
+its column subset of that shared matrix (same stratified split as
+train_model.py) and the results are printed as the usual "Experiment summary
+row" table plus the time each variant took. Sweeps never overwrite the
+production model.
+
+Feature sets:
+    production                      direct actor_* features disabled (default)
+    include_actors                  top-k actor_* features
+    actors:min_titles=3,top1=0.50   actor_* features filtered by eligibility (top3=... also accepted)
+
+Examples:
+    python scripts/train_sweep.py --feature-set production --feature-set include_actors
+    python scripts/train_sweep.py --param max_depth=4,6,8 --param learning_rate=0.05,0.1 --workers 4
+    python scripts/train_sweep.py --feature-set actors:min_titles=3 --feature-set actors:top1=0.5 --fast --output sweep.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+# train_model chdirs to the repo root on import; resolve user paths against the original cwd.
+INVOCATION_DIR = Path.cwd()
+
+import train_model
+from api.services.feature_store import FEATURE_DTYPE, FeatureSchema, assemble_features, side_features
+
+FEATURE_SET_FILTERS = {
+    "min_titles": ("min_actor_distinct_titles", int),
+    "top1": ("max_actor_top1_concentration", float),
+    "top3": ("max_actor_top3_concentration", float),
+}
+SHARED_ARRAYS = ("X", "y", "weights", "train_idx", "test_idx")
+
+# Per-process view of the shared arrays, filled by _init_worker.
+_SHARED: dict[str, np.ndarray] = {}
+
+
+@dataclass(frozen=True)
+class FeatureSet:
+    name: str
+    exclude_actors: bool = True
+    min_actor_distinct_titles: int | None = None
+    max_actor_top1_concentration: float | None = None
+    max_actor_top3_concentration: float | None = None
+
+    def options(self) -> dict[str, Any]:
+        return {
+            "exclude_actors": self.exclude_actors,
+            "min_actor_distinct_titles": self.min_actor_distinct_titles,
+            "max_actor_top1_concentration": self.max_actor_top1_concentration,
+            "max_actor_top3_concentration": self.max_actor_top3_concentration,
+        }
+
+
+@dataclass(frozen=True)
+class SweepVariant:
+    feature_set: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        if not self.params:
+            return self.feature_set
+        return self.feature_set + " " + " ".join(f"{key}={value}" for key, value in self.params.items())
+
+
+def parse_feature_set(spec: str) -> FeatureSet:
+    spec = spec.strip()
+    if spec == "production":
+        return FeatureSet(spec)
+    if spec == "include_actors":
+        return FeatureSet(spec, exclude_actors=False)
+    prefix, _, filters = spec.partition(":")
+    if prefix != "actors" or not filters:
+        raise ValueError(f"Unknown feature set {spec!r}; use production, include_actors or actors:<filters>.")
+
+    options: dict[str, Any] = {}
+    for item in filters.split(","):
+        key, _, raw_value = item.partition("=")
+        if key.strip() not in FEATURE_SET_FILTERS or not raw_value:
+            raise ValueError(f"Unknown actor filter {item!r}; use min_titles=N, top1=F or top3=F.")
+        option, cast = FEATURE_SET_FILTERS[key.strip()]
+        options[option] = cast(raw_value)
+    if options.get("min_actor_distinct_titles", 1) < 1:
+        raise ValueError("min_titles must be 1 or greater.")
+    for option in ("max_actor_top1_concentration", "max_actor_top3_concentration"):
+        if option in options and not (0 < options[option] <= 1):
+            raise ValueError(f"{option} must be greater than 0 and less than or equal to 1.")
+    return FeatureSet(spec, exclude_actors=False, **options)
+
+
+def _parse_param_value(raw: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            continue
+    return raw
+
+
+def parse_param_grid(specs: Iterable[str]) -> list[dict[str, Any]]:
+    """Expand ``key=v1,v2`` specs into the cartesian product of parameter dicts."""
+    axes: list[tuple[str, list[Any]]] = []
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        key = key.strip()
+        if not key or not values:
+            raise ValueError(f"Parameter spec {spec!r} must look like key=value[,value...].")
+        axes.append((key, [_parse_param_value(value.strip()) for value in values.split(",")]))
+    if not axes:
+        return [{}]
+    keys = [key for key, _values in axes]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*(values for _key, values in axes))]
+
+
+def build_variants(feature_sets: Sequence[FeatureSet], param_grid: Sequence[dict[str, Any]]) -> list[SweepVariant]:
+    return [SweepVariant(feature_set.name, dict(params)) for feature_set in feature_sets for params in param_grid]
+
+
+def union_schema(schemas: Iterable[FeatureSchema]) -> FeatureSchema:
+    schemas = list(schemas)
+    return FeatureSchema(
+        embedding_dim=schemas[0].embedding_dim,
+        genres=tuple(sorted(set().union(*(schema.genres for schema in schemas)))),
+        actors=tuple(sorted(set().union(*(schema.actors for schema in schemas)))),
+        directors=tuple(sorted(set().union(*(schema.directors for schema in schemas)))),
+        decades=tuple(sorted(set().union(*(schema.decades for schema in schemas)))),
+    )
+
+
+def featurize_once(df, feature_sets: Sequence[FeatureSet], shared_dir: Path, top_k: int = 20):
+    """
+    Parse training_data once and write the union feature matrix plus labels,
+    weights and the shared train/test split to ``shared_dir`` as .npy files.
+    Returns {feature set name: (feature names, column indices into X)}.
+    """
+    exclude_actors = all(feature_set.exclude_actors for feature_set in feature_sets)
+    df = train_model.prepare_training_frame(df, exclude_actors=exclude_actors)
+    embedding_dim = len(df["embedding"].iloc[0])
+    schemas = {
+        feature_set.name: train_model.build_feature_schema(
+            df, embedding_dim, top_k=top_k, **feature_set.options()
+        )
+        for feature_set in feature_sets
+    }
+    schema = union_schema(schemas.values())
+    union_names = list(schema.feature_names)
+    column_of = {name: index for index, name in enumerate(union_names)}
+
+    watch_sim = df["watch_sim"].fillna(0).astype(float).values if "watch_sim" in df.columns else None
+    X = np.lib.format.open_memmap(
+        shared_dir / "X.npy", mode="w+", dtype=FEATURE_DTYPE, shape=(len(df), len(union_names))
+    )
+    assemble_features(
+        schema,
+        np.vstack(df["embedding"].values),
+        side_features(
+            schema,
+            genres=df["genres"],
+            actors=df["actors"],
+            directors=df["directors"],
+            years=df["release_year"],
+        ),
+        watch_sim,
+        out=X,
+    )
+    X.flush()
+    del X
+
+    y = df["label"].astype(int).values
+    weights = (
+        df["sample_weight"].fillna(1.0).astype(float).values
+        if "sample_weight" in df.columns
+        else np.ones(len(df), dtype=np.float32)
+    )
+    from sklearn.model_selection import train_test_split
+
+    train_idx, test_idx = train_test_split(
+        np.arange(len(y)), test_size=0.2, stratify=y, random_state=train_model.XGB_RANDOM_STATE
+    )
+    for name, array in (("y", y), ("weights", weights), ("train_idx", train_idx), ("test_idx", test_idx)):
+        np.save(shared_dir / f"{name}.npy", array)
+
+    return {
+        name: (list(variant_schema.feature_names), [column_of[column] for column in variant_schema.feature_names])
+        for name, variant_schema in schemas.items()
+    }
+
+
+def _init_worker(shared_dir: str) -> None:
+    for name in SHARED_ARRAYS:
+        _SHARED[name] = np.load(Path(shared_dir) / f"{name}.npy", mmap_mode="r")
+
+
+def run_variant(task: dict[str, Any]) -> dict[str, Any]:
+    """Fit and score one variant's evaluation model on its columns of the shared matrix."""
+    started = time.perf_counter()
+    X, y, weights = _SHARED["X"], _SHARED["y"], _SHARED["weights"]
+    train_idx, test_idx = _SHARED["train_idx"], _SHARED["test_idx"]
+    columns = np.asarray(task["columns"])
+    X_train = X[np.ix_(train_idx, columns)]
+    X_test = X[np.ix_(test_idx, columns)]
+    y_train, y_test = np.asarray(y[train_idx]), np.asarray(y[test_idx])
+    sample_weights, _neg_count, _pos_count = train_model.class_balanced_sample_weights(
+        y_train, np.asarray(weights[train_idx])
+    )
+
+    params = {
+        **train_model.XGB_PARAMS,
+        "n_estimators": train_model.DEFAULT_N_ESTIMATORS,
+        "random_state": train_model.XGB_RANDOM_STATE,
+        "n_jobs": task["threads"],
+        **task["params"],
+    }
+    fit_options: dict[str, Any] = {"sample_weight": sample_weights}
+    if task["fast"]:
+        params.update(
+            tree_method="hist",
+            n_estimators=task["max_boost_rounds"],
+            early_stopping_rounds=task["early_stopping_rounds"],
+        )
+        fit_options.update(eval_set=[(X_test, y_test)], verbose=False)
+    model = train_model.xgb.XGBClassifier(**params)
+    model.fit(X_train, y_train, **fit_options)
+    y_prob = model.predict_proba(X_test)[:, 1]
+    boost_rounds = model.best_iteration + 1 if task["fast"] else int(params["n_estimators"])
+
+    metrics = train_model.recommended_threshold_metrics(train_model.threshold_metrics_for(y_test, y_prob))
+    return {
+        "label": task["label"],
+        "feature_set": task["feature_set"],
+        "params": task["params"],
+        "feature_names": task["feature_names"],
+        "metrics": [float(value) for value in metrics],
+        "boost_rounds": int(boost_rounds),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def default_workers(variant_count: int, threads_per_variant: int) -> int:
+    return max(1, min(variant_count, (os.cpu_count() or 1) // max(threads_per_variant, 1)))
+
+
+def run_sweep(
+    df,
+    feature_sets: Sequence[FeatureSet],
+    param_grid: Sequence[dict[str, Any]],
+    *,
+    workers: int | None = None,
+    threads_per_variant: int = 1,
+    fast: bool = False,
+    max_boost_rounds: int = 400,
+    early_stopping_rounds: int = 25,
+    top_k: int = 20,
+    work_dir: str | None = None,
+) -> dict[str, Any]:
+    variants = build_variants(feature_sets, param_grid)
+    workers = workers or default_workers(len(variants), threads_per_variant)
+    with tempfile.TemporaryDirectory(prefix="train_sweep_", dir=work_dir) as shared_dir:
+        started = time.perf_counter()
+        columns = featurize_once(df, feature_sets, Path(shared_dir), top_k=top_k)
+        featurize_seconds = time.perf_counter() - started
+        print(
+            f"🧮 Featurized {len(df)} rows once for {len(feature_sets)} feature set(s) "
+            f"in {featurize_seconds:.1f}s; training {len(variants)} variant(s) on {workers} worker(s)"
+        )
+        tasks = [
+            {
+                "label": variant.label,
+                "feature_set": variant.feature_set,
+                "params": variant.params,
+                "feature_names": columns[variant.feature_set][0],
+                "columns": columns[variant.feature_set][1],
+                "threads": threads_per_variant,
+                "fast": fast,
+                "max_boost_rounds": max_boost_rounds,
+                "early_stopping_rounds": early_stopping_rounds,
+            }
+            for variant in variants
+        ]
+        started = time.perf_counter()
+        # spawn, not fork: XGBoost's OpenMP runtime is not fork-safe.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(shared_dir,),
+        ) as pool:
+            results = list(pool.map(run_variant, tasks))
+        train_seconds = time.perf_counter() - started
+
+    return {
+        "rows": int(len(df)),
+        "workers": workers,
+        "featurize_seconds": featurize_seconds,
+        "train_seconds": train_seconds,
+        "variants": results,
+    }
+
+
+def format_sweep_table(results: Sequence[dict[str, Any]]) -> list[str]:
+    lines = [train_model.EXPERIMENT_SUMMARY_HEADER + " | boost_rounds | seconds"]
+    for result in results:
+        row = train_model.experiment_summary_row(result["label"], result["feature_names"], result["metrics"])
+        lines.append(f"{row} | {result['boost_rounds']} | {result['seconds']:.1f}")
+    return lines
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Train a grid of PlexIntel model variants from one feature build.")
+    parser.add_argument(
+        "--feature-set",
+        action="append",
+        default=None,
+        help="Feature set to sweep (repeatable): production, include_actors or actors:min_titles=N,top1=F,top3=F.",
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="XGBoost parameter values to sweep (repeatable), e.g. max_depth=4,6,8.",
+    )
+    parser.add_argument("--top-k", type=int, default=20, help="Top-k tags per category, as in train_model.py.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: cores / threads).")
+    parser.add_argument("--threads-per-variant", type=int, default=1, help="XGBoost threads inside each worker.")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Use the hist method with early stopping on the validation split, like train_model.py --fast.",
+    )
+    parser.add_argument("--max-boost-rounds", type=int, default=400)
+    parser.add_argument("--early-stopping-rounds", type=int, default=25)
+    parser.add_argument("--work-dir", default=None, help="Directory for the shared memory-mapped matrices.")
+    parser.add_argument("--output", default=None, help="Optional JSON report path.")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be 1 or greater.")
+    if args.threads_per_variant < 1:
+        parser.error("--threads-per-variant must be 1 or greater.")
+    try:
+        feature_sets = [parse_feature_set(spec) for spec in (args.feature_set or ["production"])]
+        param_grid = parse_param_grid(args.param)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if len({feature_set.name for feature_set in feature_sets}) != len(feature_sets):
+        parser.error("Each --feature-set may only be given once.")
+
+    output_path = INVOCATION_DIR / args.output if args.output else None
+    work_dir = str(INVOCATION_DIR / args.work_dir) if args.work_dir else None
+
+    print("📥 Loading training data...")
+    df = train_model.load_training_data()
+    report = run_sweep(
+        df,
+        feature_sets,
+        param_grid,
+        workers=args.workers,
+        threads_per_variant=args.threads_per_variant,
+        fast=args.fast,
+        max_boost_rounds=args.max_boost_rounds,
+        early_stopping_rounds=args.early_stopping_rounds,
+        top_k=args.top_k,
+        work_dir=work_dir,
+    )
+
+    print("📊 Experiment summary rows:")
+    for line in format_sweep_table(report["variants"]):
+        print(line)
+    print(
+        f"⏱️ Featurize {report['featurize_seconds']:.1f}s, train {report['train_seconds']:.1f}s "
+        f"across {report['workers']} worker(s)"
+    )
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📝 Sweep report written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
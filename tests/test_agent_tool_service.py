@@ -193,9 +193,29 @@ class AgentToolServiceTests(unittest.TestCase):
         self.assertEqual(response.count, 1)
         self.assertEqual(response.items[0].year, 2017)
         executed_sql, executed_params = conn.cursor_obj.executed[0]
-        self.assertIn("ORDER BY year DESC", executed_sql)
+        self.assertIn("FROM public.library_search ls", executed_sql)
+        self.assertIn("ORDER BY m.year DESC", executed_sql)
         self.assertEqual(executed_params[-2:], ["movie", 5])
 
+    def test_search_agent_library_ranks_by_relevance_by_default(self):
+        conn = FakeConnection(fetch_rows=[])
+
+        with patch.object(agent_tool_service, "connect_db", return_value=conn):
+            agent_tool_service.search_agent_library(q="Blade Runer")
+
+        executed_sql, executed_params = conn.cursor_obj.executed[0]
+        self.assertIn("ORDER BY relevance DESC, m.title ASC", executed_sql)
+        self.assertEqual(executed_params[:3], ["blade:* & runer:*", "blade runer", "blade runer"])
+
+    def test_search_agent_library_without_words_skips_the_query(self):
+        conn = FakeConnection(fetch_rows=[])
+
+        with patch.object(agent_tool_service, "connect_db", return_value=conn):
+            response = agent_tool_service.search_agent_library(q=" -- ")
+
+        self.assertEqual(response.count, 0)
+        self.assertEqual(conn.cursor_obj.executed, [])
+
     def test_get_agent_library_item_raises_404_when_missing(self):
         conn = FakeConnection(fetch_rows=[])
 
@@ -205,6 +225,31 @@ class AgentToolServiceTests(unittest.TestCase):
 
         self.assertEqual(raised.exception.status_code, 404)
 
+    def test_get_agent_library_items_batches_lookup_and_flags_posters(self):
+        conn = FakeConnection(
+            fetch_rows=[
+                {
+                    "rating_key": 2,
+                    "media_type": "episode",
+                    "title": "Pilot",
+                    "show_title": "Severance",
+                    "thumb_path": None,
+                    "parent_thumb_path": "/library/metadata/9/thumb/1",
+                    "grandparent_thumb_path": None,
+                },
+                {"rating_key": 1, "media_type": "movie", "title": "Arrival", "thumb_path": None},
+            ]
+        )
+
+        with patch.object(agent_tool_service, "connect_db", return_value=conn):
+            items = agent_tool_service.get_agent_library_items(rating_keys=[1, 2, 3, 1])
+
+        executed_sql, executed_params = conn.cursor_obj.executed[0]
+        self.assertEqual(len(conn.cursor_obj.executed), 1)
+        self.assertIn("WHERE m.rating_key = ANY(%s)", executed_sql)
+        self.assertEqual(executed_params, ([1, 2, 3],))
+        self.assertEqual([(item.rating_key, item.has_poster) for item in items], [(1, False), (2, True)])
+
     def test_get_recent_library_additions_maps_rows(self):
         conn = FakeConnection(
             fetch_rows=[
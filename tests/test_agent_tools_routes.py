@@ -124,13 +124,15 @@ class AgentToolsRouteTests(unittest.TestCase):
         ):
             with patch.object(
                 agent_tools,
-                "get_agent_library_item",
-                return_value=LibraryItem(
-                    rating_key=42,
-                    title="Blade Runner 2049",
-                    media_type="movie",
-                ),
-            ) as mock_item:
+                "get_agent_library_items",
+                return_value=[
+                    LibraryItem(
+                        rating_key=42,
+                        title="Blade Runner 2049",
+                        media_type="movie",
+                    )
+                ],
+            ) as mock_items:
                 response = agent_tools.agent_poster_gallery(
                     agent_tools.PosterGalleryPayload(rating_keys=[42], width=240)
                 )
@@ -145,7 +147,7 @@ class AgentToolsRouteTests(unittest.TestCase):
             "![Poster for Blade Runner 2049](https://plexintel.example.com/api/posters/42?w=240)",
             data["markdown"],
         )
-        mock_item.assert_called_once_with(rating_key=42)
+        mock_items.assert_called_once_with(rating_keys=[42])
 
     def test_poster_gallery_route_accepts_items_without_metadata_lookup(self):
         with patch.object(
@@ -155,7 +157,7 @@ class AgentToolsRouteTests(unittest.TestCase):
                 f"https://plexintel.example.com/api/posters/{rating_key}?w={width}"
             ),
         ):
-            with patch.object(agent_tools, "get_agent_library_item") as mock_item:
+            with patch.object(agent_tools, "get_agent_library_items") as mock_items:
                 response = agent_tools.agent_poster_gallery(
                     agent_tools.PosterGalleryPayload(
                         items=[
@@ -172,7 +174,7 @@ class AgentToolsRouteTests(unittest.TestCase):
         self.assertEqual(data["count"], 1)
         self.assertEqual(data["items"][0]["title"], "Black Bag")
         self.assertIn("https://plexintel.example.com/api/posters/88?w=180", data["markdown"])
-        mock_item.assert_not_called()
+        mock_items.assert_not_called()
 
     def test_poster_gallery_route_falls_back_when_metadata_lookup_fails(self):
         with patch.object(
@@ -182,7 +184,7 @@ class AgentToolsRouteTests(unittest.TestCase):
                 f"https://plexintel.example.com/api/posters/{rating_key}?w={width}"
             ),
         ):
-            with patch.object(agent_tools, "get_agent_library_item", side_effect=RuntimeError("missing")):
+            with patch.object(agent_tools, "get_agent_library_items", side_effect=RuntimeError("missing")):
                 response = agent_tools.agent_poster_gallery(
                     agent_tools.PosterGalleryPayload(rating_keys=[99])
                 )
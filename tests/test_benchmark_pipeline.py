@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from scripts import benchmark_pipeline
+
+
+class SyntheticDatasetTests(unittest.TestCase):
+    def setUp(self):
+        self.config = benchmark_pipeline.BenchmarkConfig(
+            items=1_000,
+            users=4,
+            watches_per_user=30,
+            feedback_per_user=5,
+            actors=50,
+            directors=10,
+        )
+
+    def test_library_fills_requested_size_with_consistent_tv_hierarchy(self):
+        synthetic = benchmark_pipeline.build_library(self.config, np.random.default_rng(1))
+
+        keys = [row[0] for row in synthetic.library]
+        self.assertEqual(keys, list(range(1, self.config.items + 1)))
+        by_key = {row[0]: row for row in synthetic.library}
+        media_types = {row[4] for row in synthetic.library}
+        self.assertEqual(media_types, {"movie", "show", "season", "episode"})
+        for row in synthetic.library:
+            if row[4] == "episode":
+                season = by_key[row[9]]
+                self.assertEqual(season[4], "season")
+                self.assertEqual(by_key[row[10]][4], "show")
+                self.assertEqual(season[7], row[7])
+        self.assertTrue(all(by_key[key][4] in {"movie", "episode"} for key in synthetic.playable_keys))
+
+    def test_generation_is_deterministic_for_a_seed(self):
+        first = benchmark_pipeline.build_library(self.config, np.random.default_rng(7))
+        second = benchmark_pipeline.build_library(self.config, np.random.default_rng(7))
+
+        self.assertEqual(first.library, second.library)
+        self.assertEqual(first.media_actors, second.media_actors)
+
+    def test_activity_references_playable_items(self):
+        rng = np.random.default_rng(3)
+        synthetic = benchmark_pipeline.build_library(self.config, rng)
+        users, watch_history, feedback = benchmark_pipeline.build_activity(self.config, synthetic, rng)
+
+        playable = set(synthetic.playable_keys)
+        self.assertEqual(len(users), 4)
+        self.assertEqual(len(watch_history), 4 * 30)
+        self.assertTrue(all(row[7] in playable for row in watch_history))
+        self.assertTrue(all(0 < row[6] <= 100 for row in watch_history))
+        self.assertEqual(len(feedback), 4 * 5)
+        self.assertTrue(all(row[2] in benchmark_pipeline.FEEDBACK_VALUES for row in feedback))
+
+    def test_embedding_batches_emit_unit_vectors_in_copy_format(self):
+        chunks = list(
+            benchmark_pipeline.embedding_batches([1, 2, 3], np.random.default_rng(0), chunk_rows=2)
+        )
+
+        self.assertEqual(len(chunks), 2)
+        key, vector_text = chunks[0].splitlines()[0].split("\t")
+        values = [float(v) for v in vector_text.strip("[]").split(",")]
+        self.assertEqual(key, "1")
+        self.assertEqual(len(values), benchmark_pipeline.EMBEDDING_DIMENSIONS)
+        self.assertAlmostEqual(float(np.linalg.norm(values)), 1.0, places=3)
+
+
+class BenchmarkReportTests(unittest.TestCase):
+    def test_compare_reports_returns_stage_and_view_deltas(self):
+        current = {
+            "config": {"items": 1000},
+            "stages": {"score_model": {"wall_seconds": 30.0}, "train_model": {"wall_seconds": 5.0}},
+            "views": {"all.first_page": {"p50_ms": 12.0}},
+        }
+        baseline = {
+            "generated_at": "2026-01-01T00:00:00+00:00",
+            "config": {"items": 1000},
+            "stages": {"score_model": {"wall_seconds": 40.0}},
+            "views": {"all.first_page": {"p50_ms": 10.0}},
+        }
+
+        comparison = benchmark_pipeline.compare_reports(current, baseline)
+
+        self.assertTrue(comparison["same_config"])
+        self.assertEqual(comparison["stages"]["score_model"]["delta_pct"], -25.0)
+        self.assertNotIn("train_model", comparison["stages"])
+        self.assertEqual(comparison["views"]["all.first_page"]["delta"], 2.0)
+
+    def test_summarize_shap_uses_score_profile_phases(self):
+        stages = {
+            "score_model_no_shap": {"returncode": 0, "wall_seconds": 10.0},
+            "score_model": {
+                "returncode": 0,
+                "wall_seconds": 16.0,
+                "profile": {"phases": {"shap": {"seconds": 4.0}, "shap write": {"seconds": 1.5}}},
+            },
+        }
+
+        summary = benchmark_pipeline.summarize_shap(stages)
+
+        self.assertEqual(summary["shap_seconds"], 5.5)
+        self.assertEqual(summary["wall_overhead_seconds"], 6.0)
+
+    def test_rejects_items_outside_supported_range(self):
+        with self.assertRaises(SystemExit):
+            benchmark_pipeline.parse_args(["--database-url", "postgresql://bench@localhost/bench", "--items", "10"])
+
+    def test_stdout_carries_only_the_json_report(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with tempfile.TemporaryDirectory() as workdir, patch.dict("os.environ", {}), patch.object(
+            benchmark_pipeline.subprocess, "run", return_value=SimpleNamespace(returncode=0, stdout="abc123\n")
+        ), redirect_stdout(stdout), redirect_stderr(stderr):
+            result = benchmark_pipeline.main([
+                "--database-url",
+                "postgresql://bench@localhost/bench",
+                "--skip-generate",
+                "--skip-views",
+                "--stages",
+                "training_data",
+                "--workdir",
+                workdir,
+            ])
+
+        self.assertEqual(result, 0)
+        self.assertIn("training_data", json.loads(stdout.getvalue())["stages"])
+        self.assertIn("⏱️ training_data", stderr.getvalue())
+
+    def test_scoring_stages_use_the_model_trained_in_the_workdir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch.object(
+            benchmark_pipeline.subprocess, "run", return_value=SimpleNamespace(returncode=0)
+        ) as mock_run, redirect_stderr(io.StringIO()):
+            workdir = benchmark_pipeline.Path(tmp_dir)
+            benchmark_pipeline.benchmark_stages(
+                ["train_model", "score_model"], database_url="postgresql://bench@localhost/bench", workdir=workdir
+            )
+
+        train_call, score_call = mock_run.call_args_list
+        model_path = str(workdir / "xgb_model.pkl")
+        self.assertIn(model_path, train_call.args[0])
+        self.assertEqual(score_call.args[0][-2:], ["--model", model_path])
+        self.assertEqual(score_call.kwargs["env"]["MODEL_REGISTRY_DIR"], str(workdir / "registry"))
+
+
+if __name__ == "__main__":
+    unittest.main()
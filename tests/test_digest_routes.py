@@ -45,6 +45,15 @@ class DigestRoutesTests(unittest.TestCase):
         self.assertEqual(put_response["updated_by"], "admin")
         self.assertEqual(history_response["runs"][0]["run_id"], 1)
 
+    def test_admin_digest_candidates_route(self):
+        candidates = {"recipient_count": 1, "recipients": [{"username": "member", "counts": {"movies": 2, "shows": 1}}]}
+
+        with patch.object(digest_routes, "get_digest_candidates", return_value=candidates):
+            response = digest_routes.admin_digest_candidates(admin_user=_admin_user())
+
+        self.assertEqual(response["requested_by"], "admin")
+        self.assertEqual(response["recipients"][0]["counts"], {"movies": 2, "shows": 1})
+
     def test_preview_and_test_send_routes_map_validation_errors(self):
         with patch.object(
             digest_routes,
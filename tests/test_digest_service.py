@@ -160,6 +160,47 @@ class DigestServiceTests(unittest.TestCase):
         self.assertIn("recs.predicted_probability >= %s", executed["sql"])
         self.assertEqual(executed["params"], ("member", "member", 0.70, 5))
 
+    def test_batch_digest_items_partition_by_user_in_one_query(self):
+        executed: list[tuple[str, dict]] = []
+        rows = [
+            {"kind": "movie", "username": "a", "rating_key": 1, "title": "M1", "year": 2020, "genres": "Drama",
+             "semantic_themes": "x", "predicted_probability": 0.9, "item_rank": 1},
+            {"kind": "show", "username": "a", "rating_key": 7, "title": "S7", "year": 2019, "genres": "Comedy",
+             "semantic_themes": None, "predicted_probability": 0.8, "item_rank": 1},
+            {"kind": "movie", "username": "b", "rating_key": 2, "title": "M2", "year": 2021, "genres": None,
+             "semantic_themes": None, "predicted_probability": 0.75, "item_rank": 1},
+        ]
+
+        class FakeCursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_args):
+                return None
+
+            def execute(self, sql, params):
+                executed.append((" ".join(sql.split()), params))
+
+            def fetchall(self):
+                return rows
+
+        class FakeConn:
+            def cursor(self, *_, **__):
+                return FakeCursor()
+
+        items = digest_service.fetch_digest_items_for_users(
+            FakeConn(), ["a", "b", "c"], top_movies=5, top_shows=3, min_probability=0.7
+        )
+
+        self.assertEqual(len(executed), 1)
+        sql, params = executed[0]
+        self.assertIn("ROW_NUMBER() OVER (PARTITION BY username ORDER BY predicted_probability DESC)", sql)
+        self.assertNotIn("descendant_feedback", sql)
+        self.assertEqual(params, {"usernames": ["a", "b", "c"], "min_probability": 0.7, "top_movies": 5, "top_shows": 3})
+        self.assertEqual([movie["rating_key"] for movie in items["a"][0]], [1])
+        self.assertEqual(items["a"][1], [{"rating_key": 7, "title": "S7", "year": 2019, "genres": "Comedy", "predicted_probability": 0.8}])
+        self.assertEqual(items["c"], ([], []))
+
     def test_digest_show_recommendations_apply_display_threshold(self):
         executed: dict[str, object] = {}
 
@@ -240,6 +281,7 @@ class DigestServiceTests(unittest.TestCase):
             message_html,
             is_test,
             poster_mode,
+            **_kwargs,
         ):
             rendered_pairs.append((recipient_user["username"], rendered_for_user["username"]))
             return {
@@ -262,7 +304,9 @@ class DigestServiceTests(unittest.TestCase):
                         with patch.object(digest_service, "_fetch_digest_user", side_effect=fake_fetch_digest_user):
                             with patch.object(digest_service, "_list_admin_users", return_value=[admin_one, admin_two]):
                                 with patch.object(digest_service, "_build_subject", return_value="[TEST] PlexIntel Weekly Picks"):
-                                    with patch.object(digest_service, "_record_run_start", return_value=7):
+                                    with patch.object(digest_service, "_record_run_start", return_value=7), patch.object(
+                                        digest_service, "get_digest_content", return_value={"message_html": ""}
+                                    ):
                                         with patch.object(digest_service, "_build_preview_payload", side_effect=fake_build_preview_payload):
                                             with patch.object(digest_service, "_send_email", return_value=None):
                                                 with patch.object(digest_service, "_record_delivery", return_value=None):
@@ -293,6 +337,7 @@ class DigestServiceTests(unittest.TestCase):
             message_html,
             is_test,
             poster_mode,
+            **_kwargs,
         ):
             rendered_pairs.append((recipient_user["username"], rendered_for_user["username"]))
             return {
@@ -316,6 +361,7 @@ class DigestServiceTests(unittest.TestCase):
                 "top_movies": 25,
                 "top_shows": 10,
                 "base_url": "http://localhost:8489",
+                "display_threshold": 0.7,
             },
         ):
             with patch.object(digest_service, "_get_smtp_settings", return_value={"from_name": "PlexIntel"}):
@@ -328,12 +374,168 @@ class DigestServiceTests(unittest.TestCase):
                                         with patch.object(digest_service, "get_digest_content", return_value={"message_html": ""}):
                                             with patch.object(digest_service, "_build_preview_payload", side_effect=fake_build_preview_payload):
                                                 with patch.object(digest_service, "_send_email", return_value=None):
-                                                    with patch.object(digest_service, "_record_delivery", return_value=None):
+                                                    with patch.object(digest_service, "_record_deliveries", return_value=None), patch.object(
+                                                        digest_service, "fetch_digest_items_for_users", return_value={}
+                                                    ), patch.object(
+                                                        digest_service, "fetch_optimized_posters", return_value=({}, {"unique": 0, "cache_hits": 0, "fetched": 0, "unavailable": 0})
+                                                    ):
                                                         with patch.object(digest_service, "_finalize_run", return_value=None):
                                                             result = digest_service.run_scheduled_digest(force=False, triggered_by="system")
 
-        self.assertEqual(rendered_pairs, [("member-one", "member-one"), ("member-two", "member-two")])
+        # Recipients render on a worker pool, so completion order is not fixed.
+        self.assertEqual(sorted(rendered_pairs), [("member-one", "member-one"), ("member-two", "member-two")])
+        self.assertEqual(result["status"], "completed")
+
+    def test_delivery_engine_records_batches_and_isolates_failures(self):
+        recipients = [self._user(f"member-{index}") for index in range(30)]
+        batches: list[list[dict]] = []
+        poster_requests: list[list[int]] = []
+        item_requests: list[list[str]] = []
+
+        class FakeConn:
+            def rollback(self):
+                return None
+
+            def close(self):
+                return None
+
+        def fake_fetch_digest_items_for_users(_conn, usernames, **_kwargs):
+            item_requests.append(list(usernames))
+            return {
+                username: ([{"rating_key": 1 if username.endswith(("0", "2", "4", "6", "8")) else 2}], [])
+                for username in usernames
+            }
+
+        def fake_fetch_optimized_posters(rating_keys, **_kwargs):
+            poster_requests.append(list(rating_keys))
+            return {1: {"content": b"one", "content_type": "image/jpeg"}, 2: None}, {
+                "unique": 2,
+                "cache_hits": 1,
+                "fetched": 1,
+                "unavailable": 1,
+            }
+
+        def fake_build_preview_payload(_conn, *, rendered_for_user, render_context, items, **_kwargs):
+            if rendered_for_user["username"] == "member-3":
+                raise RuntimeError("render failed")
+            self.assertIn(1, render_context["poster_cache"])
+            self.assertEqual(len(items[0]), 1)
+            empty = rendered_for_user["username"] == "member-4"
+            return {
+                "subject": "subject",
+                "html": "<p>html</p>",
+                "text": "text",
+                "inline_images": [],
+                "counts": {"movies": 0 if empty else 1, "shows": 0},
+                "message_html": "",
+            }
+
+        def fake_send_email(_smtp_settings, *, recipient_email, smtp_pool, **_kwargs):
+            self.assertIsNotNone(smtp_pool)
+            if recipient_email == "member-5@example.com":
+                raise digest_service.DigestConfigError("rejected")
+
+        def fake_record_deliveries(_conn, *, run_id, delivery_type, rows):
+            batches.append(list(rows))
+
+        with patch.object(digest_service, "connect_db", return_value=FakeConn()), patch.object(
+            digest_service, "fetch_digest_items_for_users", side_effect=fake_fetch_digest_items_for_users
+        ), patch.object(
+            digest_service, "fetch_optimized_posters", side_effect=fake_fetch_optimized_posters
+        ), patch.object(
+            digest_service, "_build_preview_payload", side_effect=fake_build_preview_payload
+        ), patch.object(digest_service, "_send_email", side_effect=fake_send_email), patch.object(
+            digest_service, "_record_deliveries", side_effect=fake_record_deliveries
+        ):
+            counts = digest_service._deliver_scheduled_digests(
+                FakeConn(),
+                run_id=9,
+                recipients=recipients,
+                render_context={
+                    "digest_settings": {"render_workers": 4, "top_movies": 5, "top_shows": 5, "display_threshold": 0.7},
+                    "message_html": "",
+                    "subject": "s",
+                    "poster_cache": {},
+                },
+                smtp_settings={"pool_size": 2, "send_retries": 0},
+            )
+
+        self.assertEqual(counts["deliveries"], {"sent": 27, "failed": 2, "skipped": 1})
+        self.assertEqual(len(item_requests), 1)
+        self.assertEqual(len(item_requests[0]), 30)
+        self.assertEqual(len(poster_requests), 1)
+        self.assertEqual(counts["posters"]["references"], 30)
+        self.assertEqual(counts["posters"]["fetched"], 1)
+        self.assertEqual([len(batch) for batch in batches], [25, 5])
+        by_user = {row["recipient_username"]: row for batch in batches for row in batch}
+        self.assertEqual(by_user["member-3"]["error_message"], "render failed")
+        self.assertEqual(by_user["member-4"]["status"], "skipped")
+        self.assertEqual(by_user["member-5"]["status"], "failed")
+        self.assertTrue(all(row["sent_at"] is not None for row in by_user.values()))
+
+    def test_poster_prefetch_failure_still_delivers_and_finalizes_the_run(self):
+        recipient = self._user("member")
+        finalized = []
+
+        class FakeConn:
+            def rollback(self):
+                return None
+
+            def close(self):
+                return None
+
+        def fake_build_preview_payload(_conn, *, render_context, **_kwargs):
+            self.assertEqual(render_context["poster_cache"], {})
+            return {
+                "subject": "subject",
+                "html": "<p>html</p>",
+                "text": "text",
+                "inline_images": [],
+                "counts": {"movies": 1, "shows": 0},
+                "message_html": "",
+            }
+
+        with patch.object(
+            digest_service, "_get_digest_settings", return_value={"enabled": True, "frequency": "daily", "render_workers": 2}
+        ), patch.object(digest_service, "_get_smtp_settings", return_value={"pool_size": 1, "send_retries": 0}), patch.object(
+            digest_service, "_get_schedule_slot", return_value={"schedule_key": "daily:2026-10-18"}
+        ), patch.object(digest_service, "connect_db", return_value=FakeConn()), patch.object(
+            digest_service, "sync_users_from_tautulli"
+        ), patch.object(digest_service, "_record_run_start", return_value=12), patch.object(
+            digest_service, "_list_digest_recipients", return_value=[recipient]
+        ), patch.object(digest_service, "get_digest_content", return_value={"message_html": ""}), patch.object(
+            digest_service, "_prepare_recipients", return_value=[{"recipient": recipient, "items": ([{"rating_key": 1}], []), "error": None}]
+        ), patch.object(
+            digest_service, "fetch_optimized_posters", side_effect=OSError("poster table unavailable")
+        ), patch.object(
+            digest_service, "_build_preview_payload", side_effect=fake_build_preview_payload
+        ), patch.object(digest_service, "_send_email"), patch.object(digest_service, "_record_deliveries"), patch.object(
+            digest_service, "_finalize_run", side_effect=lambda _conn, **kwargs: finalized.append(kwargs)
+        ):
+            result = digest_service.run_scheduled_digest()
+
         self.assertEqual(result["status"], "completed")
+        self.assertEqual(result["success_count"], 1)
+        self.assertEqual(len(finalized), 1)
+        self.assertIn("poster table unavailable", finalized[0]["notes"])
+
+    def test_inline_posters_are_fetched_once_per_run(self):
+        poster_cache: dict = {}
+        first = [{"rating_key": 1}, {"rating_key": 2}]
+        second = [{"rating_key": 1}]
+
+        with patch.object(
+            digest_service,
+            "_fetch_inline_poster",
+            side_effect=lambda key: {"content": b"jpeg", "content_type": "image/jpeg"} if key == 1 else None,
+        ) as mock_fetch:
+            first_images = digest_service._decorate_items_with_inline_posters(first, poster_cache)
+            second_images = digest_service._decorate_items_with_inline_posters(second, poster_cache)
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual((len(first_images), len(second_images)), (1, 1))
+        self.assertIsNone(first[1]["poster_src"])
+        self.assertNotEqual(first_images[0]["cid"], second_images[0]["cid"])
 
 
 if __name__ == "__main__":
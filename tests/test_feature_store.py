@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import score_model
+import train_model
+from api.services import feature_store
+
+
+def media_frame():
+    return pd.DataFrame(
+        {
+            "rating_key": [10, 11, 12],
+            "year": [1994, 2003, None],
+            "embedding": ["[1,0,0]", "[0,1,0]", "[0.5,0.5,1e-01]"],
+            "genre_tags": ["Drama, Crime", "Comedy", None],
+            "actor_tags": ["A", "B", "A,B"],
+            "director_tags": ["D1", None, "D2"],
+        }
+    )
+
+
+class FeatureSchemaTests(unittest.TestCase):
+    def test_parse_embedding_handles_pgvector_text_and_sequences(self):
+        np.testing.assert_allclose(feature_store.parse_embedding("[1.5,-2,3e-02]"), [1.5, -2.0, 0.03], rtol=1e-6)
+        self.assertEqual(feature_store.parse_embedding([1, 2]).dtype, np.float32)
+        self.assertEqual(feature_store.parse_embedding("[]").size, 0)
+
+    def test_schema_round_trips_next_to_model(self):
+        schema = feature_store.FeatureSchema(
+            embedding_dim=2, genres=("Drama",), actors=(), directors=("D1",), decades=("is_1990s",)
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = Path(tmp_dir) / "xgb_model.pkl"
+            path = feature_store.feature_schema_path(model_path)
+            schema.save(path)
+
+            loaded = feature_store.load_feature_schema(model_path, schema.feature_names)
+
+        self.assertEqual(path.name, "xgb_model.features.json")
+        self.assertEqual(loaded, schema)
+        self.assertEqual(
+            list(loaded.feature_names),
+            ["emb_0", "emb_1", "genre_Drama", "director_D1", "is_1990s", "watch_sim"],
+        )
+
+    def test_saved_schema_must_match_model_feature_names(self):
+        schema = feature_store.FeatureSchema(embedding_dim=1, genres=("Drama",))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = Path(tmp_dir) / "xgb_model.pkl"
+            schema.save(feature_store.feature_schema_path(model_path))
+
+            with self.assertRaises(ValueError):
+                feature_store.load_feature_schema(model_path, ["emb_0", "genre_Comedy", "watch_sim"])
+
+    def test_models_without_saved_schema_fall_back_to_feature_names(self):
+        names = ["emb_0", "genre_Sci_Fi", "actor_A", "is_2000s", "watch_sim"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema = feature_store.load_feature_schema(Path(tmp_dir) / "xgb_model.pkl", names)
+
+        self.assertEqual(schema.genres, ("Sci_Fi",))
+        self.assertEqual(list(schema.feature_names), names)
+
+
+class MediaFeatureBlockTests(unittest.TestCase):
+    def test_block_cache_is_keyed_by_library_version_and_schema(self):
+        schema = feature_store.FeatureSchema(embedding_dim=6, genres=("Crime", "Drama"), decades=("is_1990s",))
+        block = feature_store.MediaFeatureBlock.from_frame(media_frame(), schema, library_version="v1")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir)
+            feature_store.save_media_block(block, schema, cache_dir)
+
+            loaded = feature_store.load_media_block(schema, "v1", cache_dir)
+            stale = feature_store.load_media_block(schema, "v2", cache_dir)
+
+            feature_store.save_media_block(
+                feature_store.MediaFeatureBlock.from_frame(media_frame(), schema, library_version="v2"),
+                schema,
+                cache_dir,
+            )
+            remaining = sorted(path.name for path in cache_dir.iterdir())
+
+        self.assertIsNone(stale)
+        np.testing.assert_array_equal(loaded.embeddings, block.embeddings)
+        np.testing.assert_array_equal(loaded.side, block.side)
+        self.assertEqual(loaded.positions([12, 99, 10]).tolist(), [2, -1, 0])
+        self.assertEqual(block.side[0].tolist(), [1.0, 1.0, 1.0])
+        self.assertEqual(len(remaining), 1)
+
+
+class TrainingScoringParityTests(unittest.TestCase):
+    def test_training_and_scoring_build_identical_rows(self):
+        media = media_frame()
+        user_embedding = np.array([0.2, 0.4, 0.6], dtype=np.float32)
+        training_df = pd.DataFrame(
+            {
+                "embedding": [
+                    np.concatenate([feature_store.parse_embedding(value), user_embedding])
+                    for value in media["embedding"]
+                ],
+                "label": [1, 0, 1],
+                "genre_tags": media["genre_tags"],
+                "actor_tags": media["actor_tags"],
+                "director_tags": media["director_tags"],
+                "release_year": media["year"],
+                "watch_sim": [0.0, 0.0, 0.0],
+            }
+        )
+
+        X_train, _y, _weights, feature_names = train_model.preprocess(training_df, top_k=5)
+        schema = feature_store.FeatureSchema.from_feature_names(feature_names)
+        block = feature_store.MediaFeatureBlock.from_frame(media, schema, library_version="v1")
+        unwatched = pd.DataFrame({"rating_key": [12, 10, 11], "media_type": ["movie"] * 3})
+
+        X_score, scored = score_model.preprocess_for_scoring(unwatched, schema, block, user_embedding)
+
+        self.assertEqual(X_score.dtype, np.float32)
+        self.assertEqual(X_score.shape[1], len(feature_names))
+        np.testing.assert_allclose(X_score, X_train[[2, 0, 1]], rtol=1e-6)
+        self.assertEqual(scored["feature_row"].tolist(), [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
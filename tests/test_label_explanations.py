@@ -5,6 +5,7 @@ import unittest
 import io
 import sys
 import tempfile
+import threading
 import types
 from datetime import datetime, timedelta, timezone
 from contextlib import redirect_stdout
@@ -2114,5 +2115,74 @@ class ReviewCsvExportTests(unittest.TestCase):
         self.assertEqual(row["display_label"], "non-comedy mysteries")
 
 
+class ConcurrentLabelingTests(unittest.TestCase):
+    @staticmethod
+    def prepared(index, dimension, skipped_reason=""):
+        return {
+            "index": index,
+            "dimension": dimension,
+            "dim_stats": {"dimension": dimension},
+            "mode": "media",
+            "prompt_bundle": {"prompt_text": f"prompt {dimension}", "skipped_reason": skipped_reason},
+        }
+
+    def test_rate_limiter_waits_for_the_per_minute_budget_to_refill(self):
+        now = [0.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = gpt_utils.TokenRateLimiter(600, clock=lambda: now[0], sleep=fake_sleep)
+
+        self.assertEqual(limiter.acquire(500), 0.0)
+        self.assertEqual(limiter.acquire(300), 20.0)
+        self.assertEqual(sleeps, [20.0])
+        self.assertEqual(gpt_utils.TokenRateLimiter(0).acquire(10_000), 0.0)
+
+    def test_rate_limiter_is_charged_once_per_llm_attempt(self):
+        limiter = gpt_utils.TokenRateLimiter(1_000_000)
+        with patch.object(gpt_utils, "resolve_label_backend", return_value=("ollama", "model")):
+            with patch.object(
+                gpt_utils,
+                "_call_ollama_for_label_result",
+                side_effect=[RuntimeError("busy"), {"label": "heists"}],
+            ):
+                with patch.object(gpt_utils.time, "sleep"):
+                    with patch.object(limiter, "acquire", wraps=limiter.acquire) as acquire:
+                        result = gpt_utils.call_llm_for_label_result("prompt", rate_limiter=limiter)
+
+        self.assertEqual(result, {"label": "heists"})
+        self.assertEqual(acquire.call_count, 2)
+
+    def test_results_are_yielded_as_calls_finish_and_skips_need_no_call(self):
+        first_call_may_finish = threading.Event()
+
+        def fake_llm(prompt_text, **_kwargs):
+            if prompt_text == "prompt 1":
+                first_call_may_finish.wait(5)
+            return {"label": prompt_text.replace("prompt", "label"), "validation_status": "valid"}
+
+        prepared = [self.prepared(0, 1), self.prepared(1, 2, skipped_reason="too few items"), self.prepared(2, 3)]
+        results = []
+        with patch.object(batch_label_embeddings, "call_llm_for_label_result", side_effect=fake_llm):
+            with redirect_stdout(io.StringIO()):
+                for result in batch_label_embeddings.iter_dimension_label_results(
+                    prepared,
+                    call_model=True,
+                    provider="openai",
+                    model="example-model",
+                    concurrency=2,
+                ):
+                    results.append(result)
+                    if result[0]["dimension"] == 3:
+                        first_call_may_finish.set()
+
+        self.assertEqual([item["dimension"] for item, _result, _reason in results], [2, 3, 1])
+        self.assertEqual(results[0][2], "too few items")
+        self.assertEqual(results[1][1]["label"], "label 3")
+
+
 if __name__ == "__main__":
     unittest.main()
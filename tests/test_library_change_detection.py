@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+import fetch_tautulli_data as tautulli_sync
+from api.services.tautulli_metadata_cache import CHILDREN_ENDPOINT, TautulliMetadataCache
+from api.services.library_change_detection import (
+    SectionFingerprint,
+    ShowFingerprint,
+    fingerprints_match_section,
+    plan_library_changes,
+)
+
+MOVIES = {"section_id": "1", "section_type": "movie", "count": "2"}
+TV = {"section_id": "2", "section_type": "show", "count": "2", "parent_count": "3", "child_count": "5"}
+STORED_SECTIONS = {1: SectionFingerprint(2, None, None), 2: SectionFingerprint(2, 3, 5)}
+STORED_SHOWS = {10: ShowFingerprint(1, 2, 100), 20: ShowFingerprint(2, 3, 200)}
+
+
+class PlanLibraryChangesTests(unittest.TestCase):
+    def test_unchanged_sections_skip_listings_and_collect_recent_shows(self):
+        plan = plan_library_changes(
+            movie_section=MOVIES,
+            show_section=TV,
+            stored_sections=STORED_SECTIONS,
+            movie_section_id=1,
+            show_section_id=2,
+            recent_items=[
+                {"media_type": "movie", "rating_key": "5"},
+                {"media_type": "episode", "rating_key": "31", "grandparent_rating_key": "20"},
+                {"media_type": "season", "rating_key": "40", "parent_rating_key": "30"},
+            ],
+        )
+
+        self.assertFalse(plan.list_movies)
+        self.assertFalse(plan.list_shows)
+        self.assertEqual(plan.recent_movie_keys, [5])
+        self.assertEqual(plan.changed_show_keys, {20, 30})
+
+    def test_moved_or_unknown_counts_list_the_section(self):
+        plan = plan_library_changes(
+            movie_section={**MOVIES, "count": "3"},
+            show_section=TV,
+            stored_sections={},
+            movie_section_id=1,
+            show_section_id=2,
+            recent_items=[],
+        )
+
+        self.assertTrue(plan.list_movies)
+        self.assertTrue(plan.list_shows)
+
+    def test_fingerprint_totals_must_match_section_counts(self):
+        self.assertTrue(fingerprints_match_section(TV, STORED_SHOWS))
+        self.assertFalse(fingerprints_match_section({**TV, "child_count": "6"}, STORED_SHOWS))
+        self.assertFalse(fingerprints_match_section({"section_id": "2"}, STORED_SHOWS))
+
+
+class FakeCursor:
+    def __init__(self, sections=None, shows=None):
+        self.sections = sections if sections is not None else STORED_SECTIONS
+        self.shows = shows if shows is not None else STORED_SHOWS
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        if "library_section_fingerprints" in sql:
+            self._rows = [(key, fp.count, fp.parent_count, fp.child_count) for key, fp in self.sections.items()]
+        elif "library_show_fingerprints" in sql:
+            self._rows = [
+                (key, fp.season_count, fp.episode_count, fp.updated_at) for key, fp in self.shows.items()
+            ]
+
+    def fetchall(self):
+        return self._rows
+
+
+CHILDREN = {
+    10: [{"media_type": "season", "rating_key": "11"}],
+    11: [{"media_type": "episode", "rating_key": "12"}, {"media_type": "episode", "rating_key": "13"}],
+    20: [{"media_type": "season", "rating_key": "21"}, {"media_type": "season", "rating_key": "22"}],
+    21: [{"media_type": "episode", "rating_key": "23"}],
+    22: [{"media_type": "episode", "rating_key": "24"}, {"media_type": "episode", "rating_key": "25"}],
+}
+
+
+class DiscoverLibraryChangesTests(unittest.TestCase):
+    def run_discovery(self, *, libraries, recent_items, cursor=None):
+        commands = []
+
+        def fake_fetch(endpoint, params=None):
+            commands.append(endpoint)
+            if endpoint == "get_libraries":
+                return libraries
+            raise AssertionError(f"unexpected command {endpoint}")
+
+        def fake_children(rating_key, updated_at=None, use_cache=True):
+            commands.append(("children", int(rating_key)))
+            return CHILDREN[int(rating_key)]
+
+        def fake_listing(section_id, limit=None):
+            commands.append(("listing", section_id))
+            if section_id == 2:
+                return [{"rating_key": "10", "updated_at": "100"}, {"rating_key": "20", "updated_at": "200"}]
+            return []
+
+        visited = []
+        with patch.object(tautulli_sync, "fetch_tautulli_data", side_effect=fake_fetch), patch.object(
+            tautulli_sync, "get_children_metadata", side_effect=fake_children
+        ), patch.object(tautulli_sync, "get_library_media_info", side_effect=fake_listing):
+            result = tautulli_sync.discover_library_changes(
+                cursor or FakeCursor(),
+                recent_items,
+                lambda item, show_key=None: visited.append(int(item["rating_key"])),
+            )
+        return commands, visited, result
+
+    def test_quiet_day_needs_only_the_section_counts(self):
+        commands, visited, result = self.run_discovery(libraries=[MOVIES, TV], recent_items=[])
+
+        self.assertEqual(commands, ["get_libraries"])
+        self.assertEqual(visited, [])
+        self.assertEqual(result["shows"], {})
+
+    def test_recent_episode_walks_only_its_show(self):
+        libraries = [MOVIES, {**TV, "child_count": "6"}]
+        children = {**CHILDREN, 22: CHILDREN[22] + [{"media_type": "episode", "rating_key": "26"}]}
+
+        with patch.dict(CHILDREN, children):
+            commands, visited, result = self.run_discovery(
+                libraries=libraries,
+                recent_items=[{"media_type": "episode", "rating_key": "26", "grandparent_rating_key": "20"}],
+                cursor=FakeCursor(sections={1: STORED_SECTIONS[1], 2: SectionFingerprint(2, 3, 6)}),
+            )
+
+        self.assertNotIn(("children", 10), commands)
+        self.assertIn(26, visited)
+        self.assertEqual(result["shows"], {20: ShowFingerprint(2, 4, None)})
+
+    def test_count_mismatch_falls_back_to_walking_every_show(self):
+        cursor = FakeCursor(shows={10: ShowFingerprint(1, 1, 100), 20: ShowFingerprint(2, 3, 200)})
+
+        commands, visited, result = self.run_discovery(libraries=[MOVIES, TV], recent_items=[], cursor=cursor)
+
+        self.assertIn(("listing", 2), commands)
+        self.assertIn(("children", 10), commands)
+        self.assertIn(("children", 20), commands)
+        self.assertEqual(result["shows"][10], ShowFingerprint(1, 2, 100))
+        self.assertEqual(result["removed_shows"], set())
+
+    def test_count_mismatch_walk_ignores_cached_listings(self):
+        store = TautulliMetadataCache(ttl_seconds=3600)
+        store.enabled = True
+        store._loaded = True
+        for parent_key, children in CHILDREN.items():
+            store._entries[(CHILDREN_ENDPOINT, parent_key)] = (None, None, None, list(children))
+        store._entries[(CHILDREN_ENDPOINT, 20)] = (200, None, None, list(CHILDREN[20]))
+        live = {**CHILDREN, 22: CHILDREN[22] + [{"media_type": "episode", "rating_key": "26"}]}
+        libraries = [MOVIES, {**TV, "child_count": "6"}]
+        fetched = []
+
+        def fake_fetch(endpoint, params=None):
+            if endpoint == "get_libraries":
+                return libraries
+            fetched.append(int(params["rating_key"]))
+            return {"children_list": live[int(params["rating_key"])]}
+
+        def fake_listing(section_id, limit=None):
+            if section_id == 2:
+                return [{"rating_key": "10", "updated_at": "100"}, {"rating_key": "20", "updated_at": "200"}]
+            return []
+
+        visited = []
+        with patch.object(tautulli_sync, "_METADATA_STORE", store), patch.object(
+            tautulli_sync, "fetch_tautulli_data", side_effect=fake_fetch
+        ), patch.object(tautulli_sync, "get_library_media_info", side_effect=fake_listing):
+            result = tautulli_sync.discover_library_changes(
+                FakeCursor(sections={1: STORED_SECTIONS[1], 2: SectionFingerprint(2, 3, 6)}),
+                [],
+                lambda item, show_key=None: visited.append(int(item["rating_key"])),
+            )
+
+        self.assertEqual(sorted(fetched), sorted(CHILDREN))
+        self.assertIn(26, visited)
+        self.assertEqual(result["shows"][20], ShowFingerprint(2, 4, 200))
+        self.assertEqual(len(store.get(CHILDREN_ENDPOINT, 22)), 3)
+
+
+class StoredItemTrackingTests(unittest.TestCase):
+    class RollbackCursor:
+        """Inserts of ``failing_key`` raise; a rollback discards every uncommitted row."""
+
+        def __init__(self, failing_key):
+            self.failing_key = failing_key
+            self.committed, self.pending = set(), set()
+            self._rows = []
+
+        def execute(self, sql, params=None):
+            if sql.lstrip().startswith("INSERT INTO library"):
+                if params[0] == self.failing_key:
+                    raise RuntimeError("bad row")
+                self.pending.add(int(params[0]))
+            elif sql.startswith("SELECT rating_key FROM library"):
+                keys = params[0] if params else sorted(self.committed)
+                self._rows = [(key,) for key in keys if key in self.committed]
+
+        def fetchall(self):
+            return self._rows
+
+    class Conn:
+        def __init__(self, cursor):
+            self.cursor_obj = cursor
+
+        def commit(self):
+            self.cursor_obj.committed |= self.cursor_obj.pending
+            self.cursor_obj.pending = set()
+
+        def rollback(self):
+            self.cursor_obj.pending = set()
+
+        def close(self):
+            return None
+
+    def test_store_library_data_returns_only_committed_keys(self):
+        cursor = self.RollbackCursor(failing_key="2")
+        items = [{"rating_key": key, "media_type": "movie"} for key in ("1", "2", "3")]
+
+        with patch.object(tautulli_sync, "safe_refresh_library_search"), patch("builtins.print"):
+            stored = tautulli_sync.store_library_data(self.Conn(cursor), cursor, items)
+
+        self.assertEqual(stored, ["3"])
+
+    def test_rolled_back_items_keep_their_show_fingerprint(self):
+        cursor = self.RollbackCursor(failing_key=None)
+        conn = self.Conn(cursor)
+        fingerprints = {"sections": {}, "shows": {20: ShowFingerprint(2, 4, None)}, "removed_shows": set()}
+
+        def fake_discover(_cursor, _recent, visit, *, full_walk=False):
+            visit({"rating_key": "26"}, 20)
+            return fingerprints
+
+        with patch.object(tautulli_sync, "connect_to_db", return_value=(conn, cursor)), patch.multiple(
+            tautulli_sync,
+            clear_tautulli_cache=lambda: None,
+            fetch_recently_added=lambda: [],
+            invalidate_recently_added_metadata=lambda _items: None,
+            sync_users_from_tautulli=lambda _conn, _cursor: None,
+            discover_library_changes=fake_discover,
+            get_metadata=lambda key, updated_at=None: {"rating_key": str(key), "media_type": "episode"},
+            flush_metadata_store=lambda: None,
+            store_library_data=lambda _conn, _cursor, _items: [],
+            backfill_missing_header_records=lambda _conn, _cursor: None,
+            safe_refresh_library_search=lambda *_args, **_kwargs: None,
+            backfill_missing_plex_guids=lambda _conn, _cursor: None,
+            sync_new_watch_history=lambda _conn, _cursor: None,
+            get_setting_value=lambda *_args, **_kwargs: False,
+        ), patch.object(tautulli_sync, "save_library_fingerprints") as mock_save, patch("builtins.print"):
+            tautulli_sync.run_incremental_load()
+
+        self.assertEqual(mock_save.call_args.kwargs["failed_show_keys"], {20})
+
+
+class TargetedIngestTests(unittest.TestCase):
+    def test_episode_brings_its_season_and_show(self):
+        metadata = {
+            31: {"rating_key": "31", "media_type": "episode", "parent_rating_key": 30, "show_rating_key": 20},
+            30: {"rating_key": "30", "media_type": "season", "parent_rating_key": 20, "show_rating_key": 20},
+            20: {"rating_key": "20", "media_type": "show", "parent_rating_key": None, "show_rating_key": 20},
+        }
+        with patch.object(tautulli_sync, "get_metadata", side_effect=lambda key: metadata.get(int(key))), patch.object(
+            tautulli_sync, "get_metadata_store"
+        ) as mock_store, patch.object(tautulli_sync, "_walk_show") as mock_walk:
+            items = tautulli_sync.collect_targeted_items([31], existing_keys={"20", "30"})
+
+        mock_store.return_value.invalidate.assert_called_once_with([31])
+        mock_walk.assert_not_called()
+        self.assertEqual([item["rating_key"] for item in items], ["31", "30", "20"])
+
+    def test_season_notification_fetches_only_new_episodes(self):
+        metadata = {
+            22: {"rating_key": "22", "media_type": "season", "parent_rating_key": 20, "show_rating_key": 20},
+            20: {"rating_key": "20", "media_type": "show", "parent_rating_key": None, "show_rating_key": 20},
+            26: {"rating_key": "26", "media_type": "episode", "parent_rating_key": 22, "show_rating_key": 20},
+        }
+        fetched = []
+
+        def fake_metadata(key):
+            fetched.append(int(key))
+            return metadata.get(int(key))
+
+        episodes = CHILDREN[22] + [{"media_type": "episode", "rating_key": "26"}]
+        with patch.object(tautulli_sync, "get_metadata", side_effect=fake_metadata), patch.object(
+            tautulli_sync, "get_metadata_store"
+        ), patch.object(tautulli_sync, "get_children_metadata", return_value=episodes):
+            items = tautulli_sync.collect_targeted_items([22], existing_keys={"20", "22", "24", "25"})
+
+        self.assertEqual(fetched, [22, 20, 26])
+        self.assertEqual([item["rating_key"] for item in items], ["22", "20", "26"])
+
+    def test_parse_rating_keys_accepts_comma_separated_values(self):
+        self.assertEqual(tautulli_sync.parse_rating_keys(["5,6", "7", "6", "x"]), [5, 6, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from api.services import library_search, recommendation_query_service
+
+
+class RecordingCursor:
+    rowcount = 3
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed: list[tuple[str, tuple]] = []
+
+    def execute(self, sql, params=None):
+        statement = " ".join(sql.split())
+        self.executed.append((statement, params))
+        if self.fail_on and self.fail_on in statement:
+            raise RuntimeError("relation library_search does not exist")
+
+
+class LibrarySearchQueryTests(unittest.TestCase):
+    def test_prefix_tsquery_keeps_only_words(self):
+        self.assertEqual(library_search.prefix_tsquery("Blade Runner: 2049!"), "blade:* & runner:* & 2049:*")
+        self.assertEqual(library_search.prefix_tsquery("it's & | !x"), "it:* & s:* & x:*")
+        self.assertEqual(library_search.prefix_tsquery("  "), "")
+
+    def test_match_combines_full_text_and_trigram_titles(self):
+        sql = library_search.search_match_sql("ls")
+
+        self.assertIn("ls.document @@ to_tsquery('simple', %s)", sql)
+        self.assertIn("ls.title %% %s OR ls.show_title %% %s", sql)
+        self.assertEqual(library_search.search_params("Godfater"), ["godfater:*", "godfater", "godfater"])
+
+    def test_without_pg_trgm_search_uses_full_text_only(self):
+        class ExtensionCursor:
+            def execute(self, sql, params=None):
+                self.sql = sql
+
+            def fetchone(self):
+                return None
+
+        with patch.object(library_search, "_TRIGRAM_SEARCH", True), patch("builtins.print"):
+            self.assertFalse(library_search.detect_trigram_search(ExtensionCursor()))
+            match_sql = library_search.search_match_sql("ls")
+            rank_sql = library_search.search_rank_sql("ls")
+            params = library_search.search_params("Blade Run")
+
+        self.assertEqual(match_sql, "(ls.document @@ to_tsquery('simple', %s))")
+        self.assertNotIn("similarity", rank_sql)
+        self.assertEqual(params, ["blade:* & run:*"])
+        self.assertTrue(library_search._TRIGRAM_SEARCH)
+
+
+class LibrarySearchRefreshTests(unittest.TestCase):
+    def test_refresh_weights_fields_and_limits_to_keys(self):
+        cur = RecordingCursor()
+
+        refreshed = library_search.refresh_library_search(cur, [7, 3, 7])
+
+        sql, params = cur.executed[0]
+        self.assertEqual(refreshed, 3)
+        self.assertIn("setweight(to_tsvector('simple', COALESCE(m.title, '')), 'A')", sql)
+        self.assertIn("setweight(to_tsvector('simple', COALESCE(m.show_title, '')), 'B')", sql)
+        self.assertIn("WHERE m.rating_key = ANY(%s)", sql)
+        self.assertIn("ON CONFLICT (rating_key) DO UPDATE", sql)
+        self.assertEqual(params, ([3, 7],))
+
+    def test_refresh_missing_only_and_empty_keys(self):
+        cur = RecordingCursor()
+
+        self.assertEqual(library_search.refresh_library_search(cur, []), 0)
+        library_search.refresh_library_search(cur, missing_only=True)
+
+        self.assertEqual(len(cur.executed), 1)
+        self.assertIn("WHERE NOT EXISTS (SELECT 1 FROM public.library_search s2", cur.executed[0][0])
+
+    def test_safe_refresh_rolls_back_to_savepoint(self):
+        cur = RecordingCursor(fail_on="INSERT INTO public.library_search")
+
+        refreshed = library_search.safe_refresh_library_search(cur, [1])
+
+        self.assertEqual(refreshed, 0)
+        self.assertEqual(
+            [sql for sql, _params in cur.executed if "SAVEPOINT" in sql],
+            ["SAVEPOINT library_search_refresh", "ROLLBACK TO SAVEPOINT library_search_refresh"],
+        )
+
+
+class RecommendationSearchFilterTests(unittest.TestCase):
+    def test_recommendation_search_uses_library_index_and_themes(self):
+        params = ["user"]
+
+        sql = recommendation_query_service._append_library_search_filter(
+            "SELECT * FROM recs WHERE username = %s",
+            params,
+            "100% arrival",
+            ["recs.rating_key"],
+            like_columns=("recs.semantic_themes",),
+        )
+
+        self.assertIn("recs.rating_key IN (SELECT ls.rating_key FROM public.library_search ls WHERE", sql)
+        self.assertIn("recs.semantic_themes ILIKE %s ESCAPE E'\\\\'", sql)
+        self.assertEqual(
+            params,
+            ["user", "100:* & arrival:*", "100 arrival", "100 arrival", "%100\\% arrival%"],
+        )
+
+    def test_built_query_keeps_placeholders_and_params_aligned(self):
+        sql, params = recommendation_query_service._build_recommendations_query(
+            username="user",
+            view="shows",
+            show_rating_key=None,
+            season_rating_key=None,
+            search="breaking bad",
+            sort=None,
+            display_threshold=0.7,
+        )
+
+        self.assertEqual(sql.replace("%%", "").count("%s"), len(params))
+        self.assertIn("sr.show_rating_key IN (SELECT ls.rating_key", " ".join(sql.split()))
+
+
+if __name__ == "__main__":
+    unittest.main()
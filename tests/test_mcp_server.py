@@ -3,14 +3,12 @@ from __future__ import annotations
 import anyio
 import httpx
 import unittest
-from io import BytesIO
 from datetime import datetime
 from unittest.mock import patch
 
 from fastapi import FastAPI
 from mcp import ClientSession
 from mcp.client.streamable_http import streamable_http_client
-from PIL import Image
 
 from api.services import mcp_server
 from api.services.agent_tool_service import (
@@ -39,12 +37,6 @@ INITIALIZE_PAYLOAD = {
 }
 
 
-def _png_bytes() -> bytes:
-    buffer = BytesIO()
-    Image.new("RGB", (12, 18), color=(32, 64, 128)).save(buffer, format="PNG")
-    return buffer.getvalue()
-
-
 class MCPServerTests(unittest.TestCase):
     def setUp(self):
         self.http_app = FastAPI()
@@ -237,12 +229,9 @@ class MCPServerTests(unittest.TestCase):
                                     ):
                                         with patch.object(
                                             mcp_server,
-                                            "fetch_poster_image_for_rating_key",
-                                            return_value={
-                                                "content": _png_bytes(),
-                                                "content_type": "image/png",
-                                            },
-                                        ):
+                                            "get_agent_library_items",
+                                            return_value=[item_payload.model_copy(update={"has_poster": True})],
+                                        ), patch.object(mcp_server, "poster_proxy_configured", return_value=True):
                                             results = anyio.run(self._exercise_mcp_protocol)
 
         self.assertTrue(results["initialize"].serverInfo.name)
@@ -347,41 +336,53 @@ class MCPServerTests(unittest.TestCase):
     def test_build_poster_image_result_returns_not_found_when_poster_is_missing(self):
         with patch.object(
             mcp_server,
-            "get_agent_library_item",
-            return_value=LibraryItem(
-                rating_key=42,
-                title="Blade Runner 2049",
-                media_type="movie",
-            ),
-        ):
-            with patch.object(
-                mcp_server,
-                "fetch_poster_image_for_rating_key",
-                return_value=None,
-            ):
+            "get_agent_library_items",
+            return_value=[
+                LibraryItem(
+                    rating_key=42,
+                    title="Blade Runner 2049",
+                    media_type="movie",
+                    has_poster=False,
+                )
+            ],
+        ) as mock_items:
+            with patch.object(mcp_server, "poster_proxy_configured", return_value=True):
                 result = mcp_server.build_poster_image_result(42)
 
+        mock_items.assert_called_once_with(rating_keys=[42])
         self.assertFalse(result.isError)
         self.assertFalse(result.structuredContent["found"])
         self.assertEqual(result.structuredContent["title"], "Blade Runner 2049")
         self.assertEqual(result.content[0].type, "text")
         self.assertIn("Poster not found", result.content[0].text)
 
-    def test_build_poster_image_result_returns_tool_error_for_fetch_failure(self):
+    def test_build_poster_image_result_treats_unknown_or_failed_lookup_as_not_found(self):
+        for lookup in ({"return_value": []}, {"side_effect": RuntimeError("db down")}):
+            with self.subTest(lookup=lookup):
+                with patch.object(mcp_server, "get_agent_library_items", **lookup):
+                    with patch.object(mcp_server, "poster_proxy_configured", return_value=True):
+                        with patch.object(mcp_server, "build_poster_markup_payload") as mock_markup:
+                            result = mcp_server.build_poster_image_result(999)
+
+                mock_markup.assert_not_called()
+                self.assertFalse(result.isError)
+                self.assertFalse(result.structuredContent["found"])
+                self.assertIn("Poster not found for rating_key 999", result.content[0].text)
+
+    def test_build_poster_image_result_returns_tool_error_when_proxy_unconfigured(self):
         with patch.object(
             mcp_server,
-            "get_agent_library_item",
-            return_value=LibraryItem(
-                rating_key=42,
-                title="Blade Runner 2049",
-                media_type="movie",
-            ),
+            "get_agent_library_items",
+            return_value=[
+                LibraryItem(
+                    rating_key=42,
+                    title="Blade Runner 2049",
+                    media_type="movie",
+                    has_poster=True,
+                )
+            ],
         ):
-            with patch.object(
-                mcp_server,
-                "fetch_poster_image_for_rating_key",
-                side_effect=RuntimeError("Poster proxy is not configured."),
-            ):
+            with patch.object(mcp_server, "poster_proxy_configured", return_value=False):
                 result = mcp_server.build_poster_image_result(42)
 
         self.assertTrue(result.isError)
@@ -389,6 +390,30 @@ class MCPServerTests(unittest.TestCase):
         self.assertEqual(result.structuredContent["error"], "Poster proxy is not configured.")
         self.assertIn("Unable to fetch poster", result.content[0].text)
 
+    def test_build_poster_gallery_result_looks_up_missing_metadata_in_one_call(self):
+        with patch.object(
+            mcp_server,
+            "build_public_poster_url",
+            side_effect=lambda rating_key, width=None, thumb=False: (
+                f"https://plexintel.example.com/api/posters/{rating_key}?w={width}"
+            ),
+        ), patch.object(
+            mcp_server,
+            "get_agent_library_items",
+            return_value=[
+                LibraryItem(rating_key=7, title="Heat", media_type="movie"),
+                LibraryItem(rating_key=8, title="Ronin", media_type="movie"),
+            ],
+        ) as mock_items:
+            result = mcp_server.build_poster_gallery_result(
+                rating_keys=[7, 8],
+                items=[{"rating_key": 42, "title": "From", "media_type": "show"}],
+            )
+
+        mock_items.assert_called_once_with(rating_keys=[7, 8])
+        self.assertIn("### Heat", result.content[0].text)
+        self.assertIn("### Ronin", result.content[0].text)
+
     def test_mcp_returns_404_when_disabled(self):
         with patch.object(
             mcp_server,
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from fastapi import HTTPException
+
+from api.routes import model_admin_routes
+from api.services import feature_store, model_registry
+
+FEATURE_NAMES = ["emb_0", "emb_1", "watch_sim"]
+T0 = datetime(2026, 10, 18, 3, 0, tzinfo=timezone.utc)
+
+
+def write_model(path: Path, n_estimators: int) -> Path:
+    rng = np.random.default_rng(n_estimators)
+    X = pd.DataFrame(rng.random((60, 3)), columns=FEATURE_NAMES)
+    model = xgb.XGBClassifier(n_estimators=n_estimators, max_depth=2)
+    model.fit(X, (X["emb_0"] > 0.5).astype(int))
+    joblib.dump(model, path)
+    feature_store.FeatureSchema.from_feature_names(FEATURE_NAMES).save(feature_store.feature_schema_path(path))
+    return path
+
+
+class ModelRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.root = self.tmp / "registry"
+        self.model_path = self.tmp / "xgb_model.pkl"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def publish(self, n_estimators, minutes=0, **kwargs):
+        write_model(self.model_path, n_estimators)
+        return model_registry.publish_model(
+            self.model_path,
+            metadata={"training": {"training_mode": "full", "validation": {"macro_f1": 0.7}}},
+            root=self.root,
+            now=T0 + timedelta(minutes=minutes),
+            **kwargs,
+        )
+
+    def test_publish_copies_artifacts_and_moves_pointer(self):
+        first = self.publish(3)
+        second = self.publish(4, minutes=1)
+
+        pointer = model_registry.read_pointer(self.root)
+        self.assertEqual(pointer["version"], second.version)
+        self.assertEqual(pointer["previous"], first.version)
+        self.assertTrue(second.schema_path.is_file())
+        self.assertEqual(second.metadata["feature_count"], 3)
+        self.assertEqual(second.metadata["training"]["validation"]["macro_f1"], 0.7)
+        self.assertEqual([v.version for v in model_registry.list_versions(self.root)], [first.version, second.version])
+
+        rolled_back = model_registry.rollback(root=self.root)
+
+        self.assertEqual(rolled_back.version, first.version)
+        self.assertEqual(model_registry.read_pointer(self.root)["previous"], second.version)
+
+    def test_prune_keeps_current_and_previous(self):
+        versions = [self.publish(n, minutes=n, keep=None).version for n in range(2, 6)]
+        model_registry.set_current(versions[0], root=self.root)
+
+        removed = model_registry.prune_versions(1, root=self.root)
+
+        self.assertEqual(removed, versions[1:3])
+        self.assertEqual([v.version for v in model_registry.list_versions(self.root)], [versions[0], versions[3]])
+
+    def test_unknown_or_unsafe_versions_are_rejected(self):
+        self.publish(3)
+        for version in ("missing", "../registry", ".hidden", ""):
+            with self.assertRaises(model_registry.ModelRegistryError):
+                model_registry.get_version(version, self.root)
+
+    def test_server_loads_once_and_reloads_when_pointer_moves(self):
+        first = self.publish(3)
+        second = self.publish(5, minutes=1)
+        server = model_registry.ModelServer(root=self.root, legacy_model_path=None)
+
+        with patch("builtins.print"), patch("joblib.load", wraps=joblib.load) as load:
+            loaded = server.get()
+            again = server.get()
+            model_registry.set_current(first.version, root=self.root)
+            rolled_back = server.get()
+
+        self.assertIs(loaded, again)
+        self.assertEqual(loaded.version, second.version)
+        self.assertEqual(loaded.model_name, f"xgb_model@{second.version}")
+        self.assertEqual(loaded.booster.num_boosted_rounds(), 5)
+        self.assertEqual(rolled_back.booster.num_boosted_rounds(), 3)
+        self.assertEqual(load.call_count, 2)
+
+    def test_server_falls_back_to_legacy_model_file(self):
+        write_model(self.model_path, 3)
+        server = model_registry.ModelServer(root=self.root, legacy_model_path=self.model_path)
+
+        with patch("builtins.print"):
+            loaded = server.get()
+
+        self.assertEqual(loaded.model_name, "xgb_model")
+        self.assertEqual(loaded.feature_names, FEATURE_NAMES)
+        with self.assertRaises(model_registry.ModelRegistryError):
+            model_registry.ModelServer(root=self.root, legacy_model_path=None).get()
+
+    def test_use_model_file_ignores_the_registry_pointer(self):
+        self.publish(5)
+        pinned_path = write_model(self.tmp / "bench_model.pkl", 3)
+
+        with patch.object(model_registry, "_MODEL_SERVER", None), patch.dict(
+            "os.environ", {model_registry.MODEL_REGISTRY_DIR_ENV: str(self.root)}
+        ), patch("builtins.print"):
+            model_registry.use_model_file(pinned_path)
+            loaded = model_registry.get_model_server().get()
+
+        self.assertEqual(loaded.model_path, pinned_path.resolve())
+        self.assertEqual(loaded.booster.num_boosted_rounds(), 3)
+        with self.assertRaises(model_registry.ModelRegistryError):
+            model_registry.use_model_file(self.tmp / "missing.pkl")
+
+
+class ModelAdminRoutesTests(unittest.TestCase):
+    def test_activate_unknown_version_is_404_and_rollback_without_history_is_409(self):
+        admin = {"username": "admin", "is_admin": True}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with patch.dict("os.environ", {model_registry.MODEL_REGISTRY_DIR_ENV: tmp_dir}):
+                with self.assertRaises(HTTPException) as missing:
+                    model_admin_routes.admin_activate_model("20260101T000000Z-deadbeef", admin_user=admin)
+                with self.assertRaises(HTTPException) as no_history:
+                    model_admin_routes.admin_rollback_model(admin_user=admin)
+                listing = model_admin_routes.admin_list_models(admin_user=admin)
+
+        self.assertEqual(missing.exception.status_code, 404)
+        self.assertEqual(no_history.exception.status_code, 409)
+        self.assertEqual(listing["models"], [])
+        self.assertIsNone(listing["current"])
+
+
+if __name__ == "__main__":
+    unittest.main()
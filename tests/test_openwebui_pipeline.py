@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 import unittest
 
 from openwebui_pipelines.plexintel_recommendation_pipeline import Pipeline, PipelineHttpError
@@ -275,6 +276,76 @@ class OpenWebUIPipelineTests(unittest.TestCase):
         self.assertIn("`jmnovak` (Jason)", response)
         self.assertIn("`other` (Other User)", response)
 
+    def test_users_list_is_reused_between_chat_turns(self):
+        pipe = FakePipeline()
+
+        pipe.pipe("List Plex users")
+        pipe.pipe("Show watch history for Jason limit 1")
+        pipe.valves.USERS_CACHE_TTL_S = 0
+        pipe.pipe("List Plex users")
+
+        self.assertEqual(sum(1 for call in pipe.calls if call[1] == "/api/agent/users"), 2)
+
+    def test_gallery_and_narration_run_concurrently_and_are_timed(self):
+        both_started = threading.Barrier(2, timeout=5)
+
+        class ConcurrentPipeline(FakePipeline):
+            def _plex_post(self, path, payload):
+                both_started.wait()
+                return super()._plex_post(path, payload)
+
+            def _ollama_post(self, path, payload):
+                both_started.wait()
+                return {"message": {"content": "Both picks lean cerebral."}}
+
+        pipe = ConcurrentPipeline()
+        pipe.valves.USER_ALIASES_JSON = '{"unknown@example.com": "jmnovak"}'
+        pipe.valves.ENABLE_GEMMA_NARRATION = True
+        pipe.valves.SHOW_TIMINGS = True
+
+        response = pipe.pipe(
+            "Show me top 2 movie recommendations for me",
+            body={"user": {"email": "unknown@example.com"}},
+        )
+
+        self.assertIn("![Poster for Arrival]", response)
+        self.assertIn("Both picks lean cerebral.", response)
+        timings_line = response.splitlines()[-1]
+        for step in ("users=", "recommendations=", "gallery=", "narration=", "total="):
+            self.assertIn(step, timings_line)
+
+    def test_http_calls_reuse_one_pooled_session(self):
+        class FakeResponse:
+            status_code = 200
+            text = "{}"
+
+            def json(self):
+                return {"items": []}
+
+        class FakeSession:
+            def __init__(self):
+                self.requests = []
+
+            def request(self, method, url, **kwargs):
+                self.requests.append((method, url, kwargs["timeout"]))
+                return FakeResponse()
+
+        pipe = Pipeline()
+        session = FakeSession()
+        pipe._session = session
+
+        pipe._plex_get("/api/agent/users", params={"limit": 1})
+        pipe._plex_post("/api/agent/poster-gallery", {"items": []})
+
+        self.assertEqual(
+            [request[:2] for request in session.requests],
+            [
+                ("GET", "http://192.168.1.9:8489/api/agent/users"),
+                ("POST", "http://192.168.1.9:8489/api/agent/poster-gallery"),
+            ],
+        )
+        self.assertIs(pipe._http_session(), session)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from api.services import pipeline_fingerprint_service
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+
+    def fetchone(self):
+        return self.conn.fetchone_results.pop(0)
+
+
+class FakeConnection:
+    def __init__(self, fetchone_results):
+        self.fetchone_results = list(fetchone_results)
+        self.executed = []
+        self.commit_count = 0
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commit_count += 1
+
+
+def _user_embedding_stage_rows(watch_count=10):
+    return [
+        {"present": True},
+        {"row_count": watch_count, "max_id": 99, "max_modified": None},
+        {"present": True},
+        {"row_count": 5, "max_id": 500, "max_modified": None},
+        {"present": True},
+        {"row_count": 5, "max_id": 500},
+    ]
+
+
+class StageFingerprintTests(unittest.TestCase):
+    def test_external_stage_has_no_fingerprint(self):
+        conn = FakeConnection([])
+
+        self.assertIsNone(pipeline_fingerprint_service.compute_stage_fingerprint(conn, "tautulli_incremental"))
+        self.assertEqual(conn.executed, [])
+
+    def test_fingerprint_is_stable_and_tracks_source_changes(self):
+        settings = {"user_embeddings.engagement_threshold": 0.5}
+
+        first = pipeline_fingerprint_service.compute_stage_fingerprint(
+            FakeConnection(_user_embedding_stage_rows()),
+            "user_embeddings",
+            settings=settings,
+        )
+        again = pipeline_fingerprint_service.compute_stage_fingerprint(
+            FakeConnection(_user_embedding_stage_rows()),
+            "user_embeddings",
+            settings=settings,
+        )
+        changed = pipeline_fingerprint_service.compute_stage_fingerprint(
+            FakeConnection(_user_embedding_stage_rows(watch_count=11)),
+            "user_embeddings",
+            settings=settings,
+        )
+        retuned = pipeline_fingerprint_service.compute_stage_fingerprint(
+            FakeConnection(_user_embedding_stage_rows()),
+            "user_embeddings",
+            settings={"user_embeddings.engagement_threshold": 0.6},
+        )
+
+        self.assertEqual(first["digest"], again["digest"])
+        self.assertNotEqual(first["digest"], changed["digest"])
+        self.assertNotEqual(first["digest"], retuned["digest"])
+        self.assertEqual(first["detail"]["tables"]["watch_history"]["row_count"], 10)
+        self.assertIn("build_user_embeddings.py", first["detail"]["scripts"])
+
+    def test_missing_source_table_is_recorded_without_querying_it(self):
+        rows = [{"present": False}, {"present": True}, {"row_count": 1, "max_id": 1, "max_modified": None}]
+        rows += [{"present": True}, {"row_count": 1, "max_id": 1}]
+        conn = FakeConnection(rows)
+
+        fingerprint = pipeline_fingerprint_service.compute_stage_fingerprint(
+            conn,
+            "user_embeddings",
+            settings={},
+        )
+
+        self.assertEqual(fingerprint["detail"]["tables"]["watch_history"], {"present": False})
+        self.assertFalse(any("FROM public.watch_history" in sql for sql, _params in conn.executed))
+
+    def test_missing_model_output_forces_training(self):
+        with patch.object(
+            pipeline_fingerprint_service,
+            "STAGE_INPUTS",
+            {
+                "train_model": pipeline_fingerprint_service.StageInputs(
+                    required_outputs=(pipeline_fingerprint_service.REPO_ROOT / "missing_model.pkl",),
+                )
+            },
+        ):
+            self.assertIsNone(
+                pipeline_fingerprint_service.compute_stage_fingerprint(FakeConnection([]), "train_model")
+            )
+
+    def test_reusable_stage_requires_matching_latest_fingerprint(self):
+        row = {"stage_id": 4, "run_id": 2, "status": "success", "input_fingerprint": "abc", "completed_at": None}
+
+        matched = pipeline_fingerprint_service.find_reusable_stage_run(
+            FakeConnection([row]),
+            stage_key="score_model",
+            digest="abc",
+        )
+        mismatched = pipeline_fingerprint_service.find_reusable_stage_run(
+            FakeConnection([row]),
+            stage_key="score_model",
+            digest="def",
+        )
+
+        self.assertEqual(matched["run_id"], 2)
+        self.assertIsNone(mismatched)
+
+
+if __name__ == "__main__":
+    unittest.main()
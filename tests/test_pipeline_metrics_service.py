@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from api.services import pipeline_metrics_service, stage_metrics
+
+
+class StageProfilerTests(unittest.TestCase):
+    def test_profile_stage_writes_phases_rows_and_usage(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "metrics.json")
+            with patch.dict("os.environ", {stage_metrics.STAGE_METRICS_PATH_ENV: path}):
+                with stage_metrics.profile_stage():
+                    with stage_metrics.stage_phase("predict"):
+                        sum(range(1000))
+                    with stage_metrics.stage_phase("predict"):
+                        pass
+                    stage_metrics.record_rows(read=10, written=4)
+
+            payload = stage_metrics.read_stage_metrics(path)
+
+        self.assertEqual(payload["rows_read"], 10)
+        self.assertEqual(payload["rows_written"], 4)
+        self.assertEqual(payload["phases"]["predict"]["calls"], 2)
+        self.assertGreater(payload["peak_rss_kb"], 0)
+        self.assertGreaterEqual(payload["cpu_user_seconds"], 0)
+
+    def test_helpers_are_noops_outside_a_profiled_stage(self):
+        with stage_metrics.stage_phase("fetch unwatched"):
+            stage_metrics.record_rows(read=5)
+
+        with tempfile.NamedTemporaryFile() as empty:
+            self.assertIsNone(stage_metrics.read_stage_metrics(empty.name))
+
+
+class StageMetricComparisonTests(unittest.TestCase):
+    def test_compare_against_mean_of_previous_runs(self):
+        current = {
+            "wall_seconds": 30.0,
+            "peak_rss_kb": 2000,
+            "rows_read": None,
+            "phases": {"predict": {"seconds": 12.0, "calls": 3}, "shap": {"seconds": 6.0, "calls": 3}},
+        }
+        history = [
+            {"run_id": 9, "wall_seconds": 20.0, "peak_rss_kb": 1000, "phases": {"predict": {"seconds": 4.0}}},
+            {"run_id": 8, "wall_seconds": 10.0, "peak_rss_kb": 1000, "phases": {"predict": {"seconds": 6.0}}},
+        ]
+
+        comparison = pipeline_metrics_service.compare_stage_metrics(current, history)
+
+        self.assertEqual(comparison["baseline_run_ids"], [9, 8])
+        self.assertEqual(comparison["metrics"]["wall_seconds"]["baseline"], 15.0)
+        self.assertEqual(comparison["metrics"]["wall_seconds"]["delta_pct"], 100.0)
+        self.assertEqual(comparison["metrics"]["peak_rss_kb"]["delta"], 1000.0)
+        self.assertIsNone(comparison["metrics"]["rows_read"]["delta"])
+        self.assertEqual(comparison["phases"]["predict"]["baseline"], 5.0)
+        self.assertIsNone(comparison["phases"]["shap"]["baseline"])
+
+    def test_record_stage_metrics_upserts_reported_profile(self):
+        executed = []
+
+        class FakeCursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc, tb):
+                return False
+
+            def execute(self, sql, params=None):
+                executed.append((sql, params))
+
+        class FakeConnection:
+            committed = False
+
+            def cursor(self):
+                return FakeCursor()
+
+            def commit(self):
+                self.committed = True
+
+        conn = FakeConnection()
+        pipeline_metrics_service.record_stage_metrics(
+            conn,
+            run_id=3,
+            stage_id=7,
+            stage_key="score_model",
+            status="success",
+            wall_seconds=12.5,
+            metrics={"cpu_user_seconds": 9.0, "rows_written": 40, "phases": {"write": {"seconds": 1.0, "calls": 1}}},
+        )
+
+        sql, params = executed[0]
+        self.assertIn("ON CONFLICT (stage_id)", sql)
+        self.assertEqual(params[:6], (7, 3, "score_model", "success", 12.5, 9.0))
+        self.assertEqual(params[9], 40)
+        self.assertEqual(json.loads(json.dumps(params[10].adapted)), {"write": {"seconds": 1.0, "calls": 1}})
+        self.assertTrue(conn.committed)
+
+
+if __name__ == "__main__":
+    unittest.main()
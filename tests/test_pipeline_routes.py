@@ -46,6 +46,21 @@ class PipelineAdminRoutesTests(unittest.TestCase):
                 pipeline_admin_routes.admin_get_pipeline_run(run_id=999, admin_user=_admin_user())
             self.assertEqual(ctx.exception.status_code, 404)
 
+    def test_run_metrics_passes_compare_window(self):
+        payload = {"run_id": 5, "status": "success", "compare_runs": 3, "stages": []}
+        with patch.object(pipeline_admin_routes, "get_pipeline_run_metrics", return_value=payload) as mock_metrics:
+            resp = pipeline_admin_routes.admin_get_pipeline_run_metrics(run_id=5, compare=3, admin_user=_admin_user())
+
+        mock_metrics.assert_called_once_with(5, compare_runs=3)
+        self.assertEqual(resp["compare_runs"], 3)
+        self.assertEqual(resp["requested_by"], "admin")
+
+    def test_run_metrics_not_found(self):
+        with patch.object(pipeline_admin_routes, "get_pipeline_run_metrics", return_value=None):
+            with self.assertRaises(HTTPException) as ctx:
+                pipeline_admin_routes.admin_get_pipeline_run_metrics(run_id=999, compare=5, admin_user=_admin_user())
+        self.assertEqual(ctx.exception.status_code, 404)
+
     @patch.object(pipeline_admin_routes.threading, "Thread")
     def test_trigger_returns_accepted(self, mock_thread):
         mock_instance = mock_thread.return_value
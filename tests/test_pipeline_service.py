@@ -11,6 +11,23 @@ from zoneinfo import ZoneInfo
 from api.services import pipeline_service
 
 
+_LOG_DIR = None
+_LOG_ENV = None
+
+
+def setUpModule():
+    # Keep test runs from appending to the repo's logs/ directory.
+    global _LOG_DIR, _LOG_ENV
+    _LOG_DIR = tempfile.TemporaryDirectory()
+    _LOG_ENV = patch.dict("os.environ", {"PIPELINE_LOG_PATH": str(Path(_LOG_DIR.name) / "pipeline.log")})
+    _LOG_ENV.start()
+
+
+def tearDownModule():
+    _LOG_ENV.stop()
+    _LOG_DIR.cleanup()
+
+
 class FakeCursor:
     def __init__(self, conn):
         self.conn = conn
@@ -324,6 +341,84 @@ class PipelineRunTests(unittest.TestCase):
             )
         )
 
+    def test_run_pipeline_skips_stage_with_unchanged_fingerprint(self):
+        conn = FakeConnection(
+            [
+                {"acquired": True},
+                {"run_id": 123},
+                {"cancel_requested": False},
+                {"status": "success"},
+            ]
+        )
+        fingerprint = {"digest": "a" * 64, "detail": {"stage_key": "score_model"}}
+
+        with patch.object(pipeline_service, "connect_db", return_value=conn):
+            with patch.object(pipeline_service, "get_setting_value", return_value=True):
+                with patch.object(
+                    pipeline_service,
+                    "build_pipeline_stages",
+                    return_value=[("score_model", ["python", "score_model.py", "--all-users"])],
+                ):
+                    with patch.object(
+                        pipeline_service,
+                        "_resolve_stage_fingerprint",
+                        return_value=(fingerprint, {"run_id": 99, "stage_id": 7}),
+                    ):
+                        with patch.object(pipeline_service, "_run_stage_process") as mock_run:
+                            out = pipeline_service.run_pipeline(
+                                delivery_type="scheduled",
+                                triggered_by="app-scheduler",
+                                schedule_key=None,
+                            )
+
+        self.assertEqual(out, {"status": "success", "run_id": 123})
+        mock_run.assert_not_called()
+        skipped = [params for sql, params in conn.executed if "'skipped'" in sql]
+        self.assertEqual(len(skipped), 1)
+        self.assertEqual(skipped[0][1], "score_model")
+        self.assertIn("unchanged since run 99", skipped[0][2])
+        self.assertEqual(skipped[0][3], "a" * 64)
+
+    def test_run_pipeline_force_runs_stage_and_records_fingerprint(self):
+        conn = FakeConnection(
+            [
+                {"acquired": True},
+                {"run_id": 123},
+                {"cancel_requested": False},
+                {"stage_id": 456},
+                {"status": "success"},
+            ]
+        )
+        fingerprint = {"digest": "b" * 64, "detail": {"stage_key": "score_model"}}
+        completed = pipeline_service.StageProcessResult(returncode=0, stdout="", stderr="")
+
+        with patch.object(pipeline_service, "connect_db", return_value=conn):
+            with patch.object(
+                pipeline_service,
+                "build_pipeline_stages",
+                return_value=[("score_model", ["python", "score_model.py", "--all-users"])],
+            ):
+                with patch.object(
+                    pipeline_service,
+                    "_resolve_stage_fingerprint",
+                    return_value=(fingerprint, None),
+                ) as mock_resolve:
+                    with patch.object(pipeline_service, "_run_stage_process", return_value=completed) as mock_run:
+                        out = pipeline_service.run_pipeline(
+                            delivery_type="manual",
+                            triggered_by="admin",
+                            schedule_key=None,
+                            force=True,
+                        )
+
+        self.assertEqual(out, {"status": "success", "run_id": 123})
+        mock_run.assert_called_once()
+        self.assertFalse(mock_resolve.call_args.kwargs["skip_unchanged"])
+        metrics_params = [params for sql, params in conn.executed if "pipeline_stage_metrics" in sql]
+        self.assertEqual(metrics_params[0][:4], (456, 123, "score_model", "success"))
+        started = [params for sql, params in conn.executed if "VALUES (%s, %s, 'started', now(), %s, %s)" in sql]
+        self.assertEqual(started[0][2], "b" * 64)
+
     def test_run_stage_process_sends_term_then_kill_on_cancel(self):
         class FakeProc:
             pid = 987
@@ -369,6 +464,82 @@ class PipelineRunTests(unittest.TestCase):
             [(987, signal.SIGTERM), (987, signal.SIGKILL)],
         )
 
+    def test_run_stage_process_launches_through_warm_worker(self):
+        class FakeWarmProc:
+            pid = 654
+            returncode = None
+            startup_saved_seconds = 3.5
+
+            def poll(self):
+                self.returncode = 0
+                return self.returncode
+
+            def wait(self):
+                return self.returncode
+
+        launches: list[dict] = []
+
+        class FakeWorker:
+            def launch(self, argv, *, env, stdout_path, stderr_path, cwd=None):
+                Path(stdout_path).write_text("warm stdout\n", encoding="utf-8")
+                launches.append({"argv": argv, "env": env})
+                return FakeWarmProc()
+
+        conn = FakeConnection([])
+
+        with patch.object(pipeline_service, "get_warm_stage_worker", return_value=FakeWorker()):
+            with patch.object(pipeline_service.subprocess, "Popen") as mock_popen:
+                result = pipeline_service._run_stage_process(
+                    conn=conn,
+                    run_id=123,
+                    stage_key="stage_one",
+                    argv=["python", "stage.py"],
+                    env={"A": "1"},
+                    poll_seconds=0,
+                    use_warm_worker=True,
+                )
+
+        mock_popen.assert_not_called()
+        self.assertEqual(len(launches), 1)
+        self.assertEqual(launches[0]["argv"], ["python", "stage.py"])
+        self.assertEqual(launches[0]["env"]["A"], "1")
+        self.assertIn(pipeline_service.STAGE_METRICS_PATH_ENV, launches[0]["env"])
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, "warm stdout\n")
+        self.assertEqual(result.startup_saved_seconds, 3.5)
+        heartbeat_params = [params for sql, params in conn.executed if "current_pid" in sql]
+        self.assertIn(654, heartbeat_params[0])
+
+    def test_run_stage_process_falls_back_to_subprocess_when_worker_unavailable(self):
+        class FakeProc:
+            pid = 321
+            returncode = 0
+
+            def poll(self):
+                return self.returncode
+
+        conn = FakeConnection([])
+
+        with patch.object(
+            pipeline_service,
+            "get_warm_stage_worker",
+            side_effect=pipeline_service.WarmStageWorkerError("no fork"),
+        ):
+            with patch.object(pipeline_service.subprocess, "Popen", return_value=FakeProc()) as mock_popen:
+                result = pipeline_service._run_stage_process(
+                    conn=conn,
+                    run_id=123,
+                    stage_key="stage_one",
+                    argv=["python", "stage.py"],
+                    env={},
+                    poll_seconds=0,
+                    use_warm_worker=True,
+                )
+
+        mock_popen.assert_called_once()
+        self.assertEqual(result.returncode, 0)
+        self.assertIsNone(result.startup_saved_seconds)
+
     def test_run_scheduled_pipeline_treats_cancelled_schedule_as_terminal(self):
         conn = FakeConnection([{"exists": 1}], fetchall_results=[[]])
 
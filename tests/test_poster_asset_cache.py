@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from api.services import poster_asset_cache
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        statement = " ".join(sql.split())
+        self.conn.statements.append((statement, params))
+        if "FROM public.library" in statement:
+            self._rows = [row for row in self.conn.library if row["rating_key"] in params[0]]
+        elif "FROM public.poster_asset_cache" in statement:
+            self._rows = list(self.conn.cached)
+        else:
+            self._rows = []
+
+    def fetchall(self):
+        return self._rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeConn:
+    def __init__(self, library, cached=()):
+        self.library = library
+        self.cached = list(cached)
+        self.statements: list[tuple[str, object]] = []
+        self.commits = 0
+
+    def cursor(self, *_, **__):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        return None
+
+    def close(self):
+        return None
+
+
+def library_row(rating_key, media_type="movie", thumb=None, parent_thumb=None):
+    return {
+        "rating_key": rating_key,
+        "media_type": media_type,
+        "thumb_path": thumb,
+        "parent_thumb_path": parent_thumb,
+        "grandparent_thumb_path": None,
+    }
+
+
+class FetchOptimizedPostersTests(unittest.TestCase):
+    def test_fetches_each_missing_path_once_and_stores_results(self):
+        conn = FakeConn(
+            library=[
+                library_row(1, thumb="/library/metadata/1/thumb/100"),
+                library_row(2, thumb="/library/metadata/2/thumb/200"),
+                library_row(3, "episode", thumb="/e3", parent_thumb="/library/metadata/9/thumb/900"),
+                library_row(4, "episode", thumb="/e4", parent_thumb="/library/metadata/9/thumb/900"),
+            ],
+            cached=[
+                {"rating_key": 1, "poster_path": "/library/metadata/1/thumb/100", "content": memoryview(b"hit"), "content_type": "image/jpeg"},
+                {"rating_key": 2, "poster_path": "/library/metadata/2/thumb/old", "content": b"stale", "content_type": "image/jpeg"},
+            ],
+        )
+        fetched_paths: list[str] = []
+        stored: list[list] = []
+
+        def fake_fetch(path):
+            fetched_paths.append(path)
+            return SimpleNamespace(content=path.encode(), headers={"Content-Type": "image/png"})
+
+        with patch.object(poster_asset_cache, "connect_db", return_value=conn), patch.object(
+            poster_asset_cache, "poster_proxy_configured", return_value=True
+        ), patch.object(poster_asset_cache, "fetch_tautulli_image", side_effect=fake_fetch), patch.object(
+            poster_asset_cache, "store_cached_posters", side_effect=lambda _cur, _variant, entries: stored.append(entries)
+        ):
+            payloads, stats = poster_asset_cache.fetch_optimized_posters(
+                [1, 2, 3, 4, 4, 5],
+                variant="digest",
+                optimize=lambda content, content_type: {"content": content.upper(), "content_type": "image/jpeg"},
+            )
+
+        self.assertEqual(payloads[1]["content"], b"hit")
+        self.assertEqual(payloads[3], payloads[4])
+        self.assertIsNone(payloads[5])
+        self.assertEqual(sorted(fetched_paths), ["/library/metadata/2/thumb/200", "/library/metadata/9/thumb/900"])
+        self.assertEqual(sorted(entry[0] for entry in stored[0]), [2, 3, 4])
+        self.assertEqual(stats, {"unique": 5, "cache_hits": 1, "fetched": 2, "unavailable": 1})
+
+    def test_unconfigured_proxy_serves_only_cached_posters(self):
+        conn = FakeConn(library=[library_row(1, thumb="/t1")])
+
+        with patch.object(poster_asset_cache, "connect_db", return_value=conn), patch.object(
+            poster_asset_cache, "poster_proxy_configured", return_value=False
+        ), patch.object(poster_asset_cache, "fetch_tautulli_image") as mock_fetch:
+            payloads, stats = poster_asset_cache.fetch_optimized_posters([1], variant="digest", optimize=lambda c, t: None)
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(payloads, {1: None})
+        self.assertEqual(stats["fetched"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ import unittest
 from unittest.mock import patch
 
 from api.routes import public_recommendation_routes
+from api.services import response_cache
 
 
 class FakeCursor:
@@ -36,7 +37,9 @@ class PublicRecommendationRouteTests(unittest.TestCase):
     def test_public_recommendations_filter_suppressing_feedback(self):
         conn = FakeConnection()
 
-        with patch.object(public_recommendation_routes, "connect_db", return_value=conn):
+        with patch.object(public_recommendation_routes, "connect_db", return_value=conn), patch.object(
+            public_recommendation_routes, "response_cache_enabled", return_value=False
+        ):
             response = public_recommendation_routes.fetch_recommendations(
                 "jmnovak",
                 genre="Action",
@@ -56,7 +59,68 @@ class PublicRecommendationRouteTests(unittest.TestCase):
             self.assertIn("ELSE COALESCE(lf.suppress, FALSE)", sql)
 
         self.assertEqual(count_params, ("jmnovak", "jmnovak", "%Action%", "movie", 0.70))
-        self.assertEqual(data_params, ("jmnovak", "jmnovak", "%Action%", "movie", 0.70, 10, 10))
+        self.assertEqual(data_params, ("jmnovak", "jmnovak", "%Action%", "movie", 0.70, 11, 10))
+        self.assertIn("ORDER BY recs.predicted_probability DESC NULLS LAST, recs.rating_key ASC", data_sql)
+        self.assertIsNone(response["next_cursor"])
+
+    def test_public_recommendations_seek_past_cursor(self):
+        conn = FakeConnection()
+        cursor = public_recommendation_routes.encode_page_cursor(
+            {"predicted_probability": 0.9, "rating_key": 42},
+            public_recommendation_routes.PUBLIC_SORT_KEYS,
+        )
+
+        with patch.object(public_recommendation_routes, "connect_db", return_value=conn), patch.object(
+            public_recommendation_routes, "response_cache_enabled", return_value=False
+        ):
+            public_recommendation_routes.fetch_recommendations(
+                "jmnovak",
+                genre=None,
+                media_type=None,
+                score_threshold=None,
+                page=5,
+                page_size=10,
+                cursor=cursor,
+            )
+
+        count_sql, count_params = conn.cursor_obj.executed[0]
+        data_sql, data_params = conn.cursor_obj.executed[1]
+        self.assertNotIn("recs.rating_key >", count_sql)
+        self.assertIn("(recs.predicted_probability < %s OR recs.predicted_probability IS NULL)", data_sql)
+        self.assertIn("recs.predicted_probability = %s AND (recs.rating_key > %s", data_sql)
+        self.assertEqual(count_params, ("jmnovak", "jmnovak"))
+        self.assertEqual(data_params, ("jmnovak", "jmnovak", 0.9, 0.9, 42, 11, 0))
+
+    def test_include_total_false_pages_with_one_query(self):
+        conn = FakeConnection()
+
+        with patch.object(public_recommendation_routes, "connect_db", return_value=conn):
+            response = public_recommendation_routes.fetch_recommendations(
+                "jmnovak", None, None, None, page=1, page_size=10, include_total=False
+            )
+
+        self.assertEqual(len(conn.cursor_obj.executed), 1)
+        self.assertNotIn("COUNT(*)", conn.cursor_obj.executed[0][0])
+        self.assertIsNone(response["total_results"])
+        self.assertIsNone(response["total_pages"])
+
+    def test_total_is_counted_once_per_filter_and_version(self):
+        cache = response_cache.LRUResponseCache(max_bytes=100_000)
+        connections = [FakeConnection() for _ in range(2)]
+
+        for conn in connections:
+            with patch.object(public_recommendation_routes, "connect_db", return_value=conn), patch.object(
+                public_recommendation_routes, "response_cache_enabled", return_value=True
+            ), patch.object(public_recommendation_routes, "get_response_cache", return_value=cache):
+                public_recommendation_routes.fetch_recommendations(
+                    "jmnovak", "Action", None, None, page=2, page_size=10
+                )
+
+        first_sql = [sql for sql, _params in connections[0].cursor_obj.executed]
+        second_sql = [sql for sql, _params in connections[1].cursor_obj.executed]
+        self.assertTrue(any("SELECT COUNT(*)" in sql for sql in first_sql))
+        self.assertFalse(any("SELECT COUNT(*)" in sql for sql in second_sql))
+        self.assertIn("response_cache_versions", second_sql[0])
 
 
 if __name__ == "__main__":
@@ -3,7 +3,10 @@ from __future__ import annotations
 import unittest
 from unittest.mock import patch
 
+from fastapi import HTTPException
+
 from api.routes import recommendation_routes
+from api.services import recommendation_query_service
 from api.services.recommendation_query_service import _build_recommendations_query
 
 
@@ -78,6 +81,60 @@ class RecommendationPagingTests(unittest.TestCase):
             "predicted_probability DESC NULLS LAST, rating_key ASC",
         )
 
+    def test_cursor_round_trips_and_is_bound_to_the_sort(self):
+        keys = recommendation_query_service._sort_keys(["title:asc"])
+        cursor = recommendation_query_service.encode_page_cursor(
+            {"title": "Alien", "predicted_probability": 0.91, "rating_key": 7, "year": 1979},
+            keys,
+        )
+
+        values = recommendation_query_service.decode_page_cursor(cursor, keys)
+
+        self.assertEqual(keys, [("title", "asc"), ("predicted_probability", "desc"), ("rating_key", "asc")])
+        self.assertEqual(values, ["Alien", 0.91, 7])
+        for bad_cursor, other_keys in (
+            (cursor, recommendation_query_service._sort_keys(["year:desc"])),
+            ("not-a-cursor!", keys),
+        ):
+            with self.subTest(cursor=bad_cursor), self.assertRaises(HTTPException) as raised:
+                recommendation_query_service.decode_page_cursor(bad_cursor, other_keys)
+            self.assertEqual(raised.exception.status_code, 400)
+
+    def test_keyset_paging_wraps_query_and_seeks_past_cursor(self):
+        sort = ["year:desc"]
+        keys = recommendation_query_service._sort_keys(sort)
+        cursor = recommendation_query_service.encode_page_cursor(
+            {"year": None, "predicted_probability": 0.8, "rating_key": 12},
+            keys,
+        )
+        params = ["member"]
+        base_sql = "SELECT * FROM recs WHERE username = %s" + recommendation_routes._build_order_clause(sort)
+
+        sql = recommendation_routes._append_paging(base_sql, params, limit=50, offset=0, cursor=cursor, sort=sort)
+
+        self.assertEqual(
+            sql,
+            "SELECT * FROM (SELECT * FROM recs WHERE username = %s) AS keyset_page WHERE ("
+            "(year IS NULL AND (predicted_probability < %s OR predicted_probability IS NULL))"
+            " OR (year IS NULL AND predicted_probability = %s AND (rating_key > %s OR rating_key IS NULL)))"
+            " ORDER BY year DESC NULLS LAST, predicted_probability DESC NULLS LAST, rating_key ASC LIMIT %s",
+        )
+        self.assertEqual(params, ["member", 0.8, 0.8, 12, 51])
+        self.assertNotIn("OFFSET", sql)
+
+    def test_next_cursor_points_after_last_row_only_when_more_rows_exist(self):
+        rows = [{"rating_key": 1, "predicted_probability": 0.9}, {"rating_key": 2, "predicted_probability": 0.8}]
+
+        next_cursor = recommendation_routes._next_page_cursor(rows, True, None)
+
+        self.assertIsNone(recommendation_routes._next_page_cursor(rows, False, None))
+        self.assertEqual(
+            recommendation_query_service.decode_page_cursor(
+                next_cursor, recommendation_query_service._sort_keys(None)
+            ),
+            [0.8, 2],
+        )
+
     def test_search_filter_escapes_like_wildcards(self):
         params = ["user"]
 
@@ -173,7 +230,9 @@ class RecommendationPagingTests(unittest.TestCase):
 
         conn = FakeConn()
 
-        with patch.object(recommendation_routes, "connect_db", return_value=conn):
+        with patch.object(recommendation_routes, "connect_db", return_value=conn), patch.object(
+            recommendation_routes, "response_cache_enabled", return_value=False
+        ):
             with patch.object(recommendation_routes, "register_vector"):
                 with patch.object(recommendation_routes, "get_plex_username", return_value="member"):
                     recommendation_routes.get_recommendations(
@@ -238,7 +297,9 @@ class RecommendationPagingTests(unittest.TestCase):
 
         conn = FakeConn()
 
-        with patch.object(recommendation_routes, "connect_db", return_value=conn):
+        with patch.object(recommendation_routes, "connect_db", return_value=conn), patch.object(
+            recommendation_routes, "response_cache_enabled", return_value=False
+        ):
             with patch.object(recommendation_routes, "register_vector"):
                 with patch.object(recommendation_routes, "get_plex_username", return_value="member"):
                     recommendation_routes.get_recommendations(
@@ -302,7 +363,9 @@ class RecommendationPagingTests(unittest.TestCase):
 
         conn = FakeConn()
 
-        with patch.object(recommendation_routes, "connect_db", return_value=conn):
+        with patch.object(recommendation_routes, "connect_db", return_value=conn), patch.object(
+            recommendation_routes, "response_cache_enabled", return_value=False
+        ):
             with patch.object(recommendation_routes, "register_vector"):
                 with patch.object(recommendation_routes, "get_plex_username", return_value="member"):
                     recommendation_routes.get_recommendations(
@@ -410,7 +473,9 @@ class ScoreRangeFilterTests(unittest.TestCase):
         }
         defaults.update(kwargs)
 
-        with patch.object(recommendation_routes, "connect_db", return_value=conn):
+        with patch.object(recommendation_routes, "connect_db", return_value=conn), patch.object(
+            recommendation_routes, "response_cache_enabled", return_value=False
+        ):
             with patch.object(recommendation_routes, "register_vector"):
                 with patch.object(recommendation_routes, "get_plex_username", return_value="member"):
                     recommendation_routes.get_recommendations(FakeRequest(), **defaults)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import io
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import score_model
+from api.services import feature_store, rescoring_service
+
+
+class RescoreDebouncerTests(unittest.TestCase):
+    def test_burst_of_requests_runs_once_with_merged_reasons(self):
+        runs: list[str] = []
+        debouncer = rescoring_service.RescoreDebouncer(runs.append, delay=0.05)
+
+        with patch("builtins.print"):
+            for reason in ("feedback", "feedback", "bulk"):
+                debouncer.request("alice", reason)
+            self.assertEqual(debouncer.status("alice")["state"], "scheduled")
+            self.assertTrue(debouncer.wait_idle(timeout=5))
+
+        status = debouncer.status("alice")
+        self.assertEqual(runs, ["alice"])
+        self.assertEqual(status["state"], "idle")
+        self.assertEqual(status["last_run"]["status"], "success")
+        self.assertEqual(status["last_run"]["reasons"], ["feedback", "bulk"])
+
+    def test_request_during_a_run_schedules_another_run(self):
+        started = threading.Event()
+        release = threading.Event()
+        runs: list[str] = []
+
+        def run(username):
+            runs.append(username)
+            started.set()
+            release.wait(5)
+
+        debouncer = rescoring_service.RescoreDebouncer(run, delay=0)
+        with patch("builtins.print"):
+            debouncer.request("bob")
+            self.assertTrue(started.wait(5))
+            self.assertEqual(debouncer.status("bob")["state"], "running")
+            debouncer.request("bob")
+            release.set()
+            self.assertTrue(debouncer.wait_idle(timeout=5))
+
+        self.assertEqual(runs, ["bob", "bob"])
+
+    def test_failures_are_recorded_not_raised(self):
+        def run(username):
+            raise RuntimeError("no user embedding")
+
+        debouncer = rescoring_service.RescoreDebouncer(run, delay=0)
+        with patch("builtins.print"), patch("traceback.print_exc"):
+            debouncer.request("carol")
+            self.assertTrue(debouncer.wait_idle(timeout=5))
+
+        self.assertEqual(debouncer.status("carol")["last_run"]["status"], "failed")
+        self.assertIn("no user embedding", debouncer.status("carol")["last_run"]["error"])
+
+    def test_schedule_respects_setting_unless_forced(self):
+        with patch.object(rescoring_service, "get_setting_value", return_value=False), patch.object(
+            rescoring_service._DEBOUNCER, "request", return_value={"status": "scheduled"}
+        ) as request:
+            self.assertEqual(rescoring_service.schedule_user_rescore("dave"), {"status": "disabled"})
+            self.assertEqual(rescoring_service.schedule_user_rescore("dave", force=True)["status"], "scheduled")
+
+        request.assert_called_once_with("dave", "feedback")
+
+
+class ScoringReuseTests(unittest.TestCase):
+    def setUp(self):
+        self.schema = feature_store.FeatureSchema(embedding_dim=2)
+        self.block = feature_store.MediaFeatureBlock(
+            rating_keys=np.array([1, 2]),
+            embeddings=np.zeros((2, 1), dtype=np.float32),
+            side=np.zeros((2, 0), dtype=np.float32),
+            schema_fingerprint=self.schema.fingerprint,
+            library_version="v1",
+        )
+        patcher = patch.multiple(score_model, _MEDIA_FEATURE_BLOCK=self.block, _MEDIA_FEATURE_BLOCK_CHECKED_AT=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_media_block_is_rechecked_only_after_max_age(self):
+        with patch.object(score_model, "get_engine"), patch.object(
+            score_model, "get_media_feature_version", return_value="v1"
+        ) as version, patch.object(score_model, "load_media_block") as load:
+            self.assertIs(score_model.get_media_feature_block(self.schema, max_age_seconds=60), self.block)
+            self.assertIs(score_model.get_media_feature_block(self.schema, max_age_seconds=60), self.block)
+            self.assertIs(score_model.get_media_feature_block(self.schema), self.block)
+
+        self.assertEqual(version.call_count, 1)
+        load.assert_not_called()
+
+    def test_recommendation_rows_are_copied_with_null_marker(self):
+        class FakeCursor:
+            def copy_expert(self, sql, buffer):
+                self.sql, self.body = sql, buffer.read()
+
+            def close(self):
+                pass
+
+        cursor = FakeCursor()
+        conn = type("Conn", (), {"connection": type("Raw", (), {"cursor": lambda self: cursor})()})()
+        output = pd.DataFrame(
+            {
+                "username": ["alice", "alice"],
+                "rating_key": [1, 2],
+                "predicted_probability": [0.9, 0.4],
+                "scored_at": [datetime(2026, 10, 18, 3, 0)] * 2,
+                "cosine_similarity": [0.5, np.nan],
+                "explanation": ["", "Very similar"],
+            }
+        )
+
+        score_model.write_recommendation_rows(conn, "recommendations", output)
+
+        self.assertIn("COPY public.recommendations (username, rating_key, predicted_probability", cursor.sql)
+        self.assertIn("NULL '\\N'", cursor.sql)
+        rows = io.StringIO(cursor.body).read().splitlines()
+        self.assertEqual(rows[0], "alice,1,0.9,2026-10-18 03:00:00,0.5,")
+        self.assertEqual(rows[1], "alice,2,0.4,2026-10-18 03:00:00,\\N,Very similar")
+
+
+if __name__ == "__main__":
+    unittest.main()
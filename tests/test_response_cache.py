@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from api.routes import recommendation_routes
+from api.services import response_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class VersionCursor:
+    def __init__(self, versions=None):
+        self.versions = versions or {}
+        self.executed: list[tuple[str, tuple]] = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return [{"scope": scope, "version": version} for scope, version in self.versions.items()]
+
+
+class LRUResponseCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used_entries_past_byte_budget(self):
+        payload = {"rows": "x" * 40}
+        size = len(response_cache._encode(payload))
+        cache = response_cache.LRUResponseCache(max_bytes=size * 2, ttl_seconds=0)
+
+        cache.set("a", payload)
+        cache.set("b", payload)
+        self.assertEqual(cache.get("a"), payload)
+        cache.set("c", payload)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), payload)
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, size * 2, 1))
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    def test_entries_expire_after_ttl_and_datetimes_are_encoded(self):
+        clock = FakeClock()
+        cache = response_cache.LRUResponseCache(max_bytes=10_000, ttl_seconds=60, clock=clock)
+
+        cache.set("page", {"scored_at": datetime(2026, 10, 18, 3, 0)})
+        fresh = cache.get("page")
+        clock.now = 61
+
+        self.assertEqual(fresh, {"scored_at": "2026-10-18T03:00:00"})
+        self.assertIsNone(cache.get("page"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class CacheVersionTests(unittest.TestCase):
+    def test_versions_default_to_zero_and_change_the_key(self):
+        cur = VersionCursor({"feedback:member": 4})
+
+        versions = response_cache.fetch_cache_versions(cur, "member")
+        key = response_cache.response_cache_key("recommendations", "member", {"limit": 10}, versions)
+        bumped = response_cache.response_cache_key(
+            "recommendations", "member", {"limit": 10}, {**versions, "feedback": 5}
+        )
+
+        self.assertEqual(versions, {"recommendations": 0, "user_recommendations": 0, "feedback": 4})
+        self.assertEqual(cur.executed[0][1], (["recommendations", "recommendations:member", "feedback:member"],))
+        self.assertNotEqual(key, bumped)
+
+    def test_bump_upserts_each_scope(self):
+        cur = VersionCursor()
+
+        response_cache.bump_cache_versions(cur, ["feedback:member"])
+
+        sql, params = cur.executed[0]
+        self.assertIn("FROM unnest(%s::text[]) AS scope", sql)
+        self.assertIn("ON CONFLICT (scope) DO UPDATE SET version = v.version + 1", sql)
+        self.assertEqual(params, (["feedback:member"],))
+
+
+class RecommendationRouteCacheTests(unittest.TestCase):
+    class FakeRequest:
+        session = {"plex_token": "token"}
+
+    class FakeCursor:
+        closed = False
+
+        def __init__(self, conn):
+            self.conn = conn
+            self._rows = []
+
+        def execute(self, sql, params=None):
+            statement = " ".join(sql.split())
+            self.conn.statements.append(statement)
+            if "FROM public.response_cache_versions" in statement:
+                self._rows = [{"scope": "feedback:member", "version": self.conn.feedback_version}]
+            elif "FROM expanded_recs_w_label_v" in statement:
+                self._rows = [{"rating_key": 1, "predicted_probability": 0.9, "scored_at": None}]
+            else:
+                self._rows = []
+
+        def fetchall(self):
+            return self._rows
+
+        def fetchone(self):
+            return {"is_refreshing": self.conn.refreshing}
+
+        def close(self):
+            self.closed = True
+
+    class FakeConn:
+        closed = False
+
+        def __init__(self, feedback_version=1, refreshing=False):
+            self.feedback_version = feedback_version
+            self.refreshing = refreshing
+            self.statements: list[str] = []
+
+        def cursor(self, *_, **__):
+            return RecommendationRouteCacheTests.FakeCursor(self)
+
+        def close(self):
+            self.closed = True
+
+    def call(self, conn, cache):
+        with patch.object(recommendation_routes, "connect_db", return_value=conn), patch.object(
+            recommendation_routes, "register_vector"
+        ), patch.object(recommendation_routes, "get_plex_username", return_value="member"), patch.object(
+            recommendation_routes, "response_cache_enabled", return_value=True
+        ), patch.object(
+            recommendation_routes, "get_response_cache", return_value=cache
+        ), patch.object(
+            recommendation_routes, "_decorate_recommendation_rows"
+        ), patch.object(
+            recommendation_routes, "fetch_score_model_refresh_status", lambda cur: cur.conn.refreshing
+        ):
+            return recommendation_routes.get_recommendations(
+                self.FakeRequest(),
+                view="all",
+                show_rating_key=None,
+                season_rating_key=None,
+                search=None,
+                limit=10,
+                offset=0,
+                cursor=None,
+                sort=None,
+                min_probability=0.70,
+                max_probability=None,
+            )
+
+    def test_repeat_request_is_served_from_cache_with_fresh_refresh_status(self):
+        cache = response_cache.LRUResponseCache(max_bytes=1_000_000)
+        first_conn = self.FakeConn()
+        repeat_conn = self.FakeConn(refreshing=True)
+        after_feedback_conn = self.FakeConn(feedback_version=2)
+
+        first = self.call(first_conn, cache)
+        repeat = self.call(repeat_conn, cache)
+        after_feedback = self.call(after_feedback_conn, cache)
+
+        self.assertFalse(first["is_refreshing"])
+        self.assertTrue(repeat["is_refreshing"])
+        self.assertEqual(repeat["recommendations"], first["recommendations"])
+        self.assertFalse(any("expanded_recs_w_label_v" in sql for sql in repeat_conn.statements))
+        self.assertTrue(any("expanded_recs_w_label_v" in sql for sql in after_feedback_conn.statements))
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+import psycopg2.errors
+
+from api.db import migrations, schema
+from api.services import app_settings
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, sql, params=None):
+        statement = " ".join(sql.split())
+        self.conn.executed.append(statement)
+        if statement.startswith(f"SELECT key, checksum FROM {migrations.MIGRATIONS_TABLE}"):
+            if self.conn.ledger is None:
+                raise psycopg2.errors.UndefinedTable("relation does not exist")
+            self._rows = [(key, checksum) for key, checksum in self.conn.ledger.items()]
+        elif statement.startswith("CREATE TABLE IF NOT EXISTS public.schema_migrations"):
+            if self.conn.ledger is None:
+                self.conn.ledger = {}
+        elif statement.startswith(f"INSERT INTO {migrations.MIGRATIONS_TABLE}"):
+            self.conn.ledger[params[0]] = params[2]
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    def __init__(self, ledger=None):
+        self.ledger = ledger
+        self.executed: list[str] = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def make_migrations(calls, checksum="v1"):
+    return (
+        migrations.Migration("0001_first", "First", lambda conn: calls.append("0001_first")),
+        migrations.Migration("0002_second", "Second", lambda conn: calls.append("0002_second")),
+        migrations.Migration(
+            "settings_catalog",
+            "Settings",
+            lambda conn: calls.append("settings_catalog"),
+            checksum=lambda: checksum,
+        ),
+    )
+
+
+class SchemaMigrationTests(unittest.TestCase):
+    def test_database_at_head_costs_a_single_select(self):
+        calls: list[str] = []
+        conn = FakeConnection({"0001_first": None, "0002_second": None, "settings_catalog": "v1"})
+
+        applied = migrations.migrate_to_head(conn, make_migrations(calls))
+
+        self.assertEqual(applied, [])
+        self.assertEqual(calls, [])
+        self.assertEqual(len(conn.executed), 1)
+        self.assertTrue(conn.executed[0].startswith("SELECT key, checksum"))
+
+    def test_missing_ledger_applies_everything_in_order_under_advisory_lock(self):
+        calls: list[str] = []
+        conn = FakeConnection(ledger=None)
+
+        applied = migrations.migrate_to_head(conn, make_migrations(calls))
+
+        self.assertEqual(applied, ["0001_first", "0002_second", "settings_catalog"])
+        self.assertEqual(calls, applied)
+        self.assertEqual(conn.ledger, {"0001_first": None, "0002_second": None, "settings_catalog": "v1"})
+        self.assertIn("SELECT pg_advisory_lock(%s)", conn.executed)
+        self.assertEqual(conn.executed[-1], "SELECT pg_advisory_unlock(%s)")
+        self.assertIn("SELECT set_config('lock_timeout', %s, true)", conn.executed)
+
+    def test_only_new_and_changed_migrations_rerun(self):
+        calls: list[str] = []
+        conn = FakeConnection({"0001_first": None, "settings_catalog": "v1"})
+
+        applied = migrations.migrate_to_head(conn, make_migrations(calls, checksum="v2"))
+
+        self.assertEqual(applied, ["0002_second", "settings_catalog"])
+        self.assertEqual(conn.ledger["settings_catalog"], "v2")
+
+    def test_failed_migration_rolls_back_and_releases_lock(self):
+        def fail(conn):
+            raise RuntimeError("lock timeout")
+
+        conn = FakeConnection({})
+        broken = (migrations.Migration("0001_first", "First", fail),)
+
+        with self.assertRaisesRegex(migrations.SchemaMigrationError, "0001_first"):
+            migrations.migrate(conn, broken)
+
+        self.assertEqual(conn.ledger, {})
+        self.assertGreaterEqual(conn.rollbacks, 1)
+        self.assertEqual(conn.executed[-1], "SELECT pg_advisory_unlock(%s)")
+
+    def test_library_search_migration_survives_missing_pg_trgm(self):
+        executed: list[str] = []
+
+        class ExtensionCursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc, tb):
+                return False
+
+            def execute(self, sql, params=None):
+                statement = " ".join(sql.split())
+                executed.append(statement)
+                if statement.startswith("CREATE EXTENSION"):
+                    raise psycopg2.errors.InsufficientPrivilege("permission denied to create extension")
+
+            def fetchone(self):
+                return None
+
+        class ExtensionConnection:
+            def cursor(self, *args, **kwargs):
+                return ExtensionCursor()
+
+        with patch.object(schema, "refresh_library_search") as mock_refresh, patch("builtins.print"):
+            schema._add_library_search(ExtensionConnection())
+
+        mock_refresh.assert_called_once()
+        self.assertIn("ROLLBACK TO SAVEPOINT create_pg_trgm", executed)
+        self.assertTrue(any("library_search_document_idx" in statement for statement in executed))
+        self.assertFalse(any("gin_trgm_ops" in statement for statement in executed))
+
+    def test_app_migration_keys_are_unique(self):
+        keys = [migration.key for migration in schema.SCHEMA_MIGRATIONS]
+
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(keys[0], "0001_baseline")
+
+    def test_settings_checksum_tracks_env_values(self):
+        with patch.dict("os.environ", {"PIPELINE_WARM_WORKER_ENABLED": "true"}):
+            before = app_settings.settings_catalog_checksum()
+        with patch.dict("os.environ", {"PIPELINE_WARM_WORKER_ENABLED": "false"}):
+            after = app_settings.settings_catalog_checksum()
+
+        self.assertNotEqual(before, after)
+        self.assertEqual(len(before), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
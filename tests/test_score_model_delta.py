@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import call, patch
+
+import score_model
+
+
+def user_row(username, embedding_hash="h1", scored_hash="h1", scored_model="v1"):
+    return {
+        "username": username,
+        "embedding_hash": embedding_hash,
+        "scored_hash": scored_hash,
+        "scored_model": scored_model,
+    }
+
+
+class FakeSqlAlchemyConnection:
+    def __init__(self):
+        self.statements: list[tuple[str, dict | None]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+class DeltaScoringPlanTests(unittest.TestCase):
+    def test_new_items_merge_for_unchanged_users_and_new_users_are_rescored(self):
+        plan = score_model.plan_delta_scoring(
+            [
+                user_row("alice"),
+                user_row("bob", embedding_hash="h2"),
+                user_row("carol", scored_hash=None, scored_model=None),
+            ],
+            {101: "m1", 102: "m2"},
+            500,
+            "v1",
+        )
+
+        self.assertEqual(plan["mode"], "delta")
+        self.assertEqual([row["username"] for row in plan["rescore_users"]], ["bob", "carol"])
+        self.assertEqual([row["username"] for row in plan["merge_users"]], ["alice"])
+        self.assertEqual(sorted(plan["new_media"]), [101, 102])
+
+    def test_nothing_new_is_unchanged(self):
+        plan = score_model.plan_delta_scoring([user_row("alice")], {}, 500, "v1")
+
+        self.assertEqual(plan["mode"], "unchanged")
+        self.assertEqual(plan["merge_users"], [])
+
+    def test_falls_back_to_full_run_without_ledger_or_after_model_change(self):
+        no_ledger = score_model.plan_delta_scoring([user_row("alice")], {101: "m1"}, 0, "v1")
+        new_model = score_model.plan_delta_scoring([user_row("alice")], {}, 500, "v2")
+
+        self.assertEqual(no_ledger["mode"], "full")
+        self.assertEqual(new_model["mode"], "full")
+        self.assertIn("model changed", new_model["reason"])
+
+    def test_rerank_only_touches_one_user(self):
+        conn = FakeSqlAlchemyConnection()
+
+        score_model.rerank_user_recommendations(conn, "alice")
+
+        sql, params = conn.statements[0]
+        self.assertIn("ROW_NUMBER() OVER (ORDER BY predicted_probability DESC, id)", sql)
+        self.assertIn("WHERE username = :username", sql)
+        self.assertEqual(params, {"username": "alice"})
+
+
+class DeltaScoringRunTests(unittest.TestCase):
+    def run_delta(self, plan_inputs):
+        loaded = SimpleNamespace(version="v1", model_path="unused")
+        with patch.object(score_model, "get_engine", return_value="engine"), patch.object(
+            score_model, "get_model_server", return_value=SimpleNamespace(get=lambda: loaded)
+        ), patch.object(score_model, "fetch_scoring_inputs", return_value=plan_inputs), patch.object(
+            score_model, "score_and_store"
+        ) as mock_score, patch.object(
+            score_model, "merge_user_items", return_value=2
+        ) as mock_merge, patch.object(
+            score_model, "record_scoring_state"
+        ) as mock_record, patch.object(
+            score_model, "score_all_users"
+        ) as mock_full, redirect_stdout(io.StringIO()):
+            plan = score_model.run_delta_scoring(skip_shap=True)
+        return plan, loaded, mock_score, mock_merge, mock_record, mock_full
+
+    def test_delta_run_scores_only_affected_pairs_and_records_ledger(self):
+        plan, loaded, mock_score, mock_merge, mock_record, mock_full = self.run_delta(
+            ({102: "m2", 101: "m1"}, [user_row("alice"), user_row("bob", embedding_hash="h2")], 500)
+        )
+
+        self.assertEqual(plan["mode"], "delta")
+        mock_full.assert_not_called()
+        mock_score.assert_called_once_with("bob", skip_shap=True)
+        mock_merge.assert_called_once_with("alice", [101, 102], loaded)
+        mock_record.assert_called_once_with("engine", "v1", {102: "m2", 101: "m1"}, {"bob": "h2"})
+
+    def test_delta_run_without_ledger_runs_full_scoring(self):
+        plan, _loaded, mock_score, mock_merge, mock_record, mock_full = self.run_delta(
+            ({101: "m1"}, [user_row("alice", scored_hash=None, scored_model=None)], 0)
+        )
+
+        self.assertEqual(plan["mode"], "full")
+        self.assertEqual(mock_full.call_args_list, [call(skip_shap=True)])
+        mock_score.assert_not_called()
+        mock_merge.assert_not_called()
+        mock_record.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
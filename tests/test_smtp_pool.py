@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import smtplib
+import unittest
+
+from api.services.smtp_pool import SMTPSessionPool, is_transient_smtp_error
+
+
+class FakeSession:
+    def __init__(self, failures=None):
+        self.failures = list(failures or [])
+        self.sent: list[str] = []
+        self.closed = False
+        self.quit_called = False
+
+    def send_message(self, message):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append(message)
+
+    def close(self):
+        self.closed = True
+
+    def quit(self):
+        self.quit_called = True
+
+
+class SessionFactory:
+    def __init__(self, sessions=None, error=None):
+        self.sessions = list(sessions or [])
+        self.error = error
+        self.opened: list[FakeSession] = []
+
+    def __call__(self):
+        if self.error is not None:
+            raise self.error
+        session = self.sessions.pop(0) if self.sessions else FakeSession()
+        self.opened.append(session)
+        return session
+
+
+class SMTPSessionPoolTests(unittest.TestCase):
+    def test_reuses_one_authenticated_session_for_serial_sends(self):
+        factory = SessionFactory()
+
+        with SMTPSessionPool(factory, size=2) as pool:
+            for message in ("a", "b", "c"):
+                pool.send(message)
+
+        self.assertEqual(len(factory.opened), 1)
+        self.assertEqual(factory.opened[0].sent, ["a", "b", "c"])
+        self.assertTrue(factory.opened[0].quit_called)
+
+    def test_retries_dropped_connection_on_a_fresh_session(self):
+        broken = FakeSession(failures=[smtplib.SMTPServerDisconnected("gone")])
+        factory = SessionFactory(sessions=[broken])
+        delays: list[float] = []
+        pool = SMTPSessionPool(factory, size=1, retries=2, sleep=delays.append)
+
+        pool.send("digest")
+
+        self.assertTrue(broken.closed)
+        self.assertEqual(factory.opened[1].sent, ["digest"])
+        self.assertEqual((pool.retried, delays), (1, [1.0]))
+
+    def test_permanent_rejection_is_not_retried(self):
+        rejected = smtplib.SMTPDataError(552, b"too large")
+        factory = SessionFactory(sessions=[FakeSession(failures=[rejected])])
+        pool = SMTPSessionPool(factory, size=1, retries=3, sleep=lambda _seconds: None)
+
+        with self.assertRaises(smtplib.SMTPDataError):
+            pool.send("digest")
+
+        self.assertEqual((len(factory.opened), pool.retried), (1, 0))
+
+    def test_open_failure_is_remembered_for_later_messages(self):
+        factory = SessionFactory(error=ValueError("SMTP authentication failed"))
+        pool = SMTPSessionPool(factory, size=2, retries=2, sleep=lambda _seconds: None)
+
+        for _ in range(3):
+            with self.assertRaisesRegex(ValueError, "authentication failed"):
+                pool.send("digest")
+
+        self.assertEqual(factory.opened, [])
+        self.assertEqual(pool.sessions_opened, 0)
+
+    def test_transient_error_classification(self):
+        self.assertTrue(is_transient_smtp_error(smtplib.SMTPDataError(451, b"try later")))
+        self.assertTrue(is_transient_smtp_error(ConnectionResetError()))
+        self.assertFalse(is_transient_smtp_error(smtplib.SMTPDataError(550, b"no such user")))
+        self.assertFalse(is_transient_smtp_error(smtplib.SMTPNotSupportedError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
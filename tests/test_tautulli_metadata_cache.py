@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+import fetch_tautulli_data as tautulli_sync
+from api.services import tautulli_metadata_cache
+from api.services.tautulli_metadata_cache import CHILDREN_ENDPOINT, METADATA_ENDPOINT, TautulliMetadataCache
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return list(self.conn.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeConn:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements: list[tuple[str, object]] = []
+
+    def cursor(self, *_, **__):
+        return FakeCursor(self)
+
+    def commit(self):
+        return None
+
+    def close(self):
+        return None
+
+
+def cached_row(endpoint, rating_key, updated_at=None, parent=None, grandparent=None, payload=None):
+    return {
+        "endpoint": endpoint,
+        "rating_key": rating_key,
+        "updated_at": updated_at,
+        "parent_rating_key": parent,
+        "grandparent_rating_key": grandparent,
+        "payload": payload or {"rating_key": str(rating_key)},
+    }
+
+
+class TautulliMetadataCacheTests(unittest.TestCase):
+    def test_serves_fresh_entries_until_updated_at_changes(self):
+        conn = FakeConn(rows=[cached_row(METADATA_ENDPOINT, 7, updated_at=100, payload={"title": "Pilot"})])
+        cache = TautulliMetadataCache(ttl_seconds=3600)
+
+        with patch.object(tautulli_metadata_cache, "connect_db", return_value=conn):
+            self.assertEqual(cache.get(METADATA_ENDPOINT, "7"), {"title": "Pilot"})
+            self.assertEqual(cache.get(METADATA_ENDPOINT, 7, updated_at="100"), {"title": "Pilot"})
+            self.assertIsNone(cache.get(METADATA_ENDPOINT, 7, updated_at=200))
+            self.assertIsNone(cache.get(CHILDREN_ENDPOINT, 7))
+
+        self.assertEqual(len(conn.statements), 1)
+        self.assertIn("WHERE fetched_at > now() - make_interval(secs => %s)", conn.statements[0][0])
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_write_through_refreshes_entries_without_serving_them(self):
+        cache = TautulliMetadataCache(ttl_seconds=3600)
+        cache._loaded = True
+        cache._entries[(CHILDREN_ENDPOINT, 7)] = (100, None, None, [{"rating_key": "8"}])
+        cache.write_through = True
+
+        self.assertIsNone(cache.get(CHILDREN_ENDPOINT, 7, updated_at=100))
+        cache.put(CHILDREN_ENDPOINT, 7, [{"rating_key": "8"}, {"rating_key": "9"}], updated_at=101)
+        cache.write_through = False
+
+        self.assertEqual(len(cache.get(CHILDREN_ENDPOINT, 7, updated_at=101)), 2)
+        self.assertEqual(list(cache._pending), [(CHILDREN_ENDPOINT, 7)])
+
+    def test_require_updated_at_skips_entries_served_on_age_alone(self):
+        cache = TautulliMetadataCache(ttl_seconds=3600)
+        cache._loaded = True
+        cache._entries[(CHILDREN_ENDPOINT, 7)] = (100, None, None, [{"rating_key": "8"}])
+
+        self.assertIsNone(cache.get(CHILDREN_ENDPOINT, 7, require_updated_at=True))
+        self.assertIsNotNone(cache.get(CHILDREN_ENDPOINT, 7, updated_at=100, require_updated_at=True))
+
+    def test_invalidate_drops_key_and_parent_child_listings(self):
+        conn = FakeConn(
+            rows=[
+                cached_row(METADATA_ENDPOINT, 30, parent=20, grandparent=10),
+                cached_row(CHILDREN_ENDPOINT, 20),
+                cached_row(CHILDREN_ENDPOINT, 10),
+                cached_row(METADATA_ENDPOINT, 10),
+                cached_row(METADATA_ENDPOINT, 99),
+            ]
+        )
+        cache = TautulliMetadataCache(ttl_seconds=3600)
+
+        with patch.object(tautulli_metadata_cache, "connect_db", return_value=conn):
+            dropped = cache.invalidate([30])
+            delete_sql, delete_params = conn.statements[-1]
+
+            self.assertEqual(dropped, 3)
+            self.assertIsNone(cache.get(CHILDREN_ENDPOINT, 20))
+            self.assertIsNone(cache.get(CHILDREN_ENDPOINT, 10))
+            self.assertIsNotNone(cache.get(METADATA_ENDPOINT, 10))
+            self.assertIsNotNone(cache.get(METADATA_ENDPOINT, 99))
+
+        self.assertIn("DELETE FROM public.tautulli_metadata_cache", delete_sql)
+        self.assertEqual(delete_params, ([30], CHILDREN_ENDPOINT, [10, 20]))
+
+    def test_new_responses_are_written_in_batches(self):
+        conn = FakeConn()
+        cache = TautulliMetadataCache(ttl_seconds=3600, flush_size=2)
+        written = []
+
+        with patch.object(tautulli_metadata_cache, "connect_db", return_value=conn), patch.object(
+            tautulli_metadata_cache,
+            "execute_values",
+            side_effect=lambda _cur, _sql, rows, template=None: written.append(rows),
+        ):
+            cache.put_metadata(1, {"rating_key": "1", "updated_at": "5", "parent_rating_key": ""})
+            self.assertEqual(written, [])
+            cache.put(CHILDREN_ENDPOINT, 2, [{"rating_key": "3"}])
+            cache.put(CHILDREN_ENDPOINT, 4, [])
+            cache.flush()
+
+        self.assertEqual(len(written), 1)
+        self.assertEqual([row[:5] for row in written[0]], [
+            (METADATA_ENDPOINT, 1, 5, None, None),
+            (CHILDREN_ENDPOINT, 2, None, None, None),
+        ])
+
+    def test_zero_ttl_never_touches_the_database(self):
+        cache = TautulliMetadataCache(ttl_seconds=0)
+
+        with patch.object(tautulli_metadata_cache, "connect_db") as mock_connect:
+            cache.put_metadata(1, {"rating_key": "1"})
+            self.assertIsNone(cache.get(METADATA_ENDPOINT, 1))
+            self.assertEqual(cache.invalidate([1]), 0)
+            cache.flush()
+
+        mock_connect.assert_not_called()
+
+
+class SyncMetadataMissPolicyTests(unittest.TestCase):
+    def setUp(self):
+        self.store = TautulliMetadataCache(ttl_seconds=0)
+        patcher = patch.object(tautulli_sync, "_METADATA_STORE", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        flag = patch.object(tautulli_sync, "_TAUTULLI_CACHE_CLEARED", False)
+        flag.start()
+        self.addCleanup(flag.stop)
+        self.addCleanup(tautulli_sync._METADATA_CACHE.clear)
+
+    def test_missing_items_flush_tautulli_cache_at_most_once(self):
+        def mark_cleared():
+            tautulli_sync._TAUTULLI_CACHE_CLEARED = True
+
+        with patch.object(tautulli_sync, "fetch_tautulli_data", return_value={}) as mock_fetch, patch.object(
+            tautulli_sync, "clear_tautulli_cache", side_effect=mark_cleared
+        ) as mock_clear, patch.object(tautulli_sync.time, "sleep") as mock_sleep:
+            self.assertIsNone(tautulli_sync.get_metadata(501))
+            self.assertIsNone(tautulli_sync.get_metadata(502))
+            self.assertIsNone(tautulli_sync.get_metadata(503))
+
+        mock_clear.assert_called_once_with()
+        mock_sleep.assert_called_once_with(1)
+        self.assertEqual(mock_fetch.call_count, 6)
+
+    def test_cached_raw_metadata_skips_tautulli(self):
+        self.store.enabled = True
+        self.store._loaded = True
+        self.store._entries[(METADATA_ENDPOINT, 77)] = (
+            9,
+            None,
+            None,
+            {"rating_key": "77", "title": "Heat", "media_type": "movie", "year": "1995", "updated_at": "9"},
+        )
+
+        with patch.object(tautulli_sync, "fetch_tautulli_data") as mock_fetch:
+            metadata = tautulli_sync.get_metadata(77, updated_at=9)
+
+        mock_fetch.assert_not_called()
+        self.assertEqual((metadata["title"], metadata["year"]), ("Heat", 1995))
+
+    def test_children_listings_need_a_matching_updated_at(self):
+        self.store.enabled = True
+        self.store._loaded = True
+        self.store._entries[(CHILDREN_ENDPOINT, 40)] = (5, None, None, [{"rating_key": "41"}])
+        live = {"children_list": [{"rating_key": "41"}, {"rating_key": "42"}]}
+
+        with patch.object(tautulli_sync, "fetch_tautulli_data", return_value=live) as mock_fetch:
+            self.assertEqual(len(tautulli_sync.get_children_metadata(40, 5)), 1)
+            mock_fetch.assert_not_called()
+            self.assertEqual(len(tautulli_sync.get_children_metadata(40)), 2)
+
+        mock_fetch.assert_called_once()
+
+    def test_full_crawl_never_serves_cached_listings(self):
+        self.store.enabled = True
+        self.store._loaded = True
+        season = {"rating_key": "41", "title": "Season 1", "media_type": "season"}
+        self.store._entries[(CHILDREN_ENDPOINT, 40)] = (5, None, None, [season])
+        live = {"children_list": [season, {"rating_key": "43", "title": "Season 2", "media_type": "season"}]}
+
+        def fetch(cmd, params=None):
+            return live if params["rating_key"] == 40 else {}
+
+        with patch.object(
+            tautulli_sync, "get_library_media_info", side_effect=[[], [{"rating_key": 40, "title": "Show", "updated_at": 5}]]
+        ), patch.object(tautulli_sync, "get_metadata", return_value=None), patch.object(
+            tautulli_sync, "fetch_tautulli_data", side_effect=fetch
+        ):
+            tautulli_sync.get_library_data()
+
+        self.assertFalse(self.store.write_through)
+        self.assertEqual(len(self.store._entries[(CHILDREN_ENDPOINT, 40)][3]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
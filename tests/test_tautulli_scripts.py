@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import io
 import tempfile
 import unittest
+from contextlib import redirect_stderr
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
@@ -10,6 +12,23 @@ from api.services.tautulli_api import TautulliApiError, TautulliConfig
 from scripts import tautulli_recently_added_sync, verify_tautulli_api
 
 
+_LOG_DIR = None
+_LOG_ENV = None
+
+
+def setUpModule():
+    # Keep test runs from appending to the repo's logs/ directory.
+    global _LOG_DIR, _LOG_ENV
+    _LOG_DIR = tempfile.TemporaryDirectory()
+    _LOG_ENV = patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(_LOG_DIR.name) / "sync.log")})
+    _LOG_ENV.start()
+
+
+def tearDownModule():
+    _LOG_ENV.stop()
+    _LOG_DIR.cleanup()
+
+
 class TautulliVerifierTests(unittest.TestCase):
     def setUp(self):
         self.config = TautulliConfig(
@@ -149,17 +168,24 @@ class TautulliRecentlyAddedSyncTests(unittest.TestCase):
                             "run_incremental_sync",
                             return_value=0,
                         ) as mock_sync:
-                            result = tautulli_recently_added_sync.main([
-                                "--debounce-seconds",
-                                "0",
-                                "--lock-path",
-                                str(lock_path),
-                            ])
-                            log_text = log_path.read_text(encoding="utf-8")
+                            with patch.object(
+                                tautulli_recently_added_sync,
+                                "run_delta_scoring",
+                                return_value=0,
+                            ) as mock_delta:
+                                result = tautulli_recently_added_sync.main([
+                                    "--debounce-seconds",
+                                    "0",
+                                    "--lock-path",
+                                    str(lock_path),
+                                ])
+                                log_text = log_path.read_text(encoding="utf-8")
 
         self.assertEqual(result, 0)
         mock_delete.assert_called_once_with(config=self.config, timeout=30)
         mock_sync.assert_called_once()
+        mock_delta.assert_called_once()
+        self.assertIn("PlexIntel delta scoring complete", log_text)
         self.assertIn("Recently Added sync invoked", log_text)
         self.assertIn("Tautulli cache cleared", log_text)
         self.assertIn("PlexIntel incremental sync complete", log_text)
@@ -209,5 +235,214 @@ class TautulliRecentlyAddedSyncTests(unittest.TestCase):
         self.assertFalse(mock_run.call_args.kwargs["check"])
 
 
+    def test_main_can_skip_delta_scoring(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            with patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(tmp_dir) / "sync.log")}):
+                with patch.object(
+                    tautulli_recently_added_sync,
+                    "_resolve_event_config",
+                    return_value=self.config,
+                ):
+                    with patch.object(tautulli_recently_added_sync, "delete_tautulli_cache"):
+                        with patch.object(tautulli_recently_added_sync, "run_incremental_sync", return_value=0):
+                            with patch.object(tautulli_recently_added_sync, "run_delta_scoring") as mock_delta:
+                                result = tautulli_recently_added_sync.main([
+                                    "--debounce-seconds",
+                                    "0",
+                                    "--lock-path",
+                                    str(lock_path),
+                                    "--no-delta-score",
+                                ])
+
+        self.assertEqual(result, 0)
+        mock_delta.assert_not_called()
+
+    def test_run_delta_scoring_embeds_before_scoring_and_stops_on_failure(self):
+        with patch.object(
+            tautulli_recently_added_sync.subprocess,
+            "run",
+            side_effect=[SimpleNamespace(returncode=0), SimpleNamespace(returncode=3)],
+        ) as mock_run:
+            result = tautulli_recently_added_sync.run_delta_scoring()
+
+        self.assertEqual(result, 3)
+        first, second = (call.args[0] for call in mock_run.call_args_list)
+        self.assertEqual(first[-2:], ["--mode", "embeddings"])
+        self.assertEqual(second[-3:], [
+            str(tautulli_recently_added_sync.REPO_ROOT / "score_model.py"),
+            "--delta",
+            "--skip-shap",
+        ])
+
+    def test_main_queues_rating_keys_while_another_run_holds_the_lock(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            log_path = Path(tmp_dir) / "sync.log"
+            first_lock = tautulli_recently_added_sync._open_lock(lock_path)
+            try:
+                with patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(log_path)}):
+                    with patch.object(tautulli_recently_added_sync, "run_targeted_sync") as mock_targeted:
+                        result = tautulli_recently_added_sync.main([
+                            "--debounce-seconds",
+                            "0",
+                            "--lock-path",
+                            str(lock_path),
+                            "--rating-key",
+                            "101,102",
+                        ])
+
+                self.assertEqual(result, 0)
+                mock_targeted.assert_not_called()
+                self.assertIn("queued rating_key(s) [101, 102]", log_path.read_text(encoding="utf-8"))
+                queue_path = lock_path.with_suffix(".queue")
+                self.assertEqual(tautulli_recently_added_sync.drain_rating_keys(queue_path), {101: 0, 102: 0})
+                self.assertEqual(tautulli_recently_added_sync.drain_rating_keys(queue_path), {})
+            finally:
+                if first_lock is not None:
+                    first_lock.close()
+
+    def test_main_ingests_rating_keys_and_drains_keys_queued_meanwhile(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            queue_path = lock_path.with_suffix(".queue")
+            batches = []
+
+            def fake_targeted(rating_keys):
+                batches.append(rating_keys)
+                if len(batches) == 1:
+                    tautulli_recently_added_sync.enqueue_rating_keys(queue_path, [7])
+                return 0
+
+            with patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(tmp_dir) / "sync.log")}):
+                with patch.object(tautulli_recently_added_sync, "delete_tautulli_cache") as mock_delete:
+                    with patch.object(tautulli_recently_added_sync, "run_incremental_sync") as mock_sync:
+                        with patch.object(
+                            tautulli_recently_added_sync, "run_targeted_sync", side_effect=fake_targeted
+                        ):
+                            with patch.object(
+                                tautulli_recently_added_sync, "run_delta_scoring", return_value=0
+                            ) as mock_delta:
+                                result = tautulli_recently_added_sync.main([
+                                    "--debounce-seconds",
+                                    "0",
+                                    "--lock-path",
+                                    str(lock_path),
+                                    "--rating-key",
+                                    "5",
+                                    "--rating-key",
+                                    "6",
+                                ])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(batches, [[5, 6], [7]])
+        mock_delete.assert_not_called()
+        mock_sync.assert_not_called()
+        self.assertEqual(mock_delta.call_count, 2)
+        mock_delta.assert_called_with(embed=False)
+
+    def test_keys_queued_while_the_lock_is_released_are_not_stranded(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            queue_path = lock_path.with_suffix(".queue")
+            real_run_queue = tautulli_recently_added_sync._run_targeted_queue
+            batches = []
+            rounds = []
+
+            def run_queue_then_event_arrives(path, *, delta_score):
+                return_code = real_run_queue(path, delta_score=delta_score)
+                if not rounds:
+                    # Lands after the final empty drain, before the lock is released.
+                    tautulli_recently_added_sync.enqueue_rating_keys(queue_path, [9])
+                rounds.append(return_code)
+                return return_code
+
+            with patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(tmp_dir) / "sync.log")}):
+                with patch.object(
+                    tautulli_recently_added_sync, "_run_targeted_queue", side_effect=run_queue_then_event_arrives
+                ):
+                    with patch.object(
+                        tautulli_recently_added_sync,
+                        "run_targeted_sync",
+                        side_effect=lambda keys: batches.append(keys) or 0,
+                    ):
+                        result = tautulli_recently_added_sync.main([
+                            "--debounce-seconds",
+                            "0",
+                            "--lock-path",
+                            str(lock_path),
+                            "--no-delta-score",
+                            "--rating-key",
+                            "5",
+                        ])
+
+            self.assertEqual(result, 0)
+            self.assertEqual(batches, [[5], [9]])
+            self.assertEqual(tautulli_recently_added_sync.drain_rating_keys(queue_path), {})
+
+    def test_failed_targeted_sync_retries_keys_alone_and_requeues_the_failures(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            with patch.dict("os.environ", {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(tmp_dir) / "sync.log")}):
+                with patch.object(
+                    tautulli_recently_added_sync,
+                    "run_targeted_sync",
+                    side_effect=lambda keys: 2 if 6 in keys else 0,
+                ) as mock_sync, patch.object(
+                    tautulli_recently_added_sync, "run_delta_scoring", return_value=0
+                ) as mock_delta:
+                    with redirect_stderr(io.StringIO()):
+                        result = tautulli_recently_added_sync.main([
+                            "--debounce-seconds",
+                            "0",
+                            "--lock-path",
+                            str(lock_path),
+                            "--rating-key",
+                            "5,6",
+                        ])
+
+            self.assertEqual(result, 2)
+            self.assertEqual([call.args[0] for call in mock_sync.call_args_list], [[5, 6], [5], [6]])
+            mock_delta.assert_called_once_with(embed=False)
+            self.assertEqual(tautulli_recently_added_sync.drain_rating_keys(lock_path.with_suffix(".queue")), {6: 1})
+
+    def test_key_that_keeps_failing_is_quarantined(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lock_path = Path(tmp_dir) / "sync.lock"
+            queue_path = lock_path.with_suffix(".queue")
+            tautulli_recently_added_sync.enqueue_rating_keys(queue_path, [6], attempts={6: 2})
+            with patch.dict(
+                "os.environ",
+                {"PLEXINTEL_TAUTULLI_SYNC_LOG": str(Path(tmp_dir) / "sync.log"), "PLEXINTEL_TARGETED_MAX_ATTEMPTS": "3"},
+            ):
+                with patch.object(tautulli_recently_added_sync, "run_targeted_sync", return_value=2):
+                    with redirect_stderr(io.StringIO()):
+                        result = tautulli_recently_added_sync.main([
+                            "--debounce-seconds",
+                            "0",
+                            "--lock-path",
+                            str(lock_path),
+                            "--rating-key",
+                            "7",
+                        ])
+
+            self.assertEqual(result, 2)
+            self.assertEqual(tautulli_recently_added_sync.drain_rating_keys(queue_path), {7: 1})
+            self.assertEqual(
+                tautulli_recently_added_sync.drain_rating_keys(lock_path.with_suffix(".failed")), {6: 3}
+            )
+
+    def test_run_targeted_sync_passes_rating_keys(self):
+        with patch.object(
+            tautulli_recently_added_sync.subprocess,
+            "run",
+            return_value=SimpleNamespace(returncode=0),
+        ) as mock_run:
+            result = tautulli_recently_added_sync.run_targeted_sync([5, 6])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(mock_run.call_args.args[0][-4:], ["--mode", "targeted", "--rating-keys", "5,6"])
+
+
 if __name__ == "__main__":
     unittest.main()
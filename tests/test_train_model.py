@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import train_model
+from api.services import feature_store
+
+
+class FastTrainingTests(unittest.TestCase):
+    def test_fast_mode_early_stops_and_writes_artifacts_without_showing_plots(self):
+        rng = np.random.default_rng(7)
+        X = rng.random((400, 4), dtype=np.float32)
+        y = (X[:, 0] + 0.2 * rng.random(400) > 0.6).astype(int)
+        feature_names = ["emb_0", "emb_1", "genre_Drama", "watch_sim"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            model_path = tmp / "xgb_model.pkl"
+            with redirect_stdout(io.StringIO()):
+                train_model.plt.switch_backend("Agg")
+                train_model.train_and_evaluate(
+                    X,
+                    y,
+                    np.ones(len(y), dtype=np.float32),
+                    feature_names,
+                    model_output_path=str(model_path),
+                    importance_log_path=str(tmp / "feature_importance_log.txt"),
+                    importance_plot_path=str(tmp / "feature_importance_plot.png"),
+                    fast=True,
+                    n_jobs=1,
+                    max_boost_rounds=60,
+                    early_stopping_rounds=5,
+                )
+
+            model = joblib.load(model_path)
+            summary = json.loads((tmp / "xgb_model.training.json").read_text())
+            schema = feature_store.load_feature_schema(model_path, model.get_booster().feature_names)
+            probabilities = model.predict_proba(pd.DataFrame(X[:3], columns=feature_names))[:, 1]
+            confusion_plot_written = (tmp / "confusion_matrix_plot.png").is_file()
+
+        self.assertTrue(confusion_plot_written)
+        self.assertEqual(summary["mode"], "fast")
+        self.assertLessEqual(summary["boost_rounds"], 60)
+        self.assertEqual(summary["boost_rounds"], model.get_booster().num_boosted_rounds())
+        self.assertIn("build quantile matrices", summary["phases"])
+        self.assertGreater(summary["peak_rss_kb"], 0)
+        self.assertEqual(list(schema.feature_names), feature_names)
+        self.assertEqual(probabilities.shape, (3,))
+
+
+class IncrementalTrainingPlanTests(unittest.TestCase):
+    NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+    def plan(self, digests, labels, *, state=None, previous=None, fresh_schema=None, **limits):
+        schema = feature_store.FeatureSchema(embedding_dim=2, genres=("Drama",))
+        state = state or {"last_full_at": (self.NOW - timedelta(days=1)).isoformat(), "positive_rate": 0.5}
+        return train_model.plan_training_run(
+            state,
+            np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], dtype=np.uint64) if previous is None else previous,
+            np.array(digests, dtype=np.uint64),
+            np.array(labels),
+            saved_schema=schema,
+            fresh_schema=fresh_schema or schema,
+            full_retrain_days=limits.get("full_retrain_days", 7),
+            max_changed_fraction=limits.get("max_changed_fraction", 0.3),
+            max_label_drift=limits.get("max_label_drift", 0.1),
+            current_model_version=limits.get("current_model_version"),
+            now=self.NOW,
+        )
+
+    def test_new_rows_continue_boosting(self):
+        plan = self.plan([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11], [1, 0] * 5 + [1])
+
+        self.assertEqual(plan["mode"], "incremental")
+        self.assertEqual(plan["new_mask"].tolist(), [False] * 10 + [True])
+
+    def test_identical_rows_keep_the_model(self):
+        plan = self.plan(list(range(1, 11)), [1, 0] * 5)
+
+        self.assertEqual(plan["mode"], "unchanged")
+
+    def test_falls_back_to_full_retrain(self):
+        digests = list(range(1, 11)) + [11]
+        labels = [1, 0] * 5 + [1]
+        cases = {
+            "no previous": self.plan(digests, labels, previous=np.array([], dtype=np.uint64))["mode"],
+            "schedule": self.plan(
+                digests,
+                labels,
+                state={"last_full_at": (self.NOW - timedelta(days=8)).isoformat(), "positive_rate": 0.5},
+            )["reason"],
+            "schema": self.plan(
+                digests, labels, fresh_schema=feature_store.FeatureSchema(embedding_dim=2, genres=("Comedy",))
+            )["reason"],
+            "changed": self.plan(list(range(20, 31)), labels)["reason"],
+            "drift": self.plan(digests, [1] * 11)["reason"],
+        }
+
+        self.assertEqual(cases["no previous"], "full")
+        self.assertIn("scheduled full retrain", cases["schedule"])
+        self.assertIn("feature schema changed", cases["schema"])
+        self.assertIn("of rows changed", cases["changed"])
+        self.assertIn("label drift", cases["drift"])
+
+    def test_registry_rollback_forces_a_full_retrain(self):
+        digests = list(range(1, 11)) + [11]
+        labels = [1, 0] * 5 + [1]
+        state = {
+            "last_full_at": (self.NOW - timedelta(days=1)).isoformat(),
+            "positive_rate": 0.5,
+            "published_version": "v2",
+        }
+
+        rolled_back = self.plan(digests, labels, state=state, current_model_version="v1")
+        still_current = self.plan(digests, labels, state=state, current_model_version="v2")
+
+        self.assertEqual(rolled_back["mode"], "full")
+        self.assertIn("registry current version v1", rolled_back["reason"])
+        self.assertEqual(still_current["mode"], "incremental")
+
+    def test_first_run_without_state_is_full(self):
+        plan = train_model.plan_training_run(
+            None,
+            None,
+            np.array([1], dtype=np.uint64),
+            np.array([1]),
+            saved_schema=None,
+            fresh_schema=None,
+            full_retrain_days=7,
+            max_changed_fraction=0.2,
+            max_label_drift=0.1,
+        )
+
+        self.assertEqual(plan["mode"], "full")
+
+    def test_row_digests_ignore_ids(self):
+        first = pd.DataFrame({"id": [1, 2], "username": ["a", "b"], "label": [1, 0]})
+        rebuilt = pd.DataFrame({"id": [7, 8], "username": ["a", "b"], "label": [1, 1]})
+
+        first_digests = train_model.training_row_digests(first)
+        rebuilt_digests = train_model.training_row_digests(rebuilt)
+
+        self.assertEqual(first_digests[0], rebuilt_digests[0])
+        self.assertNotEqual(first_digests[1], rebuilt_digests[1])
+
+    def test_row_digests_ignore_nightly_user_embedding_rebuilds(self):
+        def rows(user_half, watch_sim):
+            return pd.DataFrame({
+                "username": ["a", "a"],
+                "rating_key": [10, 11],
+                "label": [1, 0],
+                "embedding": [str([0.1, 0.2] + user_half), str([0.3, 0.4] + user_half)],
+                "watch_sim": [watch_sim, watch_sim],
+            })
+
+        before = train_model.training_row_digests(rows([0.5, 0.6], 0.2))
+        after = train_model.training_row_digests(rows([0.7, 0.8], 0.9))
+        media_changed = rows([0.5, 0.6], 0.2)
+        media_changed.loc[1, "embedding"] = str([0.9, 0.4, 0.5, 0.6])
+
+        self.assertEqual(before.tolist(), after.tolist())
+        self.assertEqual(train_model.training_row_digests(media_changed)[0], before[0])
+        self.assertNotEqual(train_model.training_row_digests(media_changed)[1], before[1])
+
+    def test_continue_training_adds_rounds_and_records_state(self):
+        rng = np.random.default_rng(3)
+        X = rng.random((200, 3), dtype=np.float32)
+        y = (X[:, 0] > 0.5).astype(int)
+        feature_names = ["emb_0", "emb_1", "watch_sim"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = Path(tmp_dir) / "xgb_model.pkl"
+            base = train_model.xgb.XGBClassifier(n_estimators=5, max_depth=2)
+            base.fit(pd.DataFrame(X, columns=feature_names), y)
+            joblib.dump(base, model_path)
+            feature_store.FeatureSchema.from_feature_names(feature_names).save(
+                feature_store.feature_schema_path(model_path)
+            )
+
+            with redirect_stdout(io.StringIO()):
+                summary = train_model.continue_training(
+                    str(model_path), X[:20], y[:20], np.ones(20), feature_names, rounds=3, training_reason="test"
+                )
+            state = train_model.save_training_state(
+                str(model_path),
+                mode="incremental",
+                reason="test",
+                digests=np.array([3, 1, 2], dtype=np.uint64),
+                labels=y,
+                previous_state={"last_full_at": "2026-10-17T00:00:00+00:00", "positive_rate": 0.5},
+            )
+            loaded_state, digests, schema = train_model.load_training_state(str(model_path))
+            rounds = joblib.load(model_path).get_booster().num_boosted_rounds()
+            train_model.clear_training_state(str(model_path))
+            cleared = train_model.load_training_state(str(model_path))
+
+        self.assertEqual(rounds, 8)
+        self.assertEqual(summary["training_mode"], "incremental")
+        self.assertEqual(summary["boost_rounds"], 8)
+        self.assertEqual(state["incremental_runs_since_full"], 1)
+        self.assertEqual(loaded_state["last_full_at"], "2026-10-17T00:00:00+00:00")
+        self.assertEqual(digests.tolist(), [1, 2, 3])
+        self.assertEqual(list(schema.feature_names), feature_names)
+        self.assertEqual(cleared, (None, None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+import train_model
+from scripts import train_sweep
+
+
+def training_frame(rows=240, seed=5):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.random((rows, 4))
+    genres = np.where(embeddings[:, 0] > 0.5, "Drama", "Comedy")
+    actors = rng.choice(["A", "B", "C"], size=rows)
+    return pd.DataFrame(
+        {
+            "embedding": ["[" + ",".join(f"{value:.4f}" for value in row) + "]" for row in embeddings],
+            "label": (embeddings[:, 0] + 0.3 * rng.random(rows) > 0.6).astype(int),
+            "genre_tags": genres,
+            "actor_tags": actors,
+            "director_tags": rng.choice(["D1", "D2"], size=rows),
+            "release_year": rng.choice([1994, 2003, 2015], size=rows),
+            "watch_sim": rng.random(rows),
+        }
+    )
+
+
+class SweepSpecTests(unittest.TestCase):
+    def test_feature_set_specs(self):
+        self.assertTrue(train_sweep.parse_feature_set("production").exclude_actors)
+        self.assertFalse(train_sweep.parse_feature_set("include_actors").exclude_actors)
+        filtered = train_sweep.parse_feature_set("actors:min_titles=3,top1=0.5")
+        self.assertEqual(filtered.min_actor_distinct_titles, 3)
+        self.assertEqual(filtered.max_actor_top1_concentration, 0.5)
+        for bad in ("actors", "actors:top1=2", "actors:top9=0.5", "everything"):
+            with self.assertRaises(ValueError):
+                train_sweep.parse_feature_set(bad)
+
+    def test_param_grid_is_a_cartesian_product(self):
+        grid = train_sweep.parse_param_grid(["max_depth=4,6", "learning_rate=0.05,0.1", "grow_policy=lossguide"])
+
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(grid[0], {"max_depth": 4, "learning_rate": 0.05, "grow_policy": "lossguide"})
+        self.assertEqual(train_sweep.parse_param_grid([]), [{}])
+
+
+class SweepRunTests(unittest.TestCase):
+    def test_variants_share_one_feature_build_and_match_single_runs(self):
+        df = training_frame()
+        feature_sets = [train_sweep.parse_feature_set("production"), train_sweep.parse_feature_set("include_actors")]
+
+        with redirect_stdout(io.StringIO()):
+            report = train_sweep.run_sweep(
+                df.copy(),
+                feature_sets,
+                train_sweep.parse_param_grid(["max_depth=2,3"]),
+                workers=2,
+            )
+        by_label = {result["label"]: result for result in report["variants"]}
+
+        self.assertEqual(len(report["variants"]), 4)
+        self.assertEqual(
+            sorted(by_label),
+            [
+                "include_actors max_depth=2",
+                "include_actors max_depth=3",
+                "production max_depth=2",
+                "production max_depth=3",
+            ],
+        )
+        _X, _y, _w, production_names = train_model.preprocess(df.copy(), exclude_actors=True)
+        _X, _y, _w, actor_names = train_model.preprocess(df.copy(), exclude_actors=False)
+        self.assertEqual(by_label["production max_depth=2"]["feature_names"], production_names)
+        self.assertEqual(by_label["include_actors max_depth=3"]["feature_names"], actor_names)
+        self.assertTrue(all(result["seconds"] > 0 for result in report["variants"]))
+
+        table = train_sweep.format_sweep_table(report["variants"])
+        self.assertTrue(table[0].startswith(train_model.EXPERIMENT_SUMMARY_HEADER))
+        self.assertEqual(table[1].split(" | ")[2], "0")
+        self.assertEqual(table[-1].split(" | ")[-2], "100")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,10 +6,27 @@ import pandas as pd
 import numpy as np
 import psycopg2
 from sqlalchemy import create_engine
+import hashlib
+import json
 import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from urllib.parse import urlsplit, urlunsplit
 
 from api.db.connection import get_database_url
+from api.services.app_settings import get_setting_value
+from api.services.feature_store import (
+    FeatureSchema,
+    assemble_features,
+    decade_feature,
+    feature_schema_path,
+    normalize_tag_list,
+    parse_embedding,
+    side_features,
+)
+from api.services.model_registry import ModelRegistryError, current_version, publish_model
+from api.services.stage_metrics import StageProfiler, profile_stage, record_rows, stage_phase
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
@@ -47,16 +64,6 @@ def load_training_data():
     print(f"📦 Loaded {len(df)} training rows with non-null embeddings.")
     return df
 
-from sklearn.preprocessing import MultiLabelBinarizer
-import ast
-
-
-def normalize_tag_list(value):
-    if isinstance(value, (list, tuple, set)):
-        return [str(tag).strip() for tag in value if str(tag).strip()]
-    if value is None or pd.isna(value):
-        return []
-    return [tag.strip() for tag in str(value).split(",") if tag.strip()]
 
 
 def load_actor_distinct_title_stats():
@@ -249,8 +256,20 @@ def print_actor_filter_diagnostics(
         )
 
 
-def preprocess(
+def add_tag_lists(df, exclude_actors=False):
+    """Split tag strings into normalized lists (genres, actors, directors columns)."""
+    df['genres'] = df['genre_tags'].apply(normalize_tag_list)
+    if exclude_actors:
+        df['actors'] = [[] for _ in range(len(df))]
+    else:
+        df['actors'] = df['actor_tags'].apply(normalize_tag_list)
+    df['directors'] = df['director_tags'].apply(normalize_tag_list)
+    return df
+
+
+def build_feature_schema(
     df,
+    embedding_dim,
     top_k=20,
     genre_top_k=None,
     actor_top_k=None,
@@ -260,73 +279,25 @@ def preprocess(
     max_actor_top1_concentration=None,
     max_actor_top3_concentration=None,
 ):
-    # Turn vector column into actual np.ndarray
-    if df.empty:
-        raise RuntimeError(
-            "training_data has no rows with non-null embeddings. "
-            "Run build_training_data.py and confirm it reports inserted rows in the same database."
-        )
-
-    required_columns = ["embedding", "label", "genre_tags", "director_tags", "release_year"]
-    if not exclude_actors:
-        required_columns.append("actor_tags")
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        raise RuntimeError(
-            "training_data is missing required columns: " + ", ".join(missing_columns)
-        )
-
-    def safe_embedding_parse(x):
-        if isinstance(x, str):
-            return np.array(ast.literal_eval(x), dtype=np.float32)
-        return np.array(x, dtype=np.float32)
-
-    df['embedding'] = df['embedding'].apply(safe_embedding_parse)
-    df = df[df['embedding'].apply(lambda value: value.size > 0)].copy()
-    if df.empty:
-        raise RuntimeError("training_data rows were found, but every embedding was empty.")
-
-    # 🎞️ Decade features from release_year
-    def get_decade_flags(year):
-        if year is None or pd.isna(year):
-            return {}
-
-        try:
-            decade = int(year) // 10 * 10
-            return {f"is_{decade}s": 1}
-        except:
-            return {}
-
-    decade_df = df['release_year'].apply(get_decade_flags).apply(pd.Series).fillna(0).astype(int)
-
-
-    # Split tags into normalized lists.
-    df['genres'] = df['genre_tags'].apply(normalize_tag_list)
-    if exclude_actors:
-        df['actors'] = [[] for _ in range(len(df))]
-    else:
-        df['actors'] = df['actor_tags'].apply(normalize_tag_list)
-    df['directors'] = df['director_tags'].apply(normalize_tag_list)
+    """Choose the tag vocabulary and decades for a full retrain; expects add_tag_lists columns."""
 
     def top_tags(col_name, tag_limit):
         tag_counts = df[col_name].explode().dropna().value_counts()
         return list(tag_counts.index if tag_limit is None else tag_counts.nlargest(tag_limit).index)
 
-    # Binarize top-k tags for each category.
-    def binarize_tags(col_name, tag_limit, allowed_tags=None):
-        mlb = MultiLabelBinarizer()
+    # Vocabulary of the top-k tags for each category, in column order.
+    def tag_vocabulary(col_name, tag_limit, allowed_tags=None):
         all_tags = top_tags(col_name, tag_limit)
         if allowed_tags is not None:
             allowed_set = set(allowed_tags)
             all_tags = [tag for tag in all_tags if tag in allowed_set]
-        df[col_name] = df[col_name].apply(lambda tags: [tag for tag in tags if tag in all_tags])
-        return pd.DataFrame(mlb.fit_transform(df[col_name]), columns=[f"{col_name[:-1]}_{t}" for t in mlb.classes_])
+        return tuple(sorted(all_tags))
 
     actor_top_k = top_k if actor_top_k is None else actor_top_k
     director_top_k = top_k if director_top_k is None else director_top_k
-    genre_features = binarize_tags('genres', genre_top_k)
+    genre_vocabulary = tag_vocabulary('genres', genre_top_k)
     if exclude_actors:
-        actor_features = pd.DataFrame(index=df.index)
+        actor_vocabulary = ()
     else:
         raw_actor_candidates = top_tags('actors', actor_top_k)
         allowed_actor_candidates = raw_actor_candidates
@@ -361,19 +332,94 @@ def preprocess(
                 max_top1_concentration=max_actor_top1_concentration,
                 max_top3_concentration=max_actor_top3_concentration,
             )
-        actor_features = binarize_tags('actors', actor_top_k, allowed_tags=allowed_actor_candidates)
-    director_features = binarize_tags('directors', director_top_k)
+        actor_vocabulary = tag_vocabulary('actors', actor_top_k, allowed_tags=allowed_actor_candidates)
+    director_vocabulary = tag_vocabulary('directors', director_top_k)
 
-    # Stack features: embedding + tag binarizations
-    X = np.vstack(df['embedding'].values)
-    X = np.hstack((X, genre_features.values, actor_features.values, director_features.values, decade_df.values))
+    # 🎞️ Decade features from release_year
+    decades = tuple(sorted({decade_feature(year) for year in df['release_year']} - {None}))
+
+    return FeatureSchema(
+        embedding_dim=embedding_dim,
+        genres=genre_vocabulary,
+        actors=actor_vocabulary,
+        directors=director_vocabulary,
+        decades=decades,
+    )
+
+
+def prepare_training_frame(df, exclude_actors=False):
+    """Validate training_data rows, parse embeddings and add the tag list columns."""
+    # Turn vector column into actual np.ndarray
+    if df.empty:
+        raise RuntimeError(
+            "training_data has no rows with non-null embeddings. "
+            "Run build_training_data.py and confirm it reports inserted rows in the same database."
+        )
+
+    required_columns = ["embedding", "label", "genre_tags", "director_tags", "release_year"]
+    if not exclude_actors:
+        required_columns.append("actor_tags")
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise RuntimeError(
+            "training_data is missing required columns: " + ", ".join(missing_columns)
+        )
+
+    df['embedding'] = df['embedding'].apply(parse_embedding)
+    df = df[df['embedding'].apply(lambda value: value.size > 0)].copy()
+    if df.empty:
+        raise RuntimeError("training_data rows were found, but every embedding was empty.")
+
+    return add_tag_lists(df, exclude_actors=exclude_actors)
+
+
+def preprocess(
+    df,
+    top_k=20,
+    genre_top_k=None,
+    actor_top_k=None,
+    director_top_k=None,
+    exclude_actors=False,
+    min_actor_distinct_titles=None,
+    max_actor_top1_concentration=None,
+    max_actor_top3_concentration=None,
+    schema=None,
+):
+    """
+    Build the float32 training matrix. Pass ``schema`` to reuse an existing
+    model's columns (incremental refresh) instead of choosing a new vocabulary.
+    """
+    df = prepare_training_frame(df, exclude_actors=exclude_actors)
+    if schema is None:
+        schema = build_feature_schema(
+            df,
+            len(df['embedding'].iloc[0]),
+            top_k=top_k,
+            genre_top_k=genre_top_k,
+            actor_top_k=actor_top_k,
+            director_top_k=director_top_k,
+            exclude_actors=exclude_actors,
+            min_actor_distinct_titles=min_actor_distinct_titles,
+            max_actor_top1_concentration=max_actor_top1_concentration,
+            max_actor_top3_concentration=max_actor_top3_concentration,
+        )
 
     # Optional: watch-embedding similarity feature
-    if 'watch_sim' in df.columns:
-        watch_sim = df['watch_sim'].fillna(0).astype(float).values.reshape(-1, 1)
-    else:
-        watch_sim = np.zeros((len(df), 1), dtype=np.float32)
-    X = np.hstack((X, watch_sim))
+    watch_sim = df['watch_sim'].fillna(0).astype(float).values if 'watch_sim' in df.columns else None
+
+    # Stack features: embedding + tag indicators + decades + watch_sim
+    X = assemble_features(
+        schema,
+        np.vstack(df['embedding'].values),
+        side_features(
+            schema,
+            genres=df['genres'],
+            actors=df['actors'],
+            directors=df['directors'],
+            years=df['release_year'],
+        ),
+        watch_sim,
+    )
 
     y = df['label'].astype(int).values
 
@@ -382,13 +428,7 @@ def preprocess(
     else:
         sample_weight = np.ones(len(df), dtype=np.float32)
 
-    embedding_dim = len(df['embedding'].iloc[0])
-    feature_names = [f"emb_{i}" for i in range(embedding_dim)]  # ✅ Auto-detect
-    feature_names += list(genre_features.columns)
-    feature_names += list(actor_features.columns)
-    feature_names += list(director_features.columns)
-    feature_names += list(decade_df.columns)
-    feature_names += ["watch_sim"]
+    feature_names = list(schema.feature_names)
 
     return X, y, sample_weight, feature_names
 
@@ -400,6 +440,354 @@ import matplotlib.pyplot as plt
 import joblib
 from sklearn.model_selection import train_test_split
 
+XGB_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "aucpr",
+    "scale_pos_weight": 1.0,
+    "max_depth": 6,
+    "learning_rate": 0.1,
+    "subsample": 0.8,
+}
+XGB_RANDOM_STATE = 42
+DEFAULT_N_ESTIMATORS = 100
+
+
+THRESHOLD_METRIC_NAMES = (
+    "threshold",
+    "class_0_precision",
+    "class_0_recall",
+    "class_0_f1",
+    "class_1_f1",
+    "macro_f1",
+    "weighted_f1",
+)
+EXPERIMENT_SUMMARY_HEADER = (
+    "variant | feature_count | actor_feature_count | best_threshold | class_0_precision | "
+    "class_0_recall | class_0_f1 | class_1_f1 | macro_f1 | weighted_f1"
+)
+
+
+def threshold_metrics_for(y_test, y_prob):
+    """
+    Validation metrics at each candidate display threshold, as tuples of
+    (threshold, class_0_precision, class_0_recall, class_0_f1, class_1_f1, macro_f1, weighted_f1).
+    """
+    threshold_metrics = []
+    for threshold in np.arange(0.50, 0.701, 0.05):
+        y_pred_at_threshold = (y_prob >= threshold).astype(int)
+        threshold_metrics.append((
+            threshold,
+            precision_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0),
+            recall_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0),
+            f1_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0),
+            f1_score(y_test, y_pred_at_threshold, pos_label=1, zero_division=0),
+            f1_score(y_test, y_pred_at_threshold, average="macro", zero_division=0),
+            f1_score(y_test, y_pred_at_threshold, average="weighted", zero_division=0),
+        ))
+    return threshold_metrics
+
+
+def recommended_threshold_metrics(threshold_metrics):
+    """Best threshold by class_0_f1, then macro_f1."""
+    return max(threshold_metrics, key=lambda m: (m[3], m[5]))
+
+
+def experiment_summary_row(experiment_label, feature_names, metrics):
+    threshold, class_0_precision, class_0_recall, class_0_f1, class_1_f1, macro_f1, weighted_f1 = metrics
+    return (
+        f"{experiment_label} | "
+        f"{len(feature_names)} | "
+        f"{sum(1 for name in feature_names if str(name).startswith('actor_'))} | "
+        f"{threshold:.2f} | "
+        f"{class_0_precision:.3f} | "
+        f"{class_0_recall:.3f} | "
+        f"{class_0_f1:.3f} | "
+        f"{class_1_f1:.3f} | "
+        f"{macro_f1:.3f} | "
+        f"{weighted_f1:.3f}"
+    )
+
+
+def confusion_plot_path_for(importance_plot_path):
+    path = Path(importance_plot_path)
+    if "feature_importance" in path.name:
+        return path.with_name(path.name.replace("feature_importance", "confusion_matrix"))
+    return path.with_name(f"{path.stem}_confusion_matrix{path.suffix}")
+
+
+def training_summary_path_for(model_output_path):
+    path = Path(model_output_path)
+    return path.with_name(f"{path.stem}.training.json")
+
+
+@contextmanager
+def timed_phase(profiler, name):
+    with stage_phase(name), profiler.phase(name):
+        yield
+
+
+def class_balanced_sample_weights(labels, base_weights):
+    neg_count = (labels == 0).sum()
+    pos_count = (labels == 1).sum()
+    if neg_count > 0 and pos_count > 0:
+        return base_weights * np.where(labels == 0, pos_count / neg_count, 1.0), neg_count, pos_count
+    return None, neg_count, pos_count
+
+
+def write_training_summary(summary_path, profiler, **fields):
+    """Write the timing/memory summary for one training run and print a one-line digest."""
+    snapshot = profiler.snapshot()
+    snapshot.pop("rows_read", None)
+    snapshot.pop("rows_written", None)
+    summary = {**fields, **snapshot}
+    with open(summary_path, "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2)
+    phase_text = ", ".join(f"{name} {stats['seconds']:.1f}s" for name, stats in summary["phases"].items())
+    print(
+        f"⏱️ Training took {summary['wall_seconds']:.1f}s "
+        f"(cpu {summary['cpu_user_seconds'] + summary['cpu_system_seconds']:.1f}s, "
+        f"peak RSS {summary['peak_rss_kb'] / 1024:.0f} MiB): {phase_text}"
+    )
+    print(f"📝 Training summary written to {summary_path}")
+    return summary
+
+
+def booster_to_classifier(booster):
+    """Wrap a native Booster so scoring, SHAP and joblib see a regular XGBClassifier."""
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw(raw_format="ubj")))
+    return model
+
+
+def training_state_path_for(model_output_path):
+    path = Path(model_output_path)
+    return path.with_name(f"{path.stem}.incremental.json")
+
+
+def row_digests_path_for(model_output_path):
+    path = Path(model_output_path)
+    return path.with_name(f"{path.stem}.rows.npy")
+
+
+# Derived from the user's watch-profile vector, which is rebuilt nightly.
+USER_PROFILE_DIGEST_COLUMNS = ("watch_sim",)
+
+
+def _media_embedding_digest(value):
+    # training_data.embedding is the media vector followed by the user vector.
+    embedding = parse_embedding(value)
+    return hashlib.blake2b(embedding[: embedding.size // 2].tobytes(), digest_size=8).hexdigest()
+
+
+def training_row_digests(df):
+    """
+    Content hash per training_data row. build_training_data rewrites the
+    table (and its ids) nightly, so rows are matched on content, not id.
+
+    build_user_embeddings also rebuilds every active user's vectors nightly,
+    so the user half of ``embedding`` and ``watch_sim`` are left out; otherwise
+    every row of anyone who watched something would count as changed. Drift
+    in those features is picked up by the scheduled full retrain.
+    """
+    excluded = {"id", *USER_PROFILE_DIGEST_COLUMNS}
+    columns = sorted(column for column in df.columns if column not in excluded)
+    content = df[columns].copy()
+    if "embedding" in content.columns:
+        content["embedding"] = content["embedding"].map(_media_embedding_digest)
+    return pd.util.hash_pandas_object(content.astype(str), index=False).to_numpy(dtype=np.uint64)
+
+
+def load_training_state(model_output_path):
+    """Return (state, row digests, feature schema) from the last run, or Nones."""
+    try:
+        with open(training_state_path_for(model_output_path), encoding="utf-8") as handle:
+            state = json.load(handle)
+        digests = np.load(row_digests_path_for(model_output_path), allow_pickle=False)
+        schema = FeatureSchema.load(feature_schema_path(model_output_path))
+    except (OSError, ValueError, KeyError):
+        return None, None, None
+    if not Path(model_output_path).is_file():
+        return None, None, None
+    return state, digests, schema
+
+
+def save_training_state(
+    model_output_path,
+    *,
+    mode,
+    reason,
+    digests,
+    labels,
+    previous_state=None,
+    published_version=None,
+    now=None,
+):
+    now = now or datetime.now(timezone.utc)
+    previous_state = previous_state or {}
+    full = mode == "full"
+    state = {
+        "mode": mode,
+        "reason": reason,
+        "trained_at": now.isoformat(),
+        "last_full_at": now.isoformat() if full else previous_state.get("last_full_at"),
+        "incremental_runs_since_full": 0
+        if full
+        else int(previous_state.get("incremental_runs_since_full", 0)) + (mode == "incremental"),
+        "rows": int(len(digests)),
+        # Drift is measured against the last full retrain, so it accumulates.
+        "positive_rate": float(np.mean(labels)) if full else previous_state.get("positive_rate"),
+        # Registry version the model file was published as; see plan_training_run.
+        "published_version": published_version,
+    }
+    np.save(row_digests_path_for(model_output_path), np.sort(digests))
+    with open(training_state_path_for(model_output_path), "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2)
+    return state
+
+
+def clear_training_state(model_output_path):
+    """
+    Forget the incremental state. A run with incremental training off rewrites
+    the model file, so the old state no longer describes it.
+    """
+    for path in (training_state_path_for(model_output_path), row_digests_path_for(model_output_path)):
+        Path(path).unlink(missing_ok=True)
+
+
+def plan_training_run(
+    state,
+    previous_digests,
+    digests,
+    labels,
+    *,
+    saved_schema,
+    fresh_schema,
+    full_retrain_days,
+    max_changed_fraction,
+    max_label_drift,
+    current_model_version=None,
+    now=None,
+):
+    """
+    Decide between a full retrain, an incremental boosting continuation on
+    new or changed rows, or keeping the model because nothing changed.
+
+    ``current_model_version`` is the registry's current version when this run
+    publishes. If an admin rolled back or activated another version since the
+    model file was published, continuing from that file would republish the
+    rejected model, so a full retrain is forced instead.
+    """
+    now = now or datetime.now(timezone.utc)
+    if state is None or previous_digests is None or saved_schema is None:
+        return {"mode": "full", "reason": "no previous incremental training state"}
+    if current_model_version is not None and state.get("published_version") != current_model_version:
+        return {
+            "mode": "full",
+            "reason": f"registry current version {current_model_version} is not the last model trained here",
+        }
+    if fresh_schema != saved_schema:
+        return {"mode": "full", "reason": "feature schema changed (tag vocabulary or decades)"}
+
+    try:
+        last_full_at = datetime.fromisoformat(state["last_full_at"])
+    except (KeyError, TypeError, ValueError):
+        return {"mode": "full", "reason": "no recorded full retrain"}
+    if now - last_full_at >= timedelta(days=full_retrain_days):
+        return {"mode": "full", "reason": f"scheduled full retrain (last one {(now - last_full_at).days} days ago)"}
+
+    new_mask = ~np.isin(digests, previous_digests)
+    removed = int(len(previous_digests) - np.isin(previous_digests, digests).sum())
+    new_rows = int(new_mask.sum())
+    changed_fraction = (new_rows + removed) / max(len(digests), 1)
+    if changed_fraction > max_changed_fraction:
+        return {
+            "mode": "full",
+            "reason": f"{changed_fraction:.1%} of rows changed (limit {max_changed_fraction:.1%})",
+        }
+
+    baseline_rate = state.get("positive_rate")
+    positive_rate = float(np.mean(labels)) if len(labels) else 0.0
+    if baseline_rate is not None and abs(positive_rate - baseline_rate) > max_label_drift:
+        return {
+            "mode": "full",
+            "reason": f"label drift: positive rate {positive_rate:.3f} vs {baseline_rate:.3f} at last full retrain",
+        }
+
+    if new_rows == 0:
+        return {"mode": "unchanged", "reason": f"no new or changed rows ({removed} removed)"}
+    return {
+        "mode": "incremental",
+        "reason": f"{new_rows} new or changed rows, {removed} removed",
+        "new_mask": new_mask,
+    }
+
+
+def registry_current_version():
+    try:
+        model_version = current_version()
+    except ModelRegistryError as exc:
+        print(f"⚠️ Could not read the model registry pointer: {exc}")
+        return None
+    return model_version.version if model_version else None
+
+
+def continue_training(
+    model_output_path,
+    X,
+    y,
+    sample_weight,
+    feature_names,
+    *,
+    rounds,
+    fast=False,
+    n_jobs=0,
+    summary_path=None,
+    training_reason=None,
+):
+    """Add ``rounds`` boosting rounds to the saved model using only new or changed rows."""
+    profiler = StageProfiler()
+    summary_path = summary_path or training_summary_path_for(model_output_path)
+    with timed_phase(profiler, "load model"):
+        previous_booster = joblib.load(model_output_path).get_booster()
+    previous_rounds = previous_booster.num_boosted_rounds()
+
+    params = {**XGB_PARAMS, "seed": XGB_RANDOM_STATE}
+    if fast:
+        params["tree_method"] = "hist"
+        if n_jobs:
+            params["nthread"] = n_jobs
+    weights, _neg_count, _pos_count = class_balanced_sample_weights(y, sample_weight)
+    dnew = xgb.DMatrix(
+        X,
+        label=y,
+        weight=sample_weight if weights is None else weights,
+        feature_names=feature_names,
+        nthread=n_jobs or None,
+    )
+    with timed_phase(profiler, "continue boosting"):
+        booster = xgb.train(params, dnew, num_boost_round=rounds, xgb_model=previous_booster)
+    model = booster_to_classifier(booster)
+    model.get_booster().feature_names = feature_names
+
+    with timed_phase(profiler, "save model"):
+        joblib.dump(model, model_output_path)
+    print(
+        f"✅ Continued {model_output_path} from {previous_rounds} to "
+        f"{model.get_booster().num_boosted_rounds()} rounds on {len(y)} new or changed rows"
+    )
+    return write_training_summary(
+        summary_path,
+        profiler,
+        training_mode="incremental",
+        reason=training_reason,
+        mode="fast" if fast else "standard",
+        rows=int(X.shape[0]),
+        features=int(X.shape[1]),
+        boost_rounds=int(model.get_booster().num_boosted_rounds()),
+        threads=int(n_jobs) if fast else None,
+    )
+
+
 def train_and_evaluate(
     X,
     y,
@@ -409,31 +797,41 @@ def train_and_evaluate(
     importance_log_path="feature_importance_log.txt",
     importance_plot_path="feature_importance_plot.png",
     experiment_label="production no-direct-actor model",
+    fast=False,
+    n_jobs=0,
+    max_boost_rounds=400,
+    early_stopping_rounds=25,
+    confusion_plot_path=None,
+    summary_path=None,
+    training_reason=None,
 ):
+    """
+    Fit, evaluate and save the model. ``fast`` trains with the hist method on
+    QuantileDMatrix data, picks the round count by early stopping on the
+    validation split and writes plots to files instead of showing them.
+    """
     from sklearn.model_selection import train_test_split
 
-    def class_balanced_sample_weights(labels, base_weights):
-        neg_count = (labels == 0).sum()
-        pos_count = (labels == 1).sum()
-        if neg_count > 0 and pos_count > 0:
-            return base_weights * np.where(labels == 0, pos_count / neg_count, 1.0), neg_count, pos_count
-        return None, neg_count, pos_count
+    profiler = StageProfiler()
+    confusion_plot_path = confusion_plot_path or confusion_plot_path_for(importance_plot_path)
+    summary_path = summary_path or training_summary_path_for(model_output_path)
 
     print(f"🧪 Training mode: {experiment_label}")
+    if fast:
+        print(
+            "⚡ Fast training: tree_method=hist, "
+            f"threads={n_jobs or 'all'}, up to {max_boost_rounds} rounds, "
+            f"early stopping after {early_stopping_rounds}"
+        )
 
     X_train, X_test, y_train, y_test, train_idx, test_idx = train_test_split(
-        X, y, np.arange(len(y)), test_size=0.2, stratify=y, random_state=42
+        X, y, np.arange(len(y)), test_size=0.2, stratify=y, random_state=XGB_RANDOM_STATE
     )
 
     model = xgb.XGBClassifier(
-        objective='binary:logistic',
-        eval_metric='aucpr',
-        scale_pos_weight=1.0,
-        n_estimators=100,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        random_state=42
+        **XGB_PARAMS,
+        n_estimators=DEFAULT_N_ESTIMATORS,
+        random_state=XGB_RANDOM_STATE,
     )
 
     sample_weights, neg_count, pos_count = class_balanced_sample_weights(
@@ -449,27 +847,45 @@ def train_and_evaluate(
         sample_weights = None
         print("⚠️ Skipping class-balanced sample weights because one class is missing from the train split.")
 
-    model.fit(X_train, y_train, sample_weight=sample_weights)
+    final_sample_weights, full_neg_count, full_pos_count = class_balanced_sample_weights(
+        y,
+        sample_weight,
+    )
 
-    y_prob = model.predict_proba(X_test)[:, 1]
-    threshold_metrics = []
-    for threshold in np.arange(0.50, 0.701, 0.05):
-        y_pred_at_threshold = (y_prob >= threshold).astype(int)
-        class_0_precision = precision_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0)
-        class_0_recall = recall_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0)
-        class_0_f1 = f1_score(y_test, y_pred_at_threshold, pos_label=0, zero_division=0)
-        class_1_f1 = f1_score(y_test, y_pred_at_threshold, pos_label=1, zero_division=0)
-        macro_f1 = f1_score(y_test, y_pred_at_threshold, average="macro", zero_division=0)
-        weighted_f1 = f1_score(y_test, y_pred_at_threshold, average="weighted", zero_division=0)
-        threshold_metrics.append((
-            threshold,
-            class_0_precision,
-            class_0_recall,
-            class_0_f1,
-            class_1_f1,
-            macro_f1,
-            weighted_f1,
-        ))
+    boost_rounds = DEFAULT_N_ESTIMATORS
+    if fast:
+        native_params = {**XGB_PARAMS, "tree_method": "hist", "seed": XGB_RANDOM_STATE}
+        if n_jobs:
+            native_params["nthread"] = n_jobs
+        with timed_phase(profiler, "build quantile matrices"):
+            dtrain = xgb.QuantileDMatrix(
+                X_train, y_train, weight=sample_weights, feature_names=feature_names, nthread=n_jobs or None
+            )
+            dvalid = xgb.QuantileDMatrix(X_test, y_test, ref=dtrain, feature_names=feature_names)
+            # The full refit reuses the training split's quantile cuts instead of re-sketching.
+            dfull = xgb.QuantileDMatrix(
+                X, y, weight=final_sample_weights, ref=dtrain, feature_names=feature_names, nthread=n_jobs or None
+            )
+        with timed_phase(profiler, "fit evaluation model"):
+            evaluation_booster = xgb.train(
+                native_params,
+                dtrain,
+                num_boost_round=max_boost_rounds,
+                evals=[(dvalid, "validation")],
+                early_stopping_rounds=early_stopping_rounds,
+                verbose_eval=False,
+            )
+        boost_rounds = evaluation_booster.best_iteration + 1
+        print(
+            f"⏱️ Early stopping chose {boost_rounds} rounds "
+            f"(validation aucpr {evaluation_booster.best_score:.4f})"
+        )
+        y_prob = evaluation_booster.predict(dvalid, iteration_range=(0, boost_rounds))
+    else:
+        with timed_phase(profiler, "fit evaluation model"):
+            model.fit(X_train, y_train, sample_weight=sample_weights)
+        y_prob = model.predict_proba(X_test)[:, 1]
+    threshold_metrics = threshold_metrics_for(y_test, y_prob)
 
     print("📊 Threshold comparison:")
     print("threshold | class_0_recall | class_0_f1 | macro_f1")
@@ -484,10 +900,7 @@ def train_and_evaluate(
         recommended_class_1_f1,
         recommended_macro_f1,
         recommended_weighted_f1,
-    ) = max(
-        threshold_metrics,
-        key=lambda m: (m[3], m[5])
-    )
+    ) = recommended_threshold_metrics(threshold_metrics)
     (
         macro_threshold,
         _macro_class_0_precision,
@@ -519,19 +932,8 @@ def train_and_evaluate(
         "score_model.py is unchanged."
     )
     print("📊 Experiment summary row:")
-    print("variant | feature_count | actor_feature_count | best_threshold | class_0_precision | class_0_recall | class_0_f1 | class_1_f1 | macro_f1 | weighted_f1")
-    print(
-        f"{experiment_label} | "
-        f"{len(feature_names)} | "
-        f"{sum(1 for name in feature_names if str(name).startswith('actor_'))} | "
-        f"{recommended_threshold:.2f} | "
-        f"{recommended_class_0_precision:.3f} | "
-        f"{recommended_class_0_recall:.3f} | "
-        f"{recommended_class_0_f1:.3f} | "
-        f"{recommended_class_1_f1:.3f} | "
-        f"{recommended_macro_f1:.3f} | "
-        f"{recommended_weighted_f1:.3f}"
-    )
+    print(EXPERIMENT_SUMMARY_HEADER)
+    print(experiment_summary_row(experiment_label, feature_names, recommended_threshold_metrics(threshold_metrics)))
 
     for threshold, *_unused_metrics in threshold_metrics:
         y_pred_at_threshold = (y_prob >= threshold).astype(int)
@@ -545,12 +947,13 @@ def train_and_evaluate(
     disp = ConfusionMatrixDisplay(confusion_matrix=cm)
     disp.plot()
     plt.title(f"XGBoost Confusion Matrix (threshold {recommended_threshold:.2f})")
-    plt.show()
+    if fast:
+        plt.savefig(confusion_plot_path)
+        plt.close("all")
+        print(f"🖼️ Confusion matrix plot saved to {confusion_plot_path}")
+    else:
+        plt.show()
 
-    final_sample_weights, full_neg_count, full_pos_count = class_balanced_sample_weights(
-        y,
-        sample_weight,
-    )
     if final_sample_weights is not None:
         print(
             "📦 Re-training final model on all rows before saving: "
@@ -558,7 +961,11 @@ def train_and_evaluate(
         )
     else:
         print("⚠️ Saving split-trained model because one class is missing from the full dataset.")
-    model.fit(X, y, sample_weight=final_sample_weights)
+    with timed_phase(profiler, "fit final model"):
+        if fast:
+            model = booster_to_classifier(xgb.train(native_params, dfull, num_boost_round=boost_rounds))
+        else:
+            model.fit(X, y, sample_weight=final_sample_weights)
     model.get_booster().feature_names = feature_names
 
     # 📝 Log top N features to file
@@ -592,17 +999,43 @@ def train_and_evaluate(
     plt.title(f"Top 20 Most Important Features (Gain) — {experiment_label}")
     plt.tight_layout()
     plt.savefig(importance_plot_path)  # 💾 Save to file
-    plt.show()
+    if fast:
+        plt.close("all")
+    else:
+        plt.show()
     print(f"🖼️ Feature importance plot saved to {importance_plot_path}")
 
-    joblib.dump(model, model_output_path)
+    with timed_phase(profiler, "save model"):
+        joblib.dump(model, model_output_path)
+        schema_path = feature_schema_path(model_output_path)
+        FeatureSchema.from_feature_names(feature_names).save(schema_path)
     print(f"✅ XGBoost model saved to {model_output_path}")
+    print(f"🧾 Feature schema saved to {schema_path}")
+
+    summary = write_training_summary(
+        summary_path,
+        profiler,
+        training_mode="full",
+        reason=training_reason,
+        mode="fast" if fast else "standard",
+        experiment_label=experiment_label,
+        rows=int(X.shape[0]),
+        features=int(X.shape[1]),
+        boost_rounds=int(boost_rounds),
+        threads=int(n_jobs) if fast else None,
+        validation={
+            name: round(float(value), 4)
+            for name, value in zip(THRESHOLD_METRIC_NAMES, recommended_threshold_metrics(threshold_metrics))
+        },
+    )
 
     # Add this after training
     for feature, score in sorted_importances:
         if feature.startswith("is_"):
             print(f"{feature}: {score:.4f}")
 
+    return summary
+
 
 if __name__ == "__main__":
     import argparse
@@ -668,6 +1101,40 @@ if __name__ == "__main__":
         default=None,
         help="Optional feature-importance plot path. Experiment flags choose safe separate defaults.",
     )
+    parser.add_argument(
+        "--fast",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Use fast training (hist method, QuantileDMatrix, early stopping, plots written not shown). "
+            "Defaults to the training.fast_mode setting."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Continue boosting the saved model on new or changed training rows when the schedule, feature "
+            "schema and drift checks allow it; otherwise retrain fully. Defaults to the "
+            "training.incremental_enabled setting."
+        ),
+    )
+    parser.add_argument(
+        "--publish",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Publish the trained model to the model registry and make it the current scoring model. "
+            "Defaults to on for the production model and off for experiments and custom --model-output paths."
+        ),
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Training threads for fast mode; 0 uses every core. Defaults to the training.n_jobs setting.",
+    )
     args = parser.parse_args()
 
     concentration_filter_supplied = (
@@ -684,6 +1151,8 @@ if __name__ == "__main__":
         parser.error("--exclude-actors is deprecated and cannot be combined with --include-actors.")
     if args.exclude_actors and actor_eligibility_filter_supplied:
         parser.error("--exclude-actors cannot be combined with actor eligibility filter experiments.")
+    if args.n_jobs is not None and args.n_jobs < 0:
+        parser.error("--n-jobs must be 0 or greater.")
     if args.min_actor_distinct_titles is not None and args.min_actor_distinct_titles < 1:
         parser.error("--min-actor-distinct-titles must be 1 or greater.")
     for flag_name, flag_value in [
@@ -773,31 +1242,144 @@ if __name__ == "__main__":
         print("🎭 Actor metadata remains available for UI, labels, prompts, and analytics.")
         print(f"📦 Production model output: {model_output_path}")
 
-    print("📥 Loading training data...")
-    df = load_training_data()
-
-    print("🧹 Preprocessing...")
-    X, y, sample_weight, feature_names = preprocess(
-        df,
-        # Production training excludes direct actor_* binary features. The
-        # actor_tags metadata stays in training_data; it is simply not expanded
-        # into model columns unless an actor experiment opts in.
-        exclude_actors=not include_actor_features,
-        min_actor_distinct_titles=args.min_actor_distinct_titles,
-        max_actor_top1_concentration=args.max_actor_top1_concentration,
-        max_actor_top3_concentration=args.max_actor_top3_concentration,
-    )
-    actor_feature_count = sum(1 for name in feature_names if str(name).startswith("actor_"))
-    print(f"🎭 Number of actor_* features included: {actor_feature_count}")
-
-    print(f"📊 Training on {X.shape[0]} samples with {X.shape[1]} features...")
-    train_and_evaluate(
-        X,
-        y,
-        sample_weight,
-        feature_names,
-        model_output_path=model_output_path,
-        importance_log_path=importance_log_path,
-        importance_plot_path=importance_plot_path,
-        experiment_label=experiment_label,
-    )  # Switch this depending on model you want
+    fast_training = (
+        bool(get_setting_value("training.fast_mode", default=False)) if args.fast is None else args.fast
+    )
+    training_n_jobs = (
+        int(get_setting_value("training.n_jobs", default=0)) if args.n_jobs is None else args.n_jobs
+    )
+    if fast_training:
+        # Headless: plots are written to files, never shown.
+        plt.switch_backend("Agg")
+
+    publish_model_version = (
+        model_output_path == "xgb_model.pkl" and not args.exclude_actors
+        if args.publish is None
+        else args.publish
+    )
+
+    incremental_training = (
+        bool(get_setting_value("training.incremental_enabled", default=False))
+        if args.incremental is None
+        else args.incremental
+    )
+    # Production training excludes direct actor_* binary features. The
+    # actor_tags metadata stays in training_data; it is simply not expanded
+    # into model columns unless an actor experiment opts in.
+    feature_options = {
+        "exclude_actors": not include_actor_features,
+        "min_actor_distinct_titles": args.min_actor_distinct_titles,
+        "max_actor_top1_concentration": args.max_actor_top1_concentration,
+        "max_actor_top3_concentration": args.max_actor_top3_concentration,
+    }
+
+    with profile_stage():
+        print("📥 Loading training data...")
+        with stage_phase("load training data"):
+            df = load_training_data()
+        record_rows(read=len(df))
+
+        previous_state = None
+        plan = {"mode": "full", "reason": "incremental training disabled"}
+        if incremental_training:
+            with stage_phase("plan incremental"):
+                row_digests = training_row_digests(df)
+                row_labels = (
+                    df['label'].astype(int).to_numpy() if 'label' in df.columns else np.zeros(len(df), dtype=int)
+                )
+                previous_state, previous_digests, saved_schema = load_training_state(model_output_path)
+                fresh_schema = None
+                if saved_schema is not None:
+                    tag_columns = [
+                        column
+                        for column in ("genre_tags", "actor_tags", "director_tags", "release_year")
+                        if column in df.columns
+                    ]
+                    fresh_schema = build_feature_schema(
+                        add_tag_lists(df[tag_columns].copy(), exclude_actors=feature_options["exclude_actors"]),
+                        saved_schema.embedding_dim,
+                        **feature_options,
+                    )
+                plan = plan_training_run(
+                    previous_state,
+                    previous_digests,
+                    row_digests,
+                    row_labels,
+                    saved_schema=saved_schema,
+                    fresh_schema=fresh_schema,
+                    full_retrain_days=int(get_setting_value("training.full_retrain_days", default=7)),
+                    max_changed_fraction=float(
+                        get_setting_value("training.incremental_max_changed_fraction", default=0.2)
+                    ),
+                    max_label_drift=float(get_setting_value("training.incremental_max_label_drift", default=0.05)),
+                    current_model_version=registry_current_version() if publish_model_version else None,
+                )
+        print(f"🧭 Training run: {plan['mode']} ({plan['reason']})")
+
+        training_summary = None
+        if plan["mode"] == "unchanged":
+            print(f"⏩ Keeping {model_output_path}; training_data has no new or changed rows.")
+        elif plan["mode"] == "incremental":
+            print("🧹 Preprocessing new or changed rows...")
+            with stage_phase("preprocess"):
+                X, y, sample_weight, feature_names = preprocess(
+                    df.loc[plan["new_mask"]].copy(),
+                    schema=saved_schema,
+                    **feature_options,
+                )
+            training_summary = continue_training(
+                model_output_path,
+                X,
+                y,
+                sample_weight,
+                feature_names,
+                rounds=int(get_setting_value("training.incremental_rounds", default=10)),
+                fast=fast_training,
+                n_jobs=training_n_jobs,
+                training_reason=plan["reason"],
+            )
+        else:
+            print("🧹 Preprocessing...")
+            with stage_phase("preprocess"):
+                X, y, sample_weight, feature_names = preprocess(df, **feature_options)
+            actor_feature_count = sum(1 for name in feature_names if str(name).startswith("actor_"))
+            print(f"🎭 Number of actor_* features included: {actor_feature_count}")
+
+            print(f"📊 Training on {X.shape[0]} samples with {X.shape[1]} features...")
+            training_summary = train_and_evaluate(
+                X,
+                y,
+                sample_weight,
+                feature_names,
+                model_output_path=model_output_path,
+                importance_log_path=importance_log_path,
+                importance_plot_path=importance_plot_path,
+                experiment_label=experiment_label,
+                fast=fast_training,
+                n_jobs=training_n_jobs,
+                max_boost_rounds=int(get_setting_value("training.max_boost_rounds", default=400)),
+                early_stopping_rounds=int(get_setting_value("training.early_stopping_rounds", default=25)),
+                training_reason=plan["reason"],
+            )  # Switch this depending on model you want
+
+        published_version = (previous_state or {}).get("published_version") if plan["mode"] == "unchanged" else None
+        try:
+            if training_summary is not None and publish_model_version:
+                with stage_phase("publish model"):
+                    published = publish_model(model_output_path, metadata={"training": training_summary})
+                published_version = published.version
+                print(f"📚 Published model version {published.version} to the registry as current")
+        finally:
+            # Saved even when publishing fails, so the next run retrains in full.
+            if incremental_training:
+                save_training_state(
+                    model_output_path,
+                    mode=plan["mode"],
+                    reason=plan["reason"],
+                    digests=row_digests,
+                    labels=row_labels,
+                    previous_state=previous_state,
+                    published_version=published_version,
+                )
+            else:
+                clear_training_state(model_output_path)